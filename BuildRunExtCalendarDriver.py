@@ -26,6 +26,9 @@
 # Paul Baranoski 2025-11-21 Add ContentType parameter in put_object call.
 # Paul Baranoski 2025-12-03 Comment out logic to determine nearest working day when a specific day is entered in config file. Need this for 
 #                           proper Calendar entry creation for RAC.
+# 2026-10-18                Build calendar records with ExtCalendarEngine (precomputed date table for the year; rules resolved
+#                           with lookups; calendars cached by config file hash and year). getMatchingDOWDate, buildWkCal4Yr and
+#                           buildQtrCal4Yr are no longer called by this driver (reference for ExtCalendarEngineBenchmark.py).
 ########################################################################################################
 
 # Our common module with variable constants
@@ -47,6 +50,7 @@ from datetime import datetime
 from datetime import date,timedelta
         
 import BuildRunExtCalendarImport as ExtSQL
+import ExtCalendarEngine as ExtCal
 
 # Our include members
 import LoggerStandard as EnigmaLog
@@ -616,77 +620,20 @@ def main_processing_loop():
 
 
         # S3 Body is byte array. Convert byte array to utf-8 string. Splitlines recognizes "\r\n" as end-of-record markers     
-        lstConfigRecs = calendarConfigFile["Body"].read().decode('utf-8').splitlines()
+        bConfigFile = calendarConfigFile["Body"].read()
+        lstConfigRecs = bConfigFile.decode('utf-8').splitlines()
         sConfigRecs = "\n".join(lstConfigRecs)
         rootLogger.info("\n%s", sConfigRecs) 
 
 
         #########################################################
-        # iterate thru config records to build calendar entries
+        # Build calendar entries for config records
+        # NOTE: An invalid config record raises an exception 
+        #       --> Failure email with the invalid value.
         #########################################################       
-        for sConfigRec in lstConfigRecs:
-        
-            rootLogger.info("*****************************") 
-            rootLogger.info("read next Config Record") 
-            rootLogger.info(f"{sConfigRec=}")  
-            lstConfigRecFlds = sConfigRec.split("|") 
-
-            ####################################################
-            # parse input record into separte fields by '|'
-            # Example: Blbtn,Blue Button,W,M;F,,,N,EFT 
-            ####################################################
-            ExtractID = lstConfigRecFlds[0].strip() 
-            Ext_Desc = lstConfigRecFlds[1].strip()
-            TimeFrame = lstConfigRecFlds[2].strip()
-            DOW_DOM = lstConfigRecFlds[3].strip()
-            Months = lstConfigRecFlds[4].strip()
-            Month_Day = lstConfigRecFlds[5].strip()
-            FinderFileReq = lstConfigRecFlds[6].strip()
-            FF_Pre_Processing = lstConfigRecFlds[7].strip()
-            DeliveryMethod = lstConfigRecFlds[8].strip()
-            ExtInitDeliveryDt = lstConfigRecFlds[13].strip()
-            ExtObsoleteDt = lstConfigRecFlds[14].strip()            
-
-            rootLogger.info(f"{ExtractID=}")  	
-            rootLogger.info(f"{Ext_Desc=}")  	
-            rootLogger.info(f"{TimeFrame=}")        
-            rootLogger.info(f"{DOW_DOM=}")        
-            rootLogger.info(f"{Months=}")        
-            rootLogger.info(f"{Month_Day=}")        
-            rootLogger.info(f"{FinderFileReq=}")        
-            rootLogger.info(f"{FF_Pre_Processing=}")        
-            rootLogger.info(f"{DeliveryMethod=}")         
-            rootLogger.info(f"{ExtInitDeliveryDt=}")    
-            rootLogger.info(f"{ExtObsoleteDt=}")   
-            
-            ####################################################
-            # Create year calendar records for extract
-            ####################################################
-            if TimeFrame == 'W':
-                rootLogger.info("Processing Weekly Extract")   
-
-                DaysMatchMask = getDaysMatchMask(DOW_DOM)
-                rootLogger.info(f"{DaysMatchMask=}")  
-                buildWkCal4Yr(lstCalendarOutputRecs, ExtInitDeliveryDt, ExtObsoleteDt, sConfigRec) 
-
-            elif TimeFrame == 'M':
-                rootLogger.info("Processing Monthly Extract")  
-                buildQtrCal4Yr(lstCalendarOutputRecs, MON_ABREVS_DELIM, DOW_DOM, ExtInitDeliveryDt, ExtObsoleteDt, sConfigRec)
-                
-            elif TimeFrame == 'Q' or TimeFrame == 'S' or TimeFrame == 'A':   
-                buildQtrCal4Yr(lstCalendarOutputRecs, Months, Month_Day, ExtInitDeliveryDt, ExtObsoleteDt, sConfigRec)
-
-            else:
-                rootLogger.info(f"Invalid extract time frame: {TimeFrame} in config file record {sConfigRec}") 	
-            
-                ## Send Failure email	
-                SUBJECT=f"BuildRunExtCalendarDriver.py  - Failed ({ENVNAME})"
-                MSG=f"Invalid extract time frame: {TimeFrame} in config file record {config_rec}. Process failed. "
-                #sendEmail.py CMS_EMAIL_SENDER ENIGMA_EMAIL_FAILURE_RECIPIENT SUBJECT MSG 
-                sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_FAILURE_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
-                rootLogger.info(sp_info)
-    
-                sys.exit(12)	
+        ExtCal.setExtCalendarLogger(rootLogger)
+        lstCalendarOutputRecs = ExtCal.getRunExtCalendar(bConfigFile, int(sProcessingYYYY))
+        rootLogger.info(f"{len(lstConfigRecs)} config records --> {len(lstCalendarOutputRecs)} calendar records")
 
 
         ################################################################
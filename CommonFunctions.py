@@ -22,6 +22,29 @@
 # Paul Baranoski 2026-07-27 Added new function deleteS3FilesUsingPrefix.
 # Paul Baranoski 2026-07-28 Added new function sendEmail.
 # Paul Baranoski 2026-07-30 Add filter to function getExtFiles4RequestList to not include files in "archive" folder.
+# 2026-10-18                Modify function s3MoveLargeFile2NewFolder to copy large files with parallel server-side
+#                           upload_part_copy requests instead of the 100 MB multipart managed transfer.
+# 2026-10-18                Modify function splitTextFileIntoMultipleHCPCSFiles to route records with a bisect search of
+#                           the HCPCS ranges, write in blocks thru large buffers, and return record/byte counts of each file.
+#                           Added new function gzipNUploadFiles to gzip and upload files in parallel.
+# 2026-10-18                Modify function splitTextFileIntoMultipleFiles to split at newlines found near byte targets
+#                           (one mmap search per split) and copy byte ranges with copy_file_range/sendfile in parallel.
+#                           Added new functions buildLineOffsetIndex/getLineOffsetIndex (persisted line offset index).
+#                           Modify function getRangeOfRecords to optionally seek using the line offset index.
+#                           Modify function findRecsContainingSearchText to search the mmap'd file instead of each line.
+# 2026-10-18                Added new functions listS3Objects/iterS3Objects (paginated boto3 listing) with a short-TTL
+#                           SQLite listing cache (S3_LISTING_CACHE_DB), invalidateS3ListingCache, and s3GetMostRecentFileKey.
+#                           Modify functions getS3FileKeysList and getExtFiles4RequestList to use listS3Objects.
+#                           Modify s3 move/upload/delete functions to invalidate cached listings.
+# 2026-10-18                Added new functions getS3TextObjects and getS3ObjectsMetadata to get/head s3 objects concurrently
+#                           with adaptive backoff on SlowDown, cached on disk (S3_METADATA_CACHE_DB) by key + ETag.
+# 2026-10-18                Modify functions listS3Objects and s3GetMostRecentFileKey to use the listing cache only when
+#                           bUseCache=True (read-only reports). getS3FileKeysList/getExtFiles4RequestList always list s3,
+#                           because COPY INTO @stage, multipart uploads and other processes do not invalidate the cache.
+# 2026-10-18                Modify function sendEmail to log the email spool messages (sendEmail.py queues the email when
+#                           the job sets EMAIL_DELIVERY=SPOOL).
+# 2026-10-18                Modify function splitTextFileIntoMultipleHCPCSFiles to read "\r\n" and "\r" line ends as "\n" and
+#                           route on the first 5 characters (not bytes), as the prior text-mode function did.
 ######################################################################################
 
 ########################################################################################################
@@ -36,6 +59,11 @@ import sys
 import argparse
 import re
 import io
+import time
+import json
+import random
+import logging
+import threading
 
 import subprocess
 
@@ -47,6 +75,87 @@ from datetime import datetime
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 
+from concurrent.futures import ThreadPoolExecutor
+
+from bisect import bisect_right
+
+
+########################################################################################################
+# CONSTANTS
+########################################################################################################
+# s3MoveLargeFile2NewFolder: part size of each server-side upload_part_copy (max 5 GB), and NOF parts copied at one time
+S3_COPY_PART_SIZE = 512 * 1024 * 1024
+S3_COPY_MAX_IN_FLIGHT = int(os.getenv("S3_COPY_MAX_IN_FLIGHT", "16"))
+
+# splitTextFileIntoMultipleHCPCSFiles: HCPCS_CD ranges (low, high) of output files 01-24 (sorted by low value).
+# File 25 is "~    " and "UNK  " HCPCS_CD. File 26 is blank HCPCS_CD and HCPCS_CD not in any range.
+HCPCS_SPLIT_RANGES = [
+    (b"0000 ", b"09999"),
+    (b"1000 ", b"14999"),
+    (b"1500 ", b"19999"),
+    (b"2000 ", b"24999"),
+    (b"2500 ", b"29999"),
+    (b"3000 ", b"32999"),
+    (b"3300 ", b"37999"),
+    (b"3800 ", b"38999"),
+    (b"3900 ", b"39999"),
+    (b"4000 ", b"49999"),
+    (b"5000 ", b"53999"),
+    (b"5400 ", b"55999"),
+    (b"5600 ", b"58999"),
+    (b"5900 ", b"59999"),
+    (b"6000 ", b"64999"),
+    (b"6500 ", b"68999"),
+    (b"6900 ", b"69999"),
+    (b"7000 ", b"74999"),
+    (b"7500 ", b"79999"),
+    (b"8000 ", b"89999"),
+    (b"9000 ", b"99199"),
+    (b"9920 ", b"99999"),
+    (b"A000 ", b"H9999"),
+    (b"J000 ", b"Z9999")
+]
+HCPCS_SPLIT_LOWS = [low for low, high in HCPCS_SPLIT_RANGES]
+HCPCS_SPLIT_UNK_FILE_IDX = 24
+HCPCS_SPLIT_OTHER_FILE_IDX = 25
+HCPCS_SPLIT_NOF_FILES = 26
+
+# splitTextFileIntoMultipleHCPCSFiles: input bytes read at one time, and write buffer size of each output file
+HCPCS_SPLIT_READ_BLOCK_SIZE = 16 * 1024 * 1024
+HCPCS_SPLIT_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# gzipNUploadFiles: NOF files gzipped/uploaded at one time (zlib releases the GIL --> threads compress in parallel)
+GZIP_UPLOAD_MAX_WORKERS = int(os.getenv("GZIP_UPLOAD_MAX_WORKERS", "8"))
+
+# splitTextFileIntoMultipleFiles: NOF split files copied at one time, and max bytes per copy_file_range/sendfile call
+SPLIT_FILE_MAX_WORKERS = int(os.getenv("SPLIT_FILE_MAX_WORKERS", "4"))
+SPLIT_COPY_CHUNK_SIZE = 1024 * 1024 * 1024
+
+# buildLineOffsetIndex: index filename suffix, and bytes between index entries
+LINE_OFFSET_INDEX_SUFFIX = ".lineidx"
+LINE_OFFSET_INDEX_BLOCK_SIZE = 1024 * 1024
+
+# listS3Objects(bUseCache=True): listing cache database (shared by processes on this server), and seconds a listing is used (0 --> no cache).
+# Only this process's boto3 writes invalidate cached listings --> use the cache only for read-only reports, never to list files just written.
+S3_LISTING_CACHE_DB = os.getenv("S3_LISTING_CACHE_DB", "/app/IDRC/XTR/CMS/data/S3ListingCache.db")
+S3_LISTING_CACHE_TTL_SECS = int(os.getenv("S3_LISTING_CACHE_TTL_SECS", "30"))
+
+# getS3TextObjects/getS3ObjectsMetadata: NOF s3 requests at one time, cache database, and seconds a cached head_object is used
+S3_METADATA_MAX_WORKERS = int(os.getenv("S3_METADATA_MAX_WORKERS", "16"))
+S3_METADATA_CACHE_DB = os.getenv("S3_METADATA_CACHE_DB", "/app/IDRC/XTR/CMS/data/S3MetadataCache.db")
+S3_METADATA_CACHE_TTL_SECS = int(os.getenv("S3_METADATA_CACHE_TTL_SECS", str(24 * 60 * 60)))
+
+# callS3WithBackoff: error codes retried, max NOF retries, and max secs delay before each request
+S3_SLOWDOWN_ERROR_CODES = ("SlowDown", "503", "ServiceUnavailable", "Throttling", "ThrottlingException", "RequestLimitExceeded")
+S3_SLOWDOWN_MAX_RETRIES = 8
+S3_SLOWDOWN_MAX_DELAY_SECS = 20.0
+
+# Incremented by invalidateS3ListingCache. A listing is not cached when this process wrote to s3 while listing.
+giS3ListingCacheGeneration = 0
+
+# Default logger until setCommonFunctionLogger is called
+rootLogger = logging.getLogger(__name__)
+
 
 #############################################################
 # Functions
@@ -103,31 +212,67 @@ def s3MoveFile2NewFolder(s3_client, sSourceBucket, sSourceKey, sDestinationKey):
 
     s3_client.delete_object(Bucket=sSourceBucket, Key=sSourceKey)
 
-   
-def s3MoveLargeFile2NewFolder(s3_client, sSourceBucket, sSourceKey, sDestinationKey):
+    invalidateS3ListingCache(sSourceBucket, sSourceKey)
+    invalidateS3ListingCache(sSourceBucket, sDestinationKey)
 
-    from boto3.s3.transfer import S3Transfer, TransferConfig
+   
+def s3MoveLargeFile2NewFolder(s3_client, sSourceBucket, sSourceKey, sDestinationKey, iPartSize=S3_COPY_PART_SIZE, iMaxInFlight=S3_COPY_MAX_IN_FLIGHT):
 
     # Copy object, then delete to "move" file.
     rootLogger.info(f"Moving {sSourceKey} to {sDestinationKey} in {sSourceBucket}.")
 
-    # Set configuration values for transfer
-    config = TransferConfig(
-        multipart_threshold=100 * 1024 * 1024,   # switch to multipart above 100 MB
-        multipart_chunksize=100 * 1024 * 1024,   # each part = 100 MB
-        max_concurrency=10,                      # threads
-        use_threads=True
-    )
+    dictHead = s3_client.head_object(Bucket=sSourceBucket, Key=sSourceKey)
+    iFileSize = dictHead["ContentLength"]
+
+    if iFileSize <= iPartSize:
+        # Note: copy_object has a 5 GB limit. 
+        s3_client.copy_object(
+            Bucket=sSourceBucket,
+            CopySource={"Bucket": sSourceBucket, "Key": sSourceKey},
+            Key=sDestinationKey
+        )
 
-    # Note: size limit is in the TBs
-    s3_client.copy(
-        {"Bucket": sSourceBucket, "Key": sSourceKey},
-        sSourceBucket,
-        sDestinationKey,
-        Config=config )
+    else:
+        ################################################################
+        # Server-side multipart copy: no data passes through linux.
+        # Parts are copied in parallel and completed in part order.
+        # Note: size limit is in the TBs (10,000 parts)
+        ################################################################
+        lstRanges = [(iPartNum, iStart, min(iStart + iPartSize, iFileSize) - 1)
+                     for iPartNum, iStart in enumerate(range(0, iFileSize, iPartSize), start=1)]
+
+        rootLogger.info(f"Copying {iFileSize} bytes in {len(lstRanges)} parts ({iMaxInFlight} at a time).")
+
+        resp = s3_client.create_multipart_upload(Bucket=sSourceBucket, Key=sDestinationKey, 
+                                                 ContentType=dictHead.get("ContentType", "binary/octet-stream"),
+                                                 Metadata=dictHead.get("Metadata", {}))
+        upload_id = resp["UploadId"]
+
+        def copyPart(tRange):
+            iPartNum, iStart, iEnd = tRange
+            resp = s3_client.upload_part_copy(Bucket=sSourceBucket, Key=sDestinationKey, 
+                                              CopySource={"Bucket": sSourceBucket, "Key": sSourceKey},
+                                              CopySourceRange=f"bytes={iStart}-{iEnd}",
+                                              PartNumber=iPartNum, UploadId=upload_id)
+            return {"ETag": resp["CopyPartResult"]["ETag"], "PartNumber": iPartNum}
+
+        try:
+            with ThreadPoolExecutor(max_workers=iMaxInFlight) as pool:
+                lstParts = list(pool.map(copyPart, lstRanges))
+
+            s3_client.complete_multipart_upload(Bucket=sSourceBucket, Key=sDestinationKey, UploadId=upload_id,
+                                                MultipartUpload={"Parts": lstParts})
+        except Exception:
+            s3_client.abort_multipart_upload(Bucket=sSourceBucket, Key=sDestinationKey, UploadId=upload_id)
+            raise
+
+    rootLogger.info(f"Deleting {sSourceKey} in {sSourceBucket} as part of move operation (Copy/delete).")
 
     s3_client.delete_object(Bucket=sSourceBucket, Key=sSourceKey)
 
+    invalidateS3ListingCache(sSourceBucket, sSourceKey)
+    invalidateS3ListingCache(sSourceBucket, sDestinationKey)
+
 
 def getConfigFile(s3_client, S3BUCKET, s3ConfigFolder_n_filename):
     
@@ -230,6 +375,8 @@ def s3UploadFile(s3_client, sLocalPathNFilename, sBucket, sKeyPathNFilename):
 
     s3_client.upload_file(sLocalPathNFilename, sBucket, sKeyPathNFilename, Config=overrideTransferConfig, Callback=UploadFileProgress, ExtraArgs=dictExtraArgs )
 
+    invalidateS3ListingCache(sBucket, sKeyPathNFilename)
+
 
 def archiveFinderFile(s3_client, sSourceBucket, sFinderFileBktFldr, FF):
 
@@ -254,7 +401,8 @@ def getS3FileKeysList(s3_resource, s3BUCKET, s3BktFldr, sFilenamePrefix):
     S3ExtFldrNPrefix = f"{s3BktFldr}{sFilenamePrefix}"
     rootLogger.info(f"{S3ExtFldrNPrefix=}")
 
-    lstKeys = [ obj.key for obj in s3_resource.Bucket(s3BUCKET).objects.filter(Prefix=S3ExtFldrNPrefix)]
+    # no listing cache --> files just written (ex. COPY INTO @stage part files) are listed
+    lstKeys = [ dictObject["Key"] for dictObject in listS3Objects(s3_resource.meta.client, s3BUCKET, S3ExtFldrNPrefix, bUseCache=False) ]
     rootLogger.info("lstKeys:\n" + "\n".join(lstKeys))
 
     return lstKeys
@@ -317,6 +465,319 @@ def s3GetMostRecentFileKeySubProcess(s3BUCKET, s3BktFldr, sFilenamePrefix):
     return sMostRecentS3Key
 
 
+def iterS3Objects(s3_client, sBucket, sPrefix):
+
+    # Page thru objects under prefix (list_objects_v2: 1,000 keys per page) without building a list of all objects.
+    # Yields dicts {"Key", "Size", "LastModified", "ETag"} in key order.
+
+    paginator = s3_client.get_paginator("list_objects_v2")
+
+    for dictPage in paginator.paginate(Bucket=sBucket, Prefix=sPrefix):
+        for dictObject in dictPage.get("Contents", []):
+            yield {"Key": dictObject["Key"], "Size": dictObject["Size"], "LastModified": dictObject["LastModified"], "ETag": dictObject.get("ETag", "")}
+
+
+def getS3ListingCacheConnection():
+
+    import sqlite3
+
+    conn = sqlite3.connect(S3_LISTING_CACHE_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS S3_LISTING (BUCKET TEXT, PREFIX TEXT, LISTED_TS REAL, CONTENTS TEXT, PRIMARY KEY (BUCKET, PREFIX))")
+
+    return conn
+
+
+def getCachedS3Listing(sBucket, sPrefix):
+
+    # Return objects under prefix from the most specific cached listing (same or shorter prefix) that has not expired.
+    # Returns None when there is no such listing (or the cache cannot be used).
+
+    import sqlite3
+    from contextlib import closing
+    from datetime import timezone
+
+    if S3_LISTING_CACHE_TTL_SECS <= 0:
+        return None
+
+    try:
+        with closing(getS3ListingCacheConnection()) as conn:
+            row = conn.execute("SELECT PREFIX, CONTENTS FROM S3_LISTING "
+                               "WHERE BUCKET = ? AND substr(?, 1, length(PREFIX)) = PREFIX AND LISTED_TS >= ? "
+                               "ORDER BY length(PREFIX) DESC LIMIT 1",
+                               (sBucket, sPrefix, time.time() - S3_LISTING_CACHE_TTL_SECS)).fetchone()
+
+    except sqlite3.Error as ex:
+        rootLogger.warning(f"S3 listing cache {S3_LISTING_CACHE_DB} not available. {ex}")
+        return None
+
+    if row is None:
+        return None
+
+    sCachedPrefix, sContents = row
+    rootLogger.info(f"Using cached listing of s3://{sBucket}/{sCachedPrefix} for prefix {sPrefix}")
+
+    return [{"Key": sKey, "Size": iSize, "LastModified": datetime.fromtimestamp(fLastModified, tz=timezone.utc), "ETag": sETag}
+            for sKey, iSize, fLastModified, sETag in json.loads(sContents) if sKey.startswith(sPrefix)]
+
+
+def putCachedS3Listing(sBucket, sPrefix, lstObjects):
+
+    import sqlite3
+    from contextlib import closing
+
+    lstContents = [[dictObject["Key"], dictObject["Size"], dictObject["LastModified"].timestamp(), dictObject["ETag"]] for dictObject in lstObjects]
+    fNow = time.time()
+
+    try:
+        with closing(getS3ListingCacheConnection()) as conn, conn:
+            conn.execute("DELETE FROM S3_LISTING WHERE LISTED_TS < ?", (fNow - S3_LISTING_CACHE_TTL_SECS,))
+            conn.execute("INSERT OR REPLACE INTO S3_LISTING (BUCKET, PREFIX, LISTED_TS, CONTENTS) VALUES (?, ?, ?, ?)",
+                         (sBucket, sPrefix, fNow, json.dumps(lstContents)))
+
+    except sqlite3.Error as ex:
+        rootLogger.warning(f"S3 listing cache {S3_LISTING_CACHE_DB} not available. {ex}")
+
+
+def invalidateS3ListingCache(sBucket, sKeyOrPrefix):
+
+    # Remove cached listings that contain key (listing prefix is a prefix of key), or are under prefix.
+
+    import sqlite3
+    from contextlib import closing
+
+    global giS3ListingCacheGeneration
+    giS3ListingCacheGeneration += 1
+
+    if S3_LISTING_CACHE_TTL_SECS <= 0:
+        return
+
+    try:
+        with closing(getS3ListingCacheConnection()) as conn, conn:
+            conn.execute("DELETE FROM S3_LISTING WHERE BUCKET = ? AND (substr(?, 1, length(PREFIX)) = PREFIX OR substr(PREFIX, 1, length(?)) = ?)",
+                         (sBucket, sKeyOrPrefix, sKeyOrPrefix, sKeyOrPrefix))
+
+    except sqlite3.Error as ex:
+        rootLogger.warning(f"S3 listing cache {S3_LISTING_CACHE_DB} not available. {ex}")
+
+
+def listS3Objects(s3_client, sBucket, sPrefix, bUseCache=False):
+
+    # List all objects under prefix. Returns list of dicts {"Key", "Size", "LastModified", "ETag"} in key order.
+    # bUseCache=True: the listing is cached for S3_LISTING_CACHE_TTL_SECS seconds; a cached listing of a shorter prefix is also used.
+
+    rootLogger.info(f"List s3://{sBucket}/{sPrefix}")
+
+    if bUseCache:
+        lstObjects = getCachedS3Listing(sBucket, sPrefix)
+        if lstObjects is not None:
+            return lstObjects
+
+    iGeneration = giS3ListingCacheGeneration
+
+    lstObjects = list(iterS3Objects(s3_client, sBucket, sPrefix))
+    rootLogger.info(f"{len(lstObjects)} objects listed")
+
+    # Do not cache a listing that may be missing this process's own puts/copies/deletes done while listing
+    if bUseCache and S3_LISTING_CACHE_TTL_SECS > 0 and iGeneration == giS3ListingCacheGeneration:
+        putCachedS3Listing(sBucket, sPrefix, lstObjects)
+
+    return lstObjects
+
+
+def s3GetMostRecentFileKey(s3_client, s3BUCKET, s3BktFldr, sFilenamePrefix, sFilenamePattern="*", bUseCache=False):
+
+    # Most recent (LastModified) key under f"{s3BktFldr}{sFilenamePrefix}" whose filename (key without s3BktFldr)
+    # matches sFilenamePattern (fnmatch pattern). The listing is paged thru keeping only the most recent key
+    # (bUseCache=True: a cached listing is used if there is one). Returns None when no key is found.
+
+    from fnmatch import fnmatchcase
+
+    rootLogger.info("")
+    rootLogger.info(f"{s3BUCKET=}")
+    rootLogger.info(f"{s3BktFldr=}")
+    rootLogger.info(f"{sFilenamePrefix=}")
+    rootLogger.info(f"{sFilenamePattern=}")
+
+    S3ExtFldrNPrefix = f"{s3BktFldr}{sFilenamePrefix}"
+
+    lstObjects = getCachedS3Listing(s3BUCKET, S3ExtFldrNPrefix) if bUseCache else None
+    iterObjects = lstObjects if lstObjects is not None else iterS3Objects(s3_client, s3BUCKET, S3ExtFldrNPrefix)
+
+    dictMostRecent = None
+
+    for dictObject in iterObjects:
+        if not fnmatchcase(dictObject["Key"][len(s3BktFldr):], sFilenamePattern):
+            continue
+
+        # Same LastModified --> last key (like aws s3api "sort_by(Contents,&LastModified)[-1]")
+        if dictMostRecent is None or dictObject["LastModified"] >= dictMostRecent["LastModified"]:
+            dictMostRecent = dictObject
+
+    sMostRecentS3Key = dictMostRecent["Key"] if dictMostRecent else None
+    rootLogger.info(f"{sMostRecentS3Key=}")
+
+    return sMostRecentS3Key
+
+
+def callS3WithBackoff(fnS3Call, dictBackoff):
+
+    # Call fnS3Call() and retry when s3 asks to slow down. dictBackoff is shared by the threads of one fetch 
+    # (see fetchS3Concurrently): a SlowDown doubles the delay before every request, a success halves it.
+
+    from botocore.exceptions import ClientError
+
+    for iRetry in range(S3_SLOWDOWN_MAX_RETRIES + 1):
+        fDelay = dictBackoff["fDelay"]
+        if fDelay > 0:
+            time.sleep(fDelay * random.uniform(0.5, 1.0))
+
+        try:
+            result = fnS3Call()
+
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in S3_SLOWDOWN_ERROR_CODES or iRetry == S3_SLOWDOWN_MAX_RETRIES:
+                raise
+
+            with dictBackoff["lock"]:
+                dictBackoff["fDelay"] = min(max(dictBackoff["fDelay"] * 2, 0.1), S3_SLOWDOWN_MAX_DELAY_SECS)
+            rootLogger.warning(f"s3 SlowDown. Delay between requests is now {dictBackoff['fDelay']:.2f} secs.")
+            continue
+
+        with dictBackoff["lock"]:
+            dictBackoff["fDelay"] = dictBackoff["fDelay"] / 2 if dictBackoff["fDelay"] > 0.01 else 0.0
+
+        return result
+
+
+def fetchS3Concurrently(fnFetch, lstArgs, iMaxWorkers):
+
+    # Returns [fnFetch(arg, dictBackoff) for arg in lstArgs] running iMaxWorkers fetches at a time.
+
+    dictBackoff = {"fDelay": 0.0, "lock": threading.Lock()}
+
+    with ThreadPoolExecutor(max_workers=iMaxWorkers) as pool:
+        return list(pool.map(lambda arg: fnFetch(arg, dictBackoff), lstArgs))
+
+
+def getS3MetadataCacheConnection():
+
+    import sqlite3
+
+    conn = sqlite3.connect(S3_METADATA_CACHE_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS S3_OBJECT (BUCKET TEXT, KEY TEXT, ETAG TEXT, FETCHED_TS REAL, CONTENTS TEXT, PRIMARY KEY (BUCKET, KEY))")
+    conn.execute("CREATE TABLE IF NOT EXISTS S3_HEAD (BUCKET TEXT, KEY TEXT, FETCHED_TS REAL, METADATA TEXT, PRIMARY KEY (BUCKET, KEY))")
+
+    return conn
+
+
+def getS3TextObjects(s3_client, sBucket, lstObjects, iMaxWorkers=S3_METADATA_MAX_WORKERS):
+
+    # Get contents (utf-8 text) of s3 objects. lstObjects are dicts with "Key" and "ETag" (see listS3Objects).
+    # Contents are cached by key + ETag --> only new/changed objects are read from s3.
+    # Returns list of contents in lstObjects order.
+
+    import sqlite3
+    from contextlib import closing
+
+    dictContents = {}
+
+    try:
+        with closing(getS3MetadataCacheConnection()) as conn:
+            for dictObject in lstObjects:
+                row = conn.execute("SELECT CONTENTS FROM S3_OBJECT WHERE BUCKET = ? AND KEY = ? AND ETAG = ?",
+                                   (sBucket, dictObject["Key"], dictObject["ETag"])).fetchone()
+                if row:
+                    dictContents[dictObject["Key"]] = row[0]
+
+    except sqlite3.Error as ex:
+        rootLogger.warning(f"S3 metadata cache {S3_METADATA_CACHE_DB} not available. {ex}")
+
+    lstObjects2Get = [dictObject for dictObject in lstObjects if dictObject["Key"] not in dictContents]
+    rootLogger.info(f"{len(lstObjects) - len(lstObjects2Get)} objects found in cache. Get {len(lstObjects2Get)} objects from s3.")
+
+    def getTextObject(dictObject, dictBackoff):
+        resp = callS3WithBackoff(lambda: s3_client.get_object(Bucket=sBucket, Key=dictObject["Key"]), dictBackoff)
+        return resp["Body"].read().decode("utf-8"), resp.get("ETag", dictObject["ETag"])
+
+    lstResults = fetchS3Concurrently(getTextObject, lstObjects2Get, iMaxWorkers)
+
+    fNow = time.time()
+
+    try:
+        with closing(getS3MetadataCacheConnection()) as conn, conn:
+            conn.execute("DELETE FROM S3_OBJECT WHERE FETCHED_TS < ?", (fNow - S3_METADATA_CACHE_TTL_SECS,))
+            for dictObject, (sContents, sETag) in zip(lstObjects2Get, lstResults):
+                conn.execute("INSERT OR REPLACE INTO S3_OBJECT (BUCKET, KEY, ETAG, FETCHED_TS, CONTENTS) VALUES (?, ?, ?, ?, ?)",
+                             (sBucket, dictObject["Key"], sETag, fNow, sContents))
+
+    except sqlite3.Error as ex:
+        rootLogger.warning(f"S3 metadata cache {S3_METADATA_CACHE_DB} not available. {ex}")
+
+    for dictObject, (sContents, sETag) in zip(lstObjects2Get, lstResults):
+        dictContents[dictObject["Key"]] = sContents
+
+    return [dictContents[dictObject["Key"]] for dictObject in lstObjects]
+
+
+def getS3ObjectsMetadata(s3_client, sBucket, lstKeys, iMaxWorkers=S3_METADATA_MAX_WORKERS):
+
+    # head_object of s3 keys. Returns list (lstKeys order) of dicts {"ContentLength", "StorageClass", "ETag", "LastModified"}, 
+    # or None when the key is not in s3. Found keys are cached for S3_METADATA_CACHE_TTL_SECS seconds.
+
+    import sqlite3
+    from contextlib import closing
+    from botocore.exceptions import ClientError
+
+    dictMetadata = {}
+    fNow = time.time()
+
+    try:
+        with closing(getS3MetadataCacheConnection()) as conn:
+            for sKey in set(lstKeys):
+                row = conn.execute("SELECT METADATA FROM S3_HEAD WHERE BUCKET = ? AND KEY = ? AND FETCHED_TS >= ?",
+                                   (sBucket, sKey, fNow - S3_METADATA_CACHE_TTL_SECS)).fetchone()
+                if row:
+                    dictMetadata[sKey] = json.loads(row[0])
+
+    except sqlite3.Error as ex:
+        rootLogger.warning(f"S3 metadata cache {S3_METADATA_CACHE_DB} not available. {ex}")
+
+    lstKeys2Head = sorted(set(lstKeys) - set(dictMetadata))
+    rootLogger.info(f"{len(dictMetadata)} keys found in cache. head_object {len(lstKeys2Head)} keys.")
+
+    def headObject(sKey, dictBackoff):
+        try:
+            resp = callS3WithBackoff(lambda: s3_client.head_object(Bucket=sBucket, Key=sKey), dictBackoff)
+
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+        # resp.get like COALESCE("StorageClass","STANDARD") 
+        return {"ContentLength": resp["ContentLength"], "StorageClass": resp.get("StorageClass", "STANDARD"),
+                "ETag": resp.get("ETag", ""), "LastModified": resp["LastModified"].timestamp()}
+
+    lstResults = fetchS3Concurrently(headObject, lstKeys2Head, iMaxWorkers)
+
+    try:
+        with closing(getS3MetadataCacheConnection()) as conn, conn:
+            conn.execute("DELETE FROM S3_HEAD WHERE FETCHED_TS < ?", (fNow - S3_METADATA_CACHE_TTL_SECS,))
+            for sKey, dictResult in zip(lstKeys2Head, lstResults):
+                if dictResult is not None:
+                    conn.execute("INSERT OR REPLACE INTO S3_HEAD (BUCKET, KEY, FETCHED_TS, METADATA) VALUES (?, ?, ?, ?)",
+                                 (sBucket, sKey, fNow, json.dumps(dictResult)))
+
+    except sqlite3.Error as ex:
+        rootLogger.warning(f"S3 metadata cache {S3_METADATA_CACHE_DB} not available. {ex}")
+
+    dictMetadata.update(zip(lstKeys2Head, lstResults))
+
+    return [dictMetadata[sKey] for sKey in lstKeys]
+
+
 def deleteFileFromLinux(FilePathNFilename):                
     ################################################################
     # Delete linux file
@@ -347,8 +808,77 @@ def deleteFilesFromLinuxUsingPrefix(filePath, filenamePrefix):
             deleteFileFromLinux(f"{filePath}{f.name}")
 
 
-def getRangeOfRecords(sFilenameNPath, iLineFrom, iLineTo):
-        
+def buildLineOffsetIndex(sFilenameNPath, iBlockSize=LINE_OFFSET_INDEX_BLOCK_SIZE):
+
+    # Build line offset index of file: (line number, byte offset) of the first line starting in each iBlockSize block.
+    # Index is saved to f"{sFilenameNPath}{LINE_OFFSET_INDEX_SUFFIX}" with the file size/modified time it is valid for.
+    # Returns (lstLineNos, lstOffsets). NOTE: lines are terminated by "\n".
+
+    import mmap
+    from array import array
+
+    rootLogger.info(f"{sFilenameNPath=}")
+
+    statFile = os.stat(sFilenameNPath)
+    iFileSize = statFile.st_size
+
+    lstLineNos = [1]
+    lstOffsets = [0]
+
+    if iFileSize > 0:
+        with open(sFilenameNPath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mmFile:
+            iLineNo = 1
+
+            for iBlockOffset in range(iBlockSize, iFileSize, iBlockSize):
+                iNewlineOffset = mmFile.find(b"\n", max(iBlockOffset - 1, lstOffsets[-1]))
+                if iNewlineOffset < 0 or iNewlineOffset + 1 >= iFileSize:
+                    break
+
+                iLineOffset = iNewlineOffset + 1
+                iLineNo += mmFile[lstOffsets[-1]:iLineOffset].count(b"\n")
+
+                lstLineNos.append(iLineNo)
+                lstOffsets.append(iLineOffset)
+
+    sIndexFileNPath = f"{sFilenameNPath}{LINE_OFFSET_INDEX_SUFFIX}"
+    with open(f"{sIndexFileNPath}.tmp", "wb") as fIndex:
+        array("q", [iFileSize, statFile.st_mtime_ns, len(lstLineNos)] + lstLineNos + lstOffsets).tofile(fIndex)
+    os.replace(f"{sIndexFileNPath}.tmp", sIndexFileNPath)
+
+    rootLogger.info(f"Created {sIndexFileNPath} with {len(lstLineNos)} entries")
+
+    return lstLineNos, lstOffsets
+
+
+def getLineOffsetIndex(sFilenameNPath):
+
+    # Load line offset index of file. Index is (re)built when it does not exist or the file was modified.
+    # Returns (lstLineNos, lstOffsets).
+
+    from array import array
+
+    statFile = os.stat(sFilenameNPath)
+
+    try:
+        arrIndex = array("q")
+        with open(f"{sFilenameNPath}{LINE_OFFSET_INDEX_SUFFIX}", "rb") as fIndex:
+            arrIndex.frombytes(fIndex.read())
+
+        if arrIndex[0] == statFile.st_size and arrIndex[1] == statFile.st_mtime_ns:
+            iNOFEntries = arrIndex[2]
+            return arrIndex[3:3 + iNOFEntries].tolist(), arrIndex[3 + iNOFEntries:3 + 2 * iNOFEntries].tolist()
+
+    except (OSError, ValueError, IndexError):
+        pass
+
+    return buildLineOffsetIndex(sFilenameNPath)
+
+
+def getRangeOfRecords(sFilenameNPath, iLineFrom, iLineTo, bUseLineOffsetIndex=False):
+
+    # bUseLineOffsetIndex=True --> seek to the nearest indexed line before iLineFrom (see getLineOffsetIndex)
+    # instead of reading from the start of the file.
+
     from itertools import islice
     from io import StringIO
     
@@ -357,10 +887,22 @@ def getRangeOfRecords(sFilenameNPath, iLineFrom, iLineTo):
     rootLogger.info(f"{sFilenameNPath=}")
     rootLogger.info(f"{iLineFrom=}")
     rootLogger.info(f"{iLineTo=}")
-        
+
+    iStartLineNo = 1
+    iStartOffset = 0
+
+    if bUseLineOffsetIndex:
+        lstLineNos, lstOffsets = getLineOffsetIndex(sFilenameNPath)
+        iIdx = max(bisect_right(lstLineNos, iLineFrom) - 1, 0)
+        iStartLineNo = lstLineNos[iIdx]
+        iStartOffset = lstOffsets[iIdx]
+        rootLogger.info(f"{iStartLineNo=} {iStartOffset=}")
+
     with open(sFilenameNPath, "r", encoding="utf-8") as f:
+        f.seek(iStartOffset)
+
         # islice indexing is zero-based; and end-line is non-inclusive
-        for line in islice(f, iLineFrom - 1, iLineTo):
+        for line in islice(f, iLineFrom - iStartLineNo, iLineTo - iStartLineNo + 1):
             sioRangeOfRecs.write(line)
 
     return sioRangeOfRecs.getvalue()
@@ -446,36 +988,96 @@ def getExtFiles4RequestList(s3_resource, sSourceBucket, S3KeyPrefix, sTimeStamp)
     #############################################################
     rootLogger.info("Get list of Extract Files for Request. ")
 
-    lstExtFiles4Request = [ obj.key for obj in s3_resource.Bucket(sSourceBucket).objects.filter(Prefix=S3KeyPrefix) if sTimeStamp in obj.key and not "/archive/" in obj.key ]
+    # no listing cache --> the extract files just written for the request are listed
+    lstExtFiles4Request = [ dictObject["Key"] for dictObject in listS3Objects(s3_resource.meta.client, sSourceBucket, S3KeyPrefix, bUseCache=False) 
+                            if sTimeStamp in dictObject["Key"] and not "/archive/" in dictObject["Key"] ]
 
     return lstExtFiles4Request
 
 
-def splitTextFileIntoMultipleFiles(sInputFileNPath, iNOFFiles, sOutputFileNPath):
+def getSplitOffsets(mmInput, iFileSize, iNOFFiles):
+
+    # Byte offsets where each split file starts: the record after the first newline at/after each
+    # (iFileSize * i / iNOFFiles) byte target. Returns iNOFFiles + 1 offsets (first is 0, last is iFileSize).
+
+    lstSplitOffsets = [0]
+
+    for i in range(1, iNOFFiles):
+        iTargetOffset = (iFileSize * i) // iNOFFiles
+        iNewlineOffset = mmInput.find(b"\n", max(iTargetOffset - 1, lstSplitOffsets[-1]))
+        lstSplitOffsets.append(iFileSize if iNewlineOffset < 0 else iNewlineOffset + 1)
+
+    lstSplitOffsets.append(iFileSize)
+
+    return lstSplitOffsets
+
+
+def copyFileByteRange(sInputFileNPath, iOffset, iNOFBytes, sOutputFileNPath):
+
+    # Copy iNOFBytes bytes at iOffset of input file to output file without reading them into python.
+    # Uses copy_file_range; falls back to sendfile, and then to pread/write, when not supported by the OS/file system.
+
+    import errno
+
+    with open(sInputFileNPath, "rb") as fIn, open(sOutputFileNPath, "wb") as fOut:
+        iInFD = fIn.fileno()
+        iOutFD = fOut.fileno()
+
+        lstCopyMethods = [lambda iCopyOffset, iCount: os.copy_file_range(iInFD, iOutFD, iCount, iCopyOffset),
+                          lambda iCopyOffset, iCount: os.sendfile(iOutFD, iInFD, iCopyOffset, iCount),
+                          lambda iCopyOffset, iCount: os.write(iOutFD, os.pread(iInFD, iCount, iCopyOffset))]
+
+        iCopyOffset = iOffset
+        iEndOffset = iOffset + iNOFBytes
+
+        for fnCopy in lstCopyMethods:
+            try:
+                while iCopyOffset < iEndOffset:
+                    iNOFBytesCopied = fnCopy(iCopyOffset, min(iEndOffset - iCopyOffset, SPLIT_COPY_CHUNK_SIZE))
+                    if iNOFBytesCopied == 0:
+                        break
+                    iCopyOffset += iNOFBytesCopied
+                break
+
+            except AttributeError:
+                # os function not available on this platform
+                continue
+
+            except OSError as e:
+                if e.errno not in (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP):
+                    raise
+
+    if iCopyOffset != iEndOffset:
+        raise IOError(f"Copied {iCopyOffset - iOffset} of {iNOFBytes} bytes from {sInputFileNPath} to {sOutputFileNPath}")
+
+
+def splitTextFileIntoMultipleFiles(sInputFileNPath, iNOFFiles, sOutputFileNPath, iMaxWorkers=SPLIT_FILE_MAX_WORKERS):
 
     import shutil
-    import os
+    import mmap
+
+    #split --numeric-suffixes=1  --number=l/${iNOFFiles} -a 1 ${DATADIR}/${txt_filename} ${DATADIR}/${txt_filename}_  2>> ${LOGNAME}
 
-    #split --numeric-suffixes=1  --lines=${lines_per_file} -a 1 ${DATADIR}/${txt_filename} ${DATADIR}/${txt_filename}_  2>> ${LOGNAME}
+    # Split input file into iNOFFiles files of about the same size; records are not split across files.
+    # Split files are created in parallel (iMaxWorkers at a time).
 
     rootLogger.info(f"{sInputFileNPath=}")
     rootLogger.info(f"{iNOFFiles=}")
     rootLogger.info(f"Output path and filename prefix: {sOutputFileNPath}")
 
+    iFileSize = os.path.getsize(sInputFileNPath)
 
-    # Count total records
-    with open(sInputFileNPath, "r", encoding="utf-8") as f:
-        #total_records = sum(1 for _ in f)
-        iTotalInputRecs = sum(1 for line in f)
-        
     rootLogger.info("")
-    rootLogger.info(f"{iTotalInputRecs=}")
+    rootLogger.info(f"{iFileSize=}")
 
-    # Determine records per file
-    records_per_file = iTotalInputRecs // iNOFFiles
-    remainder = iTotalInputRecs % iNOFFiles
+    # Find split offsets (mmap cannot map an empty file)
+    if iFileSize > 0:
+        with open(sInputFileNPath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mmInput:
+            lstSplitOffsets = getSplitOffsets(mmInput, iFileSize, iNOFFiles)
+    else:
+        lstSplitOffsets = [0] * (iNOFFiles + 1)
 
-    rootLogger.info(f"{records_per_file=}")
+    rootLogger.info(f"{lstSplitOffsets=}")
     
     # Check system disk usage before splitting the file
     rootLogger.info("")
@@ -484,36 +1086,39 @@ def splitTextFileIntoMultipleFiles(sInputFileNPath, iNOFFiles, sOutputFileNPath)
     usage = shutil.disk_usage(sOutputDir)
     rootLogger.info(f"Free: {usage.free / 1024**3:.1f} GB")
 
-    
-    lstOutputFilesNPaths = []
-
     # Split input file into multiple output files with suffix = "_{iNOFFile}"
-    with open(sInputFileNPath, "r", encoding="utf-8") as f:
-        for i in range(iNOFFiles):
-            # If last output file --> add remaining records to that file
-            iOutputFileNOFRecs = records_per_file + (remainder if i == (iNOFFiles - 1) else 0)
-
-            # Ex. outputFilename_1, outputFilename_2 
-            sOutputSplitFileNPath = f"{sOutputFileNPath}_{i+1}"
-            with open(sOutputSplitFileNPath, "w", encoding="utf-8") as out:
-                for iRecNo in range(iOutputFileNOFRecs):
-                    line = f.readline()
-                    if not line:
-                        break
-                    
-                    # Check available space every 1 million records
-                    if (iRecNo % 1000000) == 0:
-                        usage = shutil.disk_usage(sOutputDir)
-                        rootLogger.info(f"Remaining: {usage.free / 1024**3:.1f} GB")
+    # Ex. outputFilename_1, outputFilename_2 
+    lstOutputFilesNPaths = [f"{sOutputFileNPath}_{i+1}" for i in range(iNOFFiles)]
 
-                    out.write(line)
+    def createSplitFile(i):
+        iNOFBytes = lstSplitOffsets[i + 1] - lstSplitOffsets[i]
+        copyFileByteRange(sInputFileNPath, lstSplitOffsets[i], iNOFBytes, lstOutputFilesNPaths[i])
 
-            rootLogger.info(f"Created {sOutputSplitFileNPath} with {iOutputFileNOFRecs} records")
-            lstOutputFilesNPaths.append(sOutputSplitFileNPath)
+        usage = shutil.disk_usage(sOutputDir)
+        rootLogger.info(f"Created {lstOutputFilesNPaths[i]} with {iNOFBytes} bytes. Remaining: {usage.free / 1024**3:.1f} GB")
+
+    with ThreadPoolExecutor(max_workers=iMaxWorkers) as pool:
+        list(pool.map(createSplitFile, range(iNOFFiles)))
             
     return lstOutputFilesNPaths
 
 
+def getHCPCSFileIdx(bHCPCS_CD):
+
+    # "~    " or "UNK  " --> "25_" file
+    if bHCPCS_CD == b"~    " or bHCPCS_CD == b"UNK  ":
+        return HCPCS_SPLIT_UNK_FILE_IDX
+
+    # range with largest low value <= HCPCS_CD
+    iIdx = bisect_right(HCPCS_SPLIT_LOWS, bHCPCS_CD) - 1
+
+    if iIdx >= 0 and bHCPCS_CD <= HCPCS_SPLIT_RANGES[iIdx][1]:
+        return iIdx
+
+    # blank or doesn't match any of the ranges --> "26_" file
+    return HCPCS_SPLIT_OTHER_FILE_IDX
+
+
 def splitTextFileIntoMultipleHCPCSFiles(sInputFilenameNPath, sOutputPathNFilenamePrefix):
 
     from contextlib import ExitStack
@@ -525,82 +1130,64 @@ def splitTextFileIntoMultipleHCPCSFiles(sInputFilenameNPath, sOutputPathNFilenam
     tmstmp = datetime.now().strftime('%Y%m%d.%H%M%S')
     rootLogger.info(f"{tmstmp=}")
 
-    # Define ranges and HCPCS output filenames
-    ranges = [
-        ("0000 ", "09999", f"{sOutputPathNFilenamePrefix}01_{tmstmp}.txt"),
-        ("1000 ", "14999", f"{sOutputPathNFilenamePrefix}02_{tmstmp}.txt"),
-        ("1500 ", "19999", f"{sOutputPathNFilenamePrefix}03_{tmstmp}.txt"),
-        ("2000 ", "24999", f"{sOutputPathNFilenamePrefix}04_{tmstmp}.txt"),
-        ("2500 ", "29999", f"{sOutputPathNFilenamePrefix}05_{tmstmp}.txt"),
-        ("3000 ", "32999", f"{sOutputPathNFilenamePrefix}06_{tmstmp}.txt"),
-        ("3300 ", "37999", f"{sOutputPathNFilenamePrefix}07_{tmstmp}.txt"),
-        ("3800 ", "38999", f"{sOutputPathNFilenamePrefix}08_{tmstmp}.txt"),
-        ("3900 ", "39999", f"{sOutputPathNFilenamePrefix}09_{tmstmp}.txt"),
-        ("4000 ", "49999", f"{sOutputPathNFilenamePrefix}10_{tmstmp}.txt"),
-        ("5000 ", "53999", f"{sOutputPathNFilenamePrefix}11_{tmstmp}.txt"),
-        ("5400 ", "55999", f"{sOutputPathNFilenamePrefix}12_{tmstmp}.txt"),
-        ("5600 ", "58999", f"{sOutputPathNFilenamePrefix}13_{tmstmp}.txt"),
-        ("5900 ", "59999", f"{sOutputPathNFilenamePrefix}14_{tmstmp}.txt"),
-        ("6000 ", "64999", f"{sOutputPathNFilenamePrefix}15_{tmstmp}.txt"),
-        ("6500 ", "68999", f"{sOutputPathNFilenamePrefix}16_{tmstmp}.txt"),
-        ("6900 ", "69999", f"{sOutputPathNFilenamePrefix}17_{tmstmp}.txt"),
-        ("7000 ", "74999", f"{sOutputPathNFilenamePrefix}18_{tmstmp}.txt"),
-        ("7500 ", "79999", f"{sOutputPathNFilenamePrefix}19_{tmstmp}.txt"),
-        ("8000 ", "89999", f"{sOutputPathNFilenamePrefix}20_{tmstmp}.txt"),
-        ("9000 ", "99199", f"{sOutputPathNFilenamePrefix}21_{tmstmp}.txt"),
-        ("9920 ", "99999", f"{sOutputPathNFilenamePrefix}22_{tmstmp}.txt"),
-        ("A000 ", "H9999", f"{sOutputPathNFilenamePrefix}23_{tmstmp}.txt"),
-        ("J000 ", "Z9999", f"{sOutputPathNFilenamePrefix}24_{tmstmp}.txt"),
-        ("UNK  ", "UNK  ", f"{sOutputPathNFilenamePrefix}25_{tmstmp}.txt"),
-        ("     ", "     ", f"{sOutputPathNFilenamePrefix}26_{tmstmp}.txt")
-    ]
+    # HCPCS output filenames (01 - 26)
+    lstOutputFilenames = [f"{sOutputPathNFilenamePrefix}{iFileNum:02}_{tmstmp}.txt" for iFileNum in range(1, HCPCS_SPLIT_NOF_FILES + 1)]
+
+    lstRecCnts = [0] * HCPCS_SPLIT_NOF_FILES
+    lstByteCnts = [0] * HCPCS_SPLIT_NOF_FILES
+
+    # HCPCS_CD --> output file index (a quarter has a few thousand distinct HCPCS codes)
+    dictHCPCSFileIdx = {}
 
     ###############################################################################
     # Read input file and write to appropriate Output HCPCS file.
     # The With is good for all output files so files are automatically closed.
+    # Records are copied as bytes, a block of records at a time. Line ends are read as
+    # the prior text-mode function read them ("\r\n" and "\r" --> "\n").
     ###############################################################################
     with ExitStack() as stack:
 
-        fpOutputFiles = []
-
-        # Create list of FilePointers and HCPCS Ranges
-        for low, high, filename in ranges:
-            fp = stack.enter_context(open(filename, "w"))
-            fpOutputFiles.append((low, high, fp))
+        fpOutputFiles = [stack.enter_context(open(filename, "wb", buffering=HCPCS_SPLIT_WRITE_BUFFER_SIZE)) 
+                         for filename in lstOutputFilenames]
         
         # Process input file and write to appropriate Output file
-        with open(sInputFilenameNPath) as infile:
-
-            for record in infile:
-
-                # Extract HCPCS_CD from input record.
-                sHCPCS_CD = record[0:5]
-                #print(f"{sHCPCS_CD=}")
-
-                # If HCPCS_CD is a tilda or "UNK  " --> write to "25_" file; get next input record
-                if sHCPCS_CD == "~    " or sHCPCS_CD == "UNK  ":
-                    fp = fpOutputFiles[24][2]
-                    fp.write(record)
-                    
-                    # go to next input record
-                    continue
-
-                swOutFileFnd = 'N'
-                # search list of output files that match HCPCS_CD range
-                for low, high, fp in fpOutputFiles:
-                    
-                    if low <= sHCPCS_CD <= high:
-                        fp.write(record)
-                        swOutFileFnd = 'Y'
-                        break
+        with open(sInputFilenameNPath, "rb") as infile:
 
-                # If HCPCS_CD doesn't match any of the ranges --> write to "26_" file; 
-                if swOutFileFnd == 'N':
-                    fp = fpOutputFiles[25][2]
-                    fp.write(record)
-                    
-                    # go to next input record
-                    continue
+            while True:
+                # block ends at a newline --> a "\r\n" is never split between blocks
+                bBlock = infile.read(HCPCS_SPLIT_READ_BLOCK_SIZE) + infile.readline()
+                if not bBlock:
+                    break
+
+                if b"\r" in bBlock:
+                    bBlock = bBlock.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+                lstRecords = bBlock.splitlines(keepends=True)
+
+                lstBlockRecs = [[] for _ in range(HCPCS_SPLIT_NOF_FILES)]
+
+                for record in lstRecords:
+
+                    # Extract HCPCS_CD from input record (first 5 characters, as the prior function)
+                    bHCPCS_CD = record[0:5]
+                    if not bHCPCS_CD.isascii():
+                        bHCPCS_CD = record.decode("utf-8", "replace")[0:5].encode("utf-8")
+
+                    iIdx = dictHCPCSFileIdx.get(bHCPCS_CD)
+                    if iIdx is None:
+                        iIdx = dictHCPCSFileIdx[bHCPCS_CD] = getHCPCSFileIdx(bHCPCS_CD)
+
+                    lstBlockRecs[iIdx].append(record)
+
+                # write block records of each output file; count records and bytes
+                for iIdx, lstFileRecs in enumerate(lstBlockRecs):
+                    if lstFileRecs:
+                        fpOutputFiles[iIdx].writelines(lstFileRecs)
+                        lstRecCnts[iIdx] += len(lstFileRecs)
+                        lstByteCnts[iIdx] += sum(map(len, lstFileRecs))
+
+    # [(output filename and path, NOF records, NOF bytes)]
+    return list(zip(lstOutputFilenames, lstRecCnts, lstByteCnts))
                         
                         
 def unzipFile(sFilePath, sInputFilename):
@@ -659,6 +1246,26 @@ def gzipFile(sFilePath, sInputFilename):
     return f"{sInputFilename}.gz"
    
 
+def gzipNUploadFiles(s3_client, sFilePath, lstInputFilenames, sBucket, sKeyPath, iMaxWorkers=GZIP_UPLOAD_MAX_WORKERS):
+
+    # gzip each file and upload .gz file to s3 key f"{sKeyPath}{gz filename}". 
+    # Files are processed in parallel. Returns list of .gz filenames (same order as lstInputFilenames).
+    
+    rootLogger.info(f"{sFilePath=}")
+    rootLogger.info(f"gzip and upload {len(lstInputFilenames)} files ({iMaxWorkers} at a time).")
+
+    def gzipNUploadFile(sInputFilename):
+        gz_Filename = gzipFile(sFilePath, sInputFilename)
+        s3UploadFile(s3_client, f"{sFilePath}{gz_Filename}", sBucket, f"{sKeyPath}{gz_Filename}")
+
+        return gz_Filename
+
+    with ThreadPoolExecutor(max_workers=iMaxWorkers) as pool:
+        lstGzFilenames = list(pool.map(gzipNUploadFile, lstInputFilenames))
+
+    return lstGzFilenames
+   
+
 def gzipFileSubprocess(sFilePath, sInputFilename):
 
     rootLogger.info(f"{sFilePath=}")
@@ -718,8 +1325,35 @@ def findRecsContainingSearchText(sPath: str, sInputFilename: str, sSearchString:
     rootLogger.info(f"{sInputFilename=}")
     rootLogger.info(f"{sSearchString=}")
     
+    import mmap
+
     lstRecsContainingSearchText = []
-    
+
+    # NOTE: the first record is not searched.
+    with open(f"{sPath}{sInputFilename}", "rb") as infile:
+        if os.fstat(infile.fileno()).st_size == 0:
+            return lstRecsContainingSearchText
+
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mmInput:
+            bSearchString = sSearchString.encode("utf-8")
+            iFileSize = len(mmInput)
+
+            # Records ending in "\r" are records in universal newlines mode --> search record by record.
+            if mmInput.find(b"\r") < 0 and b"\n" not in bSearchString:
+                iOffset = mmInput.find(b"\n") + 1
+                if iOffset == 0:
+                    return lstRecsContainingSearchText
+
+                # Find search string; then the record that contains it
+                while iOffset < iFileSize and (iFoundOffset := mmInput.find(bSearchString, iOffset)) >= 0:
+                    iRecStart = mmInput.rfind(b"\n", iOffset, iFoundOffset) + 1 or iOffset
+                    iRecEnd = mmInput.find(b"\n", iFoundOffset) + 1 or iFileSize
+
+                    lstRecsContainingSearchText.append(mmInput[iRecStart:iRecEnd].decode("utf-8"))
+                    iOffset = iRecEnd
+
+                return lstRecsContainingSearchText
+
     with open(f"{sPath}{sInputFilename}", "r", newline="", encoding="utf-8") as infile:
         line = infile.readline()
         for line in infile:
@@ -751,16 +1385,21 @@ def deleteS3FilesUsingPrefix(s3_resource, s3BUCKET, s3BktFldr, sFilenamePrefix):
         rootLogger.info("s3 Keys to Delete: \n%s\n", "\n".join(lstS3KeysUsingPrefix))
         s3_client.delete_objects(Bucket=s3BUCKET, Delete={'Objects': lstS3Keys2Delete})
 
+        invalidateS3ListingCache(s3BUCKET, f"{s3BktFldr}{sFilenamePrefix}")
+
 
 def sendEmail(sender, receivers, SUBJECT, MSG): 
 
     import sendEmail as EmailDr
+    import EmailSpool
     
     import io
     from contextlib import redirect_stdout, redirect_stderr
 
     buf = io.StringIO()
 
+    EmailSpool.setEmailSpoolLogger(rootLogger)
+
     with redirect_stdout(buf),redirect_stderr(buf):
         EmailDr.sendEmailNamedParms(sender=sender, receivers=receivers, subject=SUBJECT, messageText=MSG)
 
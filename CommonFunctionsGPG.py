@@ -19,12 +19,20 @@
 # Paul Baranoski 2026-06-30 Modify removeGnupg_home(gnupg_home) to add parameter "ignore_errors=True" to 
 #                           shutil.rmtree function call.
 # Paul Baranoski 2026-07-14 Modify exception logic for encrypt to write e.stdout and e.stderr to log file.
+# 2026-10-18                Added new function getGPGKeyring to import a key once per process into a cached GNUPGHOME 
+#                           (removed at exit). Added new functions encryptS3Object/decryptS3Object to stream an S3 object 
+#                           thru gpg stdin/stdout into an S3 multipart upload without a local copy, and encryptS3Objects/
+#                           decryptS3Objects to process many S3 objects thru the same keyring. encrypt_file/decrypt_file 
+#                           do not remove a cached GNUPGHOME.
 ######################################################################################
 import boto3
 import subprocess
 import tempfile
 import os
 import shutil
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 
 #PRIVATE_KEY_4_SECRET_NAME = "np-opm-private-key"
@@ -33,6 +41,15 @@ import shutil
 #SECRET_NAME = "np-opm-private-key"
 #REGION = "us-east-1"
 
+# Stream S3 objects thru gpg in chunks of this size; upload gpg output in multipart parts of GPG_S3_PART_SIZE
+GPG_STREAM_CHUNK_SIZE = 8 * 1024 * 1024
+GPG_S3_PART_SIZE = 64 * 1024 * 1024
+GPG_S3_MAX_WORKERS = int(os.getenv("GPG_S3_MAX_WORKERS", "4"))
+
+# keys imported by this process: secret name --> (gnupg_home, fingerprint)
+dictGPGKeyrings = {}
+gpgKeyringsLock = threading.Lock()
+
 
 def setCommonFunctionLogger(pRootLogger):
 
@@ -143,7 +160,8 @@ def decrypt_file(gnupg_home, recipient, encrypted_file, output_file):
         raise
         
     finally:
-        shutil.rmtree(gnupg_home, ignore_errors=True)    
+        if not isCachedGPGKeyring(gnupg_home):
+            shutil.rmtree(gnupg_home, ignore_errors=True)    
         
 
 def encrypt_file(gnupg_home, input_file, output_file, recipient):
@@ -175,7 +193,8 @@ def encrypt_file(gnupg_home, input_file, output_file, recipient):
         raise
         
     finally:
-        shutil.rmtree(gnupg_home, ignore_errors=True)
+        if not isCachedGPGKeyring(gnupg_home):
+            shutil.rmtree(gnupg_home, ignore_errors=True)
         
 
 def get_key_fingerprint(gnupg_home):
@@ -251,6 +270,149 @@ def list_packets(gnupg_home, encrypted_file):
         raise    
 
 
+def getGPGKeyring(secret_name, region, key_data=None):
+
+    ######################################################
+    # Import key into a GNUPGHOME once per process, and 
+    # return (gnupg_home, fingerprint) for later calls. 
+    # key_data --> key JSON (ex. a throwaway test key) 
+    # instead of the Secrets Manager secret.
+    ######################################################
+    with gpgKeyringsLock:
+        if secret_name not in dictGPGKeyrings:
+            rootLogger.info(f"Import gpg key {secret_name} into keyring")
+
+            if key_data is None:
+                key_data = get_secret(secret_name, region)
+
+            gnupg_home = import_gpg_key(key_data)
+
+            if not dictGPGKeyrings:
+                atexit.register(removeGPGKeyrings)
+
+            dictGPGKeyrings[secret_name] = (gnupg_home, get_key_fingerprint(gnupg_home))
+
+        return dictGPGKeyrings[secret_name]
+
+
+def isCachedGPGKeyring(gnupg_home):
+
+    return any(gnupg_home == tKeyring[0] for tKeyring in dictGPGKeyrings.values())
+
+
+def removeGPGKeyrings():
+
+    with gpgKeyringsLock:
+        for gnupg_home, fingerprint in dictGPGKeyrings.values():
+            env = os.environ.copy()
+            env["GNUPGHOME"] = gnupg_home
+
+            # stop the gpg-agent started for this GNUPGHOME
+            subprocess.run(["gpgconf", "--kill", "gpg-agent"], env=env, capture_output=True)
+            shutil.rmtree(gnupg_home, ignore_errors=True)
+
+        dictGPGKeyrings.clear()
+
+
+def gpgS3Object(gnupg_home, lstGpgOptions, s3_client, bucket, src_key, dest_key):
+
+    ######################################################
+    # S3 object --> gpg stdin; gpg stdout --> S3 multipart 
+    # upload. Nothing is written to local disk. 
+    # If any step fails, the uploaded object is deleted.
+    ######################################################
+    from boto3.s3.transfer import TransferConfig
+    from CommonFunctions import invalidateS3ListingCache
+
+    rootLogger.info(f"gpg {lstGpgOptions[-1]} s3://{bucket}/{src_key} --> s3://{bucket}/{dest_key}")
+
+    env = os.environ.copy()
+    env["GNUPGHOME"] = gnupg_home
+
+    # gpg stderr to temp file --> gpg never blocks on a full stderr pipe
+    with tempfile.TemporaryFile() as fStderr:
+        gpgProcess = subprocess.Popen(["gpg", "--batch", "--yes", *lstGpgOptions],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=fStderr, env=env)
+
+        def streamS3Object2Gpg():
+            try:
+                body = s3_client.get_object(Bucket=bucket, Key=src_key)["Body"]
+                for bChunk in body.iter_chunks(GPG_STREAM_CHUNK_SIZE):
+                    gpgProcess.stdin.write(bChunk)
+            finally:
+                try:
+                    gpgProcess.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                futureStream = executor.submit(streamS3Object2Gpg)
+
+                try:
+                    s3_client.upload_fileobj(gpgProcess.stdout, bucket, dest_key,
+                                             Config=TransferConfig(multipart_chunksize=GPG_S3_PART_SIZE, max_concurrency=4))
+                except Exception:
+                    gpgProcess.kill()
+                    raise
+
+                finally:
+                    iReturnCode = gpgProcess.wait()
+                    gpgProcess.stdout.close()
+
+            fStderr.seek(0)
+            sStderr = fStderr.read().decode("utf-8", errors="replace")
+
+            if iReturnCode != 0:
+                raise subprocess.CalledProcessError(iReturnCode, gpgProcess.args, stderr=sStderr)
+
+            # re-raise S3 get_object or gpg stdin error --> gpg output is incomplete
+            futureStream.result()
+
+            if sStderr != "":
+                rootLogger.info("\n%s", sStderr)
+
+        except Exception as ex:
+            rootLogger.info(f"gpg {lstGpgOptions[-1]} exception: {ex}")
+            if isinstance(ex, subprocess.CalledProcessError):
+                rootLogger.info(ex.stderr)
+
+            try:
+                s3_client.delete_object(Bucket=bucket, Key=dest_key)
+            except Exception:
+                pass
+
+            raise
+
+        finally:
+            invalidateS3ListingCache(bucket, dest_key)
+
+
+def encryptS3Object(gnupg_home, recipient, s3_client, bucket, src_key, dest_key):
+
+    gpgS3Object(gnupg_home, ["--trust-model", "always", "--recipient", recipient, "--encrypt"], s3_client, bucket, src_key, dest_key)
+
+
+def decryptS3Object(gnupg_home, passphrase, s3_client, bucket, src_key, dest_key):
+
+    gpgS3Object(gnupg_home, ["--pinentry-mode", "loopback", "--passphrase", passphrase, "--trust-model", "always", "--decrypt"],
+                s3_client, bucket, src_key, dest_key)
+
+
+def encryptS3Objects(gnupg_home, recipient, s3_client, bucket, lstKeyPairs, iMaxWorkers=GPG_S3_MAX_WORKERS):
+
+    # lstKeyPairs --> list of (src_key, dest_key)
+    with ThreadPoolExecutor(max_workers=iMaxWorkers) as executor:
+        list(executor.map(lambda tKeyPair: encryptS3Object(gnupg_home, recipient, s3_client, bucket, *tKeyPair), lstKeyPairs))
+
+
+def decryptS3Objects(gnupg_home, passphrase, s3_client, bucket, lstKeyPairs, iMaxWorkers=GPG_S3_MAX_WORKERS):
+
+    # lstKeyPairs --> list of (src_key, dest_key)
+    with ThreadPoolExecutor(max_workers=iMaxWorkers) as executor:
+        list(executor.map(lambda tKeyPair: decryptS3Object(gnupg_home, passphrase, s3_client, bucket, *tKeyPair), lstKeyPairs))
+
+
 def removeGnupg_home(gnupg_home):
 
     import shutil
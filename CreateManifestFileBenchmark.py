@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  CreateManifestFileBenchmark.py
+#
+# Desc: Benchmark grouping of extract files into manifest files (CreateManifestFileDriver.groupFiles4Manifests)
+#       for synthetic S3 listings:
+#         1) GREEDY --> new manifest file when the next file in listing order does not fit (prior logic)
+#         2) BINPACK --> bin-packing (best of first-fit-decreasing and worst-fit-decreasing into the fewest groups)
+#
+#       Reports NOF manifest files of each method, the lower bound of NOF manifest files
+#       (max of NOF files / 35 and total size / 40 GB), and the secs to group the files.
+#       Checks that every file is in one group, no group exceeds the manifest file limits, and that BINPACK groups
+#       do not depend on listing order.
+#
+# Ex.   python3 CreateManifestFileBenchmark.py --nof_files 1000 5000 20000
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+########################################################################################################
+import sys
+import math
+import time
+import random
+import logging
+import argparse
+
+import CreateManifestFileDriver as CreManDr
+
+
+GB = 1024 * 1024 * 1024
+
+# file size distributions (bytes)
+SCENARIOS = {
+    "small":  lambda: int(random.lognormvariate(math.log(200 * 1024 * 1024), 1.0)),
+    "mixed":  lambda: random.choice([random.randint(1024, 500 * 1024 * 1024), random.randint(1 * GB, 20 * GB)]),
+    "large":  lambda: random.randint(5 * GB, 39 * GB),
+}
+
+
+def createListing(iNOFFiles, fnSize):
+
+    lstFiles = [{"Key": f"xtr/DOJ/DOJ_SFUI_REQ{iFile % 500:03}_PTB_Y{2000 + iFile % 25}_20261018.120000.txt.gz_{iFile}",
+                 "Size": min(fnSize(), CreManDr.MANIFEST_MAX_SIZE_ALL_FILES)} for iFile in range(iNOFFiles)]
+
+    # S3 listing is in key order
+    return sorted(lstFiles, key=lambda dictFile: dictFile["Key"])
+
+
+def checkGroups(lstFiles, lstGroups, bCheckManifestBytes):
+
+    dictSizes = {dictFile["Key"]: dictFile["Size"] for dictFile in lstFiles}
+
+    lstAllKeys = sorted(sKey for lstKeys in lstGroups for sKey in lstKeys)
+    if lstAllKeys != sorted(dictSizes):
+        return "files are missing or in more than one group"
+
+    for lstKeys in lstGroups:
+        if len(lstKeys) > CreManDr.MANIFEST_MAX_NOF_FILES:
+            return f"group has {len(lstKeys)} files"
+        if sum(dictSizes[sKey] for sKey in lstKeys) > CreManDr.MANIFEST_MAX_SIZE_ALL_FILES:
+            return "group exceeds max size of all files"
+        if bCheckManifestBytes and sum(len(sKey) + CreManDr.MANIFEST_FILE_ENTRY_BYTES for sKey in lstKeys) > CreManDr.MANIFEST_MAX_BYTES:
+            return "group exceeds max manifest file bytes"
+
+    return None
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="CreateManifestFileDriver grouping benchmark")
+    parser.add_argument("--nof_files", type=int, nargs="+", default=[1000, 5000], help="NOF files of synthetic listings")
+    parser.add_argument("--seed", type=int, default=2026, help="random seed")
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s %(asctime)s => %(message)s', level=logging.WARNING)
+    CreManDr.manifestLogger = logging.getLogger()
+
+    random.seed(args.seed)
+
+    print(f"{'scenario':>10} {'files':>8} {'lower bnd':>10} {'greedy':>8} {'secs':>8} {'binpack':>8} {'secs':>8}")
+
+    for sScenario, fnSize in SCENARIOS.items():
+        for iNOFFiles in args.nof_files:
+            lstFiles = createListing(iNOFFiles, fnSize)
+
+            iLowerBound = max(math.ceil(iNOFFiles / CreManDr.MANIFEST_MAX_NOF_FILES),
+                              math.ceil(sum(dictFile["Size"] for dictFile in lstFiles) / CreManDr.MANIFEST_MAX_SIZE_ALL_FILES))
+
+            lstResults = []
+            for sPacking in ("GREEDY", "BINPACK"):
+                fStart = time.monotonic()
+                lstGroups = CreManDr.groupFiles4Manifests(lstFiles, sPacking)
+                fElapsed = time.monotonic() - fStart
+
+                sError = checkGroups(lstFiles, lstGroups, sPacking == "BINPACK")
+                if sError:
+                    print(f"{sScenario} {iNOFFiles} {sPacking}: {sError}")
+                    sys.exit(12)
+
+                lstResults.append((len(lstGroups), fElapsed))
+
+            # BINPACK groups do not depend on listing order
+            lstShuffledFiles = random.sample(lstFiles, len(lstFiles))
+            if CreManDr.groupFiles4Manifests(lstShuffledFiles, "BINPACK") != CreManDr.groupFiles4Manifests(lstFiles, "BINPACK"):
+                print(f"{sScenario} {iNOFFiles} BINPACK: groups depend on listing order")
+                sys.exit(12)
+
+            (iGreedyGroups, fGreedySecs), (iBinPackGroups, fBinPackSecs) = lstResults
+            print(f"{sScenario:>10} {iNOFFiles:>8} {iLowerBound:>10} {iGreedyGroups:>8} {fGreedySecs:>8.3f} {iBinPackGroups:>8} {fBinPackSecs:>8.3f}")
+
+
+if __name__ == "__main__":
+
+    main()
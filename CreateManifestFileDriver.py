@@ -31,6 +31,11 @@
 # 06/23/2026 Paul Baranoski   Modify logic to change file_prefix = "MOA" for VA_PTD only. It was also being set for VA_RTRN. Added logic to set file_prefix = "VARETURN' 
 #                             for VA_RTRN files. This is why we have standards. To prevent exception logic like this.
 # 07/23/2026 Paul Baranoski   Change verbiage of error message in main function.
+# 10/18/2026                  Get list of S3 files for manifest with listS3Objects (paginated; no longer fails for more than 1,000 objects).
+#                             Invalidate cached S3 listings of manifest folder after put of manifest file.
+# 10/18/2026                  Group files into the fewest manifest files with bin-packing (MANIFEST_PACKING=BINPACK; default).
+#                             MANIFEST_PACKING=GREEDY groups files in listing order (prior logic).
+#                             Put manifest files into S3 concurrently.
 ############################################################################################################
 import boto3 
 import logging
@@ -44,9 +49,13 @@ from datetime import datetime
 from datetime import date,timedelta
 
 import os
+import math
+import heapq
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 import LoggerStandard as EnigmaLog
+from CommonFunctions import listS3Objects, invalidateS3ListingCache
 
 # Our common module with variable constants
 from SET_XTR_ENV import *
@@ -54,6 +63,19 @@ from SET_XTR_ENV import *
 LOG_DIR = "/app/IDRC/XTR/CMS/logs/"
 RUNDIR = "/app/IDRC/XTR/CMS/scripts/run/"
 
+# Manifest file limits: total size of files (32212254720-30GB  42949672960-40GB  53687091200-50GB), NOF files, 
+# and manifest file bytes (fileInformation entry is about len(key) + 70 bytes)
+MANIFEST_MAX_SIZE_ALL_FILES = 42949672960
+MANIFEST_MAX_NOF_FILES = 35
+MANIFEST_MAX_BYTES = 8000
+MANIFEST_FILE_ENTRY_BYTES = 70
+
+# BINPACK --> fewest manifest files (see groupFilesBinPacking); GREEDY --> new manifest file when next file in listing order does not fit
+MANIFEST_PACKING = os.getenv("MANIFEST_PACKING", "BINPACK")
+
+# NOF manifest files put into S3 at one time
+MANIFEST_PUT_MAX_WORKERS = int(os.getenv("MANIFEST_PUT_MAX_WORKERS", "8"))
+
 #############################################################
 # Functions
 #############################################################
@@ -102,19 +124,17 @@ def getConfigFileContents(sConfigFilename):
     return lstConfigRecs
     
 
-def ProcessFiles2IncludeInManifestFile(s3ManifestFilesFolder, sModelManifestFilename, Files2IncludeInManifest, RecipientEmails, ManifestHLQ):
+def groupFilesInListingOrder(Files2IncludeInManifest):
 
     ############################################
     # Variables and constants
     ############################################
-    # 32212254720-30GB  42949672960-40GB  53687091200-50GB
-    iMaxSizeAllFiles = 42949672960  
+    iMaxSizeAllFiles = MANIFEST_MAX_SIZE_ALL_FILES  
     iTotSizeAllFiles = 0
 
-    iMaxNOFFiles = 35
+    iMaxNOFFiles = MANIFEST_MAX_NOF_FILES
     iTotNOFFiles = 0
 
-    iMaxManifestFileBytes = 8000
     iNOFManifestFileBytes = 0
 
 
@@ -128,7 +148,7 @@ def ProcessFiles2IncludeInManifestFile(s3ManifestFilesFolder, sModelManifestFile
 
     for File2Include in Files2IncludeInManifest:
 
-        manifestLogger.info(f"{File2Include=}")
+        manifestLogger.debug(f"{File2Include=}")
         
         # if a single file is larger than max, we can end up with an empty list of files to include in a manifest file
         if (File2Include['Size']) > iMaxSizeAllFiles:
@@ -166,7 +186,7 @@ def ProcessFiles2IncludeInManifestFile(s3ManifestFilesFolder, sModelManifestFile
         #print(f'{iTotSizeAllFiles=}')
         #manifestLogger.info(f"{File2Include['Size']=}")
 
-        iNOFManifestFileBytes += len(File2Include['Key']) + 70
+        iNOFManifestFileBytes += len(File2Include['Key']) + MANIFEST_FILE_ENTRY_BYTES
 
 
     ##################################################
@@ -181,6 +201,150 @@ def ProcessFiles2IncludeInManifestFile(s3ManifestFilesFolder, sModelManifestFile
         manifestLogger.info(f"{iTotSizeAllFiles=}")
         manifestLogger.info(f"{iNOFManifestFileBytes=}")
 
+    return group_filename_lists
+
+
+def packFilesFirstFitDecreasing(lstSortedFiles):
+
+    # Place each file (largest first) in the first group where it fits; otherwise start a new group. 
+    # lstSortedFiles: list of (size, manifest bytes, key) sorted by size desc. Returns list of groups (list of keys).
+
+    iMinSize = lstSortedFiles[-1][0] if lstSortedFiles else 0
+
+    # [NOF files, total size, manifest bytes, keys]
+    lstGroups = []
+    lstOpenGroups = []
+
+    for iSize, iManifestBytes, sKey in lstSortedFiles:
+
+        for lstGroup in lstOpenGroups:
+            if lstGroup[1] + iSize <= MANIFEST_MAX_SIZE_ALL_FILES and lstGroup[2] + iManifestBytes <= MANIFEST_MAX_BYTES:
+                break
+        else:
+            lstGroup = [0, 0, 0, []]
+            lstGroups.append(lstGroup)
+            lstOpenGroups.append(lstGroup)
+
+        lstGroup[0] += 1
+        lstGroup[1] += iSize
+        lstGroup[2] += iManifestBytes
+        lstGroup[3].append(sKey)
+
+        # group is full: max NOF files, or no room for the smallest file
+        if lstGroup[0] == MANIFEST_MAX_NOF_FILES or lstGroup[1] + iMinSize > MANIFEST_MAX_SIZE_ALL_FILES:
+            lstOpenGroups.remove(lstGroup)
+
+    return [lstGroup[3] for lstGroup in lstGroups]
+
+
+def packFilesWorstFitDecreasing(lstSortedFiles, iNOFGroups):
+
+    # Place each file (largest first) in the group with the most size left --> spreads large files over iNOFGroups groups.
+    # lstSortedFiles: list of (size, manifest bytes, key) sorted by size desc. 
+    # Returns list of groups (list of keys), or None when the files do not fit in iNOFGroups groups.
+
+    # [NOF files, total size, manifest bytes, keys]
+    lstGroups = [[0, 0, 0, []] for _ in range(iNOFGroups)]
+
+    # (-size left, group idx) of groups with less than max NOF files
+    heapGroupRoom = [(-MANIFEST_MAX_SIZE_ALL_FILES, iGroup) for iGroup in range(iNOFGroups)]
+
+    for iSize, iManifestBytes, sKey in lstSortedFiles:
+
+        # skip groups without room for file in manifest file bytes
+        lstSkippedGroups = []
+        while heapGroupRoom:
+            iNegRoom, iGroup = heapq.heappop(heapGroupRoom)
+            lstGroup = lstGroups[iGroup]
+            if lstGroup[2] + iManifestBytes <= MANIFEST_MAX_BYTES or lstGroup[0] == 0:
+                break
+            lstSkippedGroups.append((iNegRoom, iGroup))
+        else:
+            return None
+
+        if -iNegRoom < iSize:
+            return None
+
+        lstGroup[0] += 1
+        lstGroup[1] += iSize
+        lstGroup[2] += iManifestBytes
+        lstGroup[3].append(sKey)
+
+        if lstGroup[0] < MANIFEST_MAX_NOF_FILES:
+            heapq.heappush(heapGroupRoom, (iNegRoom + iSize, iGroup))
+
+        for tGroupRoom in lstSkippedGroups:
+            heapq.heappush(heapGroupRoom, tGroupRoom)
+
+    return [lstGroup[3] for lstGroup in lstGroups if lstGroup[3]]
+
+
+def groupFilesBinPacking(Files2IncludeInManifest):
+
+    ######################################################
+    # Group files into the fewest groups where 
+    #    1) Total NOF files is not exceeded
+    #    2) Total size of files is not exceeded
+    #    3) Manifest file bytes are not exceeded
+    #
+    # First-fit-decreasing packs large files tightly, but leaves groups with few large files when the NOF files limit matters.
+    # Worst-fit-decreasing into N groups spreads large files over the groups. The smallest N that worst-fit-decreasing 
+    # can pack is found with a binary search between the lower bound and the first-fit-decreasing NOF groups.
+    #
+    # Files are sorted by (size desc, key), and keys in groups and groups are sorted --> the same files always give the same groups.
+    ######################################################
+    for File2Include in Files2IncludeInManifest:
+        # if a single file is larger than max, we can end up with an empty list of files to include in a manifest file
+        if (File2Include['Size']) > MANIFEST_MAX_SIZE_ALL_FILES:
+             raise Exception(f"File {File2Include['Key']} is too big to place in manifest file. Create a smaller sized file.")
+
+    lstSortedFiles = sorted(((File2Include['Size'], len(File2Include['Key']) + MANIFEST_FILE_ENTRY_BYTES, File2Include['Key']) 
+                             for File2Include in Files2IncludeInManifest), key=lambda tFile: (-tFile[0], tFile[2]))
+
+    lstBestGroups = packFilesFirstFitDecreasing(lstSortedFiles)
+
+    iLowerBound = max(math.ceil(len(lstSortedFiles) / MANIFEST_MAX_NOF_FILES),
+                      math.ceil(sum(tFile[0] for tFile in lstSortedFiles) / MANIFEST_MAX_SIZE_ALL_FILES),
+                      math.ceil(sum(tFile[1] for tFile in lstSortedFiles) / MANIFEST_MAX_BYTES))
+
+    manifestLogger.info(f"{iLowerBound=} first-fit-decreasing NOF groups={len(lstBestGroups)}")
+
+    iLow = iLowerBound
+    iHigh = len(lstBestGroups) - 1
+
+    while iLow <= iHigh:
+        iMid = (iLow + iHigh) // 2
+        lstGroups = packFilesWorstFitDecreasing(lstSortedFiles, iMid)
+
+        if lstGroups is None:
+            iLow = iMid + 1
+        else:
+            lstBestGroups = lstGroups
+            iHigh = len(lstGroups) - 1
+
+    manifestLogger.info(f"NOF groups={len(lstBestGroups)}")
+
+    return sorted(sorted(lstKeys) for lstKeys in lstBestGroups)
+
+
+def groupFiles4Manifests(Files2IncludeInManifest, sPacking=MANIFEST_PACKING):
+
+    # Files2IncludeInManifest: list of {"Key", "Size"}. Returns list of groups (list of keys); one manifest file per group.
+
+    manifestLogger.info(f"Group {len(Files2IncludeInManifest)} files into manifest files ({sPacking=})")
+
+    if sPacking == "GREEDY":
+        return groupFilesInListingOrder(Files2IncludeInManifest)
+    elif sPacking == "BINPACK":
+        return groupFilesBinPacking(Files2IncludeInManifest)
+    else:
+        raise Exception(f"Invalid MANIFEST_PACKING value {sPacking}. Valid values are BINPACK and GREEDY.")
+
+
+def ProcessFiles2IncludeInManifestFile(s3ManifestFilesFolder, sModelManifestFilename, Files2IncludeInManifest, RecipientEmails, ManifestHLQ):
+
+    group_filename_lists = groupFiles4Manifests(Files2IncludeInManifest)
+
 
     ##################################################
     # Create a manifest file for each group
@@ -193,8 +357,8 @@ def ProcessFiles2IncludeInManifestFile(s3ManifestFilesFolder, sModelManifestFile
     # IDRBI-99999-20210126-165003-idx
     tmstmp4DataReqID = datetime.today().strftime('%Y%m%d-%H%M%S')
 
-   
-    for idx, filename_list in enumerate(group_filename_lists, start=1):
+
+    def buildGroupManifestFile(idx, filename_list):
         #print ("\n")
         manifestLogger.info(f"{idx=}")
         manifestLogger.info(f"{len(filename_list)=}")
@@ -208,6 +372,10 @@ def ProcessFiles2IncludeInManifestFile(s3ManifestFilesFolder, sModelManifestFile
 
         BuildManifestFile(s3ManifestFilesFolder, sModelManifestFilename, filename_list, idx_lit, RecipientEmails, tmstmp4DataReqID, ManifestHLQ )
 
+    # Put manifest files into S3 concurrently (an exception in any put is re-raised here)
+    with ThreadPoolExecutor(max_workers=MANIFEST_PUT_MAX_WORKERS) as pool:
+        list(pool.map(buildGroupManifestFile, range(1, NOFGroups + 1), group_filename_lists))
+
     
 def BuildManifestFile(s3ManifestFilesFolder, sModelManifestFilename, lstFileNames, idx_lit, RecipientEmails, tmstmp4DataReqID, ManifestHLQ):
    
@@ -296,6 +464,7 @@ def BuildManifestFile(s3ManifestFilesFolder, sModelManifestFilename, lstFileName
         
         manifestLogger.info(f"Put file {destKey} into S3")
         resp = s3_client.put_object(Bucket=XTR_BUCKET, Key=destKey, Body=json_obj, ContentType="application/json")
+        invalidateS3ListingCache(XTR_BUCKET, destKey)
 
         manifestLogger.debug(f"{resp=}")
         
@@ -442,11 +611,12 @@ def createManifestFile(bucket=None, s3folder=None, runToken=None, BoxEmails=None
         manifestLogger.info("")
         manifestLogger.info("Get list of S3 files to include in manifest file(s)" )
         
-        # Get objects in s3 folder         
-        resp = s3_client.list_objects_v2(Bucket=S3Bucket, Prefix=S3BucketFldr + file_prefix)
-        manifestLogger.debug(f"{resp=}")
-        
-        if resp == None or resp['IsTruncated']:
+        # Get objects in s3 folder (all pages)
+        try:
+            lstS3Objects = listS3Objects(s3_client, S3Bucket, S3BucketFldr + file_prefix)
+            manifestLogger.debug(f"{lstS3Objects=}")
+
+        except Exception:
             ## Send Failure email	
             SUBJECT=f"CreateManifestFileDriver.py - Failed ({ENVNAME})"
             MSG=f"Get List of S3 objects for folder {S3BucketFldr} failed. "
@@ -456,7 +626,7 @@ def createManifestFile(bucket=None, s3folder=None, runToken=None, BoxEmails=None
        
         # Get the filenames with the run token (filename timestamp)   
         #lstKeys2IncludeInManifest =  [ x['Key']  for x in resp['Contents'] if str(x['Key']).find(S3FilenameTmstmp) != -1 ]
-        lstKeys2IncludeInManifest =  [ {"Key": x['Key'], "Size": x['Size']}  for x in resp['Contents'] if str(x['Key']).find(S3FilenameTmstmp) != -1 ]
+        lstKeys2IncludeInManifest =  [ {"Key": x['Key'], "Size": x['Size']}  for x in lstS3Objects if str(x['Key']).find(S3FilenameTmstmp) != -1 ]
         
         manifestLogger.info("")
         manifestLogger.info(f"{lstKeys2IncludeInManifest=}")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:   DSH_Batch_Extracts.py
+# DESC:   Set-based (batch) version of DSH_Extracts.py. Extracts DSH data for all request records
+#         in a request file using one Snowflake session.
+#
+#         1) PUT/COPY the request records into temporary table DSH_FINDER.
+#         2) Run the DSH extract SQL once for all requests into temporary table DSH_BATCH.
+#         3) COPY INTO one extract file per request from DSH_BATCH. Extract filenames are the
+#            same as DSH_Extracts.py and each COPY INTO reports the rows/bytes for its request.
+#
+#         NOTE: extract SQL is DSH_Extracts.getExtractSQL() (same columns as DSH_Extracts.py).
+#
+# Input: FINDER_CSV parameter/environment variable --> linux file with validated request records
+#        Ex. record: "010001,2019,2021"  (PRVDR_ID,FROM_FY,TO_FY)
+#
+# Modified: 
+#
+# 2026-10-18 Created program.
+# 2026-10-18 CREATE OR REPLACE the temporary tables and drop them at the end (session is reused for each finder file).
+# 2026-10-18 Extract SQL runs in run(con, dictParams) (called in-process by ExtractRunner with an injected
+#            connection). Stand-alone run logs on in the __main__ block.
+# 2026-10-18 Use DSH_Extracts.getExtractSQL(); request values are bind variables. Request csv may have quoted
+#            fields; a malformed/invalid request record fails the extract instead of being skipped.
+########################################################################################################
+# IMPORTS
+########################################################################################################
+import os
+import sys
+import csv
+from datetime import datetime
+
+currentDirectory = os.path.dirname(os.path.realpath(__file__))
+rootDirectory = os.path.abspath(os.path.join(currentDirectory, ".."))
+utilDirectory = os.getenv('CMN_UTIL')
+
+sys.path.append(rootDirectory)
+sys.path.append(utilDirectory)
+
+import ExtractRunner as ExtRunner
+
+# extract SQL and request validation shared with the single request extract
+import DSH_Extracts
+
+########################################################################################################
+# VARIABLE ASSIGNMENT
+########################################################################################################
+script_name = os.path.basename(__file__)
+
+
+########################################################################################################
+# Read request records: (PRVDR_ID, FROM_FY, TO_FY)
+########################################################################################################
+def readRequests(FINDER_CSV):
+   """ Returns the request records of csv file FINDER_CSV. Raises ValueError on a malformed record. """
+
+   lstRequests = []
+
+   with open(FINDER_CSV, "r", encoding="utf-8", newline="") as f:
+      csvReader = csv.reader(f)
+
+      for lstRec in csvReader:
+
+         # blank line
+         if len(lstRec) == 0:
+            continue
+
+         if len(lstRec) != 3:
+            raise ValueError(f"{FINDER_CSV} line {csvReader.line_num}: {len(lstRec)} fields instead of 3")
+
+         tupRequest = tuple(sField.strip() for sField in lstRec)
+         DSH_Extracts.validateRequest(tupRequest)
+
+         lstRequests.append(tupRequest)
+
+   return lstRequests
+
+
+########################################################################################################
+# Method to execute the extract SQL
+########################################################################################################
+def run(con, dictParams):
+
+   ENVNAME=dictParams.get('ENVNAME')
+   FF_TMSTMP=dictParams.get('FF_TMSTMP')
+   FF_ID_NODE=dictParams.get('FF_ID_NODE')
+   FINDER_CSV=dictParams.get('FINDER_CSV')
+
+   ##############################################
+   # Requests: (PRVDR_ID, FROM_FY, TO_FY)
+   ##############################################
+   lstRequests = readRequests(FINDER_CSV)
+
+   ExtRunner.log(f"NOF requests: {len(lstRequests)}")
+
+   lstRecords = []
+
+   ExtRunner.execute_sql(con, f"alter session set query_tag='{script_name}'", sScript=script_name)
+   ExtRunner.execute_sql(con, f"USE WAREHOUSE {dictParams.get('sf_xtr_warehouse')}", sScript=script_name)
+
+   ##############################################
+   # Stage request records into temp table
+   ##############################################
+   ExtRunner.execute_sql(con, """CREATE OR REPLACE TEMPORARY TABLE DSH_FINDER (REQ_PRVDR_ID VARCHAR(20), REQ_FROM_FY VARCHAR(4), REQ_TO_FY VARCHAR(4))""", sScript=script_name)
+   ExtRunner.execute_sql(con, f"""PUT file://{FINDER_CSV} @%DSH_FINDER AUTO_COMPRESS=TRUE OVERWRITE=TRUE""", sScript=script_name)
+   ExtRunner.execute_sql(con, """COPY INTO DSH_FINDER FROM @%DSH_FINDER
+                    FILE_FORMAT = (TYPE = CSV field_delimiter = ','  FIELD_OPTIONALLY_ENCLOSED_BY = '"'  TRIM_SPACE = TRUE  SKIP_BLANK_LINES = TRUE)
+                    PURGE = TRUE""", sScript=script_name)
+
+   ##############################################
+   # Extract DSH data for all requests
+   ##############################################
+   ExtRunner.execute_sql(con, f"""CREATE OR REPLACE TEMPORARY TABLE DSH_BATCH AS
+
+{DSH_Extracts.getExtractSQL(ENVNAME, bBatch=True)}
+  """, sScript=script_name)
+
+   ##############################################
+   # Create one extract file per request
+   ##############################################
+   for PRVDR_ID, FROM_FY, TO_FY in dict.fromkeys(lstRequests):
+
+      lstRecords.append(ExtRunner.execute_sql(con, f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_DSH_STG/DSH_EXTRACT_{FF_ID_NODE}_{PRVDR_ID}_{FROM_FY}_{TO_FY}_{FF_TMSTMP}.csv.gz
+                    FROM (
+                        SELECT * EXCLUDE (FNDR_PRVDR_ID, FNDR_FROM_FY, FNDR_TO_FY)
+                        FROM DSH_BATCH
+                        WHERE FNDR_PRVDR_ID = ?
+                          AND FNDR_FROM_FY  = ?
+                          AND FNDR_TO_FY    = ?
+                    )
+            FILE_FORMAT = (TYPE = CSV field_delimiter=','  ESCAPE_UNENCLOSED_FIELD=NONE FIELD_OPTIONALLY_ENCLOSED_BY = none )
+            SINGLE=TRUE  HEADER=TRUE  max_file_size=5368709120  """, [PRVDR_ID, FROM_FY, TO_FY], sScript=script_name))
+
+   # session may be reused for the next finder file (runner/broker)
+   ExtRunner.execute_sql(con, "DROP TABLE IF EXISTS DSH_BATCH", sScript=script_name)
+   ExtRunner.execute_sql(con, "DROP TABLE IF EXISTS DSH_FINDER", sScript=script_name)
+
+   return lstRecords
+
+
+########################################################################################################
+# RUN (stand-alone)
+########################################################################################################
+if __name__ == "__main__":
+
+   import snowconvert_helpers
+
+   con = None 
+   now = datetime.now()
+   date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
+
+   # boolean - Python Exception status
+   bPythonExceptionOccurred=False
+
+   print('')
+   print("Run date and time: " + date_time  )
+   print('')
+
+   try:
+      snowconvert_helpers.configure_log()
+      con = snowconvert_helpers.log_on()
+
+      run(con, dict(os.environ))
+    
+      snowconvert_helpers.quit_application()
+
+   except Exception as e:
+      print(e)
+
+      # Let shell script know that python code failed.
+      bPythonExceptionOccurred=True  
+
+   finally:
+      if con is not None:
+         con.close()
+
+      # Let shell script know that python code failed.      
+      if bPythonExceptionOccurred == True:
+         sys.exit(12) 
+      else:   
+         snowconvert_helpers.quit_application()
@@ -11,12 +11,16 @@
 # Paul Baranoski 2024-07-19 Added code to SQL to format DDD field to have leading zeroes.
 # Paul Baranoski 2024-08-05 Modified SQL. When getting days for DSCHRG_DT_DD for January, the ADMIT_DT_DD
 #                           was coded instead.
+# 2026-10-18 Extract SQL runs in run(con, dictParams) (called in-process by ExtractRunner with an injected
+#            connection). Stand-alone run logs on in the __main__ block.
+# 2026-10-18 Extract SQL built by getExtractSQL() (shared with DSH_Batch_Extracts.py). Provider/FY are bind
+#            variables; request values used in the extract filename are validated.
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
 import os
 import sys
-import datetime
+import re
 from datetime import datetime
 
 currentDirectory = os.path.dirname(os.path.realpath(__file__))
@@ -26,45 +30,54 @@ utilDirectory = os.getenv('CMN_UTIL')
 sys.path.append(rootDirectory)
 sys.path.append(utilDirectory)
 
-import snowconvert_helpers
-from snowconvert_helpers import Export
+import ExtractRunner as ExtRunner
 
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
 script_name = os.path.basename(__file__)
-con = None 
-now = datetime.now()
-date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
 
-ENVNAME=os.getenv('ENVNAME')
-FF_TMSTMP=os.getenv('FF_TMSTMP')
-PRVDR_ID=os.getenv('PRVDR_ID')
-FROM_FY=os.getenv('FROM_FY')
-TO_FY=os.getenv('TO_FY')
-FF_ID_NODE=os.getenv('FF_ID_NODE')
+# Request values are part of the extract filename (stage path cannot be a bind variable)
+dictREQUEST_FIELD_FORMATS = {"PRVDR_ID": re.compile(r"^[A-Za-z0-9]{1,20}$"),
+                             "FROM_FY": re.compile(r"^[0-9]{4}$"),
+                             "TO_FY": re.compile(r"^[0-9]{4}$")}
+
+
+def validateRequest(tupRequest):
+   """ Raises ValueError when a (PRVDR_ID, FROM_FY, TO_FY) request value is not valid. """
+
+   for (sField, reFormat), sValue in zip(dictREQUEST_FIELD_FORMATS.items(), tupRequest):
+      if sValue is None or not reFormat.match(str(sValue)):
+         raise ValueError(f"Invalid request value {sField}={sValue!r}")
 
-# boolean - Python Exception status
-bPythonExceptionOccurred=False
 
 ########################################################################################################
-# RUN
+# DSH extract SQL (shared with DSH_Batch_Extracts.py)
 ########################################################################################################
-print('')
-print("Run date and time: " + date_time  )
-print
-
-try:
-   snowconvert_helpers.configure_log()
-   con = snowconvert_helpers.log_on()
-   snowconvert_helpers.execute_sql_statement(f"alter session set query_tag='{script_name}'",con,exit_on_error = True)
-   snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
+def getExtractSQL(ENVNAME, bBatch=False):
+   """
+   Returns the DSH extract SELECT.
 
-   ## INSERT DATA INTO UTIL_EXT_RUNS TABLE ##
-   snowconvert_helpers.execute_sql_statement(f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_DSH_STG/DSH_EXTRACT_{FF_ID_NODE}_{PRVDR_ID}_{FROM_FY}_{TO_FY}_{FF_TMSTMP}.csv.gz
-                    FROM (
+   bBatch=False --> one request. Bind variables: PRVDR_ID, FROM_FY, TO_FY.
+   bBatch=True  --> all requests in temporary table DSH_FINDER. The request columns
+                    FNDR_PRVDR_ID, FNDR_FROM_FY and FNDR_TO_FY are selected first.
+   """
+   if bBatch:
+      sFinderColumns = "FNDR_PRVDR_ID, FNDR_FROM_FY, FNDR_TO_FY\n    ,"
+      sFinderRequestColumns = "F.REQ_PRVDR_ID AS FNDR_PRVDR_ID, F.REQ_FROM_FY AS FNDR_FROM_FY, F.REQ_TO_FY AS FNDR_TO_FY\n                    ,"
+      sRequestFilter = """INNER JOIN DSH_FINDER F
+              ON  S.PRVDR_ID = F.REQ_PRVDR_ID
+              AND S.FED_FY BETWEEN F.REQ_FROM_FY AND F.REQ_TO_FY
+              
+              WHERE"""
+   else:
+      sFinderColumns = ""
+      sFinderRequestColumns = ""
+      sRequestFilter = """WHERE S.PRVDR_ID = ? 
+                AND S.FED_FY BETWEEN ? AND ? 
+                AND"""
 
-SELECT HICN
+   return f"""SELECT {sFinderColumns}HICN
     ,ADMIT_DT_YYYY||TO_CHAR(ADMIT_DT_DDD,'FM000')   AS Admit_Date
     ,DSCHRG_DT_YYYY||TO_CHAR(DSCHRG_DT_DDD,'FM000') AS Discharge_Date
     ,PRVDR_ID       AS Provider_ID
@@ -82,7 +95,7 @@ SELECT HICN
     ,MBI_ID              AS MBI_ID
 
 FROM (
-   SELECT HICN
+   SELECT {sFinderColumns}HICN
                ,TO_CHAR(ADM_DT,'YYYY-MM-DD') 
                ,ADMIT_DT_YYYY
                ,CASE WHEN ADMIT_DT_MM = 1  THEN ADMIT_DT_DD
@@ -132,7 +145,7 @@ FROM (
         FROM (
 
              
-              SELECT HICN 
+              SELECT {sFinderRequestColumns}HICN 
                     ,ADM_DT
                     ,TO_CHAR(ADM_DT,'YYYY')    AS ADMIT_DT_YYYY
                     ,DATE_PART(month,ADM_DT)   AS ADMIT_DT_MM
@@ -173,33 +186,83 @@ FROM (
               --INNER JOIN BIA_{ENVNAME}.CMS_TARGET_XTR_{ENVNAME}.DSH_EDX_PRVDR P 
               --ON S.PRVDR_ID = P.PRVDR_ID
               
-              WHERE S.PRVDR_ID = '{PRVDR_ID}' 
-                AND S.FED_FY BETWEEN '{FROM_FY}' AND '{TO_FY}' 
-                AND S.MEDPAR_VSN = CASE WHEN S.FED_FY IN ('2004','2005','2006') AND S.PRVDR_ID IS NOT NULL THEN 'O'
+              {sRequestFilter} S.MEDPAR_VSN = CASE WHEN S.FED_FY IN ('2004','2005','2006') AND S.PRVDR_ID IS NOT NULL THEN 'O'
                                         ELSE 'R' END 
 
             )                                
-     )                           
+     )                           """
+
+
+########################################################################################################
+# Method to execute the extract SQL
+########################################################################################################
+def run(con, dictParams):
+
+   ENVNAME=dictParams.get('ENVNAME')
+   FF_TMSTMP=dictParams.get('FF_TMSTMP')
+   PRVDR_ID=dictParams.get('PRVDR_ID')
+   FROM_FY=dictParams.get('FROM_FY')
+   TO_FY=dictParams.get('TO_FY')
+   FF_ID_NODE=dictParams.get('FF_ID_NODE')
+
+   validateRequest((PRVDR_ID, FROM_FY, TO_FY))
+
+   lstRecords = []
+
+   ExtRunner.execute_sql(con, f"alter session set query_tag='{script_name}'", sScript=script_name)
+   ExtRunner.execute_sql(con, f"USE WAREHOUSE {dictParams.get('sf_xtr_warehouse')}", sScript=script_name)
+
+   ## INSERT DATA INTO UTIL_EXT_RUNS TABLE ##
+   lstRecords.append(ExtRunner.execute_sql(con, f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_DSH_STG/DSH_EXTRACT_{FF_ID_NODE}_{PRVDR_ID}_{FROM_FY}_{TO_FY}_{FF_TMSTMP}.csv.gz
+                    FROM (
+
+{getExtractSQL(ENVNAME)}
     
  )
             FILE_FORMAT = (TYPE = CSV field_delimiter=','  ESCAPE_UNENCLOSED_FIELD=NONE FIELD_OPTIONALLY_ENCLOSED_BY = none )
-            SINGLE=TRUE  HEADER=TRUE  max_file_size=5368709120  """, con, exit_on_error=True)
+            SINGLE=TRUE  HEADER=TRUE  max_file_size=5368709120  """, [PRVDR_ID, FROM_FY, TO_FY], sScript=script_name))
+
+   return lstRecords
+
+
+########################################################################################################
+# RUN (stand-alone)
+########################################################################################################
+if __name__ == "__main__":
+
+   import snowconvert_helpers
+
+   con = None 
+   now = datetime.now()
+   date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
+
+   # boolean - Python Exception status
+   bPythonExceptionOccurred=False
+
+   print('')
+   print("Run date and time: " + date_time  )
+   print
+
+   try:
+      snowconvert_helpers.configure_log()
+      con = snowconvert_helpers.log_on()
 
+      run(con, dict(os.environ))
     
-   snowconvert_helpers.quit_application()
+      snowconvert_helpers.quit_application()
 
-except Exception as e:
-   print(e)
+   except Exception as e:
+      print(e)
 
-   # Let shell script know that python code failed.
-   bPythonExceptionOccurred=True  
+      # Let shell script know that python code failed.
+      bPythonExceptionOccurred=True  
 
-finally:
-   if con is not None:
-      con.close()
+   finally:
+      if con is not None:
+         con.close()
 
-   # Let shell script know that python code failed.      
-   if bPythonExceptionOccurred == True:
-      sys.exit(12) 
-   else:   
-      snowconvert_helpers.quit_application()
\ No newline at end of file
+      # Let shell script know that python code failed.      
+      if bPythonExceptionOccurred == True:
+         sys.exit(12) 
+      else:   
+         snowconvert_helpers.quit_application()
@@ -35,6 +35,11 @@
 # Paul Baranoski 2025-05-08 Add call to DSH_AddReqEmails.py to capture DSH Requestor-UNIQ-ID and Requestor-Email into SF table.
 # Paul Baranoski 2025-08-13 Modify success email verbiage to say request is in-process and not complete, and files will be available once they receive an email with a link to their Box account.
 # Paul Baranoski 2026-03-11 Convert bash to python. Add TESTING functionality.
+# 2026-10-18 Add --batch option: run DSH_Batch_Extracts.py once per request file (set-based extract of all 
+#            request records) instead of DSH_Extracts.py once per request record.
+# 2026-10-18 Run DSH_Extracts.py/DSH_Batch_Extracts.py in-process using ExtractRunner (run(con, dictParams) with one
+#            shared Snowflake connection) instead of a subprocess per request record. Log per-stage timings.
+#            Write the batch request csv file with csv.writer (fields quoted when needed).
 ######################################################################################
 
 
@@ -62,6 +67,7 @@ import sys
 import argparse
 import re
 import io
+import csv
 
 import tempfile
 # Set a different temp directory than the default "/tmp"
@@ -82,6 +88,9 @@ from FilenameCounts import getExtractFilenamesAndCounts
 import LoggerStandard as EnigmaLog
 from CommonFunctions import *
 
+# runs extract python code in-process
+import ExtractRunner as ExtRunner
+
 ########################################################################################################
 # CONSTANTS
 ########################################################################################################
@@ -106,7 +115,32 @@ TMP_DSH_FF_LOGFILE = "tmpDSHFFLOG.txt"
 
  
 
-def main_processing_loop():
+def runBatchExtract(sFF, sFF_TMSTMP, sFF_UniqID_Node, lstBatchRequests):
+
+    ##############################################
+    # Write validated request records to csv file for PUT/COPY into Snowflake temp table
+    ##############################################
+    sFinderCSV = f"{DATADIR}{sFF}.{sFF_TMSTMP}.batch.csv"
+    rootLogger.info(f"Write {len(lstBatchRequests)} request records to {sFinderCSV}")
+
+    with open(sFinderCSV, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(lstBatchRequests)
+
+    rootLogger.info("")
+    rootLogger.info(f"Extract DSH data for {len(lstBatchRequests)} requests in {sFF} ")
+
+    try:
+        extResult = ExtRunner.run_extract("DSH_Batch_Extracts", {"FF_TMSTMP": sFF_TMSTMP, "FF_ID_NODE": sFF_UniqID_Node, "FINDER_CSV": sFinderCSV})
+        rootLogger.info(f"{extResult.returncode=}")
+
+    finally:
+        deleteFileFromLinux(sFinderCSV)
+
+    if extResult.returncode != 0:
+        raise Exception(f"DSH_Batch_Extracts.py failed with return code {extResult.returncode} for request file {sFF}: {extResult.output}")
+
+
+def main_processing_loop(bBatchMode=False):
 
   try:    
 
@@ -131,9 +165,13 @@ def main_processing_loop():
         #global rootLogger
         rootLogger = EnigmaLog.setLogging(LOGNAME)
         rootLogger.info(f"\nDSH_Extracts_Driver.py started at {TMSTMP}")
+        rootLogger.info(f"{bBatchMode=}")
         
         setCommonFunctionLogger(rootLogger)
 
+        # Establish logger with ExtractRunner module.
+        ExtRunner.setRunnerLogger(rootLogger)
+
         ###########################################################
         # Set current working directory to scripts/run directory.
         # This is so subprocess calls will work from RunDeck  
@@ -316,6 +354,8 @@ def main_processing_loop():
             ##############################################
             # Process each record in Finder File
             ##############################################
+            lstBatchRequests = []
+
             with open(f"{DATADIR}{sFF}", "r", encoding="UTF-8") as f:
             
                 for sExtRecord in f:
@@ -568,14 +608,11 @@ def main_processing_loop():
 
                     
                     ##############################################
-                    # Export fields for python extract code.
-                    ##############################################	
-                    os.environ["PRVDR_ID"] = sPRVDR_ID                
-                    os.environ["FROM_FY"] = sFROM_FY
-                    os.environ["TO_FY"] = sTO_FY
-                    os.environ["FF_TMSTMP"] = sFF_TMSTMP
-                    os.environ["FF_ID_NODE"] = sFF_UniqID_Node
-
+                    # Batch mode: extract all request records after file is validated
+                    ##############################################
+                    if bBatchMode:
+                        lstBatchRequests.append((sPRVDR_ID, sFROM_FY, sTO_FY))
+                        continue
 
                     ##############################################
                     # Extract DSH records for Extract record.
@@ -583,14 +620,24 @@ def main_processing_loop():
                     rootLogger.info("")
                     rootLogger.info(f"Extract DSH data for Provider {sPRVDR_ID} for Extract Dates {sFROM_FY} to {sTO_FY} ")
 
-                    sp_info = subprocess.run(['python3', 'DSH_Extracts.py'], capture_output=True, text=True, check=True)
-                    write_sp_info_2_log(sp_info)  
+                    extResult = ExtRunner.run_extract("DSH_Extracts", {"PRVDR_ID": sPRVDR_ID, "FROM_FY": sFROM_FY, "TO_FY": sTO_FY,
+                                                                       "FF_TMSTMP": sFF_TMSTMP, "FF_ID_NODE": sFF_UniqID_Node})
+                    rootLogger.info(f"{extResult.returncode=}")
+
+                    if extResult.returncode != 0:
+                        raise Exception(f"DSH_Extracts.py failed with return code {extResult.returncode} for Provider {sPRVDR_ID}: {extResult.output}")
 
                     ##############################################
                     # End-For loop: Processing request file
                     ##############################################
 
 
+            #######################################################
+            # Batch mode: one set-based extract for all request records
+            #######################################################
+            if bBatchMode and BAD_FILE_SW == False and len(lstBatchRequests) > 0:
+                runBatchExtract(sFF, sFF_TMSTMP, sFF_UniqID_Node, lstBatchRequests)
+
 
             #######################################################
             # If bad file --> archive file; remove file from linux 		
@@ -771,6 +818,9 @@ def main_processing_loop():
         # End of Processing
         # NOTE: the \n before "Ended at" line is to ensure that this information is on a separate line, left-justified without any other logging info preceding it.        
         ####################################################################     -
+        rootLogger.info(ExtRunner.timing_report())
+        ExtRunner.close_connection()
+
         rootLogger.info("")
         rootLogger.info("DSH_Extracts_Driver.py completed successfully.")
         rootLogger.info(f"\nEnded at {TMSTMP}" )
@@ -795,4 +845,8 @@ def main_processing_loop():
 
 if __name__ == "__main__":
 
-        main_processing_loop()
+        parser = argparse.ArgumentParser(description="DSH Extracts Driver")
+        parser.add_argument("--batch", action="store_true", help="extract all request file records with one set-based extract")
+        args = parser.parse_args()
+
+        main_processing_loop(args.batch)
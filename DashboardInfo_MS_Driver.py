@@ -24,6 +24,11 @@
 # Paul Baranoski 2026-03-16 Add code to not process "EFT_Files_" log files.
 # Paul Baranoski 2026-03-23 Add import of CommonFunctions. Remove hard-coded common functions from program.
 # Paul Baranoski 2026-06-30 Add code to not process "DSH_Extract_ArchiveFiles" log files.
+# 2026-10-18                Get extract filenames and counts from the run metrics file (RunMetrics.py) when the run has one,
+#                           instead of scanning the log file. Do not process run metrics files as log files.
+# 2026-10-18                Use incremental log index (DashboardLogIndex.py) for job start/end lines, COPY INTO filenames, counts,
+#                           and DASHBOARD_INFO lines. Only log bytes written since the previous dashboard run are parsed.
+#                           Replace the chain of log filename exclusions with one compiled regular expression. 
 ############################################################################################################
 
 import os
@@ -38,7 +43,6 @@ import io
 import re
 import boto3
 import json
-from collections import deque
 
 # Our common module with variable constants
 from SET_XTR_ENV import *
@@ -49,6 +53,8 @@ RUNDIR = "/app/IDRC/XTR/CMS/scripts/run/"
 
 import LoggerStandard as EnigmaLog
 from CommonFunctions import * 
+import RunMetrics
+import DashboardLogIndex as LogIdx
 
 
 # bytes pretty-printing
@@ -61,47 +67,39 @@ UNITS_MAPPING = [
     (1, (' byte', ' bytes')),
 ]
 
+#################################################################################
+# Log files that are not Dashboard log files
+#
+# NOTE: Ignore logs for utility scripts, load finder file scripts, python database logs, and support processing logs.
+#       Also, ignore certain application child logs. 
+#################################################################################
+lstEXCLUDED_LOG_TEXT = [
+    # Do not process TESTING_ logs
+    "TESTING_",
+    # Ignore logs for utility scripts, load finder file scripts, python database logs
+    "CombineS3Files", "CreateManifestFile", "ProcessFiles2EFT", "_SF.", "LOAD_",
+    # Remove support scripts
+    "DashboardInfo", "DashboardVolReports", "BuildRunExtCalendar", "KIA", "CleanUp", "ListXTRProcess", "GitHub", "EFT_Files_",
+    # Remove reporting log files
+    "Manifest", "FinderFiles", "CalendarExtReports", "DSH_Extract_ArchiveFiles",
+    # Remove SF Load table logs
+    "_SF_Table_Load",
+    # Remove child logs from list of log files to process
+    "DemoFinderFilePrep", "DEMOFNDR_PT",
+    # Remove specific Driver logs from list of log files to process. 
+    # Ones to keep are VAPTD_Driver, VARTN_Driver, OPMHI_Driver
+    "NYSPAP_Extract_Driver", "PTD_DUAL_Daily_Driver", "PTD_DUAL_Monthly_Driver",
+]
+
+reEXCLUDED_LOGS = re.compile("|".join(re.escape(sText) for sText in lstEXCLUDED_LOG_TEXT)
+                             + "|^SAF_ENC_(INP|SNF)_Driver"
+                             # Run metrics files are read with their log file
+                             + "|" + re.escape(RunMetrics.RUN_METRICS_SUFFIX) + "$")
+
 
 #############################################################
 # Functions
 #############################################################
-def egrep(fFileNPath, pattern, ignore_case=False):
-   
-    flags = re.IGNORECASE if ignore_case else 0
-    regex = re.compile(pattern, flags)
-
-    lstMatchedLines = []
-    
-    with open(fFileNPath,"r") as fLogFile:
-        for line in fLogFile:
-            if regex.search(line):
-                lstMatchedLines.append(line.strip())
-                
-    return lstMatchedLines            
-  
-    
-def head(fFileNPath, iFirstNOFRecs): 
-    
-    with open(fFileNPath,"r") as fFile:
-        lstHead = []
-        for _ in range(iFirstNOFRecs):
-            try:
-                lstHead.append(next(fFile))
-                
-            except StopIteration:
-                break
-
-        return lstHead
-                
-
-def tail(fFileNPath, iLastNOFRecs): 
-    
-    with open(fFileNPath,"r") as fFile:
-        lstTail = deque(fFile, maxlen=iLastNOFRecs)
-
-        return lstTail  
-
-
 def convertBytes2ReadableSize(iprmBytes, units=UNITS_MAPPING):
 
     # iprmBytes is expected to be an integer and not a string    
@@ -142,60 +140,39 @@ def convertBytes2ReadableSize(iprmBytes, units=UNITS_MAPPING):
     return sHumanFileSize
     
     
-def getExtractFilenamesAndCounts(P_LOGNAME):
+def getExtractFilenamesAndCounts(P_LOGNAME, logInfo):
     
     rootLogger.info("")
     rootLogger.info(f"logname parameter: {P_LOGNAME}")
 
     ################################################
-    # Create regex
-    ################################################    
-    reCOPY_INTO = re.compile('^Executing: COPY INTO [@]{1}[a-zA-Z0-9_\.]+[/]+')
-    reROW_COUNTS = re.compile('rows_unloaded,input_bytes,output_bytes')
-    
+    # Use run metrics file when the run has one
+    ################################################
+    lstRunMetrics = RunMetrics.readRunMetricsRecords(P_LOGNAME)
+
+    if lstRunMetrics is not None:
+        rootLogger.info(f"Get filenames and counts from run metrics file {RunMetrics.getRunMetricsFilename(P_LOGNAME)}")
+
+        # Ex. filenamesAndCounts = "TRICARE_EXTRACT_20241016.103059.txt.gz 2605154 601790572 107807527" 
+        lstFilenamesAndCounts = [ f"{ext_filename} {rows} {input_bytes} {output_bytes}" 
+                                  for ext_filename, rows, input_bytes, output_bytes in RunMetrics.getCopyIntoFilesAndCounts(lstRunMetrics)]
+
+        rootLogger.info(f"{lstFilenamesAndCounts=}")
+
+        return lstFilenamesAndCounts
+
 	######################################################
-    # Search log file for extract names and record counts
+    # Extract names and record counts found in log file (log index)
+    #
+    # Ex. "Executing: COPY INTO @BIA_DEV.CMS_STAGE_XTR_DEV.BIA_DEV_XTR_STS_MED_INS_MN_STG/STS_MED_INS_RPT_BB2A_MN_2024_DEC_20250926.151032.csv.gz" 
+    #      --> STS_MED_INS_RPT_BB2A_MN_2024_DEC_20250926.151032.csv.gz
+    #
+    # Ex. rows_unloaded,input_bytes,output_bytes
+    #     2605154,601790572,107807527
+    #      --> record-count unzipped-bytes zipped-bytes
 	######################################################  
-    COPY_INTO_FILENAMES = []
-    ROW_COUNTS = []
-    
-    with open(P_LOGNAME,"r") as fLogFile:
-        for sLine in fLogFile:
-
-            sLine = sLine.strip()
-            
-            if sLine == "":
-                continue
-                
-            rootLogger.debug(f"{sLine=}") 
-            
-            ################################################            
-            # Ex. "Executing: COPY INTO @BIA_DEV.CMS_STAGE_XTR_DEV.BIA_DEV_XTR_STS_MED_INS_MN_STG/STS_MED_INS_RPT_BB2A_MN_2024_DEC_20250926.151032.csv.gz" 
-            #      --> STS_MED_INS_RPT_BB2A_MN_2024_DEC_20250926.151032.csv.gz
-            ################################################
-            if reCOPY_INTO.search(sLine):
-                rootLogger.info(f"\n{sLine}")
-                extFilename = (sLine.split("/")[1]).strip()
-                COPY_INTO_FILENAMES.append(extFilename)
-
-            ################################################
-            # Ex. rows_unloaded,input_bytes,output_bytes
-            #     2605154,601790572,107807527
-            #
-            # extract record-count,unzipped-bytes,zipped-bytes. Convert commas to spaces                
-            ################################################
-            if reROW_COUNTS.search(sLine):
-                try:
-                    #rootLogger.info(f"{sLine}")
-                    # get the following record --> awk {getline;print $0}
-                    sNextLine = next(fLogFile).strip()
-                    # remove commas
-                    sNextLine = sNextLine.replace(","," ")
-                    rootLogger.info(f"{sNextLine=}")
-                    ROW_COUNTS.append(sNextLine)
-                except StopIteration:
-                    # EOF
-                    sNextLine = None
+    COPY_INTO_FILENAMES = logInfo.facts(LogIdx.FACT_COPY_INTO)
+    ROW_COUNTS = logInfo.facts(LogIdx.FACT_ROW_COUNTS)
 
     ################################################
 	# No Extract Filenames were found	
@@ -232,8 +209,7 @@ def getListofFiles2Process(prmStart_ts, prmEnd_ts):
     #################################################################################
     # Get list of Log Files that are between START_DT and END_DT
     #
-    # NOTE: Ignore logs for utility scripts, load finder file scripts, python database logs, and support processing logs.
-    #       Also, ignore certin application child logs. 
+    # NOTE: Non-Dashboard log files are excluded with one compiled regular expression (reEXCLUDED_LOGS).
     #
     # NOTE-2:!!!!PSPS_Split_files  - No record counts - The following file(s) were created:
     #  Should I ignore or use old logic - for awk scripts that split files.
@@ -243,15 +219,21 @@ def getListofFiles2Process(prmStart_ts, prmEnd_ts):
     # Create list of log files within Date range
     ##############################################
     lstLogFiles4DtRange = []
+    lstLogFiles2Process = []
     
     # iterate thru log files in LOG directory
-    for sDirPath, _, files in os.walk(LOGDIR):
-        for file in files:
-            sPathNFilename = os.path.join(sDirPath, file)
+    with os.scandir(LOGDIR) as itLogDir:
+        for entry in itLogDir:
+            if not entry.is_file():
+                continue
             try:
-                mtime = os.path.getmtime(sPathNFilename)
+                mtime = entry.stat().st_mtime
                 if prmStart_ts <= mtime <= prmEnd_ts:
-                    lstLogFiles4DtRange.append(file)  
+                    lstLogFiles4DtRange.append(entry.name)  
+
+                    # We want to process this log file
+                    if not reEXCLUDED_LOGS.search(entry.name):
+                        lstLogFiles2Process.append(entry.name)
 
             except FileNotFoundError:
                 # Handle race condition if file was deleted mid-scan
@@ -272,83 +254,6 @@ def getListofFiles2Process(prmStart_ts, prmEnd_ts):
     rootLogger.info("")
     rootLogger.info(f"List of Log Files found for date range:\n-----------------------------------------\n{sLogFiles4DtRange}")
 
-    ##############################################
-    # Remove non-Dashboard log files
-    ##############################################
-    lstLogFiles2Process = []
-
-    for sFilename in lstLogFiles4DtRange:
-        # Do not process TESTING_ logs
-        if sFilename.find("TESTING_") >= 0:
-            continue
-
-        # Ignore logs for utility scripts, load finder file scripts, python database logs
-        if sFilename.find("CombineS3Files") >= 0:
-            continue
-        if sFilename.find("CreateManifestFile") >= 0:
-            continue
-        if sFilename.find("ProcessFiles2EFT") >= 0:
-            continue
-        if sFilename.find("_SF.") >= 0:
-            continue
-        if sFilename.find("LOAD_") >= 0:
-            continue  
-
-        # Remove support scripts
-        if  sFilename.find("DashboardInfo") >= 0:
-            continue
-        if  sFilename.find("DashboardVolReports") >= 0:
-            continue            
-        if  sFilename.find("BuildRunExtCalendar") >= 0:
-            continue
-        if  sFilename.find("KIA") >= 0:
-            continue
-        if  sFilename.find("CleanUp") >= 0:
-            continue
-        if  sFilename.find("ListXTRProcess") >= 0:
-            continue
-        if  sFilename.find("GitHub") >= 0:
-            continue
-        if  sFilename.find("EFT_Files_") >= 0:
-            continue
-
-        # Remove reporting log files
-        if  sFilename.find("Manifest") >= 0:
-            continue
-        if  sFilename.find("FinderFiles") >= 0:
-            continue
-        if  sFilename.find("CalendarExtReports") >= 0:
-            continue
-        if sFilename.find("DSH_Extract_ArchiveFiles") >= 0:
-            continue
-
-        # Remove SF Load table logs
-        if  sFilename.find("_SF_Table_Load") >= 0:
-            continue
-
-        # Remove child logs from list of log files to process
-        if  sFilename.find("DemoFinderFilePrep") >= 0:
-            continue
-        if  sFilename.find("DEMOFNDR_PT") >= 0:
-            continue
-        
-        # Remove specific Driver logs from list of log files to process. 
-        # Ones to keep are VAPTD_Driver, VARTN_Driver, OPMHI_Driver
-        if  sFilename.find("NYSPAP_Extract_Driver") >= 0:
-            continue
-        if  sFilename.find("PTD_DUAL_Daily_Driver") >= 0:
-            continue
-        if sFilename.find("PTD_DUAL_Monthly_Driver") >= 0:
-            continue
-        if sFilename.find("SAF_ENC_(INP|SNF)_Driver") >= 0:
-            continue
-        if re.match("SAF_ENC_(INP|SNF)_Driver",sFilename):
-            continue
-
-        # We want to process this log file
-        lstLogFiles2Process.append(sFilename)  
-
-
     ###################################################
     # Convert list to string with line-breaks
     #  for easy log display
@@ -434,7 +339,7 @@ def createJobInfoKeyValuePairs(prmLogfilename, prmJobSuccess):
 
 
 
-def getExtractFilenamesAndCountsDashboardInfo(prmLogfileNPath, prmExt): 
+def getExtractFilenamesAndCountsDashboardInfo(prmLogfileNPath, prmExt, logInfo): 
 
     rootLogger.info("")
 
@@ -448,11 +353,13 @@ def getExtractFilenamesAndCountsDashboardInfo(prmLogfileNPath, prmExt):
     # --> blbtn_drug_ext_20250106.131600.txt.gz 584307,234307107,18067235   
     # Ex. DASHBOARD_INFO:DEMOFNDR_PTA_H0137_202305_20241022.151515.txt.gz 376,239136,8335 
     # --> DEMOFNDR_PTA_H0137_202305_20241022.151515.txt.gz 376 239136 8335
+    #
+    # NOTE: The log index stores DASHBOARD_INFO lines without the eye-catcher (commas converted to spaces).
     #####################################################################################
-    lstDASHBOARD_INFO = egrep(prmLogfileNPath, "DASHBOARD_INFO:", ignore_case=False)
+    lstFilenamesNCounts = logInfo.facts(LogIdx.FACT_DASHBOARD_INFO)
 
     # if DASHBOARD_INFO: does not exist in log file--> use alternate search for ROW_COUNTS for older log files.	
-    if len(lstDASHBOARD_INFO) == 0:
+    if len(lstFilenamesNCounts) == 0:
         rootLogger.info("")
         rootLogger.info("DASHBOARD_INFO was not found. Use older method for record counts")
         
@@ -464,21 +371,6 @@ def getExtractFilenamesAndCountsDashboardInfo(prmLogfileNPath, prmExt):
     #############################################################
     # DASHBOARD_INFO exists
     #############################################################
-    rootLogger.info("")
-    rootLogger.info(f"{lstDASHBOARD_INFO=}")
-
-    #############################################################
-    # Remove "DASHBOARD_INFO" eye-catcher from each item in list
-    #  of extract filenames and counts.
-    #############################################################
-    lstFilenamesNCounts = []    
-   
-    for sDASHBOARD_INFO in lstDASHBOARD_INFO:
-        sFilenamesNCounts = (sDASHBOARD_INFO.split(":")[1]).strip().replace(","," ")
-        #rootLogger.debug(f"{sFilenamesNCounts=}")
-        lstFilenamesNCounts.append(sFilenamesNCounts)        
-
-
     rootLogger.info("")
     rootLogger.info(f"{lstFilenamesNCounts=}")
 
@@ -676,9 +568,6 @@ def main_processing_loop():
         global TOT_WARNINGS
         TOT_WARNINGS = 0
         
-        global reEndedAt
-        reEndedAt = None
-        
         # Set Timestamp for log file and extract filenames
         global TMSTMP
         TMSTMP = datetime.now().strftime('%Y%m%d.%H%M%S')
@@ -849,6 +738,10 @@ def main_processing_loop():
         ioJobInfoFile = io.BytesIO()
         ioJobDtlsFile = io.BytesIO()
 
+        rootLogger.info("")        
+        rootLogger.info(f"Open log index {LogIdx.LOG_INDEX_DB}")
+        logIndex = LogIdx.LogIndex()
+
         rootLogger.info("")        
         rootLogger.info("Start processing log files")
                 
@@ -862,20 +755,17 @@ def main_processing_loop():
             sLogfileNPath =  os.path.join(LOGDIR, sLogFile2Process)        
             rootLogger.info(f"{sLogfileNPath=}")               
             
+            ################################
+            ## Parse log bytes written since the previous Dashboard run
+            ################################
+            logInfo = logIndex.refresh(sLogfileNPath)
+            rootLogger.info(f"{logInfo.size=} {logInfo.lines_parsed=}")
+
             ################################
             ## Get Start Time for script
             ################################
             # Ex. "started at Mon Aug  7 15:22:12 EDT 2023"
-            lstHead = head(sLogfileNPath, iFirstNOFRecs = 3) 
-            
-            lstJobStartLine = [line for line in lstHead if "started at" in line ]
-            rootLogger.info(f"{lstJobStartLine=} ")
-
-            # Extract the start date from the log message
-            if len(lstJobStartLine) == 1:
-                sJobStartTime = str(lstJobStartLine[0]).split("started at")[-1].strip()
-            else: 
-                sJobStartTime = ""
+            sJobStartTime = logInfo.job_start_time
             
             rootLogger.info(f"{sJobStartTime=}")
     
@@ -883,20 +773,7 @@ def main_processing_loop():
             # Get End Time for script
             ################################	
             # Example: "Ended at Mon Aug  7 15:23:01 EDT 2023" or "VAPTD_Driver.sh ended at: 20240902.170605" or "Script PSPS_Split_files.sh completed successfully"
-            lstTail = tail(sLogfileNPath, iLastNOFRecs = 5) 
-            
-            # compile regex once    
-            if reEndedAt is None:
-                reEndedAt = re.compile("(E|e)nded at")
-            
-            lstJobEndLine = [line for line in lstTail if reEndedAt.search(line) ]
-            rootLogger.info(f"{lstJobEndLine=} ")
-
-            # Extract the end date from the log message
-            if len(lstJobEndLine) == 1:
-                sJobEndTime = str(lstJobEndLine[0]).split("(nded at")[-1].strip()
-            else: 
-                sJobEndTime = ""
+            sJobEndTime = logInfo.job_end_time
 
             rootLogger.info(f"{sJobEndTime=}")
 
@@ -946,19 +823,19 @@ def main_processing_loop():
             rootLogger.info("Get Extract filenames and record counts from log file")
 
             if sLogFile2Process.find("DemoFinderFileExtracts_") >= 0:
-                lstFilenamesNCounts = getExtractFilenamesAndCountsDashboardInfo(sLogfileNPath, prmExt = "DEMO")
+                lstFilenamesNCounts = getExtractFilenamesAndCountsDashboardInfo(sLogfileNPath, prmExt = "DEMO", logInfo = logInfo)
 
             elif sLogFile2Process.find("PSPS_NPI_Extract_") >= 0:	
-                lstFilenamesNCounts = getExtractFilenamesAndCountsDashboardInfo(sLogfileNPath, prmExt = "PSPS_NPI")
+                lstFilenamesNCounts = getExtractFilenamesAndCountsDashboardInfo(sLogfileNPath, prmExt = "PSPS_NPI", logInfo = logInfo)
 
             elif sLogFile2Process.find("PSPS_Split_files_") >= 0:	
-                lstFilenamesNCounts = getExtractFilenamesAndCountsDashboardInfo(sLogfileNPath, prmExt = "PSPS_SPLIT")
+                lstFilenamesNCounts = getExtractFilenamesAndCountsDashboardInfo(sLogfileNPath, prmExt = "PSPS_SPLIT", logInfo = logInfo)
     
             elif sLogFile2Process.find("PTD_Duals_Extract_") >= 0:	
-                lstFilenamesNCounts = getExtractFilenamesAndCountsDashboardInfo(sLogfileNPath, prmExt = "PTD_DUALS")
+                lstFilenamesNCounts = getExtractFilenamesAndCountsDashboardInfo(sLogfileNPath, prmExt = "PTD_DUALS", logInfo = logInfo)
 
             else:
-                lstFilenamesNCounts = getExtractFilenamesAndCounts(sLogfileNPath)
+                lstFilenamesNCounts = getExtractFilenamesAndCounts(sLogfileNPath, logInfo)
 
             rootLogger.info(f"{len(lstFilenamesNCounts)=}")
             
@@ -1041,6 +918,10 @@ def main_processing_loop():
                 ioJobDtlsFile.write(f"{sJobDtlsRec}\n".encode("utf-8"))
 
 
+        # Parse offsets of processed log files are committed by refresh
+        logIndex.close()
+
+
         #############################################################
         # Get S3 reference
         #############################################################
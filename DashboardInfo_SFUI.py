@@ -14,10 +14,12 @@
 # Paul Baranoski 2025-04-07 Created script.
 # Paul Baranoski 2025-11-21 Add ContentType parameter in put_object call.
 # Paul Baranoski 2026-03-31 Changed formatting of some strings to use formatted strings instead of '+' to append strings together. 
+# 2026-10-18     Count records with a streaming gzip decompressor (flat memory), count files concurrently, and
+#                cache counts by S3 ETag so unchanged files are not re-read.
 ########################################################################################################
 
 import boto3 
-import gzip
+import zlib
 import argparse
 import sys
 import os
@@ -26,6 +28,7 @@ import json
 import logging
 
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 currentDirectory = os.path.dirname(os.path.realpath(__file__))
 rootDirectory = os.path.abspath(os.path.join(currentDirectory, ".."))
@@ -42,6 +45,16 @@ from snowconvert_helpers import Export
 # 5GB limit
 PUT_BKT_LIMIT = (1024 ** 3) * 5
 
+# Streaming record count: compressed bytes read per S3 chunk, and max decompressed bytes per decompress call
+GZIP_READ_CHUNK_SIZE = 1024 * 1024
+GZIP_OUTPUT_CHUNK_SIZE = 8 * 1024 * 1024
+
+# NOF S3 files counted concurrently
+SFUI_MAX_WORKERS = int(os.getenv("SFUI_MAX_WORKERS", "4"))
+
+# Record counts of S3 files already counted --> {"bucket/key": {"ETag": "...", "bytes": n, "recs": n}}
+SFUI_COUNT_CACHE = os.getenv("SFUI_COUNT_CACHE", "/app/IDRC/XTR/CMS/data/DashboardInfo_SFUI_CountCache.json")
+
 # Setup logger to display timestamp
 logging.basicConfig(format='$(levelname) %(asctime)s => %(message)s', level=logging.INFO)
 
@@ -72,6 +85,109 @@ def pretty_size(bytes, units=UNITS_MAPPING):
             suffix = multiple
 
     return str(amount) + suffix
+
+
+def countGzipRecords(bucket, key):
+    """ Returns (unzipped byte count, record count) of S3 gzip file. Reads and decompresses the file in chunks. """
+
+    gzip_file = s3_client.get_object(Bucket=bucket, Key=key)
+
+    # wbits 16+MAX_WBITS --> expect gzip header and trailer
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    iByteCount = 0
+    iRecCount = 0
+
+    for chunk in gzip_file["Body"].iter_chunks(GZIP_READ_CHUNK_SIZE):
+
+        while chunk:
+            # limit output size so a highly compressed chunk does not expand in memory
+            data = decompressor.decompress(chunk, GZIP_OUTPUT_CHUNK_SIZE)
+            iByteCount += len(data)
+            iRecCount += data.count(b'\n')
+
+            if decompressor.eof:
+                # S3 file may be several gzip members concatenated (Ex. combined Snowflake part files)
+                chunk = decompressor.unused_data
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            else:    
+                chunk = decompressor.unconsumed_tail
+
+    data = decompressor.flush()
+    iByteCount += len(data)
+    iRecCount += data.count(b'\n')
+
+    return iByteCount, iRecCount
+
+
+def loadCountCache():
+
+    try:
+        with open(SFUI_COUNT_CACHE, "r") as fCache:
+            return json.load(fCache)
+
+    except (OSError, ValueError) as e:
+        print(f"Count cache {SFUI_COUNT_CACHE} not loaded: {e}")
+        return {}
+
+
+def saveCountCache(dctCountCache):
+
+    try:
+        # write temp file and rename --> cache file is never partially written
+        sTmpFilename = f"{SFUI_COUNT_CACHE}.{os.getpid()}"
+        with open(sTmpFilename, "w") as fCache:
+            json.dump(dctCountCache, fCache)
+
+        os.replace(sTmpFilename, SFUI_COUNT_CACHE)
+
+    except OSError as e:
+        # cache is an optimization only; next run re-counts the files
+        print(f"Count cache {SFUI_COUNT_CACHE} not saved: {e}")
+
+
+def getSFUIFileCounts(SFUI_Files_List):
+    """ Returns {Key: (unzipped byte count, record count)} of non DEEP_ARCHIVE S3 files. """
+
+    dctCountCache = loadCountCache()
+    dctCounts = {}
+    lstFiles2Count = []
+
+    ###############################################################
+    # Use cached counts of files whose ETag has not changed
+    ###############################################################
+    for SFUI_File in SFUI_Files_List:
+        if SFUI_File['StorClass'] == 'DEEP_ARCHIVE':
+            continue
+
+        dctCached = dctCountCache.get(f"{bucketname}/{SFUI_File['Key']}")
+
+        if dctCached is not None and dctCached["ETag"] == SFUI_File['ETag']:
+            print(f"Use cached counts for {SFUI_File['Key']}: {dctCached}")
+            dctCounts[SFUI_File['Key']] = (dctCached["bytes"], dctCached["recs"])
+        else:
+            lstFiles2Count.append(SFUI_File)
+
+    ###############################################################
+    # Count remaining files concurrently
+    ###############################################################
+    print("")
+    print(f"Count records of {len(lstFiles2Count)} S3 files using {SFUI_MAX_WORKERS} workers")
+
+    with ThreadPoolExecutor(max_workers=SFUI_MAX_WORKERS) as executor:
+        lstFutures = [(SFUI_File, executor.submit(countGzipRecords, bucketname, SFUI_File['Key'])) for SFUI_File in lstFiles2Count]
+
+        for SFUI_File, future in lstFutures:
+            iByteCount, iRecCount = future.result()
+            print(f"Counted {SFUI_File['Key']}: {iByteCount=} {iRecCount=}")
+
+            dctCounts[SFUI_File['Key']] = (iByteCount, iRecCount)
+            dctCountCache[f"{bucketname}/{SFUI_File['Key']}"] = {"ETag": SFUI_File['ETag'], "bytes": iByteCount, "recs": iRecCount}
+
+    if lstFiles2Count:
+        saveCountCache(dctCountCache)
+
+    return dctCounts
     
 
 def processSFUIFiles4Dashboard(folder_n_file_prefix, FromDt, ToDt, JobDtlPathNFilename, JobInfoPathNFilename):
@@ -90,6 +206,11 @@ def processSFUIFiles4Dashboard(folder_n_file_prefix, FromDt, ToDt, JobDtlPathNFi
         print(f"Get list of objects {bucketname=} {folder_n_file_prefix=} {FromDt=} {ToDt=}" )
 
         SFUI_Files_List = get_S3_list_of_files(bucketname, folder_n_file_prefix, FromDt, ToDt)
+
+        ###############################################################
+        # Get unzipped byte counts and record counts of S3 files
+        ###############################################################
+        dctSFUIFileCounts = getSFUIFileCounts(SFUI_Files_List)
         
         ###############################################################
         # Parse thru FilesList to build json records for load into database 
@@ -144,31 +265,13 @@ def processSFUIFiles4Dashboard(folder_n_file_prefix, FromDt, ToDt, JobDtlPathNFi
                 
                 ext_recCount = 0
             else:
-                #unzip file to get RecCount
-                print(f"Get s3 file: {ext_filenameNPath=}")
-                gzip_file =  s3_client.get_object(Bucket=bucketname, Key=ext_filenameNPath)
-
-                print(f"Read s3 file")
-                strmBytes = gzip_file["Body"].read()
-
-                print(f"S3 zipped file size: {len(strmBytes)}")
-
-                ###############################################################
-                # Decompress S3 gzip file
-                ###############################################################
-                print("Decompress S3 gzip file. " )
-                unzipped_content = gzip.decompress(strmBytes)
-
                 # This byte size is the unzipped byte size
-                print(f"S3 unzipped file size: {len(unzipped_content)}")
-                ext_byteCount = len(unzipped_content)
+                ext_byteCount, ext_recCount = dctSFUIFileCounts[ext_filenameNPath]
+                print(f"S3 zipped file size: {SFUI_File['bytes']}")
+                print(f"S3 unzipped file size: {ext_byteCount}")
 
                 # convert bytes to Human readable form Ex. size 126 MB
                 ext_human_fileSize = pretty_size(ext_byteCount)
-                
-                # Get record count
-                print("Count newlines " )
-                ext_recCount = unzipped_content.count(b'\n')            
 
                 
             ###############################################################
@@ -240,8 +343,8 @@ def get_S3_list_of_files(bucketname, folder_n_file_prefix, FromDt, ToDt):
 
         print(f"In function resp_to_filelist" )
 
-        # Exclude ETag; Filter out results that are not within date range
-        return [{'Key': x['Key'], 'tmstmp': x['LastModified'].strftime('%Y%m%d.%H%M%S'), 'bytes': x['Size'], 'StorClass': x['StorageClass']} for x in resp['Contents'] if  FromDt <= x['LastModified'].strftime('%Y%m%d') <= ToDt]
+        # Keep ETag for count cache; Filter out results that are not within date range
+        return [{'Key': x['Key'], 'tmstmp': x['LastModified'].strftime('%Y%m%d.%H%M%S'), 'bytes': x['Size'], 'StorClass': x['StorageClass'], 'ETag': x['ETag']} for x in resp['Contents'] if  FromDt <= x['LastModified'].strftime('%Y%m%d') <= ToDt]
         
             
     ###############################################################
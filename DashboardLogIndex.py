@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  DashboardLogIndex.py
+#
+# Desc: Persistent, incremental index of extract log files used by DashboardInfo_MS_Driver.py.
+#
+#       The index (SQLite database in the data directory) keeps for each log file its inode, size, mtime and
+#       the byte offset parsed so far, plus the dashboard facts found in the parsed lines:
+#           - "started at" line  (first 3 lines of log)
+#           - "Ended at" line    (last 5 lines of log)
+#           - COPY INTO filenames, rows_unloaded/input_bytes/output_bytes counts, DASHBOARD_INFO lines
+#
+#       refresh() only reads the bytes appended since the last run. A log file whose inode changed, or that
+#       is smaller than the parsed offset (re-created), is re-parsed from the beginning. So a dashboard run
+#       costs time in proportion to the new log volume instead of the total log history.
+#
+# NOTE: Parsing rules match the ones DashboardInfo_MS_Driver.py used on the whole log file
+#       (head/tail/egrep and getExtractFilenamesAndCounts).
+#
+# Ad-hoc queries:
+#
+#       python3 DashboardLogIndex.py --runtimes --from 20260101 --to 20260131
+#       python3 DashboardLogIndex.py --runtimes --from 20260101 --to 20260131 --ext OPMHI
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+########################################################################################################
+import os
+import re
+import sys
+import sqlite3
+import argparse
+from datetime import datetime
+
+
+########################################################################################################
+# CONSTANTS
+########################################################################################################
+DATADIR = "/app/IDRC/XTR/CMS/data/"
+
+LOG_INDEX_DB = os.getenv("DASHBOARD_LOG_INDEX_DB", f"{DATADIR}DashboardLogIndex.db")
+
+# bytes read per pass over the new part of a log file
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+# job start line must be in first 3 lines; job end line must be in last 5 lines
+NOF_HEAD_LINES = 3
+NOF_TAIL_LINES = 5
+
+reCOPY_INTO = re.compile(r'^Executing: COPY INTO [@]{1}[a-zA-Z0-9_\.]+[/]+')
+reROW_COUNTS = re.compile('rows_unloaded,input_bytes,output_bytes')
+reENDED_AT = re.compile("(E|e)nded at")
+reRUN_TMSTMP = re.compile(r'([0-9]{8}\.[0-9]{6})\.log$')
+
+FACT_COPY_INTO = "COPY_INTO"
+FACT_ROW_COUNTS = "ROW_COUNTS"
+FACT_DASHBOARD_INFO = "DASHBOARD_INFO"
+
+SQL_CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS log_files (
+    log_filename        TEXT PRIMARY KEY,
+    inode               INTEGER,
+    size                INTEGER,
+    mtime               REAL,
+    parse_offset        INTEGER NOT NULL DEFAULT 0,
+    lines_parsed        INTEGER NOT NULL DEFAULT 0,
+    pending_row_counts  INTEGER NOT NULL DEFAULT 0,
+    nof_start_lines     INTEGER NOT NULL DEFAULT 0,
+    start_line          TEXT,
+    end_line            TEXT,
+    end_lineno          INTEGER NOT NULL DEFAULT -1,
+    prev_end_lineno     INTEGER NOT NULL DEFAULT -1,
+    run_tmstmp          TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_log_files_mtime ON log_files (mtime);
+
+CREATE TABLE IF NOT EXISTS log_facts (
+    log_filename        TEXT NOT NULL,
+    seq                 INTEGER NOT NULL,
+    kind                TEXT NOT NULL,
+    value               TEXT NOT NULL,
+    PRIMARY KEY (log_filename, seq)
+);
+"""
+
+
+########################################################################################################
+# Classes
+########################################################################################################
+class LogFileInfo:
+    """ Dashboard information for one log file (one row of log_files plus its facts). """
+
+    def __init__(self, dictRow, lstFacts):
+
+        self.log_filename = dictRow["log_filename"]
+        self.size = dictRow["size"]
+        self.mtime = dictRow["mtime"]
+        self.lines_parsed = dictRow["lines_parsed"]
+        self.run_tmstmp = dictRow["run_tmstmp"]
+
+        self._dictRow = dictRow
+        self._lstFacts = lstFacts
+
+    @property
+    def job_start_time(self):
+
+        # Ex. "started at Mon Aug  7 15:22:12 EDT 2023" --> exactly one "started at" line in first 3 lines
+        if self._dictRow["nof_start_lines"] == 1:
+            return str(self._dictRow["start_line"]).split("started at")[-1].strip()
+
+        return ""
+
+    @property
+    def job_end_time(self):
+
+        # Ex. "Ended at Mon Aug  7 15:23:01 EDT 2023" --> exactly one "Ended at" line in last 5 lines
+        iFirstTailLineno = self.lines_parsed - NOF_TAIL_LINES
+
+        if self._dictRow["end_lineno"] >= iFirstTailLineno and self._dictRow["prev_end_lineno"] < iFirstTailLineno:
+            return str(self._dictRow["end_line"]).split("(nded at")[-1].strip()
+
+        return ""
+
+    def facts(self, sKind):
+
+        return [sValue for sFactKind, sValue in self._lstFacts if sFactKind == sKind]
+
+
+class LogIndex:
+    """ SQLite index of log files. """
+
+    def __init__(self, sDBFilename=LOG_INDEX_DB):
+
+        self.con = sqlite3.connect(sDBFilename)
+        self.con.row_factory = sqlite3.Row
+        self.con.executescript(SQL_CREATE_TABLES)
+
+    def close(self):
+
+        self.con.close()
+
+    def _getRow(self, sLogFilename):
+
+        row = self.con.execute("SELECT * FROM log_files WHERE log_filename = ?", (sLogFilename,)).fetchone()
+
+        return dict(row) if row is not None else None
+
+    def _reset(self, sLogFilename, objStat):
+
+        objMatch = reRUN_TMSTMP.search(sLogFilename)
+
+        self.con.execute("DELETE FROM log_facts WHERE log_filename = ?", (sLogFilename,))
+        self.con.execute("INSERT OR REPLACE INTO log_files (log_filename, inode, size, mtime, run_tmstmp) VALUES (?, ?, 0, 0, ?)",
+                         (sLogFilename, objStat.st_ino, objMatch.group(1) if objMatch else None))
+
+        return self._getRow(sLogFilename)
+
+    def refresh(self, sLogfileNPath):
+        """ Parses the bytes appended to sLogfileNPath since the last refresh. Returns LogFileInfo. """
+
+        sLogFilename = os.path.basename(sLogfileNPath)
+        objStat = os.stat(sLogfileNPath)
+
+        dictRow = self._getRow(sLogFilename)
+
+        # new log file, or log file re-created/truncated --> parse from beginning
+        if dictRow is None or dictRow["inode"] != objStat.st_ino or objStat.st_size < dictRow["parse_offset"]:
+            dictRow = self._reset(sLogFilename, objStat)
+
+        if objStat.st_size > dictRow["parse_offset"] or objStat.st_mtime != dictRow["mtime"]:
+            self._parseNewBytes(sLogfileNPath, sLogFilename, dictRow, objStat)
+            self.con.commit()
+            dictRow = self._getRow(sLogFilename)
+
+        return LogFileInfo(dictRow, self.getFacts(sLogFilename))
+
+    def _parseNewBytes(self, sLogfileNPath, sLogFilename, dictRow, objStat):
+
+        iOffset = dictRow["parse_offset"]
+        iLineno = dictRow["lines_parsed"]
+        bPendingRowCounts = bool(dictRow["pending_row_counts"])
+        iNOFStartLines = dictRow["nof_start_lines"]
+        sStartLine = dictRow["start_line"]
+        sEndLine = dictRow["end_line"]
+        iEndLineno = dictRow["end_lineno"]
+        iPrevEndLineno = dictRow["prev_end_lineno"]
+
+        iSeq = self.con.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM log_facts WHERE log_filename = ?", (sLogFilename,)).fetchone()[0]
+        lstNewFacts = []
+
+        with open(sLogfileNPath, "rb") as fLogFile:
+            fLogFile.seek(iOffset)
+
+            bytRemainder = b""
+
+            while True:
+                bytChunk = fLogFile.read(READ_CHUNK_SIZE)
+                if not bytChunk:
+                    break
+
+                bytChunk = bytRemainder + bytChunk
+
+                # only parse complete lines; a partial last line is parsed on the next refresh
+                iLastNewline = bytChunk.rfind(b"\n")
+                if iLastNewline < 0:
+                    bytRemainder = bytChunk
+                    continue
+
+                bytRemainder = bytChunk[iLastNewline + 1:]
+                # iOffset --> first byte not yet parsed (start of bytRemainder)
+                iOffset += iLastNewline + 1
+
+                for bytLine in bytChunk[:iLastNewline].split(b"\n"):
+                    sLine = bytLine.decode("utf-8", errors="replace").strip()
+
+                    # line after "rows_unloaded,input_bytes,output_bytes" --> counts (commas to spaces)
+                    if bPendingRowCounts:
+                        bPendingRowCounts = False
+                        lstNewFacts.append((sLogFilename, iSeq, FACT_ROW_COUNTS, sLine.replace(",", " ")))
+                        iSeq += 1
+
+                    elif sLine != "":
+                        if iLineno < NOF_HEAD_LINES and "started at" in sLine:
+                            iNOFStartLines += 1
+                            sStartLine = sLine
+
+                        if reENDED_AT.search(sLine):
+                            iPrevEndLineno, iEndLineno, sEndLine = iEndLineno, iLineno, sLine
+
+                        if reCOPY_INTO.search(sLine):
+                            lstNewFacts.append((sLogFilename, iSeq, FACT_COPY_INTO, (sLine.split("/")[1]).strip()))
+                            iSeq += 1
+
+                        if reROW_COUNTS.search(sLine):
+                            bPendingRowCounts = True
+
+                        if sLine.find("DASHBOARD_INFO:") >= 0:
+                            lstNewFacts.append((sLogFilename, iSeq, FACT_DASHBOARD_INFO, (sLine.split(":")[1]).strip().replace(",", " ")))
+                            iSeq += 1
+
+                    iLineno += 1
+
+        self.con.executemany("INSERT INTO log_facts (log_filename, seq, kind, value) VALUES (?, ?, ?, ?)", lstNewFacts)
+        self.con.execute("""UPDATE log_files SET size = ?, mtime = ?, parse_offset = ?, lines_parsed = ?, pending_row_counts = ?,
+                                   nof_start_lines = ?, start_line = ?, end_line = ?, end_lineno = ?, prev_end_lineno = ?
+                            WHERE log_filename = ?""",
+                         (objStat.st_size, objStat.st_mtime, iOffset, iLineno, int(bPendingRowCounts),
+                          iNOFStartLines, sStartLine, sEndLine, iEndLineno, iPrevEndLineno, sLogFilename))
+
+    def getFacts(self, sLogFilename):
+
+        return [(row["kind"], row["value"]) for row in
+                self.con.execute("SELECT kind, value FROM log_facts WHERE log_filename = ? ORDER BY seq", (sLogFilename,))]
+
+    def getRuntimes(self, sFromDt, sToDt, sExtFilter=None):
+        """ Returns [(log_filename, run_tmstmp, runtime_secs)] for runs started from sFromDt thru sToDt (YYYYMMDD). """
+
+        lstRuntimes = []
+
+        for row in self.con.execute("""SELECT log_filename, run_tmstmp, mtime FROM log_files
+                                       WHERE run_tmstmp BETWEEN ? AND ? ORDER BY run_tmstmp""", (f"{sFromDt}.000000", f"{sToDt}.999999")):
+
+            if sExtFilter is not None and row["log_filename"].find(sExtFilter) < 0:
+                continue
+
+            # Run started at timestamp in log filename; log file is last written at end of run
+            dttmStart = datetime.strptime(row["run_tmstmp"], "%Y%m%d.%H%M%S")
+            lstRuntimes.append((row["log_filename"], row["run_tmstmp"], round(row["mtime"] - dttmStart.timestamp())))
+
+        return lstRuntimes
+
+
+########################################################################################################
+# Ad-hoc queries
+########################################################################################################
+def main():
+
+    parser = argparse.ArgumentParser(description="Dashboard log index ad-hoc queries")
+    parser.add_argument("--db", default=LOG_INDEX_DB, help="log index database")
+    parser.add_argument("--runtimes", action="store_true", help="display runtime per job run")
+    parser.add_argument("--from", dest="from_dt", required=True, help="from date YYYYMMDD")
+    parser.add_argument("--to", dest="to_dt", required=True, help="to date YYYYMMDD")
+    parser.add_argument("--ext", default=None, help="only log filenames containing this text")
+    args = parser.parse_args()
+
+    logIndex = LogIndex(args.db)
+
+    if args.runtimes:
+        lstRuntimes = logIndex.getRuntimes(args.from_dt, args.to_dt, args.ext)
+
+        print(f"{'Log file':<70} {'Run timestamp':<16} {'Runtime (secs)':>15}")
+        for sLogFilename, sRunTmstmp, iRuntimeSecs in lstRuntimes:
+            print(f"{sLogFilename:<70} {sRunTmstmp:<16} {iRuntimeSecs:>15,d}")
+
+    logIndex.close()
+
+
+if __name__ == "__main__":
+
+    main()
@@ -12,6 +12,8 @@
 #
 #
 # Paul Baranoski 2026-03-13 Created script.
+# 2026-10-18                Page thru EFT_Files listing with boto3 (iterS3Objects) instead of aws cli subprocess, and write report rows
+#                           to an html file as files are listed. Attach report to email when it is too large to pass to sendEmailHTML.py.
 ############################################################################################################
 
 import boto3 
@@ -35,6 +37,7 @@ from SET_XTR_ENV import *
 
 # Our include members
 import LoggerStandard as EnigmaLog
+from CommonFunctions import iterS3Objects, setCommonFunctionLogger
 
 
 
@@ -42,6 +45,9 @@ DATA_DIR = "/app/IDRC/XTR/CMS/data/"
 LOG_DIR = "/app/IDRC/XTR/CMS/logs/"
 RUNDIR = "/app/IDRC/XTR/CMS/scripts/run/"
 
+# Larger reports are sent as an email attachment (sendEmailHTML.py gets the message as one command line argument: max 128 KB)
+EMAIL_HTML_MAX_INLINE_BYTES = 100 * 1024
+
 
 #############################################################
 # Functions
@@ -145,6 +151,9 @@ def main_processing_loop():
         rootLogger = EnigmaLog.setLogging(LOGNAME)
         rootLogger.info(f"\nEFT_Files_Report_Driver.py started at {TMSTMP}")
 
+        # Establish logger with CommonFunctions module.
+        setCommonFunctionLogger(rootLogger)
+
         ###########################################################
         # Set current working directory to scripts/run directory.
         # This is so subprocess calls will work from RunDeck  
@@ -217,41 +226,20 @@ def main_processing_loop():
  
  
         #################################################################################
-        # Get list of EFT files to process.
+        # EFT files to report: LastModified between FROM DATE 00:00:00 and TO DATE 23:59:59 (UTC)
         #################################################################################
-        rootLogger.info("")
-        rootLogger.info("Build s3api command to query EFT_Files bucket for files between a date range.")
-
         """
+        Same files as:
         aws s3api list-objects-v2 --bucket "aws-hhs-cms-eadg-bia-ddom-extracts" --prefix xtr/EFT_Files/P#EFT.ON \
             --query "Contents[?LastModified>=\`2026-02-28T00:00:00\` && LastModified<=\`2026-03-06T23:59:59\`]" > EFT_Results.txt
-            
-            f"Contents[?contains(Key, '{timestamp}')].Key"   
-
-        sXTR_BUCKET = 'aws-hhs-cms-eadg-bia-ddom-extracts'
-        sEFT_FILEST_BUCKET_FLDR = 'xtr/EFT_Files/'
         """
+        from datetime import timezone
 
-        cmd = [
-            "aws",
-            "s3api",
-            "list-objects-v2",
-            "--bucket", XTR_BUCKET,
-            "--prefix", f"{EFT_FILEST_BUCKET_FLDR}P#EFT.ON",
-            "--query", f"Contents[?LastModified>=`{sEFTFromDt}T00:00:00` && LastModified<=`{sEFTToDt}T23:59:59`]" 
-        ]
-        
-        rootLogger.info(f"{cmd=}")
-
-        rootLogger.info("")
-        rootLogger.info("Execute subprocess s3api call to query EFT_Files bucket for files between date range.")
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        
-        # convert return code string to a list object
-        lstResults = json.loads(result.stdout)
+        dtEFTFrom = datetime.strptime(f"{sEFTFromDt}T00:00:00", "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+        dtEFTTo = datetime.strptime(f"{sEFTToDt}T23:59:59", "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
 
-        rootLogger.info(f"{type(lstResults)=}")
+        rootLogger.info(f"{dtEFTFrom=}")
+        rootLogger.info(f"{dtEFTTo=}")
         
         
         #################################################################################
@@ -259,76 +247,80 @@ def main_processing_loop():
         #################################################################################
         rootLogger.info("")
         rootLogger.info("Create EFT files report ")
-        
-        sioHTMLReport = StringIO("")
-                    
-        #################################################################################
-        # Write out HTML header.
-        #################################################################################
-        sioHTMLReport.write("<html><body><table cellspacing='1px' border='1' > \n")
-        sioHTMLReport.write("<tr bgcolor='#00B0F0'><th>EFT Filename</th> <th>Creation Date</th><th>EFT file size</th></tr> \n") 	
-    
-        #################################################################################
-        # Process list of EFT files 
-        #################################################################################            
-        rootLogger.info("")
-        rootLogger.info("Process list of EFT files to build Report Rows ")
 
-        #################################################################################
-        # Loop thru list of EFT Files On-Hold.
-        #################################################################################
-        for dictEntry in lstResults:
+        sHTMLReportFileNPath = f"{DATA_DIR}EFT_Files_Report_{TMSTMP}.html"
+        rootLogger.info(f"{sHTMLReportFileNPath=}")
+
+        iNOFEFTFiles = 0
 
+        with open(sHTMLReportFileNPath, "w", encoding="utf-8") as fHTMLReport:
+                    
+            #################################################################################
+            # Write out HTML header.
+            #################################################################################
+            fHTMLReport.write("<html><body><table cellspacing='1px' border='1' > \n")
+            fHTMLReport.write("<tr bgcolor='#00B0F0'><th>EFT Filename</th> <th>Creation Date</th><th>EFT file size</th></tr> \n") 	
+    
+            #################################################################################
+            # Loop thru EFT Files listing (one page at a time) to build Report Rows.
+            #################################################################################
             rootLogger.info("")
-            rootLogger.info("*********************")
+            rootLogger.info("Process list of EFT files to build Report Rows ")
 
-            #############################################################################################
-            # Get EFT filename info from query results 
-            #############################################################################################
-            rootLogger.info(f"{dictEntry=}")
+            for dictEntry in iterS3Objects(s3_client, XTR_BUCKET, f"{EFT_FILEST_BUCKET_FLDR}P#EFT.ON"):
 
-            sEFT_Filename = os.path.basename(dictEntry["Key"])
-            rootLogger.info(f"{sEFT_Filename=}")
+                if not (dtEFTFrom <= dictEntry["LastModified"] <= dtEFTTo):
+                    continue
 
-            sFileSize = f'{int(dictEntry["Size"]):,}' 
-            rootLogger.info(f"{sFileSize=}")
-            sHumanFileSize = convertBytes2ReadableSize(int(dictEntry["Size"]), units=UNITS_MAPPING)
-            rootLogger.info(f"{sHumanFileSize=}")
+                iNOFEFTFiles += 1
 
+                #############################################################################################
+                # Get EFT filename info from listing 
+                #############################################################################################
+                sEFT_Filename = os.path.basename(dictEntry["Key"])
+                sHumanFileSize = convertBytes2ReadableSize(int(dictEntry["Size"]), units=UNITS_MAPPING)
+                sEFT_FileCreateDt = dictEntry["LastModified"].strftime("%Y-%m-%d")
 
-            sEFT_FileCreateDt = dictEntry["LastModified"] [ : 10]
-            rootLogger.info(f"{sEFT_FileCreateDt=}")
+                rootLogger.info(f"{sEFT_Filename=} {sEFT_FileCreateDt=} {sHumanFileSize=}")
             
-            #############################################################################################
-            # Build Report Rows
-            #############################################################################################
-            sioHTMLReport.write(f"<tr><td>{sEFT_Filename}</td><td>{sEFT_FileCreateDt}</td><td>{sHumanFileSize}</td></tr> \n") 	
+                #############################################################################################
+                # Build Report Rows
+                #############################################################################################
+                fHTMLReport.write(f"<tr><td>{sEFT_Filename}</td><td>{sEFT_FileCreateDt}</td><td>{sHumanFileSize}</td></tr> \n") 	
 
+            #################################################################################
+            # Write out HTML trailer.
+            #################################################################################
+            fHTMLReport.write("</table></body></html>")
 
-        #################################################################################
-        # Write out HTML trailer.
-        #################################################################################
-        sioHTMLReport.write("</table></body></html>")
+        rootLogger.info("")
+        rootLogger.info(f"{iNOFEFTFiles=}")
 
 
         #################################################################################
         # Email report
         #################################################################################
-        # Set pointer to beginning of string
-        sioHTMLReport.seek(0)
-        RPT_INFO = sioHTMLReport.read()
-        
-        rootLogger.info("")
-        rootLogger.info("\n%s", RPT_INFO)
-        
         rootLogger.info("")
         rootLogger.info("Send report email")
 
         SUBJECT = f"EFT Files Processed Report ({ENVNAME})"
-        MSG = f"EFT files processed for period {sEFTFromDt} thru {sEFTToDt} . . .<br><br>{RPT_INFO}"
+        lstEmailParms = ['python3', 'sendEmailHTML.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_SUCCESS_RECIPIENT, SUBJECT]
+
+        if os.path.getsize(sHTMLReportFileNPath) <= EMAIL_HTML_MAX_INLINE_BYTES:
+            with open(sHTMLReportFileNPath, "r", encoding="utf-8") as fHTMLReport:
+                RPT_INFO = fHTMLReport.read()
+
+            rootLogger.info("")
+            rootLogger.info("\n%s", RPT_INFO)
+
+            MSG = f"EFT files processed for period {sEFTFromDt} thru {sEFTToDt} . . .<br><br>{RPT_INFO}"
+            lstEmailParms.append(MSG)
+        else:
+            MSG = f"EFT files processed for period {sEFTFromDt} thru {sEFTToDt} ({iNOFEFTFiles} files) are in the attached report."
+            lstEmailParms.extend([MSG, sHTMLReportFileNPath])
        
         try:
-            sp_info = subprocess.run(['python3', 'sendEmailHTML.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_SUCCESS_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True )
+            sp_info = subprocess.run(lstEmailParms, capture_output=True, text=True, check=True )
             write_sp_info_2_log(sp_info)
             
         except subprocess.CalledProcessError as e:
@@ -336,6 +328,8 @@ def main_processing_loop():
             rootLogger.error(e.output)
 
             sys.exit(12)   
+
+        os.remove(sHTMLReportFileNPath)
        
 
         ####################################################################
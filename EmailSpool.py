@@ -0,0 +1,521 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  EmailSpool.py
+#
+# Desc: Local spool (queue) for notification emails, and the spool sender that delivers them.
+#
+#       Producers (sendEmail.py, sendEmailHTML.py, CommonFunctions.sendEmail) build the email message and call
+#       spoolEmail(), which writes it to EMAIL_SPOOL_DIR and returns --> drivers do not wait on SMTP.
+#       The spool is enabled per job: EMAIL_DELIVERY=SPOOL in the job's environment. Default EMAIL_DELIVERY=DIRECT -->
+#       sendEmail.py and sendEmailHTML.py send over their own SMTP connection and fail when the send fails (prior logic).
+#       A spooled email is not sent yet: the producer cannot report a failed send (see failed/ reporting below).
+#
+#       Spool directory:
+#           tmp/     --> message file being written
+#           new/     --> message files ready to send (renamed from tmp/ --> a message is never read half written)
+#           failed/  --> message files the SMTP server rejected (for all or some receivers; "refused" has the refused
+#                        receivers and SMTP replies), or that failed EMAIL_SPOOL_MAX_ATTEMPTS times
+#           sender.lock --> held by the running spool sender
+#
+#       The spool sender keeps one SMTP connection (STARTTLS) open, sends the message files in new/ in queued order,
+#       and removes each file once the SMTP server accepts it. When the SMTP server is unavailable, or a message
+#       gets a temporary (4xx) error, the sender closes the connection and retries with exponential backoff.
+#       spoolEmail() starts a spool sender when none is running. The sender exits after --idle_secs without messages;
+#       after it releases sender.lock it checks new/ again, and keeps sending when a message was queued while it was
+#       stopping (the producer saw the lock held and did not start a sender).
+#
+#       failed/ messages are reported: the sender logs an error for each one and a summary when it ends, producers
+#       print a warning while failed/ has messages, EMAIL_SPOOL_ALERT_RECIPIENT (optional) gets an alert email for
+#       each failed message, and "python3 EmailSpool.py --report_failed" lists them (exit 12 when there are any).
+#
+# Ex.   python3 EmailSpool.py                  --> send queued messages; exit when idle for EMAIL_SPOOL_IDLE_SECS
+#       python3 EmailSpool.py --daemon         --> send queued messages; never exit
+#       python3 EmailSpool.py --report_failed  --> list failed/ messages
+#
+#       SMTP_SERVER, SMTP_PORT and SMTP_STARTTLS=N allow testing with a local SMTP server
+#       (ex. python3 -m aiosmtpd -n -l localhost:8025 --> SMTP_SERVER=localhost SMTP_PORT=8025 SMTP_STARTTLS=N).
+#       EmailSpoolCheck.py tests the spool sender against a local SMTP server.
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+# 2026-10-18 Sender checks new/ again after releasing sender.lock (lost wakeup). Report failed/ messages
+#            (log, producer warning, EMAIL_SPOOL_ALERT_RECIPIENT alert email, --report_failed).
+# 2026-10-18 EMAIL_DELIVERY defaults to DIRECT (spool enabled per job). Messages some receivers refused go to failed/
+#            with the refused receivers recorded (were counted as sent).
+########################################################################################################
+import os
+import sys
+import json
+import time
+import uuid
+import fcntl
+import logging
+import smtplib
+import argparse
+import subprocess
+from datetime import datetime
+
+
+# SPOOL --> queue emails in the email spool (enabled per job); DIRECT --> send over own SMTP connection
+EMAIL_DELIVERY = os.getenv("EMAIL_DELIVERY", "DIRECT").upper()
+
+EMAIL_SPOOL_DIR = os.getenv("EMAIL_SPOOL_DIR", "/app/IDRC/XTR/CMS/data/EmailSpool/")
+EMAIL_SPOOL_LOG_DIR = os.getenv("EMAIL_SPOOL_LOG_DIR", "/app/IDRC/XTR/CMS/logs/")
+
+EMAIL_SPOOL_IDLE_SECS = int(os.getenv("EMAIL_SPOOL_IDLE_SECS", "60"))
+EMAIL_SPOOL_POLL_SECS = 1.0
+EMAIL_SPOOL_MAX_ATTEMPTS = int(os.getenv("EMAIL_SPOOL_MAX_ATTEMPTS", "10"))
+EMAIL_SPOOL_MIN_DELAY_SECS = 2.0
+EMAIL_SPOOL_MAX_DELAY_SECS = 300.0
+
+# failed/ alert email (comma separated recipients; not set --> no alert email)
+EMAIL_SPOOL_ALERT_RECIPIENT = os.getenv("EMAIL_SPOOL_ALERT_RECIPIENT", "")
+EMAIL_SPOOL_ALERT_SENDER = os.getenv("EMAIL_SPOOL_ALERT_SENDER", "BIA_SUPPORT@cms.hhs.gov")
+
+# NOF failed/ message filenames in a warning
+EMAIL_SPOOL_MAX_FAILED_LISTED = 10
+
+# check (NOOP) an open SMTP connection that has not been used for more than this many secs before sending on it
+SMTP_NOOP_AFTER_SECS = 30.0
+
+spoolLogger = logging.getLogger(__name__)
+
+
+def setEmailSpoolLogger(logger):
+
+    global spoolLogger
+    spoolLogger = logger
+
+
+#############################################################
+# Producer
+#############################################################
+def getSpoolDir(sSubDir):
+
+    sDir = os.path.join(EMAIL_SPOOL_DIR, sSubDir)
+    os.makedirs(sDir, exist_ok=True)
+
+    return sDir
+
+
+def spoolEmail(sender, lstReceivers, sMessage, bStartSender=True, bAlert=False):
+
+    ######################################################
+    # Write message file to tmp/ and rename it to new/.
+    # Filename starts with time queued --> sender sends
+    # message files in queued order.
+    # bAlert --> failed/ alert (no alert when it fails)
+    ######################################################
+    sFilename = f"{time.time_ns()}_{os.getpid()}_{uuid.uuid4().hex[:8]}.json"
+    sTmpFilenameNPath = os.path.join(getSpoolDir("tmp"), sFilename)
+    sNewFilenameNPath = os.path.join(getSpoolDir("new"), sFilename)
+
+    dictSpoolMsg = {"sender": sender, "receivers": lstReceivers, "message": sMessage,
+                    "queued": datetime.now().isoformat(timespec="seconds"), "attempts": 0, "next_attempt": 0, "alert": bAlert}
+
+    with open(sTmpFilenameNPath, "w", encoding="utf-8") as fSpoolMsg:
+        json.dump(dictSpoolMsg, fSpoolMsg)
+        fSpoolMsg.flush()
+        os.fsync(fSpoolMsg.fileno())
+
+    os.replace(sTmpFilenameNPath, sNewFilenameNPath)
+
+    spoolLogger.info(f"Email queued: {sNewFilenameNPath}")
+
+    if bStartSender:
+        startSpoolSender()
+
+    return sNewFilenameNPath
+
+
+def hasSpoolMsgs():
+
+    return any(sFilename.endswith(".json") for sFilename in os.listdir(getSpoolDir("new")))
+
+
+def getFailedSpoolMsgs():
+
+    # failed/ message filenames in queued order
+    return sorted((sFilename for sFilename in os.listdir(getSpoolDir("failed")) if sFilename.endswith(".json")),
+                  key=lambda sFilename: int(sFilename.split("_")[0]))
+
+
+def getFailedSpoolMsgsWarning():
+
+    ######################################################
+    # Warning text when failed/ has messages (else None)
+    ######################################################
+    lstFailed = getFailedSpoolMsgs()
+
+    if not lstFailed:
+        return None
+
+    sListed = ", ".join(lstFailed[-EMAIL_SPOOL_MAX_FAILED_LISTED:])
+
+    return (f"WARNING: {len(lstFailed)} emails were not sent and are in {getSpoolDir('failed')} "
+            f"(most recent: {sListed}). See the EmailSpool logs; python3 EmailSpool.py --report_failed lists them.")
+
+
+def isSpoolSenderRunning():
+
+    with open(os.path.join(getSpoolDir(""), "sender.lock"), "a") as fLock:
+        try:
+            fcntl.flock(fLock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+
+        fcntl.flock(fLock, fcntl.LOCK_UN)
+
+    return False
+
+
+def startSpoolSender():
+
+    ######################################################
+    # Start spool sender in its own session so it keeps
+    # sending after the driver ends. If two producers start
+    # a sender at the same time, the second one exits
+    # because it cannot get the sender lock.
+    ######################################################
+    if isSpoolSenderRunning():
+        return
+
+    spoolLogger.info("Start email spool sender")
+
+    subprocess.Popen([sys.executable, os.path.abspath(__file__)], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True, close_fds=True)
+
+
+#############################################################
+# Spool sender
+#############################################################
+def connectSMTP():
+
+    SMTP_SERVER = os.getenv("SMTP_SERVER")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+
+    spoolLogger.info(f"Connect to {SMTP_SERVER=} {SMTP_PORT=}")
+
+    smtpServer = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, None, timeout=60)
+
+    try:
+        smtpServer.ehlo()
+        if os.getenv("SMTP_STARTTLS", "Y") == "Y":
+            smtpServer.starttls()
+            smtpServer.ehlo()
+
+    except Exception:
+        smtpServer.close()
+        raise
+
+    return smtpServer
+
+
+def closeSMTP(smtpServer):
+
+    if smtpServer is None:
+        return
+
+    try:
+        smtpServer.quit()
+    except Exception:
+        smtpServer.close()
+
+
+def isPermanentSMTPError(ex):
+
+    # SMTP reply codes 5xx --> the server will not accept this message (retry will not help)
+    if isinstance(ex, smtplib.SMTPRecipientsRefused):
+        return all(tRecipientErr[0] >= 500 for tRecipientErr in ex.recipients.values())
+
+    if isinstance(ex, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        return ex.smtp_code >= 500
+
+    return False
+
+
+def readSpoolMsg(sFilenameNPath):
+
+    with open(sFilenameNPath, "r", encoding="utf-8") as fSpoolMsg:
+        return json.load(fSpoolMsg)
+
+
+def rewriteSpoolMsg(sFilenameNPath, dictSpoolMsg):
+
+    # write to tmp/ and rename over message file --> message file is never half written
+    sTmpFilenameNPath = os.path.join(getSpoolDir("tmp"), os.path.basename(sFilenameNPath))
+
+    with open(sTmpFilenameNPath, "w", encoding="utf-8") as fSpoolMsg:
+        json.dump(dictSpoolMsg, fSpoolMsg)
+
+    os.replace(sTmpFilenameNPath, sFilenameNPath)
+
+
+def failSpoolMsg(sFilenameNPath, sReason, dictSpoolMsg=None):
+
+    spoolLogger.error(f"Email not sent: {os.path.basename(sFilenameNPath)} --> failed/: {sReason}")
+    os.replace(sFilenameNPath, os.path.join(getSpoolDir("failed"), os.path.basename(sFilenameNPath)))
+
+    # alert email (an alert that fails is not alerted again)
+    if EMAIL_SPOOL_ALERT_RECIPIENT and not (dictSpoolMsg or {}).get("alert", False):
+        spoolAlertEmail(os.path.basename(sFilenameNPath), sReason, dictSpoolMsg)
+
+
+def spoolAlertEmail(sFilename, sReason, dictSpoolMsg):
+
+    from email.parser import Parser
+
+    lstAlertReceivers = [sReceiver.strip() for sReceiver in EMAIL_SPOOL_ALERT_RECIPIENT.split(",") if sReceiver.strip()]
+
+    sSubject = ""
+    if dictSpoolMsg is not None:
+        sSubject = Parser().parsestr(dictSpoolMsg["message"], headersonly=True).get("Subject", "")
+
+    sMessage = f"""From: <{EMAIL_SPOOL_ALERT_SENDER}>
+To: {', '.join(lstAlertReceivers)}
+Subject: Email not sent (email spool failed/)
+
+Email {sFilename} was not sent and was moved to {getSpoolDir('failed')}.
+
+Subject: {sSubject}
+Receivers: {(dictSpoolMsg or {}).get('receivers', '')}
+Queued: {(dictSpoolMsg or {}).get('queued', '')}
+Reason: {sReason}
+"""
+
+    spoolEmail(EMAIL_SPOOL_ALERT_SENDER, lstAlertReceivers, sMessage, bStartSender=False, bAlert=True)
+
+
+def failPartialSpoolMsg(sFilenameNPath, dictSpoolMsg, dictRefused):
+
+    ######################################################
+    # Some receivers refused --> message is not resent (the
+    # others have it). Record refused receivers and the SMTP
+    # replies in the message file and move it to failed/.
+    ######################################################
+    dictSpoolMsg["refused"] = {sReceiver: [iCode, bMsg.decode("utf-8", "replace") if isinstance(bMsg, bytes) else str(bMsg)]
+                               for sReceiver, (iCode, bMsg) in dictRefused.items()}
+    dictSpoolMsg["delivered"] = [sReceiver for sReceiver in dictSpoolMsg["receivers"] if sReceiver not in dictRefused]
+    rewriteSpoolMsg(sFilenameNPath, dictSpoolMsg)
+
+    failSpoolMsg(sFilenameNPath, f"Receivers refused: {dictSpoolMsg['refused']} (sent to {dictSpoolMsg['delivered']})", dictSpoolMsg)
+
+
+def retrySpoolMsg(sFilenameNPath, dictSpoolMsg, fDelaySecs, sReason):
+
+    dictSpoolMsg["attempts"] += 1
+
+    if dictSpoolMsg["attempts"] >= EMAIL_SPOOL_MAX_ATTEMPTS:
+        failSpoolMsg(sFilenameNPath, f"{dictSpoolMsg['attempts']} attempts. {sReason}", dictSpoolMsg)
+        return
+
+    dictSpoolMsg["next_attempt"] = time.time() + fDelaySecs
+    rewriteSpoolMsg(sFilenameNPath, dictSpoolMsg)
+
+    spoolLogger.warning(f"Email not sent: {os.path.basename(sFilenameNPath)} attempt {dictSpoolMsg['attempts']}; retry in {fDelaySecs:.0f} secs: {sReason}")
+
+
+def getReadySpoolMsgs():
+
+    ######################################################
+    # Return list of (filename, spool msg) ready to send
+    # in queued order, and secs until next retry is due.
+    ######################################################
+    sNewDir = getSpoolDir("new")
+    lstReadyMsgs = []
+    fSecsToNextRetry = None
+    fNow = time.time()
+
+    for sFilename in sorted(os.listdir(sNewDir), key=lambda sFilename: int(sFilename.split("_")[0])):
+        if not sFilename.endswith(".json"):
+            continue
+
+        sFilenameNPath = os.path.join(sNewDir, sFilename)
+
+        try:
+            dictSpoolMsg = readSpoolMsg(sFilenameNPath)
+        except (OSError, ValueError) as ex:
+            failSpoolMsg(sFilenameNPath, f"Cannot read message file: {ex}")
+            continue
+
+        if dictSpoolMsg["next_attempt"] <= fNow:
+            lstReadyMsgs.append((sFilenameNPath, dictSpoolMsg))
+        else:
+            fSecsToRetry = dictSpoolMsg["next_attempt"] - fNow
+            fSecsToNextRetry = fSecsToRetry if fSecsToNextRetry is None else min(fSecsToNextRetry, fSecsToRetry)
+
+    return lstReadyMsgs, fSecsToNextRetry
+
+
+def sendSpoolMsgs(fIdleSecs):
+
+    ######################################################
+    # Hold sender.lock and send queued messages until no
+    # message has been queued for fIdleSecs (None --> never
+    # exit). Returns NOF messages sent.
+    ######################################################
+    iNOFSent = 0
+
+    with open(os.path.join(getSpoolDir(""), "sender.lock"), "a") as fLock:
+        while True:
+            try:
+                fcntl.flock(fLock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                spoolLogger.info("Email spool sender is already running.")
+                break
+
+            try:
+                iNOFSent += sendSpoolMsgsUntilIdle(fIdleSecs)
+            finally:
+                fcntl.flock(fLock, fcntl.LOCK_UN)
+
+            ######################################################
+            # A producer that queued a message after the last scan
+            # but before the unlock saw the lock held and did not
+            # start a sender --> check new/ again after the unlock
+            ######################################################
+            if not hasSpoolMsgs():
+                break
+
+            spoolLogger.info("Email queued while the email spool sender was stopping. Continue sending.")
+
+    sFailedWarning = getFailedSpoolMsgsWarning()
+    if sFailedWarning is not None:
+        spoolLogger.error(sFailedWarning)
+
+    spoolLogger.info(f"Email spool sender ended: {iNOFSent=}")
+
+    return iNOFSent
+
+
+def sendSpoolMsgsUntilIdle(fIdleSecs):
+
+    ######################################################
+    # Send queued messages on one SMTP connection until no
+    # message has been queued for fIdleSecs (caller holds
+    # sender.lock). Returns NOF messages sent.
+    ######################################################
+    smtpServer = None
+    fSMTPLastUsed = 0.0
+    fLastActivity = time.monotonic()
+    fDelaySecs = EMAIL_SPOOL_MIN_DELAY_SECS
+    iNOFSent = 0
+
+    spoolLogger.info(f"Email spool sender started: {EMAIL_SPOOL_DIR=}")
+
+    try:
+        while True:
+            lstReadyMsgs, fSecsToNextRetry = getReadySpoolMsgs()
+
+            if not lstReadyMsgs:
+                if fSecsToNextRetry is None and fIdleSecs is not None and time.monotonic() - fLastActivity >= fIdleSecs:
+                    break
+
+                # do not hold SMTP connection open while idle
+                if smtpServer is not None and time.monotonic() - fSMTPLastUsed >= SMTP_NOOP_AFTER_SECS:
+                    closeSMTP(smtpServer)
+                    smtpServer = None
+
+                time.sleep(EMAIL_SPOOL_POLL_SECS if fSecsToNextRetry is None else min(EMAIL_SPOOL_POLL_SECS, fSecsToNextRetry))
+                continue
+
+            fLastActivity = time.monotonic()
+
+            #############################################
+            # Connect, or check that connection is alive
+            #############################################
+            try:
+                if smtpServer is not None and time.monotonic() - fSMTPLastUsed >= SMTP_NOOP_AFTER_SECS:
+                    if smtpServer.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+
+            except (smtplib.SMTPException, OSError):
+                closeSMTP(smtpServer)
+                smtpServer = None
+
+            if smtpServer is None:
+                try:
+                    smtpServer = connectSMTP()
+                except (smtplib.SMTPException, OSError) as ex:
+                    spoolLogger.warning(f"Cannot connect to SMTP server; retry in {fDelaySecs:.0f} secs: {ex}")
+                    time.sleep(fDelaySecs)
+                    fDelaySecs = min(fDelaySecs * 2, EMAIL_SPOOL_MAX_DELAY_SECS)
+                    continue
+
+            #############################################
+            # Send batch of ready messages
+            #############################################
+            for sFilenameNPath, dictSpoolMsg in lstReadyMsgs:
+                try:
+                    # receivers the SMTP server refused (the others accepted the message)
+                    dictRefused = smtpServer.sendmail(dictSpoolMsg["sender"], dictSpoolMsg["receivers"], dictSpoolMsg["message"].encode("utf-8"))
+
+                except Exception as ex:
+                    fSMTPLastUsed = time.monotonic()
+
+                    if isPermanentSMTPError(ex):
+                        failSpoolMsg(sFilenameNPath, repr(ex), dictSpoolMsg)
+                        try:
+                            smtpServer.rset()
+                            continue
+                        except (smtplib.SMTPException, OSError):
+                            closeSMTP(smtpServer)
+                            smtpServer = None
+                            break
+
+                    # temporary error, or connection lost --> reconnect after delay
+                    retrySpoolMsg(sFilenameNPath, dictSpoolMsg, fDelaySecs, repr(ex))
+                    fDelaySecs = min(fDelaySecs * 2, EMAIL_SPOOL_MAX_DELAY_SECS)
+                    closeSMTP(smtpServer)
+                    smtpServer = None
+                    break
+
+                fSMTPLastUsed = time.monotonic()
+                fDelaySecs = EMAIL_SPOOL_MIN_DELAY_SECS
+
+                if dictRefused:
+                    failPartialSpoolMsg(sFilenameNPath, dictSpoolMsg, dictRefused)
+                    continue
+
+                os.remove(sFilenameNPath)
+                iNOFSent += 1
+
+                spoolLogger.info(f"Email sent: {os.path.basename(sFilenameNPath)} queued {dictSpoolMsg['queued']} to {dictSpoolMsg['receivers']}")
+
+    finally:
+        closeSMTP(smtpServer)
+
+    return iNOFSent
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Send emails queued in the email spool")
+    parser.add_argument("--daemon", action="store_true", help="never exit")
+    parser.add_argument("--idle_secs", type=int, default=EMAIL_SPOOL_IDLE_SECS, help="exit after this many secs without queued emails")
+    parser.add_argument("--report_failed", action="store_true", help="list failed/ emails (exit 12 when there are any)")
+    args = parser.parse_args()
+
+    if args.report_failed:
+        lstFailed = getFailedSpoolMsgs()
+        for sFilename in lstFailed:
+            print(os.path.join(getSpoolDir("failed"), sFilename))
+        print(f"{len(lstFailed)} emails in {getSpoolDir('failed')}")
+        sys.exit(12 if lstFailed else 0)
+
+    try:
+        import LoggerStandard as EnigmaLog
+
+        TMSTMP = datetime.now().strftime('%Y%m%d.%H%M%S')
+        setEmailSpoolLogger(EnigmaLog.setLogging(f"{EMAIL_SPOOL_LOG_DIR}EmailSpool_{TMSTMP}.log"))
+
+    except OSError:
+        logging.basicConfig(format='%(asctime)s %(levelname)-8s %(message)s', level=logging.INFO)
+
+    sendSpoolMsgs(None if args.daemon else args.idle_secs)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  EmailSpoolCheck.py
+#
+# Desc: Test the email spool sender (EmailSpool.py) against a local SMTP server (started by this script on a
+#       free localhost port; no real email is sent). Each check uses its own temporary spool directory.
+#
+#       1) Queued emails are sent over one SMTP connection and removed from new/.
+#       2) An email the SMTP server rejects (550) is moved to failed/, is reported (producer warning and
+#          --report_failed exit 12), and an alert email is sent to EMAIL_SPOOL_ALERT_RECIPIENT.
+#       3) Lost wakeup: an email queued after the sender's last scan of new/ (the producer sees the lock held and
+#          does not start a sender) is sent before the sender ends.
+#       4) An email the SMTP server defers (451) is retried and sent.
+#       5) An email some receivers refuse (550) is moved to failed/ with the refused receivers recorded (not counted
+#          as sent, not resent to the receivers that accepted it).
+#
+# Ex.   python3 EmailSpoolCheck.py
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+# 2026-10-18 Check an email some receivers refuse.
+########################################################################################################
+import os
+import sys
+import json
+import logging
+import tempfile
+import threading
+import subprocess
+import socketserver
+
+import EmailSpool
+
+
+REJECT_RECEIVER = "reject@example.com"
+TEMPFAIL_RECEIVER = "tempfail@example.com"
+ALERT_RECEIVER = "alerts@example.com"
+
+
+#############################################################
+# Local SMTP server
+#############################################################
+class SMTPCheckServer(socketserver.ThreadingTCPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+
+        super().__init__(("localhost", 0), SMTPCheckHandler)
+        self.lock = threading.Lock()
+        self.iNOFConnections = 0
+        self.lstDelivered = []
+        self.setTempFailed = set()
+
+
+class SMTPCheckHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, sReply):
+
+        self.wfile.write(f"{sReply}\r\n".encode("ascii"))
+
+    def handle(self):
+
+        server = self.server
+        with server.lock:
+            server.iNOFConnections += 1
+
+        sSender = None
+        lstReceivers = []
+
+        self.reply("220 localhost EmailSpoolCheck")
+
+        while True:
+            bLine = self.rfile.readline()
+            if not bLine:
+                return
+
+            sCommand = bLine.decode("ascii").strip()
+            sVerb = sCommand[:4].upper()
+
+            if sVerb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif sVerb == "MAIL":
+                sSender = sCommand.split(":", 1)[1].strip().strip("<>")
+                lstReceivers = []
+                self.reply("250 OK")
+            elif sVerb == "RCPT":
+                sReceiver = sCommand.split(":", 1)[1].strip().strip("<>")
+                if sReceiver == REJECT_RECEIVER:
+                    self.reply("550 No such user")
+                else:
+                    lstReceivers.append(sReceiver)
+                    self.reply("250 OK")
+            elif sVerb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lstLines = []
+                while True:
+                    sLine = self.rfile.readline().decode("utf-8")
+                    if sLine in (".\r\n", ".\n", ""):
+                        break
+                    lstLines.append(sLine[1:] if sLine.startswith("..") else sLine)
+
+                with server.lock:
+                    if TEMPFAIL_RECEIVER in lstReceivers and TEMPFAIL_RECEIVER not in server.setTempFailed:
+                        server.setTempFailed.add(TEMPFAIL_RECEIVER)
+                        self.reply("451 Try again later")
+                        continue
+
+                    server.lstDelivered.append((sSender, lstReceivers, "".join(lstLines)))
+
+                self.reply("250 OK queued")
+            elif sVerb == "RSET":
+                sSender = None
+                lstReceivers = []
+                self.reply("250 OK")
+            elif sVerb == "NOOP":
+                self.reply("250 OK")
+            elif sVerb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+#############################################################
+# Checks
+#############################################################
+def createMessage(sReceiver, sSubject):
+
+    return f"""From: <sender@example.com>
+To: {sReceiver}
+Subject: {sSubject}
+
+EmailSpoolCheck {sSubject}
+"""
+
+
+def getDeliveredSubjects(smtpServer):
+
+    with smtpServer.lock:
+        return [sMessage.split("Subject: ", 1)[1].split("\n", 1)[0].strip() for sSender, lstReceivers, sMessage in smtpServer.lstDelivered]
+
+
+def useSpoolDir(smtpServer):
+
+    # new spool dir and SMTP server counters for each check
+    EmailSpool.EMAIL_SPOOL_DIR = tempfile.mkdtemp(prefix="EmailSpoolCheck_") + os.sep
+    os.environ["EMAIL_SPOOL_DIR"] = EmailSpool.EMAIL_SPOOL_DIR
+
+    with smtpServer.lock:
+        smtpServer.iNOFConnections = 0
+        smtpServer.lstDelivered = []
+        smtpServer.setTempFailed = set()
+
+
+def checkFailed(bOK, sMsg):
+
+    if not bOK:
+        print(f"FAILED: {sMsg}")
+        sys.exit(12)
+
+
+def checkOneConnection(smtpServer):
+
+    useSpoolDir(smtpServer)
+
+    lstSubjects = [f"one connection {iMsg}" for iMsg in range(5)]
+    for sSubject in lstSubjects:
+        EmailSpool.spoolEmail("sender@example.com", ["receiver@example.com"], createMessage("receiver@example.com", sSubject), bStartSender=False)
+
+    iNOFSent = EmailSpool.sendSpoolMsgs(0)
+
+    checkFailed(iNOFSent == 5 and getDeliveredSubjects(smtpServer) == lstSubjects, f"queued emails not sent in order: {iNOFSent=} {getDeliveredSubjects(smtpServer)}")
+    checkFailed(smtpServer.iNOFConnections == 1, f"emails not sent over one SMTP connection: {smtpServer.iNOFConnections=}")
+    checkFailed(not EmailSpool.hasSpoolMsgs(), "new/ is not empty")
+    print("OK: queued emails sent over one SMTP connection")
+
+
+def checkRejected(smtpServer):
+
+    useSpoolDir(smtpServer)
+    EmailSpool.EMAIL_SPOOL_ALERT_RECIPIENT = ALERT_RECEIVER
+
+    try:
+        EmailSpool.spoolEmail("sender@example.com", [REJECT_RECEIVER], createMessage(REJECT_RECEIVER, "rejected"), bStartSender=False)
+        EmailSpool.spoolEmail("sender@example.com", ["receiver@example.com"], createMessage("receiver@example.com", "after rejected"), bStartSender=False)
+
+        EmailSpool.sendSpoolMsgs(0)
+    finally:
+        EmailSpool.EMAIL_SPOOL_ALERT_RECIPIENT = ""
+
+    lstSubjects = getDeliveredSubjects(smtpServer)
+    checkFailed(len(EmailSpool.getFailedSpoolMsgs()) == 1, f"rejected email not in failed/: {EmailSpool.getFailedSpoolMsgs()}")
+    checkFailed("after rejected" in lstSubjects, f"email after the rejected email not sent: {lstSubjects}")
+    checkFailed(EmailSpool.getFailedSpoolMsgsWarning() is not None, "failed/ email not reported to producers")
+
+    with smtpServer.lock:
+        lstAlerts = [(lstReceivers, sMessage) for sSender, lstReceivers, sMessage in smtpServer.lstDelivered if ALERT_RECEIVER in lstReceivers]
+    checkFailed(len(lstAlerts) == 1 and "Subject: rejected" in lstAlerts[0][1], f"alert email for the rejected email not sent: {lstAlerts}")
+
+    procReport = subprocess.run([sys.executable, EmailSpool.__file__, "--report_failed"], capture_output=True, text=True)
+    checkFailed(procReport.returncode == 12 and EmailSpool.getFailedSpoolMsgs()[0] in procReport.stdout,
+                f"--report_failed did not list the failed/ email: {procReport.returncode=} {procReport.stdout}")
+    print("OK: rejected email moved to failed/, reported and alerted")
+
+
+def checkLostWakeup(smtpServer):
+
+    useSpoolDir(smtpServer)
+
+    ######################################################
+    # Queue an email right after the sender's idle scan of
+    # new/ (before the sender releases sender.lock)
+    ######################################################
+    getReadySpoolMsgs = EmailSpool.getReadySpoolMsgs
+    lstQueued = []
+
+    def getReadySpoolMsgsThenQueue():
+        lstReadyMsgs, fSecsToNextRetry = getReadySpoolMsgs()
+        if not lstReadyMsgs and fSecsToNextRetry is None and not lstQueued:
+            lstQueued.append(EmailSpool.spoolEmail("sender@example.com", ["receiver@example.com"],
+                                                   createMessage("receiver@example.com", "lost wakeup"), bStartSender=False))
+        return lstReadyMsgs, fSecsToNextRetry
+
+    EmailSpool.getReadySpoolMsgs = getReadySpoolMsgsThenQueue
+    try:
+        iNOFSent = EmailSpool.sendSpoolMsgs(0)
+    finally:
+        EmailSpool.getReadySpoolMsgs = getReadySpoolMsgs
+
+    checkFailed(lstQueued and iNOFSent == 1 and getDeliveredSubjects(smtpServer) == ["lost wakeup"],
+                f"email queued while the sender was stopping was not sent: {iNOFSent=} {getDeliveredSubjects(smtpServer)}")
+    checkFailed(not EmailSpool.hasSpoolMsgs(), "new/ is not empty")
+    print("OK: email queued while the sender was stopping sent")
+
+
+def checkTempFailed(smtpServer):
+
+    useSpoolDir(smtpServer)
+
+    EmailSpool.spoolEmail("sender@example.com", [TEMPFAIL_RECEIVER], createMessage(TEMPFAIL_RECEIVER, "deferred"), bStartSender=False)
+
+    iNOFSent = EmailSpool.sendSpoolMsgs(0)
+
+    checkFailed(iNOFSent == 1 and getDeliveredSubjects(smtpServer) == ["deferred"], f"deferred email not retried: {iNOFSent=} {getDeliveredSubjects(smtpServer)}")
+    checkFailed(not EmailSpool.getFailedSpoolMsgs() and smtpServer.iNOFConnections == 2,
+                f"deferred email not retried on a new connection: {EmailSpool.getFailedSpoolMsgs()} {smtpServer.iNOFConnections=}")
+    print("OK: deferred email retried and sent")
+
+
+def checkPartialRefused(smtpServer):
+
+    useSpoolDir(smtpServer)
+
+    lstReceivers = ["receiver@example.com", REJECT_RECEIVER]
+    EmailSpool.spoolEmail("sender@example.com", lstReceivers, createMessage(", ".join(lstReceivers), "partly refused"), bStartSender=False)
+
+    iNOFSent = EmailSpool.sendSpoolMsgs(0)
+
+    lstFailed = EmailSpool.getFailedSpoolMsgs()
+    checkFailed(iNOFSent == 0 and len(lstFailed) == 1, f"partly refused email counted as sent: {iNOFSent=} {lstFailed}")
+
+    with open(os.path.join(EmailSpool.getSpoolDir("failed"), lstFailed[0]), "r", encoding="utf-8") as fSpoolMsg:
+        dictSpoolMsg = json.load(fSpoolMsg)
+
+    checkFailed(list(dictSpoolMsg.get("refused", {})) == [REJECT_RECEIVER] and dictSpoolMsg.get("refused")[REJECT_RECEIVER][0] == 550,
+                f"refused receivers not recorded: {dictSpoolMsg.get('refused')}")
+    checkFailed(dictSpoolMsg.get("delivered") == ["receiver@example.com"] and getDeliveredSubjects(smtpServer) == ["partly refused"],
+                f"email not sent once to the receivers that accepted it: {dictSpoolMsg.get('delivered')} {getDeliveredSubjects(smtpServer)}")
+    print("OK: partly refused email moved to failed/ with the refused receivers")
+
+
+def main():
+
+    logging.basicConfig(format='%(asctime)s %(levelname)-8s %(message)s', level=logging.INFO)
+
+    smtpServer = SMTPCheckServer()
+    threading.Thread(target=smtpServer.serve_forever, daemon=True).start()
+
+    os.environ["SMTP_SERVER"] = "localhost"
+    os.environ["SMTP_PORT"] = str(smtpServer.server_address[1])
+    os.environ["SMTP_STARTTLS"] = "N"
+
+    # short retry delays and polls for the checks
+    EmailSpool.EMAIL_SPOOL_MIN_DELAY_SECS = 0.2
+    EmailSpool.EMAIL_SPOOL_POLL_SECS = 0.1
+
+    try:
+        checkOneConnection(smtpServer)
+        checkRejected(smtpServer)
+        checkLostWakeup(smtpServer)
+        checkTempFailed(smtpServer)
+        checkPartialRefused(smtpServer)
+    finally:
+        smtpServer.shutdown()
+        smtpServer.server_close()
+
+    print("EmailSpool checks passed")
+
+
+if __name__ == "__main__":
+
+    main()
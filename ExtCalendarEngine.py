@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  ExtCalendarEngine.py
+#
+# Desc: Run Extract calendar engine used by BuildRunExtCalendarDriver.py.
+#
+#       A year's date table is built once (per process): date, day of week, weekdays of the year, and for each month
+#       the first/last day, first/last working day, and the dates of each day of week (1st, 2nd, ... occurrence).
+#       Every calendar config rule is then resolved with lookups into the date table:
+#           W          --> DOW_DOM days (M-F or MON,WED,...) --> union of the dates of those days of week
+#           M          --> DOW_DOM (LW|FW|LD|FD|DAY-N|DD) for every month
+#           Q, S, A    --> Month_Day (LW|FW|LD|FD|DAY-N|DD) for each month in Months
+#                          LW = Last working day of month    LD = Last day of month
+#                          FW = First working day of month   FD = First day of month
+#                          DAY-N = Nth (1-4), F(irst) or L(ast) DAY of month (ex. FRI-2, MON-L)
+#                          DD = day number of month (last day of month when month has fewer days)
+#
+#       Calendars are cached (EXT_CALENDAR_CACHE_DB) by a hash of the config file and the year, so reruns
+#       for the same config file and year reuse the calendar.
+#
+# Usage:
+#       import ExtCalendarEngine as ExtCal
+#
+#       lstCalendarOutputRecs = ExtCal.getRunExtCalendar(bConfigFile, 2026)
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+########################################################################################################
+import os
+import re
+import time
+import logging
+import hashlib
+import calendar
+from datetime import date, timedelta
+from functools import lru_cache
+
+
+EXT_CALENDAR_CACHE_DB = os.getenv("EXT_CALENDAR_CACHE_DB", "/app/IDRC/XTR/CMS/data/ExtCalendarCache.db")
+
+# Part of the config file hash --> change when rule resolution changes so cached calendars are rebuilt
+EXT_CALENDAR_ENGINE_VERSION = "1"
+
+FLD_DELIM = "|"
+
+# 0-6 Sun-Sat (strftime('%w'))
+WORKING_DAYS = (1, 2, 3, 4, 5)
+DOW_NBRS = {"SUN": 0, "MON": 1, "TUE": 2, "WED": 3, "THU": 4, "FRI": 5, "SAT": 6}
+DOW_ABBREVS = ("Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat")
+
+MONTH_NBRS = {"JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6, "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12}
+
+ValidNumeredDay = '^[0-9]+$'
+ValidDayAbrevAndOcc = '^(SUN|MON|TUE|WED|THU|FRI|SAT)-(1|2|3|4|L|F)$'
+ValidLWFWLDFD = '^(LW|FW|LD|FD)$'
+
+reValidNumeredDay = re.compile(ValidNumeredDay)
+reValidDayAbrevAndOcc = re.compile(ValidDayAbrevAndOcc, re.IGNORECASE)
+reValidLWFWLDFD = re.compile(ValidLWFWLDFD, re.IGNORECASE)
+
+rootLogger = logging.getLogger(__name__)
+
+
+def setExtCalendarLogger(pRootLogger):
+
+    # Pass the logger once instead of for each function
+    global rootLogger
+    rootLogger = pRootLogger
+
+
+#############################################################
+# Date table
+#############################################################
+@lru_cache(maxsize=None)
+def buildYearDateTable(iYYYY):
+
+    ######################################################
+    # Date table of a year (iDay = 0-based day of year):
+    #   lstDates[iDay]       --> "YYYY-MM-DD"
+    #   lstDOWAbbrevs[iDay]  --> "Mon"
+    #   dictDOWDays[dow]     --> iDays with day of week dow (0=Sun)
+    #   dictMonths[mm]       --> {"FD", "LD", "FW", "LW": iDay,
+    #                             "DOW": {dow: [iDays of 1st, 2nd, ... occurrence]}}
+    ######################################################
+    dtFirstDay = date(iYYYY, 1, 1)
+    iNOFDays = 366 if calendar.isleap(iYYYY) else 365
+
+    dictYear = {"lstDates": [], "lstDOWAbbrevs": [], "dictDOWDays": {iDOW: [] for iDOW in range(7)}, "dictMonths": {}}
+
+    for iDay in range(iNOFDays):
+        dtDay = dtFirstDay + timedelta(days=iDay)
+        iDOW = (dtDay.weekday() + 1) % 7
+
+        dictYear["lstDates"].append(dtDay.isoformat())
+        dictYear["lstDOWAbbrevs"].append(DOW_ABBREVS[iDOW])
+        dictYear["dictDOWDays"][iDOW].append(iDay)
+
+        dictMonth = dictYear["dictMonths"].setdefault(dtDay.month, {"FD": iDay, "FW": None, "DOW": {iDOW: [] for iDOW in range(7)}})
+        dictMonth["LD"] = iDay
+        dictMonth["DOW"][iDOW].append(iDay)
+
+        if iDOW in WORKING_DAYS:
+            dictMonth["LW"] = iDay
+            if dictMonth["FW"] is None:
+                dictMonth["FW"] = iDay
+
+    return dictYear
+
+
+#############################################################
+# Rules
+#############################################################
+def getWeeklyExtDays(dictYear, DOW_DOM):
+
+    # DOW_DOM: "M-F" or days delimited by comma (MON,WED,FRI)
+    if DOW_DOM == "M-F":
+        lstDOWs = WORKING_DAYS
+    else:
+        lstDOWs = [DOW_NBRS[sDay] for sDay in DOW_DOM.upper().split(",") if sDay in DOW_NBRS]
+
+    return sorted(iDay for iDOW in set(lstDOWs) for iDay in dictYear["dictDOWDays"][iDOW])
+
+
+def getMonthExtDay(dictYear, iMM, sMonthDay):
+
+    # sMonthDay: LW|FW|LD|FD, DAY-N (FRI-2, FRI-L, FRI-F) or day number (validated by getMonthDayRule)
+    dictMonth = dictYear["dictMonths"][iMM]
+
+    if sMonthDay in ("LW", "FW", "LD", "FD"):
+        return dictMonth[sMonthDay]
+
+    if reValidDayAbrevAndOcc.match(sMonthDay):
+        sDOWDay, sOcc = sMonthDay.split("-")
+        lstDOWDays = dictMonth["DOW"][DOW_NBRS[sDOWDay]]
+
+        if sOcc == "L":
+            return lstDOWDays[-1]
+        elif sOcc == "F":
+            return lstDOWDays[0]
+        else:
+            return lstDOWDays[int(sOcc) - 1]
+
+    # day number --> last day of month when month has fewer days
+    return dictMonth["FD"] + min(int(sMonthDay), dictMonth["LD"] - dictMonth["FD"] + 1) - 1
+
+
+def getMonthDayRule(sMonthDay, sConfigRec):
+
+    sMonthDay = sMonthDay.upper()
+
+    if not (reValidNumeredDay.match(sMonthDay) or reValidDayAbrevAndOcc.match(sMonthDay) or reValidLWFWLDFD.match(sMonthDay)):
+        raise Exception(f"Invalid DOM value {sMonthDay} in config file record {sConfigRec}")
+
+    return sMonthDay
+
+
+def getMonthNbrs(sMonths, sConfigRec):
+
+    # sMonths like: "JAN,APR,JUL,OCT" or "JAN,JUL"
+    lstMonthNbrs = []
+
+    for sMON in sMonths.split(","):
+        iMM = MONTH_NBRS.get(sMON.strip().upper())
+        if iMM is None:
+            raise Exception(f"Search Month parameter {sMON} is not a valid month in config file record {sConfigRec}")
+
+        lstMonthNbrs.append(iMM)
+
+    return lstMonthNbrs
+
+
+def getConfigRecExtDays(dictYear, sConfigRec):
+
+    ######################################################
+    # Parse config record (fields delimited by '|') and
+    # return iDays of its extract dates.
+    # Example: Blbtn|Blue Button|W|M-F|||N||EFT|...
+    ######################################################
+    lstConfigRecFlds = sConfigRec.split(FLD_DELIM)
+
+    TimeFrame = lstConfigRecFlds[2].strip()
+    DOW_DOM = lstConfigRecFlds[3].strip()
+    Months = lstConfigRecFlds[4].strip()
+    Month_Day = lstConfigRecFlds[5].strip()
+
+    if TimeFrame == 'W':
+        return getWeeklyExtDays(dictYear, DOW_DOM)
+
+    elif TimeFrame == 'M':
+        sMonthDay = getMonthDayRule(DOW_DOM, sConfigRec)
+        return [getMonthExtDay(dictYear, iMM, sMonthDay) for iMM in range(1, 13)]
+
+    elif TimeFrame == 'Q' or TimeFrame == 'S' or TimeFrame == 'A':
+        sMonthDay = getMonthDayRule(Month_Day, sConfigRec)
+        return [getMonthExtDay(dictYear, iMM, sMonthDay) for iMM in getMonthNbrs(Months, sConfigRec)]
+
+    else:
+        raise Exception(f"Invalid extract time frame: {TimeFrame} in config file record {sConfigRec}")
+
+
+def buildRunExtCalendar(lstConfigRecs, iYYYY):
+
+    ######################################################
+    # Calendar records: extract date|DOW|config record for
+    # each extract date of each config record, on/after
+    # ExtInitDeliveryDt and before ExtObsoleteDt.
+    ######################################################
+    dictYear = buildYearDateTable(iYYYY)
+    lstDates = dictYear["lstDates"]
+    lstDOWAbbrevs = dictYear["lstDOWAbbrevs"]
+
+    lstCalendarOutputRecs = []
+
+    for sConfigRec in lstConfigRecs:
+        lstConfigRecFlds = sConfigRec.split(FLD_DELIM)
+        ExtInitDeliveryDt = lstConfigRecFlds[13].strip()
+        ExtObsoleteDt = lstConfigRecFlds[14].strip()
+
+        for iDay in getConfigRecExtDays(dictYear, sConfigRec):
+            sExtDt = lstDates[iDay]
+
+            if (ExtInitDeliveryDt == "" or sExtDt >= ExtInitDeliveryDt) and (ExtObsoleteDt == "" or sExtDt < ExtObsoleteDt):
+                lstCalendarOutputRecs.append(sExtDt + FLD_DELIM + lstDOWAbbrevs[iDay] + FLD_DELIM + sConfigRec)
+
+    return lstCalendarOutputRecs
+
+
+#############################################################
+# Calendar cache
+#############################################################
+def getConfigFileHash(bConfigFile):
+
+    return hashlib.sha256(EXT_CALENDAR_ENGINE_VERSION.encode("utf-8") + b"\0" + bConfigFile).hexdigest()
+
+
+def getExtCalendarCacheConnection():
+
+    import sqlite3
+
+    conn = sqlite3.connect(EXT_CALENDAR_CACHE_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS EXT_CALENDAR (CONFIG_HASH TEXT, YYYY INTEGER, CREATED_TS REAL, CALENDAR_RECS TEXT, PRIMARY KEY (CONFIG_HASH, YYYY))")
+
+    return conn
+
+
+def getRunExtCalendars(bConfigFile, lstYears, bUseCache=True):
+
+    ######################################################
+    # Calendar records for each year of lstYears
+    # --> dict {YYYY: list of calendar records}.
+    # bConfigFile: calendar config file contents (bytes).
+    ######################################################
+    import sqlite3
+    from contextlib import closing
+
+    lstConfigRecs = bConfigFile.decode('utf-8').splitlines()
+    sConfigHash = getConfigFileHash(bConfigFile)
+    dictCalendars = {}
+
+    if bUseCache:
+        try:
+            with closing(getExtCalendarCacheConnection()) as conn:
+                for iYYYY, sCalendarRecs in conn.execute(f"SELECT YYYY, CALENDAR_RECS FROM EXT_CALENDAR WHERE CONFIG_HASH = ? AND YYYY IN ({','.join('?' * len(lstYears))})",
+                                                         (sConfigHash, *lstYears)):
+                    dictCalendars[iYYYY] = sCalendarRecs.split("\n") if sCalendarRecs else []
+
+        except sqlite3.Error as ex:
+            rootLogger.warning(f"Calendar cache {EXT_CALENDAR_CACHE_DB} not used: {ex}")
+            bUseCache = False
+
+    lstYears2Build = [iYYYY for iYYYY in lstYears if iYYYY not in dictCalendars]
+    rootLogger.info(f"{sConfigHash=} cached years={sorted(dictCalendars)} years to build={lstYears2Build}")
+
+    for iYYYY in lstYears2Build:
+        dictCalendars[iYYYY] = buildRunExtCalendar(lstConfigRecs, iYYYY)
+
+    if bUseCache and lstYears2Build:
+        try:
+            with closing(getExtCalendarCacheConnection()) as conn, conn:
+                conn.executemany("INSERT OR REPLACE INTO EXT_CALENDAR (CONFIG_HASH, YYYY, CREATED_TS, CALENDAR_RECS) VALUES (?, ?, ?, ?)",
+                                 [(sConfigHash, iYYYY, time.time(), "\n".join(dictCalendars[iYYYY])) for iYYYY in lstYears2Build])
+
+        except sqlite3.Error as ex:
+            rootLogger.warning(f"Calendar cache {EXT_CALENDAR_CACHE_DB} not updated: {ex}")
+
+    return dictCalendars
+
+
+def getRunExtCalendar(bConfigFile, iYYYY, bUseCache=True):
+
+    return getRunExtCalendars(bConfigFile, [iYYYY], bUseCache)[iYYYY]
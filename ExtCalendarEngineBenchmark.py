@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  ExtCalendarEngineBenchmark.py
+#
+# Desc: Benchmark building Run Extract calendars for a synthetic calendar config file of
+#         1) BuildRunExtCalendarDriver rule functions (getDaysMatchMask/buildWkCal4Yr/buildQtrCal4Yr; logging to a file)
+#         2) ExtCalendarEngine without cache (date table per year + rule lookups)
+#         3) ExtCalendarEngine with cache (calendars cached by config file hash and year)
+#
+#       Checks that the engine's calendar records are identical to the driver functions' records.
+#       NOTE: DAY-L rules (ex. FRI-L) are not included for the driver functions (int(str - 1) TypeError), and
+#             buildWkCal4Yr stops after 365 days --> weekly Dec 31 records of leap years are only created by the engine.
+#
+# Ex.   python3 ExtCalendarEngineBenchmark.py --nof_jobs 300 --years 2025 2026 2027 2028
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+########################################################################################################
+import os
+import sys
+import time
+import random
+import shutil
+import calendar
+import logging
+import argparse
+import tempfile
+
+import ExtCalendarEngine as ExtCal
+import BuildRunExtCalendarDriver as CalDr
+
+
+def createConfigRecs(iNOFJobs, bIncludeLastDOW):
+
+    lstDOWs = list(ExtCal.DOW_NBRS)
+    lstMonths = list(ExtCal.MONTH_NBRS)
+    lstConfigRecs = []
+
+    for iJob in range(iNOFJobs):
+        sTimeFrame = random.choice("WWMMQSA")
+        sDOW_DOM = sMonths = sMonthDay = ""
+
+        sDayRule = random.choice(["LW", "FW", "LD", "FD", str(random.randint(1, 31)),
+                                  f"{random.choice(lstDOWs)}-{random.choice('1234FL' if bIncludeLastDOW else '1234F')}"])
+
+        if sTimeFrame == "W":
+            sDOW_DOM = random.choice(["M-F", ",".join(sorted(random.sample(lstDOWs, random.randint(1, 3)), key=lstDOWs.index))])
+        elif sTimeFrame == "M":
+            sDOW_DOM = sDayRule
+        else:
+            iNOFMonths = {"Q": 4, "S": 2, "A": 1}[sTimeFrame]
+            sMonths = ",".join(sorted(random.sample(lstMonths, iNOFMonths), key=lstMonths.index))
+            sMonthDay = sDayRule
+
+        sInitDeliveryDt = random.choice(["", "", f"{random.randint(2024, 2028)}-{random.randint(1, 12):02}-15"])
+        sObsoleteDt = random.choice(["", "", "", f"{random.randint(2025, 2029)}-{random.randint(1, 12):02}-01"])
+
+        lstConfigRecs.append("|".join([f"EXT{iJob:04}", f"Extract {iJob}", sTimeFrame, sDOW_DOM, sMonths, sMonthDay,
+                                       "N", "", "EFT", "", "", "", "Y", sInitDeliveryDt, sObsoleteDt]))
+
+    return lstConfigRecs
+
+
+def buildCalendarWithDriverFunctions(lstConfigRecs, iYYYY):
+
+    # same rule dispatch as BuildRunExtCalendarDriver.main_processing_loop before ExtCalendarEngine
+    CalDr.sProcessingYYYY = str(iYYYY)
+    CalDr.setNOFDaysForYear(CalDr.sProcessingYYYY)
+
+    lstCalendarOutputRecs = []
+
+    for sConfigRec in lstConfigRecs:
+        lstConfigRecFlds = sConfigRec.split("|")
+        TimeFrame = lstConfigRecFlds[2].strip()
+        DOW_DOM = lstConfigRecFlds[3].strip()
+        Months = lstConfigRecFlds[4].strip()
+        Month_Day = lstConfigRecFlds[5].strip()
+        ExtInitDeliveryDt = lstConfigRecFlds[13].strip()
+        ExtObsoleteDt = lstConfigRecFlds[14].strip()
+
+        if TimeFrame == 'W':
+            CalDr.getDaysMatchMask(DOW_DOM)
+            CalDr.buildWkCal4Yr(lstCalendarOutputRecs, ExtInitDeliveryDt, ExtObsoleteDt, sConfigRec)
+        elif TimeFrame == 'M':
+            CalDr.buildQtrCal4Yr(lstCalendarOutputRecs, CalDr.MON_ABREVS_DELIM, DOW_DOM, ExtInitDeliveryDt, ExtObsoleteDt, sConfigRec)
+        else:
+            CalDr.buildQtrCal4Yr(lstCalendarOutputRecs, Months, Month_Day, ExtInitDeliveryDt, ExtObsoleteDt, sConfigRec)
+
+    return lstCalendarOutputRecs
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Run Extract calendar engine benchmark")
+    parser.add_argument("--nof_jobs", type=int, default=300, help="NOF config records (jobs)")
+    parser.add_argument("--years", type=int, nargs="+", default=[2025, 2026, 2027, 2028], help="calendar years")
+    parser.add_argument("--seed", type=int, default=2026, help="random seed")
+    args = parser.parse_args()
+
+    # driver functions log each day to the log file, as in BuildRunExtCalendarDriver.py
+    calLogger = logging.getLogger("ExtCalendarEngineBenchmark")
+    calLogger.setLevel(logging.INFO)
+    calLogger.addHandler(logging.FileHandler(os.devnull))
+    CalDr.rootLogger = calLogger
+    ExtCal.setExtCalendarLogger(calLogger)
+
+    sDir = tempfile.mkdtemp(prefix="ExtCalendarEngineBenchmark_")
+    ExtCal.EXT_CALENDAR_CACHE_DB = os.path.join(sDir, "ExtCalendarCache.db")
+
+    try:
+        random.seed(args.seed)
+        lstDriverConfigRecs = createConfigRecs(args.nof_jobs, False)
+        lstConfigRecs = createConfigRecs(args.nof_jobs, True)
+        bConfigFile = "\n".join(lstConfigRecs).encode("utf-8")
+
+        print(f"{args.nof_jobs} jobs x {len(args.years)} years")
+        print(f"{'calendar build':>24} {'secs':>10} {'records':>10}")
+
+        def timeIt(sName, fnBuild):
+            fStart = time.monotonic()
+            dictCalendars = fnBuild()
+            fElapsed = time.monotonic() - fStart
+            print(f"{sName:>24} {fElapsed:>10.4f} {sum(len(lstRecs) for lstRecs in dictCalendars.values()):>10}")
+            return dictCalendars
+
+        #############################################################
+        # Driver functions vs engine (rules the driver supports)
+        #############################################################
+        dictDriverCalendars = timeIt("driver functions", lambda: {iYYYY: buildCalendarWithDriverFunctions(lstDriverConfigRecs, iYYYY) for iYYYY in args.years})
+
+        ExtCal.buildYearDateTable.cache_clear()
+        dictEngineCalendars = timeIt("engine (same rules)", lambda: {iYYYY: ExtCal.buildRunExtCalendar(lstDriverConfigRecs, iYYYY) for iYYYY in args.years})
+
+        for iYYYY in args.years:
+            # buildWkCal4Yr stops after 365 days --> no weekly Dec 31 records in leap years
+            lstEngineRecs = [sRec for sRec in dictEngineCalendars[iYYYY] if not (calendar.isleap(iYYYY) and sRec.startswith(f"{iYYYY}-12-31") and sRec.split("|")[4] == "W")]
+
+            if lstEngineRecs != dictDriverCalendars[iYYYY]:
+                print(f"{iYYYY}: engine calendar records are not identical to driver function calendar records")
+                sys.exit(12)
+
+        #############################################################
+        # Engine with all rules: no cache, cache build, cache hit
+        #############################################################
+        ExtCal.buildYearDateTable.cache_clear()
+        dictCalendars = timeIt("engine", lambda: ExtCal.getRunExtCalendars(bConfigFile, args.years, bUseCache=False))
+        dictCachedCalendars = timeIt("engine + cache (build)", lambda: ExtCal.getRunExtCalendars(bConfigFile, args.years))
+        dictCachedCalendars2 = timeIt("engine + cache (hit)", lambda: ExtCal.getRunExtCalendars(bConfigFile, args.years))
+
+        if not dictCalendars == dictCachedCalendars == dictCachedCalendars2:
+            print("cached calendar records are not identical to calendar records")
+            sys.exit(12)
+
+    finally:
+        shutil.rmtree(sDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+
+    main()
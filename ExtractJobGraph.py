@@ -0,0 +1,516 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  ExtractJobGraph.py
+#
+# Desc: Declarative job graph (DAG) runner for multi-claim-type extract drivers.
+#
+#       Driver scripts like RAND_FFS_PTA_Driver.sh, PAC_QTR_Extract.sh, SRTR_*_Driver.sh and
+#       SAF_ENC_INP_SNF_Extract.sh run independent extracts one after another. This module runs
+#       the same steps from a JSON (or YAML) spec of nodes with dependencies:
+#
+#         - bounded worker pool (max_workers)
+#         - per-node retries with back-off
+#         - concurrency cap per Snowflake warehouse (warehouse_limits)
+#         - downstream nodes are skipped when a dependency fails (see run_if)
+#         - critical-path timing report written to the log at the end of the run
+#
+#       Wall-clock time per run drops to roughly the longest branch instead of the sum of all steps.
+#
+# Execute as ExtractJobGraph.sh $1 [--env KEY=VALUE ...]   (sources SET_XTR_ENV.sh, then runs ExtractJobGraph.py)
+#
+#       $1 = job graph spec file (.json, .yaml or .yml)
+#
+# Ex.    ExtractJobGraph.sh RAND_FFS_PTA_JobGraph.json
+# Ex.    ExtractJobGraph.sh PAC_QTR_JobGraph.json --env FYQ=2026Q1
+#
+# Spec format:
+#
+#   {
+#     "name": "RAND_FFS_PTA",
+#     "max_workers": 5,
+#     "warehouse_limits": {"${sf_xtr_warehouse}": 3},
+#     "env": {"KEY": "value"},
+#     "nodes": [
+#       {"id": "INP", "type": "extract", "script": "RAND_FFS_PTA_INP.sh", "warehouse": "${sf_xtr_warehouse}", "retries": 1},
+#       {"id": "EFT", "type": "eft", "folder": "RAND_FFS/", "depends_on": ["INP"]},
+#       {"id": "Failed", "type": "email", "depends_on": ["INP", "EFT"], "run_if": "any_failed",
+#        "sender": "${CMS_EMAIL_SENDER}", "receivers": "${ENIGMA_EMAIL_FAILURE_RECIPIENT}", "subject": "...", "message": "..."}
+#     ]
+#   }
+#
+#   Node types:
+#       extract  : script (.sh or .py), args (optional list)
+#       combine  : bucket_folder, filename                       --> CombineS3Files.sh
+#       eft      : folder, dest_folder (optional)                --> ProcessFiles2EFT.py
+#       manifest : bucket, s3folder, run_token, box_emails       --> CreateManifestFileDriver.py
+#       email    : sender, receivers, subject, message           --> sendEmail.py
+#       command  : cmd (list)
+#
+#   Common node keys:
+#       depends_on  : list of node ids. Shell-style wildcards are allowed (ex. "PAC_*_CLMS").
+#       run_if      : "all_success" (default), "any_failed" or "always"
+#       retries     : NOF retries after the first attempt (default 0)
+#       retry_delay : seconds before first retry; doubles for each retry (default 30)
+#       warehouse   : Snowflake warehouse the node uses (for warehouse_limits)
+#       env         : environment variables for the node
+#       matrix      : {"KEY": [values], ...} --> one node per combination. "{KEY}" is replaced in all node strings.
+#       exclude     : list of matrix combinations to skip. Ex. [{"SETTING": "HOSP", "TBL": "PC"}]
+#       parm_file   : {"path": ..., "fields": [...], "delimiter": ","} --> one node per parm file record (like matrix).
+#
+#   "${VAR}" in any string is replaced by environment variables or SET_XTR_ENV constants. Email senders/recipients and
+#   sf_xtr_warehouse are defined only in SET_XTR_ENV.sh --> run the graph with ExtractJobGraph.sh. The spec is not
+#   run when a "${VAR}" is not defined.
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+# 2026-10-18 loadJobGraph fails when a "${VAR}" of the spec is not defined. Added ExtractJobGraph.sh (sources SET_XTR_ENV.sh).
+# 2026-10-18 Resolve a relative --spec path before chdir to RUNDIR.
+#            "${VAR}" in dict keys (warehouse_limits) is replaced.
+########################################################################################################
+import os
+import sys
+import re
+import json
+import time
+import argparse
+import itertools
+import fnmatch
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+LOG_DIR = "/app/IDRC/XTR/CMS/logs/"
+RUNDIR = "/app/IDRC/XTR/CMS/scripts/run/"
+
+PYTHON_COMMAND = os.getenv("PYTHON_COMMAND", "python3")
+
+# Node status values
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+SKIPPED = "SKIPPED"
+
+reVAR = re.compile(r"\$\{(\w+)\}")
+
+
+class JobGraphSpecError(Exception):
+    "Job graph specification is not valid"
+
+
+#############################################################
+# Classes
+#############################################################
+class JobNode:
+
+    def __init__(self, dictNode):
+
+        self.id = dictNode["id"]
+        self.type = dictNode.get("type", "command")
+        self.spec = dictNode
+        self.depends_on = []
+        self.run_if = dictNode.get("run_if", "all_success")
+        self.retries = int(dictNode.get("retries", 0))
+        self.retry_delay = float(dictNode.get("retry_delay", 30))
+        self.warehouse = dictNode.get("warehouse")
+        self.env = {sKey: str(sValue) for sKey, sValue in dictNode.get("env", {}).items()}
+
+        self.status = PENDING
+        self.attempts = 0
+        self.start = None
+        self.end = None
+        self.returncode = None
+
+    @property
+    def elapsed(self):
+        return (self.end - self.start) if self.start is not None and self.end is not None else 0.0
+
+    def buildCommand(self):
+
+        dictSpec = self.spec
+
+        if self.type == "extract":
+            sScript = dictSpec["script"]
+            lstInterp = ["bash"] if sScript.endswith(".sh") else [PYTHON_COMMAND]
+            return lstInterp + [sScript] + [str(arg) for arg in dictSpec.get("args", [])]
+
+        elif self.type == "combine":
+            return ["bash", "CombineS3Files.sh", dictSpec["bucket_folder"], dictSpec["filename"]]
+
+        elif self.type == "eft":
+            return [PYTHON_COMMAND, "ProcessFiles2EFT.py", dictSpec["folder"]] + ([dictSpec["dest_folder"]] if dictSpec.get("dest_folder") else [])
+
+        elif self.type == "manifest":
+            return [PYTHON_COMMAND, "CreateManifestFileDriver.py", "--bucket", dictSpec["bucket"], "--s3folder", dictSpec["s3folder"],
+                    "--runToken", dictSpec["run_token"], "--BoxEmails", dictSpec["box_emails"]]
+
+        elif self.type == "email":
+            return [PYTHON_COMMAND, "sendEmail.py", dictSpec["sender"], dictSpec["receivers"], dictSpec["subject"], dictSpec["message"]]
+
+        elif self.type == "command":
+            return [str(arg) for arg in dictSpec["cmd"]]
+
+        raise JobGraphSpecError(f"Node {self.id} has unknown type {self.type}")
+
+
+#############################################################
+# Functions
+#############################################################
+def _substitute(obj, dictVars, setUnresolved):
+
+    # Recursively replace "${VAR}" in strings and dict keys (ex. warehouse_limits)
+    # Unknown variables are left as-is and added to setUnresolved
+    def replaceVar(m):
+        if m.group(1) not in dictVars:
+            setUnresolved.add(m.group(1))
+            return m.group(0)
+        return str(dictVars[m.group(1)])
+
+    if isinstance(obj, str):
+        return reVAR.sub(replaceVar, obj)
+    elif isinstance(obj, list):
+        return [_substitute(item, dictVars, setUnresolved) for item in obj]
+    elif isinstance(obj, dict):
+        return {_substitute(sKey, dictVars, setUnresolved): _substitute(value, dictVars, setUnresolved) for sKey, value in obj.items()}
+
+    return obj
+
+
+def _replaceMatrixKeys(obj, dictCombo):
+
+    if isinstance(obj, str):
+        for sKey, sValue in dictCombo.items():
+            obj = obj.replace(f"{{{sKey}}}", str(sValue))
+        return obj
+    elif isinstance(obj, list):
+        return [_replaceMatrixKeys(item, dictCombo) for item in obj]
+    elif isinstance(obj, dict):
+        return {sKey: _replaceMatrixKeys(value, dictCombo) for sKey, value in obj.items()}
+
+    return obj
+
+
+def _expandNode(dictNode):
+
+    ############################################################
+    # matrix/parm_file nodes --> one node per combination/record
+    ############################################################
+    lstCombos = None
+
+    if "matrix" in dictNode:
+        dictMatrix = dictNode["matrix"]
+        lstKeys = list(dictMatrix.keys())
+        lstCombos = [dict(zip(lstKeys, tupValues)) for tupValues in itertools.product(*(dictMatrix[sKey] for sKey in lstKeys))]
+
+        lstExclude = dictNode.get("exclude", [])
+        lstCombos = [dictCombo for dictCombo in lstCombos
+                     if not any(all(dictCombo.get(sKey) == sValue for sKey, sValue in dictExcl.items()) for dictExcl in lstExclude)]
+
+    elif "parm_file" in dictNode:
+        dictParm = dictNode["parm_file"]
+        sDelim = dictParm.get("delimiter", ",")
+        lstFields = dictParm["fields"]
+
+        with open(dictParm["path"], "r", encoding="utf-8") as f:
+            lstCombos = [dict(zip(lstFields, [sField.strip() for sField in sRec.strip().split(sDelim)]))
+                         for sRec in f if sRec.strip() != ""]
+
+    if lstCombos is None:
+        return [dictNode]
+
+    lstNodes = []
+    for dictCombo in lstCombos:
+        dictTemplate = {sKey: value for sKey, value in dictNode.items() if sKey not in ("matrix", "exclude", "parm_file")}
+        dictNew = _replaceMatrixKeys(dictTemplate, dictCombo)
+        # matrix values are also available to the node as environment variables
+        dictNew["env"] = {**dictCombo, **dictNew.get("env", {})}
+        lstNodes.append(dictNew)
+
+    return lstNodes
+
+
+def loadJobGraph(sSpecFile, dictVars):
+
+    with open(sSpecFile, "r", encoding="utf-8") as f:
+        if sSpecFile.endswith((".yaml", ".yml")):
+            import yaml
+            dictSpec = yaml.safe_load(f)
+        else:
+            dictSpec = json.load(f)
+
+    setUnresolved = set()
+    dictSpec = _substitute(dictSpec, {**dictVars, **{sKey: str(v) for sKey, v in dictSpec.get("env", {}).items()}}, setUnresolved)
+
+    # ex. email recipients/warehouse defined only in SET_XTR_ENV.sh --> run with ExtractJobGraph.sh
+    if setUnresolved:
+        raise JobGraphSpecError(f"Job graph spec {sSpecFile} has undefined variables: {', '.join(sorted(setUnresolved))}. "
+                                "Run the job graph with ExtractJobGraph.sh (sources SET_XTR_ENV.sh) or pass them with --env.")
+
+    lstNodes = [JobNode(dictNode) for dictRawNode in dictSpec["nodes"] for dictNode in _expandNode(dictRawNode)]
+    dictNodes = {}
+    for node in lstNodes:
+        if node.id in dictNodes:
+            raise JobGraphSpecError(f"Duplicate node id {node.id}")
+        dictNodes[node.id] = node
+
+    ############################################################
+    # resolve dependency wildcards
+    ############################################################
+    for node in lstNodes:
+        lstDeps = []
+        for sPattern in node.spec.get("depends_on", []):
+            lstMatches = [sId for sId in dictNodes if sId != node.id and fnmatch.fnmatchcase(sId, sPattern)]
+            if not lstMatches:
+                raise JobGraphSpecError(f"Node {node.id} depends on {sPattern} which matches no nodes")
+            lstDeps.extend(sId for sId in lstMatches if sId not in lstDeps)
+        node.depends_on = lstDeps
+
+    _verifyAcyclic(dictNodes)
+
+    return dictSpec, dictNodes
+
+
+def _verifyAcyclic(dictNodes):
+
+    dictState = {}
+
+    def visit(sId, lstPath):
+        if dictState.get(sId) == "done":
+            return
+        if dictState.get(sId) == "visiting":
+            raise JobGraphSpecError(f"Job graph has a cycle: {' -> '.join(lstPath + [sId])}")
+        dictState[sId] = "visiting"
+        for sDep in dictNodes[sId].depends_on:
+            visit(sDep, lstPath + [sId])
+        dictState[sId] = "done"
+
+    for sId in dictNodes:
+        visit(sId, [])
+
+
+def _runNode(node, dictBaseEnv, logger):
+
+    lstCmd = node.buildCommand()
+    dictEnv = {**dictBaseEnv, **node.env}
+
+    node.start = time.monotonic()
+
+    while True:
+        node.attempts += 1
+        logger.info(f"Node {node.id} attempt {node.attempts}: {' '.join(lstCmd)}")
+
+        sp_info = subprocess.run(lstCmd, capture_output=True, text=True, env=dictEnv)
+        node.returncode = sp_info.returncode
+
+        # Send stdout/stderr to log using "%\n%s" to ensure output is broken by newlines
+        logger.info("Node %s output:\n%s%s", node.id, sp_info.stdout, sp_info.stderr)
+        logger.info(f"Node {node.id} {sp_info.returncode=}")
+
+        if sp_info.returncode == 0 or node.attempts > node.retries:
+            break
+
+        fDelay = node.retry_delay * (2 ** (node.attempts - 1))
+        logger.info(f"Node {node.id} failed. Retrying in {fDelay:.0f} secs.")
+        time.sleep(fDelay)
+
+    node.end = time.monotonic()
+
+    return node.returncode == 0
+
+
+def _isRunnable(node, dictNodes):
+
+    lstDepStatus = [dictNodes[sDep].status for sDep in node.depends_on]
+
+    if any(sStatus in (PENDING, RUNNING) for sStatus in lstDepStatus):
+        return None
+
+    bAllSucceeded = all(sStatus == SUCCEEDED for sStatus in lstDepStatus)
+
+    if node.run_if == "always":
+        return True
+    elif node.run_if == "any_failed":
+        return not bAllSucceeded
+
+    return bAllSucceeded
+
+
+def runJobGraph(dictSpec, dictNodes, logger, dictBaseEnv=None):
+    """ Runs all nodes. Returns True if no node failed. """
+
+    dictBaseEnv = dict(os.environ) if dictBaseEnv is None else dictBaseEnv
+    iMaxWorkers = int(dictSpec.get("max_workers", 4))
+    dictWhseLimits = {sWhse.upper(): int(iLimit) for sWhse, iLimit in dictSpec.get("warehouse_limits", {}).items()}
+    dictWhseRunning = {}
+
+    fRunStart = time.monotonic()
+    dictFutures = {}
+
+    logger.info(f"Running job graph {dictSpec.get('name', '')} with {len(dictNodes)} nodes and {iMaxWorkers} workers")
+
+    with ThreadPoolExecutor(max_workers=iMaxWorkers) as pool:
+
+        while True:
+            ##################################################
+            # Submit every node whose dependencies are done
+            ##################################################
+            for node in dictNodes.values():
+                if node.status != PENDING:
+                    continue
+
+                bRunnable = _isRunnable(node, dictNodes)
+                if bRunnable is None:
+                    continue
+
+                if bRunnable is False:
+                    node.status = SKIPPED
+                    logger.info(f"Node {node.id} skipped (run_if={node.run_if})")
+                    continue
+
+                sWhse = (node.warehouse or "").upper()
+                if sWhse in dictWhseLimits and dictWhseRunning.get(sWhse, 0) >= dictWhseLimits[sWhse]:
+                    continue
+
+                if len(dictFutures) >= iMaxWorkers:
+                    break
+
+                node.status = RUNNING
+                dictWhseRunning[sWhse] = dictWhseRunning.get(sWhse, 0) + 1
+                dictFutures[pool.submit(_runNode, node, dictBaseEnv, logger)] = node
+
+            if not dictFutures:
+                break
+
+            ##################################################
+            # Wait for a running node to finish
+            ##################################################
+            setDone, _ = wait(dictFutures.keys(), return_when=FIRST_COMPLETED)
+
+            for future in setDone:
+                node = dictFutures.pop(future)
+                sWhse = (node.warehouse or "").upper()
+                dictWhseRunning[sWhse] -= 1
+
+                try:
+                    bOK = future.result()
+                except Exception as e:
+                    logger.error(f"Node {node.id} raised an exception: {e}")
+                    node.end = time.monotonic()
+                    bOK = False
+
+                node.status = SUCCEEDED if bOK else FAILED
+                logger.info(f"Node {node.id} {node.status} in {node.elapsed:.1f} secs")
+
+    fWallClock = time.monotonic() - fRunStart
+    logger.info(buildTimingReport(dictNodes, fRunStart, fWallClock))
+
+    return not any(node.status == FAILED for node in dictNodes.values())
+
+
+def buildTimingReport(dictNodes, fRunStart, fWallClock):
+
+    lstLines = ["", "Job graph timing report:",
+                f"{'Node':<40} {'Status':<10} {'Tries':>5} {'Start':>10} {'Secs':>10}"]
+
+    lstRan = sorted((node for node in dictNodes.values() if node.start is not None), key=lambda node: node.start)
+    for node in lstRan:
+        lstLines.append(f"{node.id:<40} {node.status:<10} {node.attempts:>5} {node.start - fRunStart:>10.1f} {node.elapsed:>10.1f}")
+
+    for node in dictNodes.values():
+        if node.start is None:
+            lstLines.append(f"{node.id:<40} {node.status:<10} {0:>5} {'':>10} {'':>10}")
+
+    ##################################################
+    # Critical path: walk back from the last node to finish
+    # through the dependency that finished last.
+    ##################################################
+    lstCritical = []
+    lstEnded = [node for node in lstRan if node.end is not None]
+    if lstEnded:
+        node = max(lstEnded, key=lambda n: n.end)
+        while node is not None:
+            lstCritical.append(node)
+            lstDepsRan = [dictNodes[sDep] for sDep in node.depends_on if dictNodes[sDep].end is not None]
+            node = max(lstDepsRan, key=lambda n: n.end) if lstDepsRan else None
+
+    fSumSecs = sum(node.elapsed for node in lstRan)
+
+    lstLines.append("")
+    lstLines.append("Critical path: " + " -> ".join(f"{node.id} ({node.elapsed:.1f}s)" for node in reversed(lstCritical)))
+    lstLines.append(f"Critical path secs: {sum(node.elapsed for node in lstCritical):.1f}")
+    lstLines.append(f"Wall clock secs:    {fWallClock:.1f}")
+    lstLines.append(f"Sum of node secs:   {fSumSecs:.1f}")
+    if fWallClock > 0:
+        lstLines.append(f"Parallel speed-up:  {fSumSecs / fWallClock:.2f}x")
+
+    return "\n".join(lstLines) + "\n"
+
+
+def _getSubstitutionVars():
+
+    # SET_XTR_ENV constants (bucket folders, email recipients) plus environment variables
+    dictVars = {}
+
+    try:
+        import SET_XTR_ENV
+        dictVars.update({sKey: value for sKey, value in vars(SET_XTR_ENV).items() if not sKey.startswith("_") and isinstance(value, str)})
+    except (ImportError, SystemExit):
+        pass
+
+    dictVars.update(os.environ)
+
+    return dictVars
+
+
+def main_processing_loop():
+
+    import LoggerStandard as EnigmaLog
+
+    parser = argparse.ArgumentParser(description="Run extract job graph")
+    parser.add_argument("spec", help="job graph spec file (.json/.yaml)")
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE environment variable for all nodes")
+    args = parser.parse_args()
+
+    for sKeyValue in args.env:
+        sKey, sValue = sKeyValue.split("=", 1)
+        os.environ[sKey] = sValue
+
+    TMSTMP = os.getenv("TMSTMP", datetime.now().strftime('%Y%m%d.%H%M%S'))
+    os.environ["TMSTMP"] = TMSTMP
+
+    # spec path relative to the caller's directory (resolved before chdir to RUNDIR)
+    sSpecFile = os.path.abspath(args.spec)
+
+    sGraphName = os.path.basename(sSpecFile).split(".")[0]
+    LOGNAME = f"{LOG_DIR}{sGraphName}_{TMSTMP}.log"
+
+    rootLogger = EnigmaLog.setLogging(LOGNAME)
+    rootLogger.info(f"\nExtractJobGraph.py started at {TMSTMP}")
+    rootLogger.info(f"{sSpecFile=}")
+
+    try:
+        if os.path.isdir(RUNDIR):
+            os.chdir(RUNDIR)
+
+        dictSpec, dictNodes = loadJobGraph(sSpecFile, _getSubstitutionVars())
+        bOK = runJobGraph(dictSpec, dictNodes, rootLogger)
+
+    except Exception as e:
+        rootLogger.error("Exception occured in ExtractJobGraph.py.")
+        rootLogger.error("\n%s", str(e))
+        sys.exit(12)
+
+    if not bOK:
+        rootLogger.info("ExtractJobGraph.py completed with failed nodes.")
+        sys.exit(12)
+
+    # Need these messages for Dashboard
+    rootLogger.info("ExtractJobGraph.py completed successfully.")
+    rootLogger.info(f"\nEnded at {TMSTMP}")
+
+
+if __name__ == "__main__":
+
+    main_processing_loop()
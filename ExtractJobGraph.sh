@@ -0,0 +1,38 @@
+#!/usr/bin/sh
+#
+######################################################################################
+# Name: ExtractJobGraph.sh
+# Desc: Run a job graph spec with ExtractJobGraph.py. SET_XTR_ENV.sh is sourced first so that
+#       "${VAR}" values of the spec defined only in SET_XTR_ENV.sh are resolved
+#       (ex. ${RAND_FFS_EMAIL_SENDER}, ${PAC_EMAIL_SENDER}, ${sf_xtr_warehouse}).
+#
+# Execute as ./ExtractJobGraph.sh $1 [--env KEY=VALUE ...]
+#
+# $1 = job graph spec file    Ex1: RAND_FFS_PTA_JobGraph.json
+#                             Ex2: PAC_QTR_JobGraph.json --env FYQ=2026Q1
+#
+# Modified: 
+# 
+# 2026-10-18 Created script.
+######################################################################################
+
+######################################################################################
+set +x
+
+TMSTMP=${TMSTMP:=`date +%Y%m%d.%H%M%S`}
+export TMSTMP
+RUNDIR=/app/IDRC/XTR/CMS/scripts/run/
+
+#############################################################
+# THIS ONE SCRIPT SETS ALL DATABASE NAMES VARIABLES 
+#############################################################
+source ${RUNDIR}SET_XTR_ENV.sh > /dev/null
+
+#############################################################
+# ExtractJobGraph.py writes its own log file
+#############################################################
+${PYTHON_COMMAND:-python3} ${RUNDIR}ExtractJobGraph.py "$@"
+
+RET_STATUS=$?
+
+exit $RET_STATUS
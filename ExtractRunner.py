@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  ExtractRunner.py
+#
+# Desc: In-process extract runner for python drivers.
+#
+#       Drivers traditionally run each step as its own process:
+#           subprocess.run(['python3', 'X_Extract.py'])       --> interpreter start, imports, Snowflake logon
+#           subprocess.run(['bash', 'CombineS3Files.sh', ..])  --> interpreter start, imports
+#           subprocess.run(['python3', 'sendEmail.py', ..])    --> interpreter start, imports
+#           subprocess.run(['bash', 'ProcessFiles2EFT.sh', ..])--> interpreter start, imports
+#
+#       This module runs those same steps inside the driver's process:
+#           run_extract(module, params)  --> calls the extract module's run(con, dictParams) with an injected
+#                                            Snowflake connection (one logon for all extracts of the driver)
+#                                            and returns an ExtractResult with the files, rows and bytes
+#                                            unloaded by its COPY INTO statements.
+#           combine_files()              --> CombineS3FilesDriver.combineS3Files
+#           send_notification()          --> CommonFunctions.sendEmail
+#           process_files_2_eft()        --> ProcessFiles2EFT.main_processing_loop
+#
+#       An extract module has a run(con, dictParams) entry point that executes its SQL with execute_sql()
+#       (statement errors are raised; no sys.exit) and returns the run metrics records of its statements.
+#       Importing the module has no side effects; the module's __main__ block (stand-alone run or
+#       subprocess) logs on with snowconvert_helpers.log_on() and calls run(con, os.environ).
+#
+#       The shared connection is opened with snowconvert_helpers.log_on() (warm session from SFSessionBroker
+#       when the broker is running). The atexit handler and sys.excepthook that importing snowconvert_helpers
+#       installs are removed so the driver keeps its own exit handling.
+#
+#       Every step is timed. timing_report() returns a per-stage table (including the one-time cold-start
+#       cost of the Snowflake logon) that drivers write to their log.
+#
+# Usage:
+#       import ExtractRunner as ExtRunner
+#
+#       ExtRunner.setRunnerLogger(rootLogger)
+#       result = ExtRunner.run_extract("HCPP_Extract", {"CONTRACT_NUM": "H3503", "EXT_YR": "2018", ...})
+#       ...
+#       rootLogger.info(ExtRunner.timing_report())
+#       ExtRunner.close_connection()
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+# 2026-10-18 Keep the driver's run metrics file (RUN_METRICS_FILE) when ProcessFiles2EFT establishes its own log in-process.
+# 2026-10-18 Run each extract script in a worker process (python3 X.py) instead of runpy in the driver's process:
+#            snowconvert_helpers atexit/excepthook/sys.exit stay in the worker and concurrent runs do not share
+#            redirected stdout. COPY INTO files and counts come from the worker's run metrics records.
+# 2026-10-18 Run extracts in-process again thru their run(con, dictParams) entry point with an injected (shared)
+#            connection; execute_sql() executes an extract's statements. The worker process runner is removed.
+########################################################################################################
+import os
+import sys
+import time
+import atexit
+import importlib
+from datetime import datetime
+
+import RunMetrics
+
+
+########################################################################################################
+# CONSTANTS
+########################################################################################################
+# shared Snowflake connection for all extracts run in this process
+_con = None
+
+# list of (stage name, elapsed seconds)
+_lstStageTimings = []
+
+# return code of an extract that failed (same as the extract scripts' sys.exit(12))
+EXTRACT_FAILED_RC = 12
+
+rootLogger = None
+
+
+########################################################################################################
+# Classes
+########################################################################################################
+class ExtractResult:
+    """ Structured result of one extract run. """
+
+    def __init__(self, sModule):
+
+        self.module = sModule
+        self.returncode = 0
+        self.files = []          # list of dicts: filename, rows, input_bytes, output_bytes
+        self.output = ""         # error message when the extract failed
+        self.elapsed_secs = 0.0
+
+    @property
+    def rows(self):
+        return sum(dictFile["rows"] for dictFile in self.files)
+
+    @property
+    def bytes(self):
+        return sum(dictFile["output_bytes"] for dictFile in self.files)
+
+    def __repr__(self):
+        return f"ExtractResult(module={self.module}, returncode={self.returncode}, files={len(self.files)}, rows={self.rows}, bytes={self.bytes}, secs={self.elapsed_secs:.2f})"
+
+
+########################################################################################################
+# Functions
+########################################################################################################
+def setRunnerLogger(pRootLogger):
+
+    # Pass the logger once instead of for each function
+    global rootLogger
+    rootLogger = pRootLogger
+
+
+def _log(sMsg):
+
+    if rootLogger is not None:
+        rootLogger.info(sMsg)
+    else:
+        print(sMsg)
+
+
+def log(sMsg):
+    """Writes sMsg to the driver's log (stdout when the extract runs stand-alone)."""
+    _log(sMsg)
+
+
+def _record_stage(sStage, fStart):
+
+    fElapsed = time.monotonic() - fStart
+    _lstStageTimings.append((sStage, fElapsed))
+    _log(f"Stage {sStage} completed in {fElapsed:.3f} secs")
+
+    return fElapsed
+
+
+def _log_on():
+
+    ######################################################
+    # snowconvert_helpers.log_on() in the driver's process.
+    # Importing snowconvert_helpers registers an atexit
+    # handler and replaces sys.excepthook --> removed; the
+    # driver keeps its own exit handling.
+    ######################################################
+    bImported = "snowconvert_helpers" in sys.modules
+    excepthook = sys.excepthook
+
+    import snowconvert_helpers
+
+    if not bImported:
+        sys.excepthook = excepthook
+        atexit.unregister(snowconvert_helpers.at_exit_helpers)
+
+    try:
+        return snowconvert_helpers.log_on()
+
+    except SystemExit as e:
+        # log_on() calls quit_application() when the environment/AWS role is not valid
+        raise Exception(f"Snowflake logon failed with return code {e.code}")
+
+
+def get_connection():
+
+    global _con
+
+    if _con is not None and not _con.is_closed():
+        return _con
+
+    # cold start: Snowflake logon (or warm session from SFSessionBroker) once per process
+    fStart = time.monotonic()
+    _con = _log_on()
+    _record_stage("cold start: Snowflake logon", fStart)
+
+    return _con
+
+
+def close_connection():
+
+    global _con
+
+    if _con is not None and not _con.is_closed():
+        _con.close()
+
+    _con = None
+
+
+def execute_sql(con, sSQL, lstBinds=None, sScript=None):
+    """
+    Executes one SQL statement of an extract's run(con, dictParams).
+
+    Parameters:
+      con      : Snowflake connection (snowflake.connector connection or SFSessionBroker.BrokerConnection)
+      sSQL     : SQL statement. Request values are "?" bind variables.
+      lstBinds : values of the "?" bind variables
+      sScript  : extract script name for the run metrics record
+
+    Returns:
+      run metrics record of the statement (COPY INTO @stage: filename, rows_unloaded, input_bytes, output_bytes).
+      Raises the Snowflake error when the statement fails.
+    """
+    sExecSQL = sSQL
+    if lstBinds and getattr(con, "is_pyformat", True):
+        # pyformat connections bind on the client: "%" in the SQL text is escaped and "?" --> "%s"
+        sExecSQL = sSQL.replace("%", "%%").replace("?", "%s")
+
+    # same lines as execute_sql_statement (log scanners use "Executing: COPY INTO")
+    _log(f"\nExecuting: {sSQL}.")
+    if lstBinds:
+        _log(f"Bind values: {list(lstBinds)}")
+
+    # capture COPY INTO @stage result rows (rows_unloaded, input_bytes, output_bytes)
+    lstResultRows = [] if RunMetrics.getCopyIntoTarget(sSQL)[0] is not None else None
+
+    bSuccess = False
+    dttmStart = datetime.now()
+    cur = con.cursor()
+
+    try:
+        cur.execute(sExecSQL, params=list(lstBinds) if lstBinds else None)
+
+        if lstResultRows is not None and cur.description:
+            lstColumns = [col[0].lower() for col in cur.description]
+            for row in cur.fetchall():
+                lstResultRows.append(dict(zip(lstColumns, row)))
+                _log(f"\n{','.join(lstColumns)}\n{','.join(str(val) for val in row)}")
+
+        bSuccess = True
+
+    finally:
+        dttmEnd = datetime.now()
+        _log(f"Query Execution Time for Query ID {cur.sfqid} is {dttmEnd - dttmStart}")
+
+        dictRecord = RunMetrics.buildStatementRecord(sSQL, cur.sfqid, dttmStart, dttmEnd, bSuccess, lstResultRows)
+        if sScript is not None:
+            dictRecord["script"] = sScript
+        RunMetrics.writeRunMetricsRecord(dictRecord)
+
+        cur.close()
+
+    return dictRecord
+
+
+def run_extract(sModule, dictParams=None, con=None):
+    """
+    Runs extract sModule (ex. "HCPP_Extract" or "HCPP_Extract.py") in this process.
+
+    Parameters:
+      sModule    : extract module name. The module must have a run(con, dictParams) function.
+      dictParams : extract parameters (ex. CONTRACT_NUM, EXT_YR, TMSTMP). Values not in dictParams are
+                   taken from the environment (ex. ENVNAME, sf_xtr_warehouse).
+      con        : optional Snowflake connection. Default is the runner's shared connection.
+
+    Returns:
+      ExtractResult. result.returncode is 0 when the extract completed successfully.
+    """
+    sModuleName = sModule[:-3] if sModule.endswith(".py") else sModule
+    result = ExtractResult(sModuleName)
+
+    dictRunParams = dict(os.environ)
+    for sKey, sValue in (dictParams or {}).items():
+        dictRunParams[sKey] = str(sValue)
+
+    try:
+        extModule = importlib.import_module(sModuleName)
+
+        if con is None:
+            con = get_connection()
+
+    except Exception as e:
+        _log(f"Could not start extract {sModuleName}.py: {e}")
+        result.returncode = EXTRACT_FAILED_RC
+        result.output = str(e)
+        return result
+
+    _log(f"Start in-process execution of {sModuleName}.py")
+
+    fStart = time.monotonic()
+
+    try:
+        lstRecords = extModule.run(con, dictRunParams)
+
+        result.files = [{"filename": sFilename, "rows": iRows, "input_bytes": iInputBytes, "output_bytes": iOutputBytes}
+                        for sFilename, iRows, iInputBytes, iOutputBytes in RunMetrics.getCopyIntoFilesAndCounts(lstRecords)]
+
+    except Exception as e:
+        _log(f"{sModuleName}.py failed: {e}")
+        result.returncode = EXTRACT_FAILED_RC
+        result.output = str(e)
+
+    result.elapsed_secs = _record_stage(f"extract {result.module}", fStart)
+
+    _log(f"{result}")
+
+    return result
+
+
+def combine_files(s3BucketAndFldr, s3CombinedFilename):
+
+    import CombineS3FilesDriver as CombineS3FilesDr
+    from CommonFunctions import setCommonFunctionLogger
+
+    fStart = time.monotonic()
+
+    CombineS3FilesDr.combineS3Files(s3BucketAndFldr=s3BucketAndFldr, s3CombinedFilename=s3CombinedFilename)
+
+    # switch common functions module back to the caller's logger
+    if rootLogger is not None:
+        setCommonFunctionLogger(rootLogger)
+
+    _record_stage(f"combine {s3CombinedFilename}", fStart)
+
+
+def send_notification(sender, receivers, SUBJECT, MSG):
+
+    from CommonFunctions import sendEmail, setCommonFunctionLogger
+
+    fStart = time.monotonic()
+
+    if rootLogger is not None:
+        setCommonFunctionLogger(rootLogger)
+
+    sendEmail(sender, receivers, SUBJECT, MSG)
+
+    _record_stage("notify", fStart)
+
+
+def process_files_2_eft(S3ParmExtractFolder, S3ParmEFTDestFolder=None):
+
+    import ProcessFiles2EFT
+    from CommonFunctions import setCommonFunctionLogger
+
+    fStart = time.monotonic()
+
+    # ProcessFiles2EFT.py sets up its own log (and run metrics file); keep the driver's
+    sRunMetricsFile = os.environ.get(RunMetrics.RUN_METRICS_ENV)
+
+    try:
+        ProcessFiles2EFT.main_processing_loop(S3ParmExtractFolder, S3ParmEFTDestFolder)
+
+    except SystemExit as e:
+        # ProcessFiles2EFT exits with 0 when there are no files to EFT
+        if e.code not in (0, None):
+            raise Exception(f"ProcessFiles2EFT.py failed with return code {e.code}")
+
+    finally:
+        if rootLogger is not None:
+            setCommonFunctionLogger(rootLogger)
+
+        if sRunMetricsFile is not None:
+            os.environ[RunMetrics.RUN_METRICS_ENV] = sRunMetricsFile
+
+    _record_stage("EFT", fStart)
+
+
+def timing_report():
+
+    fTotal = sum(fSecs for _, fSecs in _lstStageTimings)
+
+    lstLines = ["", "Extract runner stage timings:", f"{'Stage':<70} {'Secs':>10}"]
+    lstLines.extend(f"{sStage:<70} {fSecs:>10.3f}" for sStage, fSecs in _lstStageTimings)
+    lstLines.append(f"{'Total':<70} {fTotal:>10.3f}")
+
+    return "\n".join(lstLines) + "\n"
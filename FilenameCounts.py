@@ -10,21 +10,23 @@
 # Paul Baranoski 2025-07-15 Create python version of shell script
 # Paul Baranoski 2026-03-23 Removed ending '$' in regular expression to get COPY_INTO_FILENAMES. Some 
 #                           python modules (PECOS) had spaces after the COPY_INTO statement which caused reg expr to not find the line.
+# 2026-10-18                Get filenames and counts from the run metrics file (RunMetrics.py) written by execute_sql_statement.
+#                           Scan the log file only when the run has no metrics file.
 #############################################################################################################
 import re
 import os
 
+import RunMetrics
+
 
 #############################################################
 # Functions
 #############################################################
-def getExtractFilenamesAndCounts(rootLogger, fLogFilenameNPath): 
+def scanLogFile4FilenamesAndCounts(rootLogger, fLogFilenameNPath): 
 
     # Read contents of log file and store in string that will be used to search
     with open(fLogFilenameNPath, "r") as logfile:
         strLogFileContents = logfile.read()
-    
-    rootLogger.info("In function getExtractFilenamesAndCounts()")
 
     ##################################################
     # COPY_INTO_FILENAMES
@@ -35,9 +37,6 @@ def getExtractFilenamesAndCounts(rootLogger, fLogFilenameNPath):
     
     # We want the 2nd part of the split command which is the extract filename - excludes S3 Stage 
     lstExtractFilenames = [ S3StageNFilename.split("/")[1] for S3StageNFilename in lstReResults]
-    COPY_INTO_FILENAMES = (os.linesep).join([extFilename for extFilename in lstExtractFilenames])
-    COPY_INTO_FILENAMES += os.linesep
-    rootLogger.info(f"COPY_INTO_FILENAMES: {COPY_INTO_FILENAMES}")  
 
     ##################################################
     # ROW_COUNTS and ROW_INFO
@@ -49,6 +48,33 @@ def getExtractFilenamesAndCounts(rootLogger, fLogFilenameNPath):
 
     # Ex. '147148,13979060,181562' 
     lstFileCounts  = [EyeCatcherNCounts.split("\n")[1] for EyeCatcherNCounts in lstReResults]
+
+    return lstExtractFilenames, lstFileCounts
+
+
+def getExtractFilenamesAndCounts(rootLogger, fLogFilenameNPath): 
+
+    rootLogger.info("In function getExtractFilenamesAndCounts()")
+
+    ##################################################
+    # Use run metrics file written by execute_sql_statement.
+    # Older runs (no metrics file) --> scan log file.
+    ##################################################
+    lstRunMetrics = RunMetrics.readRunMetricsRecords(fLogFilenameNPath)
+
+    if lstRunMetrics is not None:
+        rootLogger.info(f"Get filenames and counts from run metrics file {RunMetrics.getRunMetricsFilename(fLogFilenameNPath)}")
+
+        lstCopyIntoFilesAndCounts = RunMetrics.getCopyIntoFilesAndCounts(lstRunMetrics)
+        lstExtractFilenames = [filename for filename, _, _, _ in lstCopyIntoFilesAndCounts]
+        lstFileCounts = [f"{rows},{input_bytes},{output_bytes}" for _, rows, input_bytes, output_bytes in lstCopyIntoFilesAndCounts]
+    else:
+        lstExtractFilenames, lstFileCounts = scanLogFile4FilenamesAndCounts(rootLogger, fLogFilenameNPath)
+
+    COPY_INTO_FILENAMES = (os.linesep).join([extFilename for extFilename in lstExtractFilenames])
+    COPY_INTO_FILENAMES += os.linesep
+    rootLogger.info(f"COPY_INTO_FILENAMES: {COPY_INTO_FILENAMES}")  
+
     lstRecCounts = [fileCounts.split(",")[0]  for fileCounts in lstFileCounts]
     
     rootLogger.info(f"{lstFileCounts=}")
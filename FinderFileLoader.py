@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  FinderFileLoader.py
+#
+# Desc: Load finder files into their finder file tables (BIA_{ENV}.CMS_TARGET_XTR_{ENV}) in one Snowflake session.
+#
+#       The layout of each finder type (target table, stage, file format, and column parse expressions) is
+#       defined once in FINDER_FILE_LAYOUTS. Each finder file is loaded with:
+#           1) PUT the file to the user stage (only layouts loaded from DATADIR)
+#           2) CREATE TRANSIENT TABLE <table>_LOAD_STG LIKE <table>
+#           3) COPY INTO <table>_LOAD_STG from the stage with the layout's parse expressions
+#           4) MERGE INTO <table> the staged rows that are not in the table, and
+#              DELETE FROM <table> the rows that are no longer in the finder file (one transaction)
+#           5) REMOVE the file from the user stage and DROP the staging table
+#
+#       Rows of the finder file that are already in the table are not rewritten, so a refresh with mostly
+#       unchanged finder data only writes the changed rows (no full table DELETE and reload).
+#       Duplicate rows of a finder file are loaded once.
+#
+#       Cumulative tables (ex. DSH_EDX_STAY, one fiscal year file per load) have KEY_COLUMNS and SYNC_DELETE False:
+#       rows are matched on the table's primary key, changed rows are updated, and rows that are not in the
+#       finder file (earlier years) are kept.
+#
+# Usage:
+#       import FinderFileLoader
+#
+#       FinderFileLoader.loadFinderFiles(con, [("MNUP", MNUP_FNDR_FILE)], ENVNAME)
+#
+#       python3 FinderFileLoader.py MNUP TRICARE=SORTED_TRICARE_FF.txt     (file name from the layout's env variable when omitted)
+#       python3 FinderFileLoader.py --print_sql HOSH HOSM
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+# 2026-10-18 DSH_EDX_STAY is cumulative: match on the primary key, update changed rows, no DELETE
+#            of rows that are not in the finder file (KEY_COLUMNS, UPDATE_VALUES, SYNC_DELETE).
+########################################################################################################
+import os
+import sys
+import argparse
+
+
+TARGET_SCHEMA = "BIA_{ENVNAME}.CMS_TARGET_XTR_{ENVNAME}"
+STAGE_SCHEMA = "BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}"
+
+# Suffix of the transient staging table created in TARGET_SCHEMA for each load
+LOAD_STG_TABLE_SUFFIX = "_LOAD_STG"
+
+USER_STAGE = "@~"
+
+########################################################################################################
+# Finder file layouts
+#   TABLE        : target table in TARGET_SCHEMA
+#   STAGE        : named stage (files already in S3), or USER_STAGE (file is PUT from DATADIR)
+#   FILE_ENV     : env variable with the finder file name (set by the shell script/driver)
+#   FILE         : finder file name when FILE_ENV is not set (optional)
+#   FILE_FORMAT  : COPY INTO FILE_FORMAT options
+#   COLUMNS      : (column, parse expression) of each finder file column --> rows are matched on all columns
+#   INSERT_VALUES: (column, value) of columns not in the finder file set when a row is inserted
+#   KEY_COLUMNS  : primary key columns (optional) --> rows are matched on the key, and a changed row is updated
+#   UPDATE_VALUES: (column, value) of columns not in the finder file set when a row is updated (KEY_COLUMNS only)
+#   SYNC_DELETE  : False --> rows that are not in the finder file are kept (optional; default True)
+########################################################################################################
+FINDER_FILE_LAYOUTS = {
+    "MNUP": {
+        "TABLE": "MNUP_YEAR_FF",
+        "STAGE": f"@{STAGE_SCHEMA}.BIA_{{ENVNAME}}_XTR_FF_SSA_STG",
+        "FILE_ENV": "LOAD_MNUP_FINDER_FILE",
+        "FILE_FORMAT": "TYPE = CSV",
+        "COLUMNS": [("BENE_HIC_NUM", "TRIM(SUBSTR(f.$1, 1, 11))"),
+                    ("BENE_BRTH_DT", "TO_DATE(SUBSTR(f.$1, 12, 8),'YYYYMMDD')")],
+    },
+    "MNUP_MONTHLY": {
+        "TABLE": "MNUP_MONTHLY_FF",
+        "STAGE": f"@{STAGE_SCHEMA}.BIA_{{ENVNAME}}_XTR_FF_SSA_STG",
+        "FILE_ENV": "LOAD_MNUP_Monthly_FINDER_FILE",
+        "FILE_FORMAT": "TYPE = CSV",
+        "COLUMNS": [("BENE_HIC_NUM", "TRIM(SUBSTR(f.$1, 1, 11))"),
+                    ("BENE_BRTH_DT", "TO_DATE(SUBSTR(f.$1, 12, 8),'YYYYMMDD')")],
+    },
+    "TRICARE": {
+        "TABLE": "TRICARE_FINDER_FILE",
+        "STAGE": USER_STAGE,
+        "FILE_ENV": "SORTED_COMBINED_TRICARE_FNDR_FILE",
+        "FILE_FORMAT": "TYPE = CSV",
+        "COLUMNS": [("SSN_NUM", "SUBSTR(f.$1,1,9)")],
+    },
+    "SRTR": {
+        "TABLE": "SRTR_SSN",
+        "STAGE": USER_STAGE,
+        "FILE_ENV": "LOAD_SRTR_FINDER_FILE",
+        "FILE_FORMAT": "TYPE = CSV",
+        "COLUMNS": [("SSN", "SUBSTR(f.$1,1,9)")],
+    },
+    "HOSH": {
+        "TABLE": "HOSHFF",
+        "STAGE": f"@{STAGE_SCHEMA}.BIA_{{ENVNAME}}_XTR_FINDER_FILE_STG",
+        "FILE_ENV": "HOSHFF",
+        "FILE_FORMAT": "TYPE=CSV FIELD_DELIMITER='|' SKIP_HEADER=1",
+        "COLUMNS": [("CNTRCT_NUM", "f.$1")],
+    },
+    "HOSM": {
+        "TABLE": "HOSMFF",
+        "STAGE": f"@{STAGE_SCHEMA}.BIA_{{ENVNAME}}_XTR_FINDER_FILE_STG",
+        "FILE_ENV": "HOSMFF",
+        "FILE_FORMAT": "TYPE=CSV FIELD_DELIMITER='|' SKIP_HEADER=1",
+        "COLUMNS": [("CNTRCT_NUM", "f.$1")],
+    },
+    "DOD_NPI": {
+        "TABLE": "DOD_NPI_YEAR_FF",
+        "STAGE": f"@{STAGE_SCHEMA}.BIA_{{ENVNAME}}_XTR_FF_STG",
+        "FILE_ENV": "LOAD_FINDER_FILE",
+        "FILE_FORMAT": "TYPE = CSV",
+        "COLUMNS": [("SSN_NUM", "SUBSTR(f.$1, 1, 3)||SUBSTR(f.$1,5,2)||SUBSTR(f.$1,8,4)"),
+                    ("EMP_ID", "SUBSTR(f.$2,1,7)")],
+    },
+    "OPMHI_CPT_EXCL": {
+        "TABLE": "OPMHI_CPT_EXCL",
+        "STAGE": USER_STAGE,
+        "FILE_ENV": "OPMHI_CPT_EXCL_FF",
+        "FILE_FORMAT": "TYPE = CSV",
+        "COLUMNS": [("OPMHI_CPT_EXCL", "SUBSTR(f.$1,1,5)")],
+    },
+    "OPMHI_ICD10DGS_EXCL": {
+        "TABLE": "OPMHI_ICD10DGS_EXCL",
+        "STAGE": USER_STAGE,
+        "FILE_ENV": "OPMHI_ICD10DGS_FF",
+        "FILE_FORMAT": "TYPE = CSV",
+        "COLUMNS": [("OPMHI_ICD10DG_EXCL", "SUBSTR(f.$1,1,6)")],
+    },
+    "OPMHI_ICD10PCS_EXCL": {
+        "TABLE": "OPMHI_ICD10PCS_EXCL",
+        "STAGE": USER_STAGE,
+        "FILE_ENV": "OPMHI_ICD10PCS_EXCL_FF",
+        "FILE_FORMAT": "TYPE = CSV",
+        "COLUMNS": [("OPMHI_ICD10PC_EXCL", "SUBSTR(f.$1,1,7)")],
+    },
+    "OPMHI_SSN": {
+        "TABLE": "OPMHI_SSN",
+        "STAGE": f"@{STAGE_SCHEMA}.BIA_{{ENVNAME}}_XTR_FINDER_FILE_STG",
+        "FILE_ENV": "OPMHI_SSN_FF",
+        "FILE_FORMAT": "TYPE = CSV SKIP_HEADER=1",
+        "COLUMNS": [("SSN_NUM", "SUBSTR(f.$1,1,9)")],
+    },
+    "DSH_EDX_STAY": {
+        "TABLE": "DSH_EDX_STAY",
+        "STAGE": f"@{STAGE_SCHEMA}.BIA_{{ENVNAME}}_XTR_DSH_STG",
+        "FILE_ENV": "DSH_EDX_STAY_LOAD_FILE",
+        "FILE": "dsh_data_V1.csv",
+        "FILE_FORMAT": "TYPE = CSV FIELD_OPTIONALLY_ENCLOSED_BY='\"'",
+        "COLUMNS": [("PRVDR_ID", "SUBSTR(f.$1,1,6)"),
+                    ("DSCHRG_DT", "TO_DATE(SUBSTR(f.$1,7,10),'YYYY-MM-DD')"),
+                    ("MEDPAR_VSN", "SUBSTR(f.$1,17,1)"),
+                    ("HICN", "SUBSTR(f.$1,18,11)"),
+                    ("ADM_DT", "TO_DATE(SUBSTR(f.$1,29,10),'YYYY-MM-DD')"),
+                    ("SPCL_UNIT_CD", "SUBSTR(f.$1,39,1)"),
+                    ("LENGTH_OF_STAY", "SUBSTR(f.$1,40,7)"),
+                    ("PRE_RLNG_SSI_DAYS", "SUBSTR(f.$1,47,7)"),
+                    ("UTLZTN_DAYS", "SUBSTR(f.$1,54,7)"),
+                    ("POST_RLNG_SSI_DAYS", "SUBSTR(f.$1,61,7)"),
+                    ("GHO_PD_CD", "SUBSTR(f.$1,68,1)"),
+                    ("IME_AMT", "SUBSTR(f.$1,69,8)"),
+                    ("DRG_AMT", "SUBSTR(f.$1,77,8)"),
+                    ("MA_STUS", "SUBSTR(f.$1,85,1)"),
+                    ("DSCHRG_DAYS", "SUBSTR(f.$1,86,7)"),
+                    ("ADMT_DAYS", "SUBSTR(f.$1,93,7)"),
+                    ("FED_FY", "SUBSTR(f.$1,100,4)"),
+                    ("MBI_ID", "SUBSTR(f.$1,104,11)"),
+                    ("PRVDR_ID_ORIG", "SUBSTR(f.$1,115,6)")],
+        "INSERT_VALUES": [("ETL_LOAD_TS", "CURRENT_TIMESTAMP"),
+                          ("ETL_UPDT_TS", "NULL")],
+        # cumulative table (240 million rows, 2007 onward) loaded one fiscal year file at a time
+        "KEY_COLUMNS": ["PRVDR_ID", "FED_FY", "HICN"],
+        "UPDATE_VALUES": [("ETL_UPDT_TS", "CURRENT_TIMESTAMP")],
+        "SYNC_DELETE": False,
+    },
+}
+
+
+def getFinderFileLayout(sFinderType):
+
+    try:
+        return FINDER_FILE_LAYOUTS[sFinderType.upper()]
+
+    except KeyError:
+        raise Exception(f"Invalid finder type {sFinderType}. Valid finder types are {', '.join(FINDER_FILE_LAYOUTS)}")
+
+
+def getFinderFileLoadSQL(sFinderType, sFinderFile, sENVNAME, sDataDir=""):
+
+    ######################################################
+    # Return the SQL statements that load the finder file
+    # into the finder type's table.
+    ######################################################
+    dictLayout = getFinderFileLayout(sFinderType)
+
+    sTargetSchema = TARGET_SCHEMA.format(ENVNAME=sENVNAME)
+    sTable = f"{sTargetSchema}.{dictLayout['TABLE']}"
+    sStgTable = f"{sTable}{LOAD_STG_TABLE_SUFFIX}"
+
+    lstCols = [sCol for sCol, sExpr in dictLayout["COLUMNS"]]
+    lstInsertCols = lstCols + [sCol for sCol, sValue in dictLayout.get("INSERT_VALUES", [])]
+    lstInsertValues = [f"s.{sCol}" for sCol in lstCols] + [sValue for sCol, sValue in dictLayout.get("INSERT_VALUES", [])]
+    lstKeyCols = dictLayout.get("KEY_COLUMNS", [])
+
+    if lstKeyCols:
+        ######################################################
+        # Match on the primary key (one staged row per key)
+        # and update the rows with changed values.
+        ######################################################
+        lstDataCols = [sCol for sCol in lstCols if sCol not in lstKeyCols]
+        sMatchCols = " AND ".join(f"t.{sCol} = s.{sCol}" for sCol in lstKeyCols)
+        sUsing = (f"(SELECT {', '.join(lstCols)}\n\t       FROM (SELECT {', '.join(lstCols)}, "
+                  f"ROW_NUMBER() OVER (PARTITION BY {', '.join(lstKeyCols)} ORDER BY {', '.join(lstDataCols)}) AS LOAD_ROW_NUM\n\t             FROM {sStgTable})\n\t       WHERE LOAD_ROW_NUM = 1)")
+        sChangedCols = " OR ".join(f"t.{sCol} IS DISTINCT FROM s.{sCol}" for sCol in lstDataCols)
+        sUpdateCols = ", ".join([f"{sCol} = s.{sCol}" for sCol in lstDataCols] + [f"{sCol} = {sValue}" for sCol, sValue in dictLayout.get("UPDATE_VALUES", [])])
+        sWhenMatched = f"\n\tWHEN MATCHED AND ({sChangedCols}) THEN UPDATE SET {sUpdateCols}"
+    else:
+        sMatchCols = " AND ".join(f"t.{sCol} IS NOT DISTINCT FROM s.{sCol}" for sCol in lstCols)
+        sUsing = f"(SELECT DISTINCT {', '.join(lstCols)} FROM {sStgTable})"
+        sWhenMatched = ""
+
+    lstSQL = []
+
+    # PUT compresses the file --> <file>.gz in the user stage
+    if dictLayout["STAGE"] == USER_STAGE:
+        sStageFile = sFinderFile if sFinderFile.endswith(".gz") else f"{sFinderFile}.gz"
+        lstSQL.append(f"PUT file://{sDataDir}{sFinderFile} {USER_STAGE} OVERWRITE = TRUE")
+    else:
+        sStageFile = sFinderFile
+
+    sStagePath = f"{dictLayout['STAGE'].format(ENVNAME=sENVNAME)}/{sStageFile}"
+
+    # New staging table has no load history --> FORCE=TRUE not needed
+    lstSQL.append(f"CREATE OR REPLACE TRANSIENT TABLE {sStgTable} LIKE {sTable}")
+
+    lstSQL.append(f"""COPY INTO {sStgTable}
+	({', '.join(lstCols)})
+	FROM (SELECT {', '.join(f'{sExpr} AS {sCol}' for sCol, sExpr in dictLayout['COLUMNS'])}
+	      FROM {sStagePath} f)
+	FILE_FORMAT = ({dictLayout['FILE_FORMAT']})""")
+
+    lstSQL.append("BEGIN TRANSACTION")
+
+    lstSQL.append(f"""MERGE INTO {sTable} t
+	USING {sUsing} s
+	ON {sMatchCols}{sWhenMatched}
+	WHEN NOT MATCHED THEN INSERT ({', '.join(lstInsertCols)})
+	     VALUES ({', '.join(lstInsertValues)})""")
+
+    # cumulative tables keep the rows that are not in the finder file
+    if dictLayout.get("SYNC_DELETE", True):
+        lstSQL.append(f"""DELETE FROM {sTable} t
+	WHERE NOT EXISTS (SELECT 1 FROM {sStgTable} s
+	                  WHERE {sMatchCols})""")
+
+    lstSQL.append("COMMIT")
+
+    if dictLayout["STAGE"] == USER_STAGE:
+        lstSQL.append(f"REMOVE {USER_STAGE}/{sStageFile}")
+
+    lstSQL.append(f"DROP TABLE IF EXISTS {sStgTable}")
+
+    return lstSQL
+
+
+def loadFinderFiles(con, lstFinderFiles, sENVNAME, sDataDir=""):
+
+    ######################################################
+    # Load each (finder type, finder file) in the
+    # connection's session.
+    ######################################################
+    import snowconvert_helpers
+
+    # Invalid finder type fails before any finder file is loaded
+    lstLoadSQL = [getFinderFileLoadSQL(sFinderType, sFinderFile, sENVNAME, sDataDir) for sFinderType, sFinderFile in lstFinderFiles]
+
+    for (sFinderType, sFinderFile), lstSQL in zip(lstFinderFiles, lstLoadSQL):
+        print(f"Load {sFinderType} finder file {sFinderFile}")
+
+        for sSQL in lstSQL:
+            snowconvert_helpers.execute_sql_statement(sSQL, con, exit_on_error=True)
+
+
+def getFinderFilesFromArgs(lstArgs):
+
+    ######################################################
+    # FINDER_TYPE[=file] --> (FINDER_TYPE, file)
+    # File name from the layout's FILE_ENV (or FILE)
+    # when omitted.
+    ######################################################
+    lstFinderFiles = []
+
+    for sArg in lstArgs:
+        sFinderType, _, sFinderFile = sArg.partition("=")
+        sFinderType = sFinderType.upper()
+
+        if sFinderFile == "":
+            dictLayout = getFinderFileLayout(sFinderType)
+            sFinderFile = os.getenv(dictLayout["FILE_ENV"], dictLayout.get("FILE", ""))
+
+        if sFinderFile == "":
+            raise Exception(f"No finder file for finder type {sFinderType}")
+
+        lstFinderFiles.append((sFinderType, sFinderFile))
+
+    return lstFinderFiles
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Load finder files into finder file tables in one session")
+    parser.add_argument("finder_files", nargs="+", help="FINDER_TYPE[=file] (ex. MNUP TRICARE=SORTED_TRICARE_FF.txt)")
+    parser.add_argument("--print_sql", action="store_true", help="print the load SQL; do not load")
+    args = parser.parse_args()
+
+    ENVNAME = os.getenv('ENVNAME')
+    DATADIR = os.getenv('DATADIR', "")
+
+    lstFinderFiles = getFinderFilesFromArgs(args.finder_files)
+
+    if args.print_sql:
+        for sFinderType, sFinderFile in lstFinderFiles:
+            print(";\n".join(getFinderFileLoadSQL(sFinderType, sFinderFile, ENVNAME, DATADIR)) + ";\n")
+
+        return
+
+    import snowconvert_helpers
+
+    con = None
+    bPythonExceptionOccurred = False
+
+    try:
+        snowconvert_helpers.configure_log()
+        con = snowconvert_helpers.log_on()
+        snowconvert_helpers.execute_sql_statement(f"alter session set query_tag='{os.path.basename(__file__)}'", con, exit_on_error=True)
+        snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con, exit_on_error=True)
+
+        loadFinderFiles(con, lstFinderFiles, ENVNAME, DATADIR)
+
+    except Exception as e:
+        print(e)
+
+        # Let shell script know that python code failed.
+        bPythonExceptionOccurred = True
+
+    finally:
+        if con is not None:
+            con.close()
+
+        # Let shell script know that python code failed.
+        if bPythonExceptionOccurred == True:
+            sys.exit(12)
+        else:
+            snowconvert_helpers.quit_application()
+
+
+if __name__ == "__main__":
+
+    main()
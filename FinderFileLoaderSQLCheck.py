@@ -0,0 +1,389 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  FinderFileLoaderSQLCheck.py
+#
+# Desc: Validate the load SQL generated by FinderFileLoader.py for every finder type (no Snowflake connection).
+#
+#       1) Statement checks: statement order (PUT only for the user stage, COPY INTO the transient staging table,
+#          MERGE/DELETE in one transaction, REMOVE/DROP), no FORCE=TRUE, no DELETE of the whole table,
+#          no unresolved {ENVNAME}, balanced parentheses, COPY/INSERT column counts match their values.
+#       2) Load checks in a local sqlite database: the COPY parse expressions, MERGE and DELETE are run
+#          (translated to sqlite) for a synthetic finder file and a second finder file with rows added, removed
+#          and duplicated. The table must equal the distinct rows of the finder file after each load, and rows
+#          in both finder files must not be rewritten.
+#          Cumulative layouts (SYNC_DELETE False, ex. DSH_EDX_STAY): the second finder file is the next fiscal year
+#          with some rows of the first file changed. Rows of the earlier year must survive the reload, changed rows
+#          must be updated (ETL_UPDT_TS set), and unchanged rows must not be rewritten.
+#
+# Ex.   python3 FinderFileLoaderSQLCheck.py
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+# 2026-10-18 Check cumulative layouts (KEY_COLUMNS, SYNC_DELETE False): earlier year rows survive a reload.
+########################################################################################################
+import re
+import sys
+import random
+import sqlite3
+from datetime import datetime
+
+import FinderFileLoader
+
+
+ENVNAME = "TST"
+DATADIR = "/app/IDRC/XTR/CMS/data/"
+FINDER_FILE = "FinderFileLoaderSQLCheck_FF.txt"
+
+TARGET_SCHEMA = FinderFileLoader.TARGET_SCHEMA.format(ENVNAME=ENVNAME)
+
+reToDate = re.compile(r"TO_DATE\(SUBSTR\(f\.\$1,\s*(\d+),\s*(\d+)\),\s*'([^']+)'\)", re.IGNORECASE)
+reFieldPos = re.compile(r"SUBSTR\(f\.\$(\d+),\s*(\d+),\s*(\d+)\)|f\.\$(\d+)", re.IGNORECASE)
+
+
+def splitTopLevel(sText):
+
+    ######################################################
+    # split on commas not within parentheses or quotes
+    ######################################################
+    lstItems = []
+    iDepth = 0
+    bInQuote = False
+    sItem = ""
+
+    for sChar in sText:
+        if sChar == "'":
+            bInQuote = not bInQuote
+        elif not bInQuote and sChar == "(":
+            iDepth += 1
+        elif not bInQuote and sChar == ")":
+            iDepth -= 1
+        elif not bInQuote and iDepth == 0 and sChar == ",":
+            lstItems.append(sItem.strip())
+            sItem = ""
+            continue
+
+        sItem += sChar
+
+    lstItems.append(sItem.strip())
+
+    return lstItems
+
+
+def isBalanced(sSQL):
+
+    iDepth = 0
+    for sChar in re.sub(r"'[^']*'", "", sSQL):
+        iDepth += {"(": 1, ")": -1}.get(sChar, 0)
+        if iDepth < 0:
+            return False
+
+    return iDepth == 0 and sSQL.count("'") % 2 == 0
+
+
+def checkStatements(sFinderType, lstSQL):
+
+    dictLayout = FinderFileLoader.FINDER_FILE_LAYOUTS[sFinderType]
+    sTable = f"{TARGET_SCHEMA}.{dictLayout['TABLE']}"
+    sStgTable = f"{sTable}{FinderFileLoader.LOAD_STG_TABLE_SUFFIX}"
+    bUserStage = dictLayout["STAGE"] == FinderFileLoader.USER_STAGE
+    bSyncDelete = dictLayout.get("SYNC_DELETE", True)
+    lstKeyCols = dictLayout.get("KEY_COLUMNS", [])
+
+    lstExpectedPrefixes = ([f"PUT file://{DATADIR}{FINDER_FILE} "] if bUserStage else []) + [
+        f"CREATE OR REPLACE TRANSIENT TABLE {sStgTable} LIKE {sTable}",
+        f"COPY INTO {sStgTable}",
+        "BEGIN TRANSACTION",
+        f"MERGE INTO {sTable} t"] + ([
+        f"DELETE FROM {sTable} t\n\tWHERE NOT EXISTS"] if bSyncDelete else []) + [
+        "COMMIT"] + ([f"REMOVE @~/{FINDER_FILE}.gz"] if bUserStage else []) + [
+        f"DROP TABLE IF EXISTS {sStgTable}"]
+
+    if len(lstSQL) != len(lstExpectedPrefixes):
+        return f"{len(lstSQL)} statements; expected {len(lstExpectedPrefixes)}"
+
+    for sSQL, sPrefix in zip(lstSQL, lstExpectedPrefixes):
+        if not sSQL.startswith(sPrefix):
+            return f"statement does not start with {sPrefix!r}:\n{sSQL}"
+        if "FORCE" in sSQL.upper() or "{" in sSQL or "}" in sSQL:
+            return f"FORCE or unresolved placeholder in:\n{sSQL}"
+        if not isBalanced(sSQL):
+            return f"unbalanced parentheses or quotes in:\n{sSQL}"
+
+    sCopySQL = next(sSQL for sSQL in lstSQL if sSQL.startswith("COPY INTO"))
+    sMergeSQL = next(sSQL for sSQL in lstSQL if sSQL.startswith("MERGE INTO"))
+
+    lstCopyCols = splitTopLevel(re.search(r"\n\t\((.*)\)\n\tFROM \(SELECT ", sCopySQL).group(1))
+    lstCopyExprs = splitTopLevel(re.search(r"FROM \(SELECT (.*)\n\t      FROM ", sCopySQL).group(1))
+    if len(lstCopyCols) != len(lstCopyExprs) or len(lstCopyCols) != len(dictLayout["COLUMNS"]):
+        return f"COPY INTO has {len(lstCopyCols)} columns and {len(lstCopyExprs)} values"
+
+    sStagePath = f"@~/{FINDER_FILE}.gz" if bUserStage else f"{dictLayout['STAGE'].format(ENVNAME=ENVNAME)}/{FINDER_FILE}"
+    if f"FROM {sStagePath} f)" not in sCopySQL:
+        return f"COPY INTO is not from {sStagePath}"
+
+    lstInsertCols = splitTopLevel(re.search(r"INSERT \((.*)\)\n", sMergeSQL).group(1))
+    lstInsertValues = splitTopLevel(re.search(r"VALUES \((.*)\)$", sMergeSQL).group(1))
+    if len(lstInsertCols) != len(lstInsertValues):
+        return f"MERGE INSERT has {len(lstInsertCols)} columns and {len(lstInsertValues)} values"
+
+    sOn = re.search(r"\n\tON (.*)\n", sMergeSQL).group(1)
+
+    if lstKeyCols:
+        # primary key match --> no full table compare of every column
+        if sOn != " AND ".join(f"t.{sCol} = s.{sCol}" for sCol in lstKeyCols):
+            return f"MERGE does not match on the primary key {', '.join(lstKeyCols)}: {sOn}"
+        if "WHEN MATCHED AND (" not in sMergeSQL:
+            return "MERGE does not update changed rows"
+    else:
+        for sCol in lstCopyCols:
+            if f"t.{sCol} IS NOT DISTINCT FROM s.{sCol}" not in sOn:
+                return f"MERGE does not match on {sCol}"
+
+    return None
+
+
+def getPyDateFormat(sFormat):
+
+    return sFormat.upper().replace("YYYY", "%Y").replace("MM", "%m").replace("DD", "%d")
+
+
+def toDate(sValue, sFormat):
+
+    return datetime.strptime(sValue, getPyDateFormat(sFormat)).date().isoformat()
+
+
+def getFinderFileFlds(sExpr):
+
+    # f.$1 --> f.FLD1 (columns of the sqlite FINDER_FILE table)
+    return re.sub(r"f[.][$](\d+)", r"f.FLD\1", sExpr)
+
+
+def toSqlite(sSQL):
+
+    ######################################################
+    # Snowflake --> sqlite for the statements of a load
+    # Returns the sqlite statements of the statement
+    ######################################################
+    sSQL = sSQL.replace(f"{TARGET_SCHEMA}.", "")
+
+    # DELETE FROM <table> t --> DELETE FROM <table> AS t
+    sSQL = re.sub(r"^DELETE FROM (\w+) t\b", r"DELETE FROM \1 AS t", sSQL)
+
+    # MERGE ... [WHEN MATCHED AND (...) THEN UPDATE SET ...] WHEN NOT MATCHED THEN INSERT
+    #   --> [UPDATE ... FROM ...;] INSERT ... WHERE NOT EXISTS
+    mMerge = re.match(r"MERGE INTO (\w+) t\n\tUSING (.*) s\n\tON ([^\n]*)(?:\n\tWHEN MATCHED AND (\(.*\)) THEN UPDATE SET ([^\n]*))?"
+                      r"\n\tWHEN NOT MATCHED THEN INSERT \((.*)\)\n\s*VALUES \((.*)\)$", sSQL, re.S)
+    if mMerge:
+        sTable, sUsing, sOn, sChanged, sUpdateCols, sInsertCols, sValues = mMerge.groups()
+        sSQL = f"INSERT INTO {sTable} ({sInsertCols}) SELECT {sValues} FROM {sUsing} s WHERE NOT EXISTS (SELECT 1 FROM {sTable} t WHERE {sOn})"
+        if sChanged:
+            return [f"UPDATE {sTable} AS t SET {sUpdateCols} FROM {sUsing} AS s WHERE {sOn} AND {sChanged}", sSQL]
+
+    # COPY INTO <stg> (cols) FROM (SELECT exprs FROM <stage> f) --> INSERT INTO <stg> (cols) SELECT exprs FROM FINDER_FILE f
+    mCopy = re.match(r"COPY INTO (\w+)\n\t\((.*)\)\n\tFROM \(SELECT (.*)\n\t      FROM \S+ f\)", sSQL, re.S)
+    if mCopy:
+        sStgTable, sCols, sExprs = mCopy.groups()
+        sSQL = f"INSERT INTO {sStgTable} ({sCols}) SELECT {getFinderFileFlds(sExprs)} FROM FINDER_FILE f"
+
+    return [sSQL]
+
+
+def createFinderFileRecs(dictLayout, iNOFRecs, dictFixedCols={}):
+
+    ######################################################
+    # Records with digits in every parsed position and
+    # valid dates in TO_DATE positions
+    # dictFixedCols: column --> value of every record
+    # (SUBSTR(f.$1,...) columns)
+    ######################################################
+    sExprs = " ".join(sExpr for sCol, sExpr in dictLayout["COLUMNS"])
+    iNOFFlds = max(int(mFld.group(1) or mFld.group(4)) for mFld in reFieldPos.finditer(sExprs))
+    iRecLen = max([int(mFld.group(2)) + int(mFld.group(3)) - 1 for mFld in reFieldPos.finditer(sExprs) if mFld.group(2)] + [12])
+
+    lstRecs = []
+    for iRec in range(iNOFRecs):
+        lstChars = list(f"{random.randrange(10 ** iRecLen):0{iRecLen}}")
+
+        for mDate in reToDate.finditer(sExprs):
+            iPos, iLen, sFormat = int(mDate.group(1)), int(mDate.group(2)), mDate.group(3)
+            sDate = datetime(random.randint(1930, 2025), random.randint(1, 12), random.randint(1, 28)).strftime(getPyDateFormat(sFormat))
+            lstChars[iPos - 1:iPos - 1 + iLen] = list(sDate)
+
+        for sCol, sExpr in dictLayout["COLUMNS"]:
+            mFld = reFieldPos.fullmatch(sExpr)
+            if sCol in dictFixedCols and mFld and mFld.group(1) == "1":
+                iPos, iLen = int(mFld.group(2)), int(mFld.group(3))
+                lstChars[iPos - 1:iPos - 1 + iLen] = list(dictFixedCols[sCol].ljust(iLen)[:iLen])
+
+        lstRecs.append(tuple(["".join(lstChars)] + [f"{random.randrange(10 ** 7):07}" for iFld in range(iNOFFlds - 1)]))
+
+    return lstRecs, iNOFFlds
+
+
+def createLoadDB(dictLayout):
+
+    lstAllCols = [sCol for sCol, sExpr in dictLayout["COLUMNS"]] + [sCol for sCol, sValue in dictLayout.get("INSERT_VALUES", [])]
+
+    # autocommit --> BEGIN TRANSACTION/COMMIT of the load SQL control the transaction
+    con = sqlite3.connect(":memory:", isolation_level=None)
+    con.create_function("TO_DATE", 2, toDate)
+    con.execute(f"CREATE TABLE {dictLayout['TABLE']} ({', '.join(lstAllCols)})")
+
+    return con
+
+
+def runLoad(con, dictLayout, lstSQL, lstRecs, iNOFFlds):
+
+    ######################################################
+    # Load lstRecs (the finder file) with the load SQL.
+    # Returns the parsed rows of the finder file.
+    ######################################################
+    con.execute("DROP TABLE IF EXISTS FINDER_FILE")
+    con.execute(f"CREATE TABLE FINDER_FILE ({', '.join(f'FLD{iFld}' for iFld in range(1, iNOFFlds + 1))})")
+    con.executemany(f"INSERT INTO FINDER_FILE VALUES ({', '.join('?' * iNOFFlds)})", lstRecs)
+
+    for sSQL in lstSQL:
+        if sSQL.startswith(("PUT ", "REMOVE ")):
+            continue
+        if sSQL.startswith("CREATE OR REPLACE TRANSIENT TABLE"):
+            sStgTable = sSQL.split()[5].split(".")[-1]
+            con.execute(f"DROP TABLE IF EXISTS {sStgTable}")
+            con.execute(f"CREATE TABLE {sStgTable} AS SELECT * FROM {dictLayout['TABLE']} WHERE 0")
+            continue
+
+        for sSqliteSQL in toSqlite(sSQL):
+            con.execute(sSqliteSQL)
+
+    sParse = ", ".join(getFinderFileFlds(sExpr) for sCol, sExpr in dictLayout["COLUMNS"])
+
+    return con.execute(f"SELECT {sParse} FROM FINDER_FILE f").fetchall()
+
+
+def changeFinderFileRec(dictLayout, tRec):
+
+    # change the digits of the first SUBSTR(f.$1,...) column that is not a key column
+    lstKeyCols = dictLayout.get("KEY_COLUMNS", [])
+    for sCol, sExpr in dictLayout["COLUMNS"]:
+        mFld = reFieldPos.fullmatch(sExpr)
+        if sCol not in lstKeyCols and mFld and mFld.group(1) == "1":
+            iPos, iLen = int(mFld.group(2)), int(mFld.group(3))
+            sRec = tRec[0]
+            sChanged = "".join(str((int(sChar) + 1) % 10) for sChar in sRec[iPos - 1:iPos - 1 + iLen])
+            return (sRec[:iPos - 1] + sChanged + sRec[iPos - 1 + iLen:],) + tuple(tRec[1:])
+
+    raise Exception(f"{dictLayout['TABLE']} has no data column to change")
+
+
+def checkCumulativeLoad(sFinderType, lstSQL):
+
+    ######################################################
+    # SYNC_DELETE False: the second finder file is the next
+    # fiscal year, 20 rows of the first file changed,
+    # 20 rows of the first file unchanged and 5 duplicates
+    ######################################################
+    dictLayout = FinderFileLoader.FINDER_FILE_LAYOUTS[sFinderType]
+    sTable = dictLayout["TABLE"]
+    lstCols = [sCol for sCol, sExpr in dictLayout["COLUMNS"]]
+    lstKeyIdxs = [lstCols.index(sCol) for sCol in dictLayout.get("KEY_COLUMNS", lstCols)]
+
+    def getKey(tRow):
+        return tuple(tRow[iIdx] for iIdx in lstKeyIdxs)
+
+    con = createLoadDB(dictLayout)
+
+    lstRecs1, iNOFFlds = createFinderFileRecs(dictLayout, 500, {"FED_FY": "2021"})
+    lstRecs2 = createFinderFileRecs(dictLayout, 300, {"FED_FY": "2022"})[0]
+    lstRecs2 = lstRecs2 + lstRecs2[:5] + [changeFinderFileRec(dictLayout, tRec) for tRec in lstRecs1[:20]] + lstRecs1[20:40]
+
+    lstRows1 = runLoad(con, dictLayout, lstSQL, lstRecs1, iNOFFlds)
+    dictRowIds1 = {tuple(tRow[1:]): tRow[0] for tRow in con.execute(f"SELECT rowid, {', '.join(lstCols)} FROM {sTable}")}
+
+    lstRows2 = runLoad(con, dictLayout, lstSQL, lstRecs2, iNOFFlds)
+
+    # table = rows of both finder files, the second finder file's row for a key in both
+    dictExpected = {getKey(tRow): tRow for tRow in lstRows1}
+    dictExpected.update({getKey(tRow): tRow for tRow in lstRows2})
+    setChangedKeys = {getKey(tRow) for tRow in lstRows2 if getKey(tRow) in dictExpected and tRow not in lstRows1} & {getKey(tRow) for tRow in lstRows1}
+
+    dictActual = {tuple(tRow[2:]): (tRow[0], tRow[1]) for tRow in con.execute(f"SELECT rowid, ETL_UPDT_TS, {', '.join(lstCols)} FROM {sTable}")}
+
+    setActualKeys = {getKey(tRow) for tRow in dictActual}
+    lstMissing = [tRow for tRow in lstRows1 if getKey(tRow) not in setActualKeys]
+    if lstMissing:
+        return f"{len(lstMissing)} rows of the earlier fiscal year were deleted by the reload"
+
+    if len(dictActual) != len(dictExpected) or set(dictActual) != set(dictExpected.values()):
+        return f"{sTable} has {len(dictActual)} rows; expected {len(dictExpected)} rows of both finder files"
+
+    if len(setChangedKeys) != 20:
+        return f"{len(setChangedKeys)} changed rows; expected 20"
+
+    for tRow, (iRowId, sUpdtTs) in dictActual.items():
+        if getKey(tRow) in setChangedKeys and sUpdtTs is None:
+            return f"changed row {tRow} was not updated (ETL_UPDT_TS)"
+        if tRow in dictRowIds1 and (sUpdtTs is not None or dictRowIds1[tRow] != iRowId):
+            return f"unchanged row {tRow} was rewritten"
+
+    return None
+
+
+def checkLoad(sFinderType, lstSQL):
+
+    dictLayout = FinderFileLoader.FINDER_FILE_LAYOUTS[sFinderType]
+    if not dictLayout.get("SYNC_DELETE", True):
+        return checkCumulativeLoad(sFinderType, lstSQL)
+
+    sTable = dictLayout["TABLE"]
+    lstCols = [sCol for sCol, sExpr in dictLayout["COLUMNS"]]
+
+    con = createLoadDB(dictLayout)
+
+    lstRecs1, iNOFFlds = createFinderFileRecs(dictLayout, 500)
+    lstRecs2 = lstRecs1[100:] + lstRecs1[:20] + createFinderFileRecs(dictLayout, 200)[0]
+
+    dictRowIds = None
+
+    for lstRecs in (lstRecs1, lstRecs2):
+        # table = distinct parsed rows of the finder file
+        setExpected = set(runLoad(con, dictLayout, lstSQL, lstRecs, iNOFFlds))
+        lstActual = con.execute(f"SELECT {', '.join(lstCols)} FROM {sTable}").fetchall()
+
+        if len(lstActual) != len(setExpected) or set(lstActual) != setExpected:
+            return f"{sTable} has {len(lstActual)} rows; expected {len(setExpected)} distinct finder file rows"
+
+        # rows in both finder files are not rewritten (same rowid)
+        dictNewRowIds = {tuple(tRow[1:]): tRow[0] for tRow in con.execute(f"SELECT rowid, {', '.join(lstCols)} FROM {sTable}")}
+        if dictRowIds is not None:
+            for tRow, iRowId in dictNewRowIds.items():
+                if tRow in dictRowIds and dictRowIds[tRow] != iRowId:
+                    return f"unchanged row {tRow} was rewritten"
+
+        dictRowIds = dictNewRowIds
+
+    return None
+
+
+def main():
+
+    random.seed(2026)
+    iNOFErrors = 0
+
+    for sFinderType in FinderFileLoader.FINDER_FILE_LAYOUTS:
+        lstSQL = FinderFileLoader.getFinderFileLoadSQL(sFinderType, FINDER_FILE, ENVNAME, DATADIR)
+
+        sError = checkStatements(sFinderType, lstSQL) or checkLoad(sFinderType, lstSQL)
+        print(f"{sFinderType:<22} {'OK' if sError is None else 'FAILED: ' + sError}")
+
+        if sError is not None:
+            iNOFErrors += 1
+
+    if iNOFErrors:
+        sys.exit(12)
+
+    print("FinderFileLoaderSQLCheck.py: all checks passed")
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  HCPP_Batch_Extract.py
+#
+# Desc: Set-based (batch) version of HCPP_Extract.py. Extracts HCPP data for all Plan/Year requests
+#       in a finder file using one Snowflake session.
+#
+#       1) PUT/COPY the finder file requests into temporary table HCPP_FINDER.
+#       2) Run the HCPP extract SQL once for all requests into temporary table HCPP_BATCH
+#          (joined to HCPP_FINDER instead of filtering on one Contract/Year).
+#       3) COPY INTO one extract file per request from HCPP_BATCH. Extract filenames are the
+#          same as HCPP_Extract.py and each COPY INTO reports the rows/bytes for its request.
+#
+#       NOTE: extract SQL is HCPP_Extract.getExtractSQL() (same columns as HCPP_Extract.py).
+#
+# Input: FINDER_CSV parameter/environment variable --> linux file with validated finder records
+#        Ex. record: "H3503,2018,Bland"
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+# 2026-10-18 CREATE OR REPLACE the temporary tables and drop them at the end (session is reused for each finder file).
+# 2026-10-18 Extract SQL runs in run(con, dictParams) (called in-process by ExtractRunner with an injected
+#            connection). Stand-alone run logs on in the __main__ block.
+# 2026-10-18 Use HCPP_Extract.getExtractSQL(); request values are bind variables. Finder csv may have quoted
+#            fields; a malformed/invalid finder record fails the extract instead of being skipped.
+########################################################################################################
+import os
+import sys
+import csv
+from datetime import datetime
+
+currentDirectory = os.path.dirname(os.path.realpath(__file__))
+rootDirectory = os.path.abspath(os.path.join(currentDirectory, ".."))
+utilDirectory = os.getenv('CMN_UTIL')
+
+sys.path.append(rootDirectory)
+sys.path.append(utilDirectory)
+script_name = os.path.basename(__file__)
+
+import ExtractRunner as ExtRunner
+
+# extract SQL and request validation shared with the single request extract
+import HCPP_Extract
+
+
+########################################################################################################
+# Read request records: (CONTRACT_NUM, EXT_YR, CONTRACTOR)
+########################################################################################################
+def readRequests(FINDER_CSV):
+   """ Returns the request records of csv file FINDER_CSV. Raises ValueError on a malformed record. """
+
+   lstRequests = []
+
+   with open(FINDER_CSV, "r", encoding="utf-8", newline="") as f:
+      csvReader = csv.reader(f)
+
+      for lstRec in csvReader:
+
+         # blank line
+         if len(lstRec) == 0:
+            continue
+
+         if len(lstRec) != 3:
+            raise ValueError(f"{FINDER_CSV} line {csvReader.line_num}: {len(lstRec)} fields instead of 3")
+
+         tupRequest = tuple(sField.strip() for sField in lstRec)
+         HCPP_Extract.validateRequest(tupRequest)
+
+         lstRequests.append(tupRequest)
+
+   return lstRequests
+
+
+########################################################################################################
+# Method to execute the extract SQL using Timestamp 
+########################################################################################################
+def run(con, dictParams):
+
+   TMSTMP=dictParams.get('TMSTMP')
+   ENVNAME=dictParams.get('ENVNAME')
+   FINDER_CSV=dictParams.get('FINDER_CSV')
+
+   ##############################################
+   # Requests: (CONTRACT_NUM, EXT_YR, CONTRACTOR)
+   ##############################################
+   lstRequests = readRequests(FINDER_CSV)
+
+   ExtRunner.log(f"NOF requests: {len(lstRequests)}")
+
+   lstRecords = []
+
+   ExtRunner.execute_sql(con, f"alter session set query_tag='{script_name}'", sScript=script_name)
+   ExtRunner.execute_sql(con, f"USE WAREHOUSE {dictParams.get('sf_xtr_warehouse')}", sScript=script_name)
+
+   ##############################################
+   # Stage finder requests into temp table
+   ##############################################
+   ExtRunner.execute_sql(con, """CREATE OR REPLACE TEMPORARY TABLE HCPP_FINDER (CONTRACT_NUM VARCHAR(5), EXT_YR VARCHAR(4), CONTRACTOR VARCHAR(100))""", sScript=script_name)
+   ExtRunner.execute_sql(con, f"""PUT file://{FINDER_CSV} @%HCPP_FINDER AUTO_COMPRESS=TRUE OVERWRITE=TRUE""", sScript=script_name)
+   ExtRunner.execute_sql(con, """COPY INTO HCPP_FINDER FROM @%HCPP_FINDER
+                                                FILE_FORMAT = (TYPE = CSV field_delimiter = ','  FIELD_OPTIONALLY_ENCLOSED_BY = '"'  TRIM_SPACE = TRUE  SKIP_BLANK_LINES = TRUE)
+                                                PURGE = TRUE""", sScript=script_name)
+
+   ##############################################
+   # Extract HCPP data for all requests
+   ##############################################
+   ExtRunner.execute_sql(con, f"""CREATE OR REPLACE TEMPORARY TABLE HCPP_BATCH AS
+
+{HCPP_Extract.getExtractSQL(ENVNAME, bBatch=True)}  """, sScript=script_name)
+
+   ##############################################
+   # Create one extract file per request
+   ##############################################
+   for CONTRACT_NUM, EXT_YR, CONTRACTOR in dict.fromkeys(lstRequests):
+
+      EXT_YY=str(EXT_YR)[2:4]
+
+      lstRecords.append(ExtRunner.execute_sql(con, f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_HCPP_STG/HCPP_{CONTRACTOR}_{CONTRACT_NUM}_PY{EXT_YY}_{TMSTMP}.txt.gz
+                                                FROM (
+                                                    SELECT * EXCLUDE (FNDR_CONTRACT_NUM, FNDR_EXT_YR, FNDR_CONTRACTOR)
+                                                    FROM HCPP_BATCH
+                                                    WHERE FNDR_CONTRACT_NUM = ?
+                                                      AND FNDR_EXT_YR       = ?
+                                                      AND FNDR_CONTRACTOR   = ?
+                                                )
+                        FILE_FORMAT = (TYPE = CSV field_delimiter = none  ESCAPE_UNENCLOSED_FIELD=NONE FIELD_OPTIONALLY_ENCLOSED_BY = none )
+                        SINGLE = TRUE  max_file_size=5368709120  """, [CONTRACT_NUM, EXT_YR, CONTRACTOR], sScript=script_name))
+
+   # session may be reused for the next finder file (runner/broker)
+   ExtRunner.execute_sql(con, "DROP TABLE IF EXISTS HCPP_BATCH", sScript=script_name)
+   ExtRunner.execute_sql(con, "DROP TABLE IF EXISTS HCPP_FINDER", sScript=script_name)
+
+   return lstRecords
+
+
+########################################################################################################
+# RUN (stand-alone)
+########################################################################################################
+if __name__ == "__main__":
+
+   import snowconvert_helpers
+
+   con = None 
+   now = datetime.now()
+   date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
+
+   # boolean - Python Exception status
+   bPythonExceptionOccurred=False
+
+   print('')
+   print("Run date and time: " + date_time  )
+   print('')
+
+   try:
+      snowconvert_helpers.configure_log()
+      con = snowconvert_helpers.log_on()   
+
+      run(con, dict(os.environ))
+   
+      #**************************************
+      # End Application
+      #**************************************    
+      snowconvert_helpers.quit_application()
+   
+   except Exception as e:
+      print(e)
+   
+      # Let shell script know that python code failed.
+      bPythonExceptionOccurred=True   
+   
+   finally:
+      if con is not None:
+         con.close()
+
+      # Let shell script know that python code failed.      
+      if bPythonExceptionOccurred == True:
+         sys.exit(12) 
+      else:   
+         snowconvert_helpers.quit_application()
@@ -12,12 +12,15 @@
 # Paul Baranoski 2023-04-25 Added Coalesce to several fields in SQL.
 # Paul Baranoski 2023-04-27 Modify Extract filename to make conversion to EFT filename easier.
 # Sean Whitelock 2025-01-16 Updated the length of PRVDR_LGL_NAME from 70 to 100 and added the COALESCE function to CLM_BLG_PRVDR_NPI_NUM and CLM_RNDRG_PRVDR_NPI_NUM
+# 2026-10-18 Extract SQL runs in run(con, dictParams) (called in-process by ExtractRunner with an injected
+#            connection). Stand-alone run logs on in the __main__ block.
+# 2026-10-18 Extract SQL built by getExtractSQL() (shared with HCPP_Batch_Extract.py). Contract/Year are bind
+#            variables; request values used in the extract filename are validated.
 ########################################################################################################
 import os
 import sys
-import datetime
+import re
 from datetime import datetime
-import sendEmail
 
 currentDirectory = os.path.dirname(os.path.realpath(__file__))
 rootDirectory = os.path.abspath(os.path.join(currentDirectory, ".."))
@@ -27,48 +30,51 @@ sys.path.append(rootDirectory)
 sys.path.append(utilDirectory)
 script_name = os.path.basename(__file__)
 
-import snowconvert_helpers
-from snowconvert_helpers import Export
+import ExtractRunner as ExtRunner
 
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
-con = None 
-now = datetime.now()
-date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
+# Request values are part of the extract filename (stage path cannot be a bind variable)
+dictREQUEST_FIELD_FORMATS = {"CONTRACT_NUM": re.compile(r"^[A-Za-z0-9]{1,5}$"),
+                             "EXT_YR": re.compile(r"^[0-9]{4}$"),
+                             "CONTRACTOR": re.compile(r"^[A-Za-z0-9_.-]{1,100}$")}
 
-TMSTMP=os.getenv('TMSTMP')
-ENVNAME=os.getenv('ENVNAME')
-CONTRACT_NUM=os.getenv('CONTRACT_NUM')
-EXT_YR=os.getenv('EXT_YR')
-EXT_YY=str(EXT_YR)[2:4]
-CONTRACTOR=os.getenv('CONTRACTOR')
 
-# boolean - Python Exception status
-bPythonExceptionOccurred=False
+def validateRequest(tupRequest):
+   """ Raises ValueError when a (CONTRACT_NUM, EXT_YR, CONTRACTOR) request value is not valid. """
+
+   for (sField, reFormat), sValue in zip(dictREQUEST_FIELD_FORMATS.items(), tupRequest):
+      if sValue is None or not reFormat.match(str(sValue)):
+         raise ValueError(f"Invalid request value {sField}={sValue!r}")
 
-########################################################################################################
-# RUN
-########################################################################################################
-print('')
-print("Run date and time: " + date_time  )
-print('')
 
 ########################################################################################################
-# Method to execute the extract SQL using Timestamp 
+# HCPP extract SQL (shared with HCPP_Batch_Extract.py)
 ########################################################################################################
-try:
-   snowconvert_helpers.configure_log()
-   con = snowconvert_helpers.log_on()   
-   snowconvert_helpers.execute_sql_statement(f"alter session set query_tag='{script_name}'",con,exit_on_error = True)
-   snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
-   
- 
-   snowconvert_helpers.execute_sql_statement(f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_HCPP_STG/HCPP_{CONTRACTOR}_{CONTRACT_NUM}_PY{EXT_YY}_{TMSTMP}.txt.gz
-                                                FROM (
+def getExtractSQL(ENVNAME, bBatch=False):
+   """
+   Returns the HCPP extract SELECT.
+
+   bBatch=False --> one Plan/Year. Bind variables: EXT_YR, EXT_YR, CONTRACT_NUM.
+   bBatch=True  --> all Plan/Year requests in temporary table HCPP_FINDER. The request columns
+                    FNDR_CONTRACT_NUM, FNDR_EXT_YR and FNDR_CONTRACTOR are selected first.
+   """
+   if bBatch:
+      sFinderColumns = "F.CONTRACT_NUM AS FNDR_CONTRACT_NUM, F.EXT_YR AS FNDR_EXT_YR, F.CONTRACTOR AS FNDR_CONTRACTOR\n                            ,"
+      sRequestFilter = """INNER JOIN HCPP_FINDER F
+                        ON  BMER.BENE_CNTRCT_NUM = F.CONTRACT_NUM
+                        AND CDS.CLM_NCH_WKLY_PROC_DT between to_date(F.EXT_YR || '-01-01','YYYY-MM-DD') and to_date(F.EXT_YR || '-12-31','YYYY-MM-DD')
+
+                        WHERE"""
+   else:
+      sFinderColumns = ""
+      sRequestFilter = """WHERE CDS.CLM_NCH_WKLY_PROC_DT between to_date(? || '-01-01','YYYY-MM-DD') and to_date(? || '-12-31','YYYY-MM-DD')
+                          AND BMER.BENE_CNTRCT_NUM  = ? 
+                          AND"""
 
-                        SELECT DISTINCT
-                            '%'  AS D1
+   return f"""                        SELECT DISTINCT
+                            {sFinderColumns}'%'  AS D1
                             ,RPAD(C.CLM_HIC_NUM,20,' ')                AS CLM_HIC_NUM
                             ,'%' AS D2
                             ,RPAD(COALESCE(BH.BENE_LAST_NAME,' '),40,' ')   AS BENE_LAST_NAME
@@ -265,34 +271,82 @@ try:
                         LEFT OUTER JOIN IDRC_{ENVNAME}.CMS_DIM_PRVDR_{ENVNAME}.PRVDR PRB
                         ON PRB.PRVDR_NPI_NUM = CL.PRVDR_RNDRNG_PRVDR_NPI_NUM
 
-                        WHERE CDS.CLM_NCH_WKLY_PROC_DT between to_date('{EXT_YR}-01-01','YYYY-MM-DD') and to_date('{EXT_YR}-12-31','YYYY-MM-DD')
-                          AND BMER.BENE_CNTRCT_NUM  = '{CONTRACT_NUM}' 
-                          AND C.CLM_TYPE_CD IN (71,72,81,82)
+                        {sRequestFilter} C.CLM_TYPE_CD IN (71,72,81,82)"""
+
+
+########################################################################################################
+# Method to execute the extract SQL using Timestamp 
+########################################################################################################
+def run(con, dictParams):
+
+   TMSTMP=dictParams.get('TMSTMP')
+   ENVNAME=dictParams.get('ENVNAME')
+   CONTRACT_NUM=dictParams.get('CONTRACT_NUM')
+   EXT_YR=dictParams.get('EXT_YR')
+   EXT_YY=str(EXT_YR)[2:4]
+   CONTRACTOR=dictParams.get('CONTRACTOR')
+
+   validateRequest((CONTRACT_NUM, EXT_YR, CONTRACTOR))
+
+   lstRecords = []
+
+   ExtRunner.execute_sql(con, f"alter session set query_tag='{script_name}'", sScript=script_name)
+   ExtRunner.execute_sql(con, f"USE WAREHOUSE {dictParams.get('sf_xtr_warehouse')}", sScript=script_name)
+   
+ 
+   lstRecords.append(ExtRunner.execute_sql(con, f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_HCPP_STG/HCPP_{CONTRACTOR}_{CONTRACT_NUM}_PY{EXT_YY}_{TMSTMP}.txt.gz
+                                                FROM (
+
+{getExtractSQL(ENVNAME)}
 
  )
                         FILE_FORMAT = (TYPE = CSV field_delimiter = none  ESCAPE_UNENCLOSED_FIELD=NONE FIELD_OPTIONALLY_ENCLOSED_BY = none )
-                        SINGLE = TRUE  max_file_size=5368709120  """, con, exit_on_error=True)
+                        SINGLE = TRUE  max_file_size=5368709120  """, [EXT_YR, EXT_YR, CONTRACT_NUM], sScript=script_name))
 
+   return lstRecords
+
+
+########################################################################################################
+# RUN (stand-alone)
+########################################################################################################
+if __name__ == "__main__":
+
+   import snowconvert_helpers
+
+   con = None 
+   now = datetime.now()
+   date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
+
+   # boolean - Python Exception status
+   bPythonExceptionOccurred=False
+
+   print('')
+   print("Run date and time: " + date_time  )
+   print('')
+
+   try:
+      snowconvert_helpers.configure_log()
+      con = snowconvert_helpers.log_on()   
+
+      run(con, dict(os.environ))
    
+      #**************************************
+      # End Application
+      #**************************************    
+      snowconvert_helpers.quit_application()
    
-   #**************************************
-   # End Application
-   #**************************************    
-   snowconvert_helpers.quit_application()
-   
-except Exception as e:
-   print(e)
+   except Exception as e:
+      print(e)
    
-   # Let shell script know that python code failed.
-   bPythonExceptionOccurred=True   
+      # Let shell script know that python code failed.
+      bPythonExceptionOccurred=True   
    
-finally:
-   if con is not None:
-      con.close()
-
-   # Let shell script know that python code failed.      
-   if bPythonExceptionOccurred == True:
-      sys.exit(12) 
-   else:   
-      snowconvert_helpers.quit_application()
+   finally:
+      if con is not None:
+         con.close()
 
+      # Let shell script know that python code failed.      
+      if bPythonExceptionOccurred == True:
+         sys.exit(12) 
+      else:   
+         snowconvert_helpers.quit_application()
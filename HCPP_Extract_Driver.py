@@ -11,6 +11,17 @@
 # Author     : Viren Khanna	
 # Created    : 03/08/2026
 #
+# Modified:
+#
+# 2026-10-18 Run HCPP_Extract.py, success email and EFT step in-process using ExtractRunner, sharing one
+#            Snowflake connection for all finder file records. Log per-stage timings.
+# 2026-10-18 Add --batch option: run HCPP_Batch_Extract.py once per finder file (set-based extract
+#            of all finder records) instead of HCPP_Extract.py once per finder record.
+# 2026-10-18 ExtractRunner calls run(con, dictParams) of HCPP_Extract.py/HCPP_Batch_Extract.py in-process with
+#            one shared Snowflake connection (warm session from SFSessionBroker when it is running); connection
+#            is closed at the end of processing.
+# 2026-10-18 Write the batch finder csv file with csv.writer (fields quoted when needed).
+#
 ######################################################################################
 
 ########################################################################################################
@@ -34,6 +45,7 @@ import sys
 import argparse
 import re
 import io
+import csv
 
 import tempfile
 # Set a different temp directory than the default "/tmp"
@@ -50,6 +62,9 @@ import CreateManifestFileDriver as CreManDr
 # contains function to extract extract filenames and record counts
 from FilenameCounts import getExtractFilenamesAndCounts
 
+# runs extract, combine, email and EFT steps in this process
+import ExtractRunner as ExtRunner
+
 # Our include members
 import LoggerStandard as EnigmaLog
 
@@ -236,7 +251,35 @@ def getExtFiles4RequestList(s3_resource, sSourceBucket, S3KeyPrefix, sTimeStamp)
     return lstExtFiles4Request
 
 
-def main_processing_loop():
+def runBatchExtract(S3FinderFilename, lstBatchRequests):
+
+    ##############################################
+    # Write validated finder records to csv file for PUT/COPY into Snowflake temp table
+    ##############################################
+    sFinderCSV = f"{DATA_DIR}{S3FinderFilename}.{TMSTMP}.batch.csv"
+    rootLogger.info(f"Write {len(lstBatchRequests)} finder records to {sFinderCSV}")
+
+    with open(sFinderCSV, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(lstBatchRequests)
+
+    rootLogger.info(f"Start execution of HCPP_Batch_Extract.py program ")
+
+    try:
+        extResult = ExtRunner.run_extract("HCPP_Batch_Extract", {"FINDER_CSV": sFinderCSV, "TMSTMP": TMSTMP})
+        rootLogger.info(f"{extResult.returncode=}")
+
+    finally:
+        deleteFileFromLinux(sFinderCSV)
+
+    if extResult.returncode != 0:
+        raise Exception(f"HCPP_Batch_Extract.py failed with return code {extResult.returncode} for finder file {S3FinderFilename}: {extResult.output}")
+
+    # Per-request file counts
+    for dictFile in extResult.files:
+        rootLogger.info(f"{dictFile['filename']}: {dictFile['rows']} rows, {dictFile['output_bytes']} bytes")
+
+
+def main_processing_loop(bBatchMode=False):
 
   try:    
 
@@ -261,6 +304,10 @@ def main_processing_loop():
         #global rootLogger
         rootLogger = EnigmaLog.setLogging(LOGNAME)
         rootLogger.info(f"\nHCPP_Extract_Driver.py started at {TMSTMP}")
+        rootLogger.info(f"{bBatchMode=}")
+
+        # Establish logger with ExtractRunner module.
+        ExtRunner.setRunnerLogger(rootLogger)
 
         ###########################################################
         # Set current working directory to scripts/run directory.
@@ -344,6 +391,8 @@ def main_processing_loop():
             ##############################################
             # Process each record in Finder File
             ##############################################
+            lstBatchRequests = []
+
             with open(f"{DATA_DIR}{S3FinderFilename}", "r", encoding="UTF-8") as f:
                 
                 for sExtRecord in f:
@@ -404,25 +453,35 @@ def main_processing_loop():
 
 
                     ##############################################
-                    # Export fields for python extract code.
-                    ##############################################	
-                    os.environ["CONTRACT_NUM"] = CONTRACT_NUM                
-                    os.environ["EXT_YR"] = EXT_YR
-                    os.environ["CONTRACTOR"] = CONTRACTOR
-                    os.environ["TMSTMP"] = TMSTMP
+                    # Batch mode: extract all finder records after file is read
+                    ##############################################
+                    if bBatchMode:
+                        lstBatchRequests.append((CONTRACT_NUM, EXT_YR, CONTRACTOR))
+                        continue
 
                     ##############################################
                     # Extract HCPP records for Extract record.
+                    # NOTE: fields are exported as environment variables for python extract code.
                     ##############################################
                     rootLogger.info(f"Start execution of HCPP_Extract.py program ")
                     rootLogger.info(f"Extract HCPP data for {CONTRACT_NUM=} for {EXT_YR=} and {CONTRACTOR=} ")
 
-                    sp_info = subprocess.run(['python3', 'HCPP_Extract.py'], capture_output=True, text=True, check=True)
-                    write_sp_info_2_log(sp_info)  
+                    extResult = ExtRunner.run_extract("HCPP_Extract", {"CONTRACT_NUM": CONTRACT_NUM, "EXT_YR": EXT_YR, 
+                                                                       "CONTRACTOR": CONTRACTOR, "TMSTMP": TMSTMP})
+                    rootLogger.info(f"{extResult.returncode=}")
+
+                    if extResult.returncode != 0:
+                        raise Exception(f"HCPP_Extract.py failed with return code {extResult.returncode} for {CONTRACT_NUM=} {EXT_YR=} {CONTRACTOR=}: {extResult.output}")
 
                     ##############################################
                     # End-For loop: Processing request file
                     ##############################################
+
+                #############################################################
+                # Batch mode: one set-based extract for all finder records
+                #############################################################
+                if bBatchMode and len(lstBatchRequests) > 0:
+                    runBatchExtract(S3FinderFilename, lstBatchRequests)
                     
                 #############################################################
                 # Move Finder File to archive folder -- Required only for Finder python script file
@@ -465,12 +524,10 @@ def main_processing_loop():
         MSG=f"HCPP Extract has completed successfully.\n\nThe following file(s) were created:\n\n{S3Files}"
         
         try:
-            sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, HCPP_EMAIL_SUCCESS_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
-            write_sp_info_2_log(sp_info)
+            ExtRunner.send_notification(CMS_EMAIL_SENDER, HCPP_EMAIL_SUCCESS_RECIPIENT, SUBJECT, MSG)
             
-        except subprocess.CalledProcessError as e:
-            rootLogger.error(f"sendEmail.py failed with return code {e.returncode}")
-            rootLogger.error("\n%s", e.output)
+        except Exception as e:
+            rootLogger.error(f"sendEmail failed with error: {e}")
 
             sys.exit(12)    
 
@@ -489,12 +546,10 @@ def main_processing_loop():
         rootLogger.info("EFT HCPP Extract File")
         
         try:
-            sp_info = subprocess.run(['bash', 'ProcessFiles2EFT.sh', HCPP_BUCKET ], capture_output=True, text=True, check=True)
-            write_sp_info_2_log(sp_info) 
+            ExtRunner.process_files_2_eft(HCPP_BUCKET)
             
-        except subprocess.CalledProcessError as e:
-            rootLogger.error(f"Calling ProcessFiles2EFT.sh failed with return code {e.returncode}")
-            rootLogger.error(e.output)
+        except Exception as e:
+            rootLogger.error(f"Calling ProcessFiles2EFT.py failed with error: {e}")
             
             ## Send Failure email	
             SUBJECT = f"HCPP Extract EFT process  - Failed ({ENVNAME})"
@@ -510,6 +565,9 @@ def main_processing_loop():
         # End of Processing
         # NOTE: the \n before "Ended at" line is to ensure that this information is on a separate line, left-justified without any other logging info preceding it.        
         ####################################################################          
+        rootLogger.info(ExtRunner.timing_report())
+        ExtRunner.close_connection()
+
         # Need these messages for Dashboard
         rootLogger.info("Script HCPP_Extract_Driver.py completed successfully.")
         rootLogger.info(f"\nEnded at {TMSTMP}" )
@@ -531,5 +589,9 @@ def main_processing_loop():
 
 
 if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="HCPP Extract Driver")
+    parser.add_argument("--batch", action="store_true", help="extract all finder file records with one set-based extract")
+    args = parser.parse_args()
     
-    main_processing_loop()
\ No newline at end of file
+    main_processing_loop(args.batch)
\ No newline at end of file
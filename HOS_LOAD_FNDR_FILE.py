@@ -11,6 +11,8 @@
 # --------------------  -----------  -------------------------------------------------------------------
 # Joshua Turner         2023-10-26   Changed the stage name in the load SQL to read from /Finder_Files
 #                                    instead of /HOS (eliminates unneeded copies)          
+#                       2026-10-18   Load finder file with FinderFileLoader.py: COPY INTO a transient staging table and MERGE/DELETE only
+#                                    changed rows, instead of DELETE of the whole table and COPY INTO the table (FORCE=TRUE).
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
@@ -29,6 +31,8 @@ sys.path.append(utilDirectory)
 import snowconvert_helpers
 from snowconvert_helpers import Export
 
+import FinderFileLoader
+
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
@@ -60,27 +64,10 @@ try:
     snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
     
     ########################################################################################################
-    # Delete all data from both of the FF tables
-    ########################################################################################################
-    snowconvert_helpers.execute_sql_statement(f"""DELETE FROM "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}".HOSHFF""", con, exit_on_error=True)
-    snowconvert_helpers.execute_sql_statement(f"""DELETE FROM "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}".HOSMFF""", con, exit_on_error=True)
-
-    ########################################################################################################
-    # Load the files to the staging tables 
+    # Load finder file (staging table + MERGE of changed rows)
     ########################################################################################################
-    snowconvert_helpers.execute_sql_statement(f"""COPY INTO "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}"."HOSHFF"
-                      (CNTRCT_NUM) FROM
-                      (SELECT f.$1 AS CNTRCT_NUM FROM @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_FINDER_FILE_STG/{HOSHFF_FILENAME} f)
-                      FILE_FORMAT = (TYPE=CSV FIELD_DELIMITER='|' SKIP_HEADER=1)
-                      FORCE=TRUE;""", con, exit_on_error=True)
-
+    FinderFileLoader.loadFinderFiles(con, [("HOSH", HOSHFF_FILENAME), ("HOSM", HOSMFF_FILENAME)], ENVNAME)
 
-    snowconvert_helpers.execute_sql_statement(f"""COPY INTO "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}"."HOSMFF"
-                      (CNTRCT_NUM) FROM
-                      (SELECT f.$1 AS CNTRCT_NUM FROM @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_FINDER_FILE_STG/{HOSMFF_FILENAME} f)
-                      FILE_FORMAT = (TYPE=CSV FIELD_DELIMITER='|' SKIP_HEADER=1)
-                      FORCE=TRUE;""", con, exit_on_error=True)
-    
     snowconvert_helpers.quit_application()
                      
 except Exception as e:
@@ -4,6 +4,8 @@
 # DESC:   This python program loads the DOD NPI finder file to BIA_{ENV}.CMS_TARGET_XTR_{ENV}.DOD_NPI_FF table.
 #
 # Paul Baranoski 2025-09-11 Create script.
+# 2026-10-18                Load finder file with FinderFileLoader.py: COPY INTO a transient staging table and MERGE/DELETE only
+#                           changed rows, instead of DELETE of the whole table and COPY INTO the table (FORCE=TRUE).
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
@@ -22,6 +24,8 @@ sys.path.append(utilDirectory)
 import snowconvert_helpers
 from snowconvert_helpers import Export
 
+import FinderFileLoader
+
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
@@ -51,15 +55,11 @@ try:
    con = snowconvert_helpers.log_on()
    snowconvert_helpers.execute_sql_statement(f"alter session set query_tag='{script_name}'",con,exit_on_error = True)
    snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
-   snowconvert_helpers.execute_sql_statement(f"""DELETE FROM "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}".DOD_NPI_YEAR_FF""", con, exit_on_error=True)
    
-   # 123-11-1234  - pos 32= 6 digit # what is it?
-   ## INSERT FINDER FILE WITH DERIVED FIELDS TO THE TARGET TABLE ##
-   snowconvert_helpers.execute_sql_statement(f"""COPY INTO BIA_{ENVNAME}.CMS_TARGET_XTR_{ENVNAME}.DOD_NPI_YEAR_FF
-	(SSN_NUM, EMP_ID)
-	FROM (SELECT SUBSTR(f.$1, 1, 3)||SUBSTR(f.$1,5,2)||SUBSTR(f.$1,8,4) AS SSN_NUM, SUBSTR(f.$2,1,7) AS EMP_ID  
-          FROM @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_FF_STG/{LOAD_FNDR_FILE} f)
-	      FORCE=TRUE FILE_FORMAT = (TYPE = CSV)""", con,exit_on_error = True)
+   ########################################################################################################
+   # Load finder file (staging table + MERGE of changed rows)
+   ########################################################################################################
+   FinderFileLoader.loadFinderFiles(con, [("DOD_NPI", LOAD_FNDR_FILE)], ENVNAME)
 
    snowconvert_helpers.quit_application()
 
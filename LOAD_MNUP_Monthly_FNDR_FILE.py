@@ -8,6 +8,8 @@
 #
 # Viren Khanna 2024-07-22 Create logic to load finder file from S3 instead of data directory
 # Viren Khanna 2024-10-01 - Updated STG table location
+# 2026-10-18              Load finder file with FinderFileLoader.py: COPY INTO a transient staging table and MERGE/DELETE only
+#                         changed rows, instead of DELETE of the whole table and COPY INTO the table (FORCE=TRUE).
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
@@ -26,6 +28,8 @@ sys.path.append(utilDirectory)
 import snowconvert_helpers
 from snowconvert_helpers import Export
 
+import FinderFileLoader
+
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
@@ -55,21 +59,12 @@ try:
    con = snowconvert_helpers.log_on()
    snowconvert_helpers.execute_sql_statement(f"alter session set query_tag='{script_name}'",con,exit_on_error = True)
    snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
-   snowconvert_helpers.execute_sql_statement(f"""DELETE FROM "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}".MNUP_Monthly_FF""", con, exit_on_error=True)
    
-   ## PUT FINDER FILE TO FNDR TABLE ##
-   ###snowconvert_helpers.execute_sql_statement(f"""PUT file://{LANDING}{MNUP_Monthly_FNDR_FILE} @~ OVERWRITE = TRUE""", con,exit_on_error = True)
-
-   ## INSERT FINDER FILE WITH DERIVED FIELDS TO THE TARGET TABLE ##
-   snowconvert_helpers.execute_sql_statement(f"""COPY INTO BIA_{ENVNAME}.CMS_TARGET_XTR_{ENVNAME}.MNUP_Monthly_FF
-	(BENE_HIC_NUM, BENE_BRTH_DT)
-	FROM (SELECT TRIM(SUBSTR(f.$1, 1, 11)) as BENE_HIC_NUM, to_date(SUBSTR(f.$1, 12, 8),'YYYYMMDD') as BENE_BRTH_DT  
-          FROM @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_FF_SSA_STG/{MNUP_Monthly_FNDR_FILE} f)
-	      FORCE=TRUE FILE_FORMAT = (TYPE = CSV)""", con,exit_on_error = True)
-
+   ########################################################################################################
+   # Load finder file (staging table + MERGE of changed rows)
+   ########################################################################################################
+   FinderFileLoader.loadFinderFiles(con, [("MNUP_MONTHLY", MNUP_Monthly_FNDR_FILE)], ENVNAME)
 
-   ## REMOVE FINDER FILE FROM USER STAGE ##
-   snowconvert_helpers.execute_sql_statement(f"""REMOVE @~/{MNUP_Monthly_FNDR_FILE}.gz""", con,exit_on_error = True)
    snowconvert_helpers.quit_application()
 
 except Exception as e:
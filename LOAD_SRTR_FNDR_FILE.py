@@ -6,6 +6,8 @@
 # Created: Paul Baranoski  
 # Modified: 02/15/2023
 #
+# 2026-10-18 Load finder file with FinderFileLoader.py: COPY INTO a transient staging table and MERGE/DELETE only
+#            changed rows, instead of DELETE of the whole table and COPY INTO the table (FORCE=TRUE).
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
@@ -24,6 +26,8 @@ sys.path.append(utilDirectory)
 import snowconvert_helpers
 from snowconvert_helpers import Export
 
+import FinderFileLoader
+
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
@@ -53,21 +57,12 @@ try:
    con = snowconvert_helpers.log_on()
    snowconvert_helpers.execute_sql_statement(f"alter session set query_tag='{script_name}'",con,exit_on_error = True)
    snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
-   snowconvert_helpers.execute_sql_statement(f"""DELETE FROM "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}".SRTR_SSN""", con, exit_on_error=True)
    
-   ## PUT FINDER FILE TO FNDR TABLE ##
-   snowconvert_helpers.execute_sql_statement(f"""PUT file://{LANDING}{SRTR_FNDR_FILE} @~ OVERWRITE = TRUE""", con,exit_on_error = True)
-
-   ## INSERT FINDER FILE WITH DERIVED FIELDS TO THE TARGET TABLE ##
-   snowconvert_helpers.execute_sql_statement(f"""COPY INTO BIA_{ENVNAME}.CMS_TARGET_XTR_{ENVNAME}.SRTR_SSN
-	(SSN)
-	FROM (SELECT SUBSTR(f.$1, 1, 9) as SSN 
-	      FROM @~/{SRTR_FNDR_FILE}.gz f) 
-	FILE_FORMAT = (TYPE = CSV)""", con,exit_on_error = True)
-
+   ########################################################################################################
+   # Load finder file (staging table + MERGE of changed rows)
+   ########################################################################################################
+   FinderFileLoader.loadFinderFiles(con, [("SRTR", SRTR_FNDR_FILE)], ENVNAME, LANDING)
 
-   ## REMOVE FINDER FILE FROM USER STAGE ##
-   snowconvert_helpers.execute_sql_statement(f"""REMOVE @~/{SRTR_FNDR_FILE}.gz""", con,exit_on_error = True)
    snowconvert_helpers.quit_application()
 
 except Exception as e:
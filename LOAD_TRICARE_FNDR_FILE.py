@@ -8,6 +8,8 @@
 #
 # Paul Baranoski 2023-09-12 Created program.
 #
+# 2026-10-18                Load finder file with FinderFileLoader.py: COPY INTO a transient staging table and MERGE/DELETE only
+#                           changed rows, instead of DELETE of the whole table and COPY INTO the table (FORCE=TRUE).
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
@@ -26,6 +28,8 @@ sys.path.append(utilDirectory)
 import snowconvert_helpers
 from snowconvert_helpers import Export
 
+import FinderFileLoader
+
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
@@ -54,21 +58,12 @@ try:
    con = snowconvert_helpers.log_on()
    snowconvert_helpers.execute_sql_statement(f"alter session set query_tag='{script_name}'",con,exit_on_error = True)
    snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
-   snowconvert_helpers.execute_sql_statement(f"""DELETE FROM "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}".TRICARE_FINDER_FILE""", con, exit_on_error=True)
    
-   ## PUT FINDER FILE TO FNDR TABLE ##
-   snowconvert_helpers.execute_sql_statement(f"""PUT file://{LANDING}{TRICARE_FINDERFILE} @~ OVERWRITE = TRUE""", con,exit_on_error = True)
-
-   ## INSERT FINDER FILE WITH DERIVED FIELDS TO THE TARGET TABLE ##
-   snowconvert_helpers.execute_sql_statement(f"""COPY INTO BIA_{ENVNAME}.CMS_TARGET_XTR_{ENVNAME}.TRICARE_FINDER_FILE
-	(SSN_NUM)
-	FROM (SELECT SUBSTR(f.$1,1,9) as SSN_NUM
-	      FROM @~/{TRICARE_FINDERFILE}.gz f) 
-	FILE_FORMAT = (TYPE = CSV)""", con,exit_on_error = True)
+   ########################################################################################################
+   # Load finder file (staging table + MERGE of changed rows)
+   ########################################################################################################
+   FinderFileLoader.loadFinderFiles(con, [("TRICARE", TRICARE_FINDERFILE)], ENVNAME, LANDING)
 
-    
-   ## REMOVE FINDER FILE FROM USER STAGE ##
-   snowconvert_helpers.execute_sql_statement(f"""REMOVE @~/{TRICARE_FINDERFILE}.gz""", con,exit_on_error = True)
    snowconvert_helpers.quit_application()
 
 except Exception as e:
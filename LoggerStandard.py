@@ -8,6 +8,10 @@ def setLogging(LOGNAME):
     rootLogger.setLevel(logging.INFO)
 
     if not rootLogger.handlers:
+        # extract scripts run by this process write their SQL run metrics next to this log file
+        import RunMetrics
+        RunMetrics.setRunMetricsFile(LOGNAME)
+
         fh = logging.FileHandler(f"{LOGNAME}",encoding='utf-8')
         sh = logging.StreamHandler(sys.stdout)
         
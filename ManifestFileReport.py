@@ -28,6 +28,11 @@
 # Paul Baranoski 2024-01-16 Add code to remove temporary directory before test to create it if it isn't there.
 #                           Remove aws cp --recursive since it is copying from sub-directories which is not what is intended.
 # Paul Baranoski 2025-12-12 Convert from bash to python.
+# 2026-10-18                Get list of manifest files with listS3Objects (cached paginated listing). 
+#                           Invalidate cached S3 listings when moving manifest files.
+# 2026-10-18                Get manifest files and extract file sizes concurrently (getS3TextObjects/getS3ObjectsMetadata; cached
+#                           by key + ETag). Write report rows to an html file instead of one string; attach the report to the 
+#                           email when it is too large to pass to sendEmailHTML.py. Put extract file size in its report column.
 ############################################################################################################
 
 import boto3 
@@ -50,12 +55,16 @@ from SET_XTR_ENV import *
 
 # Our include members
 import LoggerStandard as EnigmaLog
+from CommonFunctions import listS3Objects, invalidateS3ListingCache, setCommonFunctionLogger, getS3TextObjects, getS3ObjectsMetadata
 
 
 DATA_DIR = "/app/IDRC/XTR/CMS/data/"
 LOG_DIR = "/app/IDRC/XTR/CMS/logs/"
 RUNDIR = "/app/IDRC/XTR/CMS/scripts/run/"
 
+# Larger reports are sent as an email attachment (sendEmailHTML.py gets the message as one command line argument: max 128 KB)
+EMAIL_HTML_MAX_INLINE_BYTES = 100 * 1024
+
 
 #############################################################
 # Functions
@@ -81,6 +90,9 @@ def s3MoveFile2NewFolder(s3_client, sSourceBucket, sSourceKey, sDestinationKey):
 
     s3_client.delete_object(Bucket=sSourceBucket, Key=sSourceKey)
 
+    invalidateS3ListingCache(sSourceBucket, sSourceKey)
+    invalidateS3ListingCache(sSourceBucket, sDestinationKey)
+
 
 # bytes pretty-printing
 UNITS_MAPPING = [
@@ -157,6 +169,9 @@ def main_processing_loop():
         rootLogger = EnigmaLog.setLogging(LOGNAME)
         rootLogger.info(f"\nManifestFileReport_Driver.py started at {TMSTMP}")
 
+        # Establish logger with CommonFunctions module.
+        setCommonFunctionLogger(rootLogger)
+
         ###########################################################
         # Set current working directory to scripts/run directory.
         # This is so subprocess calls will work from RunDeck  
@@ -231,7 +246,9 @@ def main_processing_loop():
         # Get list of Extract filenames (with folder path) that area ONLY under the requested path. No "archive" folder filenames. No folder without ext filename: "xtr/PSPS/"
         lsS3ManifestPrefix = ManifestSourceBucketFldr + ManifestFileHLQ
         
-        lstManifestFileKeys = [ obj.key for obj in s3_resource.Bucket(XTR_BUCKET).objects.filter(Prefix=lsS3ManifestPrefix)  if not obj.key.endswith("/") ]
+        # read-only report --> a cached listing can be used (manifest moves below invalidate it)
+        lstManifestFileObjects = [ dictObject for dictObject in listS3Objects(s3_client, XTR_BUCKET, lsS3ManifestPrefix, bUseCache=True)  if not dictObject["Key"].endswith("/") ]
+        lstManifestFileKeys = [ dictObject["Key"] for dictObject in lstManifestFileObjects ]
         rootLogger.info("lstManifestFileKeys:\n" + "\n".join(lstManifestFileKeys))
        
         NOF_FILES = len(lstManifestFileKeys)
@@ -253,126 +270,114 @@ def main_processing_loop():
           
 
         #################################################################################
-        # Create Report
+        # Get manifest files from S3 (only new/changed manifest files are read from S3)
         #################################################################################
         rootLogger.info("")
-        rootLogger.info("Create manifest files report ")
-        
-        sioHTMLReport = StringIO("")
-                    
-        #################################################################################
-        # Write out HTML header.
+        rootLogger.info("Get manifest files from S3 ")
+
+        lstManifestFiles = getS3TextObjects(s3_client, XTR_BUCKET, lstManifestFileObjects)
+
+        lstManifests = []
+        for ManifestFile2Process, sManifestFile in zip(lstManifestFileKeys, lstManifestFiles):
+            rootLogger.info("")
+            rootLogger.info(f"{ManifestFile2Process=}")
+
+            # preserve new lines for better readability in log file
+            rootLogger.info("\n%s", sManifestFile)
+
+            # Convert string to Dict to make it easier to access the info
+            lstManifests.append(json.loads(sManifestFile))
+
         #################################################################################
-        sioHTMLReport.write("<html><body><table cellspacing='1px' border='1' > \n")
-        sioHTMLReport.write("<tr bgcolor='#00B0F0'><th>Data Request ID</th><th>Manifest Filename</th> <th>Extract filename</th><th>Extract file size</th></tr> \n") 	
-    
+        # Get extract file sizes from S3 
         #################################################################################
-        # Process list of manifest files 
-        #################################################################################            
         rootLogger.info("")
-        rootLogger.info("Process list of manifest files to build Report Rows ")
+        rootLogger.info("Get extract file sizes from S3 ")
+
+        lstExtFilenameKeys = [ dctExtFile["fileLocation"] + dctExtFile["fileName"] 
+                               for dctManifestFile in lstManifests for dctExtFile in dctManifestFile["fileInformation"] ]
+
+        dictExtFileMetadata = dict(zip(lstExtFilenameKeys, getS3ObjectsMetadata(s3_client, XTR_BUCKET, lstExtFilenameKeys)))
 
         #################################################################################
-        # Loop thru list of Manifest Files On-Hold.
+        # Create Report
         #################################################################################
-        for ManifestFile2Process in lstManifestFileKeys:
+        rootLogger.info("")
+        rootLogger.info("Create manifest files report ")
 
+        sHTMLReportFileNPath = f"{DATA_DIR}ManifestFileReport_{TMSTMP}.html"
+        rootLogger.info(f"{sHTMLReportFileNPath=}")
+
+        with open(sHTMLReportFileNPath, "w", encoding="utf-8") as fHTMLReport:
+                    
+            #################################################################################
+            # Write out HTML header.
+            #################################################################################
+            fHTMLReport.write("<html><body><table cellspacing='1px' border='1' > \n")
+            fHTMLReport.write("<tr bgcolor='#00B0F0'><th>Data Request ID</th><th>Manifest Filename</th> <th>Extract filename</th><th>Extract file size</th></tr> \n") 	
+    
+            #################################################################################
+            # Loop thru list of Manifest Files to build Report Rows.
+            #################################################################################
             rootLogger.info("")
-            rootLogger.info("*********************")
-            rootLogger.info(f"{ManifestFile2Process=}")
+            rootLogger.info("Process list of manifest files to build Report Rows ")
+
+            for ManifestFile2Process, dctManifestFile in zip(lstManifestFileKeys, lstManifests):
 
-            #############################################################################################
-            # Get manifest file from S3 
-            #############################################################################################
-            rootLogger.info(f"Make s3_client.get_object call")
-            resp = s3_client.get_object(Bucket=XTR_BUCKET, Key=ManifestFile2Process)
+                manifestFilename = os.path.basename(ManifestFile2Process)
 
-            if resp == None:
+                sDataRequestID =  dctManifestFile["shareDetails"]["dataRequestID"]
                 rootLogger.info("")
-                rootLogger.info(f"ManifestFileReport.py failed on get_object on file {ManifestFile2Process}.")
-                
-                ## Send Failure email	
-                SUBJECT = f"ManifestFileReport.py Failed ({ENVNAME})"
-                MSG = f"Getting manifest file {{ManifestFile2Process}} from S3 has failed. "
-                
-                #sendEmail.py CMS_EMAIL_SENDER ENIGMA_EMAIL_FAILURE_RECIPIENT SUBJECT MSG
-                sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_FAILURE_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
-                rootLogger.info(sp_info) 
-                
-                sys.exit(12)
+                rootLogger.info(f"{manifestFilename=} {sDataRequestID=}")
 
-            # Manifest s3 Obj
-            rootLogger.info(resp)
-            
-            # Extract the "Body" which is the actual file contents. Convert from array of bytes to String
-            sManifestFile = resp["Body"].read().decode('utf-8')
-            
-            # preserve new lines for better readability in log file
-            rootLogger.info("\n%s", sManifestFile)
-            
-            # Convert string to Dict to make it easier to access the info
-            dctManifestFile = json.loads(sManifestFile)
-            
-            #############################################################################################
-            # Build Report Rows
-            #############################################################################################
-            manifestFilename = os.path.basename(ManifestFile2Process)
-
-            sDataRequestID =  dctManifestFile["shareDetails"]["dataRequestID"]
-            rootLogger.info(f"{sDataRequestID=}")
-
-            lstFiles = dctManifestFile["fileInformation"]
-            for dctExtFile in lstFiles:
-                s3ExtractFilename = dctExtFile["fileName"]
-                s3ExtractBucketFolder = dctExtFile["fileLocation"]
-                
-                s3ExtFilenameKey = s3ExtractBucketFolder + s3ExtractFilename    
-
-                # Get File size if available
-                try:
-                    resp =  s3_client.head_object(Bucket=XTR_BUCKET, Key=s3ExtFilenameKey)
-                    rootLogger.info(f"{resp=}")
-                    sContentLength = resp["ContentLength"]
-                    sExtFileSize = convertBytes2ReadableSize(int(sContentLength), units=UNITS_MAPPING)
-                    
-                    # resp.get like COALESCE("StorageClass","STANDARD") 
-                    sStorageClass = resp.get("StorageClass","STANDARD")
+                for dctExtFile in dctManifestFile["fileInformation"]:
+                    s3ExtractFilename = dctExtFile["fileName"]
+                    s3ExtFilenameKey = dctExtFile["fileLocation"] + s3ExtractFilename    
 
-                except ClientError as e:
-                    rootLogger.info(f"s3 Extract file {s3ExtFilenameKey} notfnd in s3. Setting file size = blank")
-                    sExtFileSize = ""
+                    # Get File size if available
+                    dictMetadata = dictExtFileMetadata[s3ExtFilenameKey]
 
-                # Display file information
-                rootLogger.info(f"{s3ExtractFilename=}")
-                rootLogger.info(f"{sExtFileSize=}")
-                    
-                sioHTMLReport.write(f"<tr><td>{sDataRequestID}</td><td>{manifestFilename}</td><td>{s3ExtractFilename}</td><td></td>{sExtFileSize}</tr> \n") 	
+                    if dictMetadata is None:
+                        rootLogger.info(f"s3 Extract file {s3ExtFilenameKey} notfnd in s3. Setting file size = blank")
+                        sExtFileSize = ""
+                    else:
+                        sExtFileSize = convertBytes2ReadableSize(int(dictMetadata["ContentLength"]), units=UNITS_MAPPING)
 
+                    # Display file information
+                    rootLogger.info(f"{s3ExtractFilename=} {sExtFileSize=}")
+                    
+                    fHTMLReport.write(f"<tr><td>{sDataRequestID}</td><td>{manifestFilename}</td><td>{s3ExtractFilename}</td><td>{sExtFileSize}</td></tr> \n") 	
 
-        #################################################################################
-        # Write out HTML trailer.
-        #################################################################################
-        sioHTMLReport.write("</table></body></html>")
+            #################################################################################
+            # Write out HTML trailer.
+            #################################################################################
+            fHTMLReport.write("</table></body></html>")
 
 
         #################################################################################
         # Email report
         #################################################################################
-        # Set pointer to beginning of string
-        sioHTMLReport.seek(0)
-        RPT_INFO = sioHTMLReport.read()
-        
-        rootLogger.info("")
-        rootLogger.info("\n%s", RPT_INFO)
-        
         rootLogger.info("")
         rootLogger.info("Send report email")
 
         SUBJECT = f"Manifest Files Processed Report ({ENVNAME})"
-        MSG = f"Manifest Files Processed Report has completed.<br><br>The manifest files processed . . .<br><br>{RPT_INFO}"
+        lstEmailParms = ['python3', 'sendEmailHTML.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_SUCCESS_RECIPIENT, SUBJECT]
+
+        if os.path.getsize(sHTMLReportFileNPath) <= EMAIL_HTML_MAX_INLINE_BYTES:
+            with open(sHTMLReportFileNPath, "r", encoding="utf-8") as fHTMLReport:
+                RPT_INFO = fHTMLReport.read()
+
+            rootLogger.info("")
+            rootLogger.info("\n%s", RPT_INFO)
+
+            MSG = f"Manifest Files Processed Report has completed.<br><br>The manifest files processed . . .<br><br>{RPT_INFO}"
+            lstEmailParms.append(MSG)
+        else:
+            MSG = f"Manifest Files Processed Report has completed.<br><br>The manifest files processed are in the attached report ({len(lstExtFilenameKeys)} extract files)."
+            lstEmailParms.extend([MSG, sHTMLReportFileNPath])
        
         try:
-            sp_info = subprocess.run(['python3', 'sendEmailHTML.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_SUCCESS_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True )
+            sp_info = subprocess.run(lstEmailParms, capture_output=True, text=True, check=True )
             write_sp_info_2_log(sp_info)
             
         except subprocess.CalledProcessError as e:
@@ -380,6 +385,8 @@ def main_processing_loop():
             rootLogger.error(e.output)
 
             sys.exit(12)   
+
+        os.remove(sHTMLReportFileNPath)
        
 
         #############################################################
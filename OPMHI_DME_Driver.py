@@ -6,6 +6,8 @@
 # 
 # Viren Khanna   2026-02-02 Create Module.
 # Paul Baranoski 2026-05-12 Add GSG encryption logic of extract file.
+# 2026-10-18                Encrypt extract file by streaming it from S3 thru gpg into S3 (GPGFunctions.encryptS3Object)
+#                           with a keyring imported once per process. Extract file is no longer downloaded.
 ########################################################################################################
 import os
 os.environ["TESTING"] = "N"
@@ -308,33 +310,15 @@ def main_processing_loop():
 
 
         #############################################################
-        # Download extract file from S3
+        # GPG encrypt extract file: stream S3 extract file thru gpg
+        # into S3 .gpg file (no local copy of either file).
         #############################################################
-        downloadFileFromS3(s3_client, XTR_BUCKET, f"{OPMHI_DME_BUCKET_FLDR}{EXT_FILENAME}", f"{DATA_DIR}{EXT_FILENAME}" )
-
-        #############################################################
-        # GPG encrypt file
-        #############################################################
-        rootLogger.info("Get Secret Key. ")
-        EncryptKey = GPGFunctions.get_secret(OPMHI_CLAIMS_ENCRYPT_KEY_SECRET_NAME, REGION)
-
-        rootLogger.info("Import gpg Key. ")
-        gnupg_home = GPGFunctions.import_gpg_key(EncryptKey)
-        
-        rootLogger.info("get recipient. ")
-        recipient = GPGFunctions.get_key_fingerprint(gnupg_home)
+        rootLogger.info("Get gpg keyring. ")
+        gnupg_home, recipient = GPGFunctions.getGPGKeyring(OPMHI_CLAIMS_ENCRYPT_KEY_SECRET_NAME, REGION)
         rootLogger.debug(f"{recipient=}")
 
-        ext_fileNPath = f"{DATA_DIR}{EXT_FILENAME}"
-        gpg_fileNPath = f"{DATA_DIR}{EXT_FILENAME}.gpg"
-
         rootLogger.info("encrypt file ")
-        GPGFunctions.encrypt_file(gnupg_home, ext_fileNPath, gpg_fileNPath, recipient)
-
-        #############################################################
-        # Upload encrypted extract file to S3
-        #############################################################
-        s3UploadFile(s3_client, f"{DATA_DIR}{EXT_FILENAME}.gpg", XTR_BUCKET, f"{OPMHI_DME_BUCKET_FLDR}{EXT_FILENAME}.gpg")
+        GPGFunctions.encryptS3Object(gnupg_home, recipient, s3_client, XTR_BUCKET, f"{OPMHI_DME_BUCKET_FLDR}{EXT_FILENAME}", f"{OPMHI_DME_BUCKET_FLDR}{EXT_FILENAME}.gpg")
 
         #############################################################
         # Move extract .gz file to archive folder so that it is not
@@ -342,11 +326,6 @@ def main_processing_loop():
         #############################################################
         s3MoveFile2NewFolder(s3_client, XTR_BUCKET, f"{OPMHI_DME_BUCKET_FLDR}{EXT_FILENAME}", f"{OPMHI_DME_BUCKET_FLDR}archive/{EXT_FILENAME}")
 
-        #############################################################
-        # Clean-up files on linux server
-        #############################################################
-        deleteFileFromLinux(ext_fileNPath)
-        deleteFileFromLinux(gpg_fileNPath)
         
         #############################################################
         # SFTP file - 1) no EFT unzip and create text file.
@@ -6,6 +6,10 @@
 # 
 # Viren Khanna   2026-02-02 Create Module.
 # Paul Baranoski 2026-05-12 Add GSG encryption logic of extract file.
+# 2026-10-18                Encrypt extract file by streaming it from S3 thru gpg into S3 (GPGFunctions.encryptS3Object)
+#                           with a keyring imported once per process. Extract file is no longer downloaded.
+# 2026-10-18                Run OPMHI_PTA_Extract.py (run(con, dictParams) with an injected Snowflake connection),
+#                           combine and email steps in-process using ExtractRunner. Log per-stage timings.
 ########################################################################################################
 import os
 os.environ["TESTING"] = "N"
@@ -37,6 +41,9 @@ from CommonFunctions import *
 # functions for encrypting/decrypting files using gpg
 import CommonFunctionsGPG as GPGFunctions
 
+# runs extract, combine and email steps in-process
+import ExtractRunner as ExtRunner
+
 OPMHI_INP_BUCKET = rf"{XTR_BUCKET}/{OPMHI_INP_BUCKET_FLDR}"
 
 
@@ -80,6 +87,9 @@ def main_processing_loop():
 
         # Establish logger with CommonFunctionsGPG module.        
         GPGFunctions.setCommonFunctionLogger(rootLogger) 
+
+        # Establish logger with ExtractRunner module.
+        ExtRunner.setRunnerLogger(rootLogger)
         
         ###########################################################
         # Set current working directory to scripts/run directory.
@@ -200,20 +210,20 @@ def main_processing_loop():
         s3_client.delete_object(Bucket=XTR_BUCKET, Key=f"{OPMHI_INP_BUCKET_FLDR}{EXT_FILENAME}.gpg")
 
         #############################################################
-        # Make variables available for substitution in Python code
+        # Parameters for substitution in Python code
         #############################################################
-        os.environ["TMSTMP"] = TMSTMP
-        os.environ["EXT_FILENAME"] = EXT_FILENAME
-        os.environ["CLM_TYPE_CD"] = CLM_TYPE_CD
-        os.environ["STAGE_NAME"] = STAGE_NAME
-        os.environ["CURR_YR"] = str(CURR_YR)
-        os.environ["CURR_MONTH"] = str(CURR_MONTH)
-        os.environ["CUR_DT"] = CUR_DT
-        os.environ["CAL_QTR"] = str(CAL_QTR)
-        os.environ["START_DATE"] = START_DATE
-        os.environ["END_DATE"] = END_DATE
-        os.environ["EXT_YEAR"] = str(EXT_YEAR)
-        os.environ["EXT_QTR"] = str(EXT_QTR)
+        dictExtParams = {"TMSTMP": TMSTMP,
+                         "EXT_FILENAME": EXT_FILENAME,
+                         "CLM_TYPE_CD": CLM_TYPE_CD,
+                         "STAGE_NAME": STAGE_NAME,
+                         "CURR_YR": CURR_YR,
+                         "CURR_MONTH": CURR_MONTH,
+                         "CUR_DT": CUR_DT,
+                         "CAL_QTR": CAL_QTR,
+                         "START_DATE": START_DATE,
+                         "END_DATE": END_DATE,
+                         "EXT_YEAR": EXT_YEAR,
+                         "EXT_QTR": EXT_QTR}
 
         #############################################################
         # Execute Python code to Extract claims data.
@@ -221,13 +231,12 @@ def main_processing_loop():
         rootLogger.info("")
         rootLogger.info("Start execution of OPMHI_PTA_Extract.py program")
 
-        try:
-            sp_info = subprocess.run(['python3', 'OPMHI_PTA_Extract.py'], capture_output=True, text=True, check=True)
-            write_sp_info_2_log(sp_info) 
-            
-        except subprocess.CalledProcessError as e:
-            rootLogger.error(f"Calling OPMHI_PTA_Extract.py failed with return code {e.returncode}")
-            rootLogger.error("\n%s", e.output)
+        extResult = ExtRunner.run_extract("OPMHI_PTA_Extract", dictExtParams)
+        rootLogger.info(f"{extResult.returncode=}")
+
+        if extResult.returncode != 0:
+            rootLogger.error(f"Calling OPMHI_PTA_Extract.py failed with return code {extResult.returncode}")
+            rootLogger.error("\n%s", extResult.output)
             
             ## Send Failure email	
             SUBJECT=f"OPMHI_PTA_Extract- Failed ({ENVNAME})"
@@ -246,7 +255,7 @@ def main_processing_loop():
         # Call combineS3Files.sh to combine all file parts
         ###########################################################################################
         rootLogger.info("")
-        rootLogger.info("Concatenate S3 files using CombineS3Files.sh") 
+        rootLogger.info("Concatenate S3 files using CombineS3FilesDriver") 
 
         rootLogger.info(f"{OPMHI_INP_BUCKET=} ")
 
@@ -254,12 +263,10 @@ def main_processing_loop():
         rootLogger.info(f"{sConcatFilename=}")
 
         try:
-            sp_info = subprocess.run(['bash', 'CombineS3Files.sh', OPMHI_INP_BUCKET, sConcatFilename ], capture_output=True, text=True, check=True)
-            write_sp_info_2_log(sp_info) 
+            ExtRunner.combine_files(OPMHI_INP_BUCKET, sConcatFilename)
             
-        except subprocess.CalledProcessError as e:
-            rootLogger.error(f"Calling CombineS3Files.sh failed with return code {e.returncode}")
-            rootLogger.error(e.output)
+        except Exception as e:
+            rootLogger.error(f"Combining S3 files failed with error: {e}")
             
             ## Send Failure email	
             SUBJECT=f"Combining S3 files in OPMHI_INP_Driver.py - Failed ({ENVNAME})"
@@ -293,44 +300,24 @@ def main_processing_loop():
         MSG=f" OPMHI_INP_Driver completed. \n\nThe following extract files were created:\n\n{S3Files}"
         
         try:
-            sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, OPMHI_EMAIL_SUCCESS_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
-            write_sp_info_2_log(sp_info)
+            ExtRunner.send_notification(CMS_EMAIL_SENDER, OPMHI_EMAIL_SUCCESS_RECIPIENT, SUBJECT, MSG)
             
-        except subprocess.CalledProcessError as e:
-            rootLogger.error(f"sendEmail.py failed with return code {e.returncode}")
-            rootLogger.error("\n%s", e.output)
+        except Exception as e:
+            rootLogger.error(f"sendEmail failed with error: {e}")
 
             sys.exit(12)    
 
 
         #############################################################
-        # Download extract file from S3
+        # GPG encrypt extract file: stream S3 extract file thru gpg
+        # into S3 .gpg file (no local copy of either file).
         #############################################################
-        downloadFileFromS3(s3_client, XTR_BUCKET, f"{OPMHI_INP_BUCKET_FLDR}{EXT_FILENAME}", f"{DATA_DIR}{EXT_FILENAME}" )
-
-        #############################################################
-        # GPG encrypt file
-        #############################################################
-        rootLogger.info("Get Secret Key. ")
-        EncryptKey = GPGFunctions.get_secret(OPMHI_CLAIMS_ENCRYPT_KEY_SECRET_NAME, REGION)
-
-        rootLogger.info("Import gpg Key. ")
-        gnupg_home = GPGFunctions.import_gpg_key(EncryptKey)
-        
-        rootLogger.info("get recipient. ")
-        recipient = GPGFunctions.get_key_fingerprint(gnupg_home)
+        rootLogger.info("Get gpg keyring. ")
+        gnupg_home, recipient = GPGFunctions.getGPGKeyring(OPMHI_CLAIMS_ENCRYPT_KEY_SECRET_NAME, REGION)
         rootLogger.debug(f"{recipient=}")
 
-        ext_fileNPath = f"{DATA_DIR}{EXT_FILENAME}"
-        gpg_fileNPath = f"{DATA_DIR}{EXT_FILENAME}.gpg"
-
         rootLogger.info("encrypt file ")
-        GPGFunctions.encrypt_file(gnupg_home, ext_fileNPath, gpg_fileNPath, recipient)
-
-        #############################################################
-        # Upload encrypted extract file to S3
-        #############################################################
-        s3UploadFile(s3_client, f"{DATA_DIR}{EXT_FILENAME}.gpg", XTR_BUCKET, f"{OPMHI_INP_BUCKET_FLDR}{EXT_FILENAME}.gpg")
+        GPGFunctions.encryptS3Object(gnupg_home, recipient, s3_client, XTR_BUCKET, f"{OPMHI_INP_BUCKET_FLDR}{EXT_FILENAME}", f"{OPMHI_INP_BUCKET_FLDR}{EXT_FILENAME}.gpg")
 
         #############################################################
         # Move extract .gz file to archive folder so that it is not
@@ -338,11 +325,6 @@ def main_processing_loop():
         #############################################################
         s3MoveFile2NewFolder(s3_client, XTR_BUCKET, f"{OPMHI_INP_BUCKET_FLDR}{EXT_FILENAME}", f"{OPMHI_INP_BUCKET_FLDR}archive/{EXT_FILENAME}")
 
-        #############################################################
-        # Clean-up files on linux server
-        #############################################################
-        deleteFileFromLinux(ext_fileNPath)
-        deleteFileFromLinux(gpg_fileNPath)
         
         #############################################################
         # SFTP file - 1) no EFT unzip and create text file.
@@ -392,6 +374,9 @@ def main_processing_loop():
         # End of Processing
         # NOTE: the \n before "Ended at" line is to ensure that this information is on a separate line, left-justified without any other logging info preceding it.        
         ####################################################################          
+        rootLogger.info(ExtRunner.timing_report())
+        ExtRunner.close_connection()
+
         # Need these messages for Dashboard
         rootLogger.info("Script OPMHI_INP_Driver.py completed successfully.")
         rootLogger.info(f"\nEnded at {datetime.now().strftime('%Y%m%d.%H%M%S')}" )
@@ -6,6 +6,8 @@
 # Created: Joshua Turner
 # Modified: 06/06/2023
 #
+# 2026-10-18 Load finder file with FinderFileLoader.py: COPY INTO a transient staging table and MERGE/DELETE only
+#            changed rows, instead of DELETE of the whole table and COPY INTO the table (FORCE=TRUE).
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
@@ -24,6 +26,8 @@ sys.path.append(utilDirectory)
 import snowconvert_helpers
 from snowconvert_helpers import Export
 
+import FinderFileLoader
+
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
@@ -54,28 +58,10 @@ try:
    snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
    
    ########################################################################################################
-   # Delete everything from OPMHI_CPT_EXCL
-   ########################################################################################################
-   snowconvert_helpers.execute_sql_statement(f"""DELETE FROM "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}".OPMHI_ICD10DGS_EXCL""", con, exit_on_error=True)
-   
-   ######################################################################################################## 
-   # Put the finder file to the local stage
-   ########################################################################################################
-   snowconvert_helpers.execute_sql_statement(f"""PUT file://{DATADIR}{OPMHI_ICD10DGS_FF} @~ OVERWRITE = TRUE""", con,exit_on_error = True)
-
-   ########################################################################################################
-   # Insert finder file data to the table
+   # Load finder file (staging table + MERGE of changed rows)
    ########################################################################################################
-   snowconvert_helpers.execute_sql_statement(f"""COPY INTO BIA_{ENVNAME}.CMS_TARGET_XTR_{ENVNAME}.OPMHI_ICD10DGS_EXCL
-	(OPMHI_ICD10DG_EXCL)
-	FROM (SELECT SUBSTR(f.$1,1,6)
-	      FROM @~/{OPMHI_ICD10DGS_FF} f) 
-	FILE_FORMAT = (TYPE = CSV)""", con,exit_on_error = True)
+   FinderFileLoader.loadFinderFiles(con, [("OPMHI_ICD10DGS_EXCL", OPMHI_ICD10DGS_FF)], ENVNAME, DATADIR)
 
-   ########################################################################################################
-   # Remove the finder file from the stage
-   ########################################################################################################
-   snowconvert_helpers.execute_sql_statement(f"""REMOVE @~/{OPMHI_ICD10DGS_FF}.gz""", con,exit_on_error = True)
    snowconvert_helpers.quit_application()
 
 except Exception as e:
@@ -6,6 +6,8 @@
 # Created: Joshua Turner
 # Modified: 06/06/2023
 # Viren Khanna         2024-02-23   Updated SQL to load FF directly from /Finder_Files folder. 
+#                       2026-10-18   Load finder file with FinderFileLoader.py: COPY INTO a transient staging table and MERGE/DELETE only
+#                                    changed rows, instead of DELETE of the whole table and COPY INTO the table (FORCE=TRUE).
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
@@ -24,6 +26,8 @@ sys.path.append(utilDirectory)
 import snowconvert_helpers
 from snowconvert_helpers import Export
 
+import FinderFileLoader
+
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
@@ -54,18 +58,9 @@ try:
    snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
    
    ########################################################################################################
-   # Delete everything from OPMHI_CPT_EXCL
-   ########################################################################################################
-   snowconvert_helpers.execute_sql_statement(f"""DELETE FROM "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}".OPMHI_SSN""", con, exit_on_error=True)
-   
-   ########################################################################################################
-   # Insert finder file data to the table
+   # Load finder file (staging table + MERGE of changed rows)
    ########################################################################################################
-   snowconvert_helpers.execute_sql_statement(f"""COPY INTO BIA_{ENVNAME}.CMS_TARGET_XTR_{ENVNAME}.OPMHI_SSN
-	(SSN_NUM)
-	FROM (SELECT SUBSTR(f.$1,1,9)
-	      FROM @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_FINDER_FILE_STG/{OPMHI_SSN_FF} f) 
-	FORCE=TRUE FILE_FORMAT = (TYPE = CSV SKIP_HEADER=1 )""", con,exit_on_error = True)
+   FinderFileLoader.loadFinderFiles(con, [("OPMHI_SSN", OPMHI_SSN_FF)], ENVNAME)
 
    snowconvert_helpers.quit_application()
 
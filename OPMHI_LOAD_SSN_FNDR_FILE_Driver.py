@@ -8,6 +8,8 @@
 # Viren Khanna   2026-02-20 Create Module.
 # Paul Baranoski 2026-05-12 Add GSG decryption logic of finder file.
 # Paul Baranoski 2026-06-30 Remove call to removeGnupg_home since the Finally in the decrypt try-block issues the same command.
+# 2026-10-18                Decrypt finder file by streaming it from S3 thru gpg into S3 (GPGFunctions.decryptS3Object)
+#                           with a keyring imported once per process. Finder file is no longer downloaded.
 #
 ########################################################################################################
 # IMPORTS
@@ -164,43 +166,19 @@ def main_processing_loop():
         OPMHI_SSN_FF = OPMHI_SSN_FF_GPG.replace(".gpg","")
         #OPMHI_SSN_FF = OPMHI_SSN_FF.replace(".PGP","")
 
-        encrypted_file = f"{DATA_DIR}{OPMHI_SSN_FF_GPG}"
-        decrypted_file = f"{DATA_DIR}{OPMHI_SSN_FF}"
-        
-        rootLogger.info(f"{encrypted_file=}")
-        rootLogger.info(f"{decrypted_file=}")
-        
-        #############################################################
-        # Download extract file from S3
-        #############################################################
-        downloadFileFromS3(s3_client, XTR_BUCKET, f"{FINDER_FILE_BUCKET_FLDR}{OPMHI_SSN_FF_GPG}", f"{DATA_DIR}{OPMHI_SSN_FF_GPG}" )
-
         #############################################################
-        # GPG decrypt file
+        # GPG decrypt finder file: stream S3 .gpg file thru gpg into
+        # S3 finder file (no local copy of either file).
         #############################################################
-        rootLogger.info(f"Get Secret Key: {OPMHI_DECRYPT_KEY_SECRET_NAME}. ")
-        DecryptKey = GPGFunctions.get_secret(OPMHI_DECRYPT_KEY_SECRET_NAME, REGION)
-        
-        # To allow us to konw if key is a Private or public key
-        sKeyHeader = DecryptKey.split("\\n")[0:1]
-        rootLogger.info(f"{sKeyHeader=}")
-        
-        rootLogger.info("Import gpg Key. ")
-        gnupg_home = GPGFunctions.import_gpg_key(DecryptKey)
+        rootLogger.info(f"Get gpg keyring: {OPMHI_DECRYPT_KEY_SECRET_NAME}. ")
+        gnupg_home, fingerprint = GPGFunctions.getGPGKeyring(OPMHI_DECRYPT_KEY_SECRET_NAME, REGION)
 
-        # List keys and list-packets for debugging
+        # List keys for debugging
         #GPGFunctions.list_keys(gnupg_home)
-
-        #GPGFunctions.list_packets(gnupg_home, encrypted_file)
        
         rootLogger.info("Decrypt finder file ")
-        GPGFunctions.decrypt_file(gnupg_home, OPMHI_DECRYPT_PASSPHRASE, encrypted_file, decrypted_file)
-
-
-        #############################################################
-        # Upload decrypted finder file to S3
-        #############################################################
-        s3UploadFile(s3_client, f"{DATA_DIR}{OPMHI_SSN_FF}", XTR_BUCKET, f"{FINDER_FILE_BUCKET_FLDR}{OPMHI_SSN_FF}")
+        GPGFunctions.decryptS3Object(gnupg_home, OPMHI_DECRYPT_PASSPHRASE, s3_client, XTR_BUCKET, 
+                                     f"{FINDER_FILE_BUCKET_FLDR}{OPMHI_SSN_FF_GPG}", f"{FINDER_FILE_BUCKET_FLDR}{OPMHI_SSN_FF}")
 
         #############################################################
         # Move extract gpg file to archive folder.
@@ -274,12 +252,6 @@ def main_processing_loop():
         s3MoveFile2NewFolder(s3_client, XTR_BUCKET, f"{FINDER_FILE_BUCKET_FLDR}{OPMHI_SSN_FF}", f"{FINDER_FILE_BUCKET_FLDR}archive/{OPMHI_SSN_FF}")
 
 
-        #############################################################
-        # Clean-up files on linux server
-        #############################################################
-        deleteFileFromLinux(decrypted_file)
-        deleteFileFromLinux(encrypted_file)
-
         
         ####################################################################
         # End of Processing
@@ -8,12 +8,13 @@
 #
 # 10/02/2023   Paul Baranoski       Modified extract filename to use imported EXT_FILENAME.
 # 01/14/2025   Sean Whitelock	    Modified PRVDR_LGL_NAME column length from 70 to 100.
+# 2026-10-18 Extract SQL runs in run(con, dictParams) (called in-process by ExtractRunner with an injected
+#            connection). Stand-alone run logs on in the __main__ block.
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
 import os
 import sys
-import datetime
 from datetime import datetime
 
 currentDirectory = os.path.dirname(os.path.realpath(__file__))
@@ -23,38 +24,36 @@ utilDirectory = os.getenv('CMN_UTIL')
 sys.path.append(rootDirectory)
 sys.path.append(utilDirectory)
 
-import snowconvert_helpers
-from snowconvert_helpers import Export
+import ExtractRunner as ExtRunner
 
 ########################################################################################################
 # VARIABLE ASSIGNMENT
 ########################################################################################################
 script_name = os.path.basename(__file__)
-con = None 
-now = datetime.now()
-date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
-
-ENVNAME = os.getenv('ENVNAME')
-TMSTMP = os.getenv('TMSTMP')
-CLM_TYPE_CD = os.getenv('CLM_TYPE_CD')
-START_DATE = os.getenv('START_DATE')
-END_DATE = os.getenv('END_DATE')
-STAGE_NAME = os.getenv('STAGE_NAME')
-EXT_FILENAME=os.getenv('EXT_FILENAME')
-
-# boolean - Python Exception status
-bPythonExceptionOccurred=False
-
-try:
-    snowconvert_helpers.configure_log()
-    con = snowconvert_helpers.log_on()
-    snowconvert_helpers.execute_sql_statement(f"alter session set query_tag='{script_name}'",con,exit_on_error = True)
-    snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}""", con,exit_on_error = True)
+
+
+########################################################################################################
+# Extract OPM-HI Part A data (CLM_TYPE_CD, START_DATE, END_DATE) into EXT_FILENAME
+########################################################################################################
+def run(con, dictParams):
+
+    ENVNAME = dictParams.get('ENVNAME')
+    TMSTMP = dictParams.get('TMSTMP')
+    CLM_TYPE_CD = dictParams.get('CLM_TYPE_CD')
+    START_DATE = dictParams.get('START_DATE')
+    END_DATE = dictParams.get('END_DATE')
+    STAGE_NAME = dictParams.get('STAGE_NAME')
+    EXT_FILENAME=dictParams.get('EXT_FILENAME')
+
+    lstRecords = []
+
+    ExtRunner.execute_sql(con, f"alter session set query_tag='{script_name}'", sScript=script_name)
+    ExtRunner.execute_sql(con, f"USE WAREHOUSE {dictParams.get('sf_xtr_warehouse')}", sScript=script_name)
 
     ########################################################################################################
     # Extract OPM-HI Part A data and write to S3
     ########################################################################################################
-    snowconvert_helpers.execute_sql_statement(f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_{STAGE_NAME}_STG/{EXT_FILENAME}
+    lstRecords.append(ExtRunner.execute_sql(con, f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_{STAGE_NAME}_STG/{EXT_FILENAME}
             FROM (
             SELECT DISTINCT
                 'START' AS ST_OF_FILE,
@@ -204,21 +203,41 @@ try:
                     (SELECT OPMHI_ICD10PC_EXCL FROM "BIA_{ENVNAME}"."CMS_TARGET_XTR_{ENVNAME}"."OPMHI_ICD10PCS_EXCL")
               )
             ) FILE_FORMAT = (TYPE=CSV, FIELD_DELIMITER='|' ESCAPE_UNENCLOSED_FIELD=NONE  FIELD_OPTIONALLY_ENCLOSED_BY=NONE)
-              max_file_size=5368709120 """, con, exit_on_error=True)
-                      
-except Exception as e:
-    print(e)
-    
-    # Let shell script know that python code failed.
-    bPythonExceptionOccurred=True 
-finally:
-    if con is not None:
-        con.close()
-    # Let shell script know that python code failed.      
-    if bPythonExceptionOccurred == True:
-        sys.exit(12) 
-    else:   
-        snowconvert_helpers.quit_application()
+              max_file_size=5368709120 """, sScript=script_name))
 
+    return lstRecords
 
+
+########################################################################################################
+# RUN (stand-alone)
+########################################################################################################
+if __name__ == "__main__":
+
+    import snowconvert_helpers
+
+    con = None 
+    now = datetime.now()
+    date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
+
+    # boolean - Python Exception status
+    bPythonExceptionOccurred=False
+
+    try:
+        snowconvert_helpers.configure_log()
+        con = snowconvert_helpers.log_on()
+
+        run(con, dict(os.environ))
+                      
+    except Exception as e:
+        print(e)
     
+        # Let shell script know that python code failed.
+        bPythonExceptionOccurred=True 
+    finally:
+        if con is not None:
+            con.close()
+        # Let shell script know that python code failed.      
+        if bPythonExceptionOccurred == True:
+            sys.exit(12) 
+        else:   
+            snowconvert_helpers.quit_application()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  OPMHI_TEST_GPG_Stream.py
+#
+# Desc: Test CommonFunctionsGPG streaming/batch functions with a throwaway local key (no Secrets Manager key).
+#
+#       1) Generate a throwaway gpg key (with passphrase) in a temp GNUPGHOME and import it with getGPGKeyring.
+#       2) Put test objects of random data in s3://<bucket>/<folder>.
+#       3) encryptS3Objects --> <key>.gpg; decryptS3Objects --> <key>.out (streamed S3 --> gpg --> S3).
+#       4) Check that each .out object is identical to its test object and that a failed decrypt leaves no object.
+#       5) Delete the test objects.
+#
+# Ex.   python3 OPMHI_TEST_GPG_Stream.py --bucket aws-hhs-cms-eadg-bia-ddom-extracts-nonrpod --folder xtr/DEV/OPMHI_TEST/
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+########################################################################################################
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+
+import boto3
+
+# functions for encrypting/decrypting files using gpg
+import CommonFunctionsGPG as GPGFunctions
+
+
+TEST_PASSPHRASE = "throwaway-test-passphrase"
+
+
+def createThrowawayKey():
+
+    ######################################################
+    # Generate key in a temp GNUPGHOME and return it as the
+    # key JSON stored in Secrets Manager.
+    ######################################################
+    gnupg_home = tempfile.mkdtemp()
+
+    env = os.environ.copy()
+    env["GNUPGHOME"] = gnupg_home
+
+    try:
+        subprocess.run(["gpg", "--batch", "--pinentry-mode", "loopback", "--passphrase", TEST_PASSPHRASE,
+                        "--quick-gen-key", "OPMHI TEST <opmhi-test@localhost>", "default", "default", "never"],
+                       env=env, capture_output=True, check=True)
+
+        sp_info = subprocess.run(["gpg", "--batch", "--pinentry-mode", "loopback", "--passphrase", TEST_PASSPHRASE,
+                                  "--armor", "--export-secret-keys"],
+                                 env=env, capture_output=True, text=True, check=True)
+
+    finally:
+        subprocess.run(["gpgconf", "--kill", "gpg-agent"], env=env, capture_output=True)
+        shutil.rmtree(gnupg_home, ignore_errors=True)
+
+    return json.dumps({"private_key": sp_info.stdout})
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="CommonFunctionsGPG streaming/batch test with a throwaway key")
+    parser.add_argument("--bucket", required=True, help="S3 bucket for test objects")
+    parser.add_argument("--folder", required=True, help="S3 folder for test objects (ex. xtr/DEV/OPMHI_TEST/)")
+    parser.add_argument("--sizes_mb", type=int, nargs="+", default=[0, 1, 150], help="test object sizes (MB)")
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s %(asctime)s => %(message)s', level=logging.INFO)
+    rootLogger = logging.getLogger()
+    GPGFunctions.setCommonFunctionLogger(rootLogger)
+
+    s3_client = boto3.client("s3")
+
+    lstTestKeys = [f"{args.folder}OPMHI_TEST_GPG_Stream_{iFile}_{iMB}MB.txt" for iFile, iMB in enumerate(args.sizes_mb)]
+    lstAllKeys = [f"{sKey}{sSuffix}" for sKey in lstTestKeys for sSuffix in ("", ".gpg", ".out")] + [f"{args.folder}OPMHI_TEST_GPG_Stream_bad.out"]
+
+    try:
+        gnupg_home, fingerprint = GPGFunctions.getGPGKeyring("OPMHI_TEST_GPG_Stream", None, key_data=createThrowawayKey())
+        rootLogger.info(f"{fingerprint=}")
+
+        for sKey, iMB in zip(lstTestKeys, args.sizes_mb):
+            s3_client.put_object(Bucket=args.bucket, Key=sKey, Body=os.urandom(iMB * 1024 * 1024))
+
+        fStart = time.monotonic()
+        GPGFunctions.encryptS3Objects(gnupg_home, fingerprint, s3_client, args.bucket, [(sKey, f"{sKey}.gpg") for sKey in lstTestKeys])
+        GPGFunctions.decryptS3Objects(gnupg_home, TEST_PASSPHRASE, s3_client, args.bucket, [(f"{sKey}.gpg", f"{sKey}.out") for sKey in lstTestKeys])
+        print(f"encrypt + decrypt {sum(args.sizes_mb)} MB: {time.monotonic() - fStart:.1f} secs")
+
+        for sKey in lstTestKeys:
+            if s3_client.get_object(Bucket=args.bucket, Key=sKey)["Body"].read() != s3_client.get_object(Bucket=args.bucket, Key=f"{sKey}.out")["Body"].read():
+                print(f"{sKey}.out is not identical to {sKey}")
+                sys.exit(12)
+
+        # decrypting an object that is not gpg encrypted fails, and leaves no output object
+        try:
+            GPGFunctions.decryptS3Object(gnupg_home, TEST_PASSPHRASE, s3_client, args.bucket, lstTestKeys[0], lstAllKeys[-1])
+            print("decrypt of a file that is not encrypted did not fail")
+            sys.exit(12)
+
+        except subprocess.CalledProcessError:
+            pass
+
+        if s3_client.list_objects_v2(Bucket=args.bucket, Prefix=lstAllKeys[-1]).get("KeyCount", 0) != 0:
+            print(f"{lstAllKeys[-1]} was not deleted after failed decrypt")
+            sys.exit(12)
+
+        print("OPMHI_TEST_GPG_Stream.py: all checks passed")
+
+    finally:
+        s3_client.delete_objects(Bucket=args.bucket, Delete={"Objects": [{"Key": sKey} for sKey in lstAllKeys]})
+        GPGFunctions.removeGPGKeyrings()
+
+
+if __name__ == "__main__":
+
+    main()
@@ -9,6 +9,9 @@
 #                           Modify code to write e.output to log on subprocess.run failure. Replaced code
 #                           with writing e.stdout and e.stderr to log. 
 #                           Change "Ended At" message to have current timestamp value.
+# 2026-10-18                Use record/byte counts returned by splitTextFileIntoMultipleHCPCSFiles instead of re-reading
+#                           each split file. gzip and upload split files in parallel (gzipNUploadFiles).
+# 2026-10-18                Find most recent Q4/Q6 file with s3GetMostRecentFileKey (boto3 listing) instead of aws cli subprocess.
 ########################################################################################################
 # IMPORTS
 ########################################################################################################
@@ -186,10 +189,13 @@ def main_processing_loop():
         
         rootLogger.info("Find most recent S3 Q4/Q6 file.")
         
-        sMostRecentS3Key = s3GetMostRecentFileKeySubProcess(XTR_BUCKET, f"{PSPS_BUCKET_FLDR}archive/", PREFIX)
+        sMostRecentS3Key = s3GetMostRecentFileKey(s3_client, XTR_BUCKET, f"{PSPS_BUCKET_FLDR}archive/", PREFIX)
 
         rootLogger.info(f"{sMostRecentS3Key=}")
 
+        if sMostRecentS3Key is None:
+            raise Exception(f"No file was found in {PSPS_BUCKET_FLDR}archive/ for prefix {PREFIX}.")
+
         # Remove the filepath from the key --> filename only
         gz_filename = sMostRecentS3Key.replace(f"{PSPS_BUCKET_FLDR}archive/","")
         
@@ -222,7 +228,8 @@ def main_processing_loop():
 
         try:
 
-            splitTextFileIntoMultipleHCPCSFiles(f"{DATA_DIR}{txt_Filename}", f"{DATA_DIR}{PSPS_HCPCS_PREFIX}")
+            # [(split filename and path, NOF records, NOF bytes)]
+            lstSplitFilesNCounts = splitTextFileIntoMultipleHCPCSFiles(f"{DATA_DIR}{txt_Filename}", f"{DATA_DIR}{PSPS_HCPCS_PREFIX}")
 
             """
             cmd_awk = [
@@ -257,18 +264,16 @@ def main_processing_loop():
         #################################
 
         rootLogger.info("Get list of .txt split files")
-        sFilenamePattern = f"{PSPS_HCPCS_PREFIX}*.txt"
-        lstFilesMatchingPattern = ls_using_filename_pattern(DATA_DIR, sFilenamePattern)
+        lstFilesMatchingPattern = [os.path.basename(sSplitFilenameNPath) for sSplitFilenameNPath, iRecCnt, iByteCnt in lstSplitFilesNCounts]
 
         ####################################################
-        # Iterate thru files in directory
+        # Iterate thru split files (record and byte counts were counted by the split)
         ####################################################
         lstFilenamesNRecCounts4Email = []
         lstFilenamesNCounts4Dashboard = []
 
-        for sFilename in lstFilesMatchingPattern:
-            iRecCnt = wc_l(f"{DATA_DIR}{sFilename}")
-            iByteCnt = getFileByteCount(f"{DATA_DIR}{sFilename}")
+        for sSplitFilenameNPath, iRecCnt, iByteCnt in lstSplitFilesNCounts:
+            sFilename = os.path.basename(sSplitFilenameNPath)
 
             ##########################################################################
             # # wc -l PSPS_HCPCS_Q6_PSPS*.txt | grep -v 'total' | awk '{print $2,$1}' | xargs printf "%s %'14d\n"
@@ -294,11 +299,7 @@ def main_processing_loop():
         
         rootLogger.info(f"zip and upload split files." )
         
-        for sFilename in lstFilesMatchingPattern:
-            gz_SplitFilename = gzipFile(DATA_DIR, os.path.basename(sFilename))
-            rootLogger.info(f"{sFilename=} on linux" )
-            
-            s3UploadFile(s3_client, f"{DATA_DIR}{gz_SplitFilename}", XTR_BUCKET, f"{PSPS_BUCKET_FLDR}{gz_SplitFilename}" )     
+        gzipNUploadFiles(s3_client, DATA_DIR, lstFilesMatchingPattern, XTR_BUCKET, PSPS_BUCKET_FLDR)
         
         ####################################################################
         # Send success email 
@@ -17,6 +17,9 @@
 #                           Add logic to remove full extract temp file when processing for all states has completed.  
 # Paul Baranoski 2026-02-03 Modify to Add "TESTING" functionality.
 # Paul Baranoski 2026-06-18 Add CommonFunctions module, and remove duplicate hard-coded functions.
+# 2026-10-18                Compile each state's field masks into a mask plan applied with one itemgetter/format operation.
+#                           Stream extract .gz file from S3 instead of downloading and unzipping it to temp files.
+#                           gzip and upload each completed state file in a thread pool (ST_GZIP_UPLOAD_MAX_WORKERS).
 ############################################################################################################
 import os
 os.environ["TESTING"] = "N"
@@ -40,6 +43,9 @@ import boto3
 import gzip
 import shutil
 import tempfile
+
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 # Set a different temp directory than the default "/tmp"
 tempfile.tempdir = "/app/IDRC/XTR/CMS/data"
 
@@ -60,6 +66,12 @@ iTotalBytesTransferred = 0
 s3UploadConfig = TransferConfig(multipart_chunksize=4 * 1024 * 1024,
                                 multipart_threshold=4 * 1024 * 1024)
 
+# NOF completed state files gzipped and uploaded at one time
+ST_GZIP_UPLOAD_MAX_WORKERS = int(os.getenv("ST_GZIP_UPLOAD_MAX_WORKERS", "4"))
+
+# write buffer size of each state temp file
+ST_FILE_WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 #############################################################
 # Functions
@@ -244,6 +256,99 @@ def buildStFldDisplayRules(lstConfigRecs):
     return dictAllStatesNFlds2Init, iOutputRecLength
 
 
+def buildStMaskPlans(dictAllStatesNFlds2Init, iOutputRecLength):
+
+    ########################################################################
+    # Compile each state's list of flds to mask into a mask plan:
+    #   1) Overlay the state's masks on the output record positions 
+    #      (flds are applied in config order like maskExtRecLegacy).
+    #   2) Convert the overlay into runs of record slices and mask values.
+    #   3) Format template: record slices are %s, mask values and the 
+    #      ending newline are constants. 
+    #
+    # Ex. flds [(28, 48, 20, b' '), (48, 56, 8, b'0')] with iOutputRecLength 205
+    #     --> getter: itemgetter(slice(0, 28), slice(56, 205))
+    #     --> template: b'%s' + (b' ' * 20) + (b'0' * 8) + b'%s\n'
+    #
+    # Masked record = template % getter(record) (for records >= iOutputRecLength bytes) 
+    ########################################################################
+    dictStMaskPlans = {}
+
+    for sStAbrv, lstFlds2Init in dictAllStatesNFlds2Init.items():
+
+        # None --> keep record byte; else mask byte value
+        lstOverlay = [None] * iOutputRecLength
+
+        for fldStartPos, fldEndPos, fldLen, fldMaskValue in lstFlds2Init:
+            for iPos in range(fldStartPos, min(fldEndPos, iOutputRecLength)):
+                lstOverlay[iPos] = fldMaskValue
+
+        lstSlices = []
+        lstTemplate = []
+
+        iRunStart = 0
+        for iPos in range(1, iOutputRecLength + 1):
+            if iPos < iOutputRecLength and (lstOverlay[iPos] is None) == (lstOverlay[iRunStart] is None):
+                continue
+
+            if lstOverlay[iRunStart] is None:
+                lstSlices.append(slice(iRunStart, iPos))
+                lstTemplate.append(b"%s")
+            else:
+                lstTemplate.append(b"".join(lstOverlay[iRunStart:iPos]).replace(b"%", b"%%"))
+
+            iRunStart = iPos
+
+        # itemgetter returns a tuple for 2+ items only
+        if len(lstSlices) == 1:
+            lstSlices.append(slice(0, 0))
+            lstTemplate.append(b"%s")
+
+        getter = itemgetter(*lstSlices) if lstSlices else (lambda bExtRec: ())
+        bTemplate = b"".join(lstTemplate) + b"\n"
+
+        dictStMaskPlans[sStAbrv] = (bTemplate, getter)
+
+    return dictStMaskPlans
+
+
+def maskExtRecLegacy(bExtRec, lstFlds2Init, iOutputRecLength):
+
+    ############################################### 
+    # Iterate thru fields to mask flds on record
+    # NOTE: Used for records shorter than the output record length. 
+    ############################################### 
+    # Ex.  [(28, 48, 20, b' '), (48, 56, 8, b'0'), (56, 57, 1, b'0'), (164, 165, 1, b' '), (166, 167, 1, b' '), (167, 168, 1, b' ')]       
+    ############################################### 
+    baExtRec = bytearray(bExtRec)
+
+    for fld2Init in lstFlds2Init:
+        
+        # Load fld attributes    
+        fldStartPos = fld2Init[0]
+        fldEndPos = fld2Init[1]
+        fldLen  = fld2Init[2]
+        fldMaskValue = fld2Init[3] 
+        
+        # initialize fld
+        baExtRec[fldStartPos : fldEndPos] = fldMaskValue * fldLen
+
+    return baExtRec[:iOutputRecLength]+b'\n'
+
+
+def openS3ExtFileStream(s3_client, S3BUCKET, s3ExtractFileKey):
+
+    ################################################################
+    # Stream s3 Extract gz file: records are decompressed as they 
+    # are read (no temp .gz file or unzipped temp file).
+    ################################################################
+    rootLogger.info(f"Streaming {s3ExtractFileKey} from s3 bucket {S3BUCKET}")
+
+    response = s3_client.get_object(Bucket=S3BUCKET, Key=s3ExtractFileKey)
+
+    return gzip.GzipFile(fileobj=response["Body"], mode="rb")
+
+
 def downloadExtFileAndUnzip(s3_client, S3BUCKET, s3ExtractFileKey):    
 
     ################################################################
@@ -666,31 +771,34 @@ def main_processing_loop():
         dictAllStatesNFlds2Init, iOutputRecLength = buildStFldDisplayRules(lstConfigRecs)
 
         ##################################################################
-        # Download Extract .gz file from s3 and unzip it into temp file.
+        # Compile State field masks 
+        ##################################################################
+        dictStMaskPlans = buildStMaskPlans(dictAllStatesNFlds2Init, iOutputRecLength)
+
+        ##################################################################
+        # Stream Extract .gz file from s3.
         # NOTE: Contains data for all states.
         ##################################################################
         s3ExtractFileKey = S3_BUCKET_FLDR + S3_EXTRACT_FILE
         
-        unzippedExtFilePath = downloadExtFileAndUnzip(s3_client, XTR_BUCKET, s3ExtractFileKey)            
-
-
         ##################################################################
-        # Split unzipped Extract file into multiple state files,
+        # Split Extract file into multiple state files,
         #  and mask specific fields depending on the State field display rules.
+        # Completed state files are gzipped and uploaded in the pool while
+        #  the next states are split.
         ##################################################################
         swFirstRec = True
         iRecCount = 0
         lstDashboardRecs = []
+
+        # [(sExtStGzFilename, iRecCount, future of processCompletedState)] 
+        lstCompletedStates = []
         
-        with open(unzippedExtFilePath, 'rb') as fExtFile:
+        with openS3ExtFileStream(s3_client, XTR_BUCKET, s3ExtractFileKey) as fExtFile, \
+             ThreadPoolExecutor(max_workers=ST_GZIP_UPLOAD_MAX_WORKERS) as stPool:
             
             for bExtRec in fExtFile:
 
-                ###############################################
-                # Convert record contents to bytearray  
-                ###############################################
-                baExtRec = bytearray(bExtRec)
-
                 ###############################################                
                 # Get State Abrev for record
                 ###############################################
@@ -714,13 +822,8 @@ def main_processing_loop():
                     
                     sExtStGzFilename = S3_EXT_ST_FILE.replace("XX",sPrevStCD)
                                         
-                    sFileByteSizes = processCompletedState(s3_client, sPrevStCD, tmpStateFile, S3_BUCKET_FLDR, sExtStGzFilename, iRecCount)
-                    
-                    rootLogger.info(f"Processing complete for {sPrevStCD}. ")
-
-                    # Build Dashboard extract info: 
-                    sDashboardRec = f"DASHBOARD_INFO: {sExtStGzFilename} {iRecCount} {sFileByteSizes} "
-                    lstDashboardRecs.append(sDashboardRec)
+                    futStateFile = stPool.submit(processCompletedState, s3_client, sPrevStCD, tmpStateFile, S3_BUCKET_FLDR, sExtStGzFilename, iRecCount)
+                    lstCompletedStates.append((sExtStGzFilename, iRecCount, futStateFile))
                     
                     swNewState = True
 
@@ -738,14 +841,16 @@ def main_processing_loop():
                     bPrevStCD = bStCD
                     iRecCount = 0
 
-                    # Get new State's list of flds to mask
+                    # Get new State's list of flds to mask, and compiled mask plan
                     rootLogger.info(f"Get lstFlds2Init")
                     lstFlds2Init = dictAllStatesNFlds2Init[sStCD] 
                     rootLogger.info(f"{lstFlds2Init=}")
+
+                    bStTemplate, stGetter = dictStMaskPlans[sStCD]
                     
                     # Create temporary file to write new state records to        
                     rootLogger.info(f"Create temp file for new state")
-                    tmpStateFile = tempfile.NamedTemporaryFile(delete=False, mode='wb') 
+                    tmpStateFile = tempfile.NamedTemporaryFile(delete=False, mode='wb', buffering=ST_FILE_WRITE_BUFFER_SIZE) 
                     tmpStateFilePath = tmpStateFile.name
                     
                 
@@ -754,55 +859,41 @@ def main_processing_loop():
                 ###############################################
                 iRecCount += 1
                 
-                ############################################### 
-                # Iterate thru fields to mask flds on record
-                ############################################### 
-                # Ex.  [(28, 48, 20, b' '), (48, 56, 8, b'0'), (56, 57, 1, b'0'), (164, 165, 1, b' '), (166, 167, 1, b' '), (167, 168, 1, b' ')]       
-                ############################################### 
-                for fld2Init in lstFlds2Init:
-                    
-                    # Load fld attributes    
-                    fldStartPos = fld2Init[0]
-                    fldEndPos = fld2Init[1]
-                    fldLen  = fld2Init[2]
-                    fldMaskValue = fld2Init[3] 
-                    
-                    # initialize fld
-                    baExtRec[fldStartPos : fldEndPos] = fldMaskValue * fldLen
-
                 ###############################################
-                # Write current record  
+                # Mask flds and write current record  
                 ###############################################
-                tmpStateFile.write(baExtRec[:iOutputRecLength]+b'\n')  
-
+                if len(bExtRec) >= iOutputRecLength:
+                    tmpStateFile.write(bStTemplate % stGetter(bExtRec))  
+                else:
+                    tmpStateFile.write(maskExtRecLegacy(bExtRec, lstFlds2Init, iOutputRecLength))  
 
       
-        #############################################################
-        # Process last completed state (after EOF)
-        #############################################################
-        rootLogger.debug(f"{iRecCount=}")
-        
-        if iRecCount > 0:
-            sPrevStCD = bPrevStCD.decode('utf-8')
-
-            rootLogger.info(f"Processed all extract file records for {sPrevStCD}. ")
+            #############################################################
+            # Process last completed state (after EOF)
+            #############################################################
+            rootLogger.debug(f"{iRecCount=}")
             
-            sExtStGzFilename = S3_EXT_ST_FILE.replace("XX",sPrevStCD)
-                    
-            sFileByteSizes = processCompletedState(s3_client, sPrevStCD, tmpStateFile, S3_BUCKET_FLDR, sExtStGzFilename, iRecCount)
-
-            rootLogger.info(f"Processing complete for {sPrevStCD}. ")
-
-            # Build Dashboard extract info: 
-            sDashboardRec = f"DASHBOARD_INFO: {sExtStGzFilename} {iRecCount} {sFileByteSizes} "
-            lstDashboardRecs.append(sDashboardRec)
+            if iRecCount > 0:
+                sPrevStCD = bPrevStCD.decode('utf-8')
 
-
-        #############################################################
-        # Remove temp file of full extract.
-        #############################################################
-        rootLogger.info(f"Removing temp file {unzippedExtFilePath}")
-        os.remove(unzippedExtFilePath)
+                rootLogger.info(f"Processed all extract file records for {sPrevStCD}. ")
+                
+                sExtStGzFilename = S3_EXT_ST_FILE.replace("XX",sPrevStCD)
+                        
+                futStateFile = stPool.submit(processCompletedState, s3_client, sPrevStCD, tmpStateFile, S3_BUCKET_FLDR, sExtStGzFilename, iRecCount)
+                lstCompletedStates.append((sExtStGzFilename, iRecCount, futStateFile))
+
+            #############################################################
+            # Wait for state files to be gzipped and uploaded (in state order)
+            #############################################################
+            for sExtStGzFilename, iStRecCount, futStateFile in lstCompletedStates:
+                sFileByteSizes = futStateFile.result()
+
+                rootLogger.info(f"Processing complete for {sExtStGzFilename}. ")
+
+                # Build Dashboard extract info: 
+                sDashboardRec = f"DASHBOARD_INFO: {sExtStGzFilename} {iStRecCount} {sFileByteSizes} "
+                lstDashboardRecs.append(sDashboardRec)
 
 
         #############################################################
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  PTD_Duals_St_SplitBenchmark.py
+#
+# Desc: Benchmark PTD Duals state split and field masking (MB/sec) of
+#         1) PTD_Duals_St_Split.awk
+#         2) PTD_Duals_Extract_Driver.maskExtRecLegacy (bytearray slice assignments per field)
+#         3) PTD_Duals_Extract_Driver.buildStMaskPlans (compiled state mask plans)
+#
+#       Creates a state parm file and an extract file sorted by state in a temp directory, checks that the state files
+#       of the mask plans are identical to the bytearray state files, and removes the temp directory.
+#       NOTE: The awk script never suppresses the last parm fld, so its state files are only reported as identical or not.
+#
+# Ex.   python3 PTD_Duals_St_SplitBenchmark.py --nof_recs 2000000 --awk ./PTD_Duals_St_Split.awk
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+########################################################################################################
+import os
+import sys
+import time
+import random
+import shutil
+import filecmp
+import logging
+import argparse
+import tempfile
+import subprocess
+
+import PTD_Duals_Extract_Driver as PTDDuals
+
+
+EXT_REC_LEN = 230
+
+# Fld start positions (1-based) and lengths from the PTD Duals parm file
+FLD_START_POS = [1, 6, 9, 29, 49, 57, 58, 66, 74, 93, 95, 110, 112, 113, 114, 115, 125, 128, 130, 165, 166, 167, 168, 169, 182, 195]
+FLD_LEN = [5, 3, 20, 20, 8, 1, 8, 8, 19, 2, 15, 2, 1, 1, 1, 10, 3, 2, 35, 1, 1, 1, 1, 13, 13, 11]
+
+STATES = ["AZ", "CA", "CT", "IL", "IN", "MA", "NJ", "NY", "PA", "TX"]
+
+
+def createTestFiles(sDir, iNOFRecs):
+
+    random.seed(iNOFRecs)
+
+    #############################################################
+    # State parm file: each state masks a random set of flds
+    #############################################################
+    lstConfigRecs = ["#  |" + "|".join(f"{iPos:03}" for iPos in FLD_START_POS)]
+
+    for sSt in STATES:
+        lstConfigRecs.append(sSt + "|" + "|".join(random.choice(["XX ", "XX ", "   "]) for _ in FLD_START_POS))
+
+    lstConfigRecs.append("ZX|" + "|".join(random.choice(["X  ", "9  "]) for _ in FLD_START_POS))
+    lstConfigRecs.append("ZY|" + "|".join(f"{iPos:03}" for iPos in FLD_START_POS))
+    lstConfigRecs.append("ZZ|" + "|".join(f"{iLen:03}" for iLen in FLD_LEN))
+
+    sParmFile = os.path.join(sDir, "PTDDualsStParms.txt")
+    with open(sParmFile, "w") as fParm:
+        fParm.write("\n".join(lstConfigRecs) + "\n")
+
+    #############################################################
+    # Extract file sorted by state (state code in cols 221-222)
+    #############################################################
+    sChars = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 "
+    lstRecs = ["".join(random.choice(sChars) for _ in range(EXT_REC_LEN)) for _ in range(1000)]
+
+    sExtFile = os.path.join(sDir, "PTDDualsExtract.txt")
+    with open(sExtFile, "w") as fExt:
+        for iSt, sSt in enumerate(STATES):
+            for iRec in range(iNOFRecs // len(STATES)):
+                sRec = lstRecs[(iSt + iRec) % len(lstRecs)]
+                fExt.write(sRec[:220] + sSt + sRec[222:] + "\n")
+
+    return lstConfigRecs, sParmFile, sExtFile
+
+
+def splitExtFile(sExtFile, sOutDir, fnMaskRec):
+    """ Split extract file into state files. fnMaskRec(bExtRec, sStCD) returns the masked output record. """
+
+    bPrevStCD = None
+    fStFile = None
+
+    with open(sExtFile, "rb") as fExtFile:
+        for bExtRec in fExtFile:
+            bStCD = bExtRec[220:222]
+
+            if bStCD != bPrevStCD:
+                if fStFile:
+                    fStFile.close()
+                bPrevStCD = bStCD
+                sStCD = bStCD.decode("utf-8")
+                fStFile = open(os.path.join(sOutDir, f"ST_{sStCD}.txt"), "wb", buffering=PTDDuals.ST_FILE_WRITE_BUFFER_SIZE)
+
+            fStFile.write(fnMaskRec(bExtRec, sStCD))
+
+    if fStFile:
+        fStFile.close()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="PTD Duals state split benchmark")
+    parser.add_argument("--nof_recs", type=int, default=500000, help="NOF extract records")
+    parser.add_argument("--awk", default="./PTD_Duals_St_Split.awk", help="PTD_Duals_St_Split.awk (skipped if it does not exist)")
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s %(asctime)s => %(message)s', level=logging.WARNING)
+    PTDDuals.rootLogger = logging.getLogger()
+
+    sDir = tempfile.mkdtemp(prefix="PTD_Duals_St_SplitBenchmark_")
+
+    try:
+        #############################################################
+        # Create parm and extract files
+        #############################################################
+        lstConfigRecs, sParmFile, sExtFile = createTestFiles(sDir, args.nof_recs)
+        fMB = os.path.getsize(sExtFile) / (1024 * 1024)
+        print(f"Extract file {args.nof_recs} records {fMB:.1f} MB")
+
+        dictAllStatesNFlds2Init, iOutputRecLength = PTDDuals.buildStFldDisplayRules(lstConfigRecs)
+        dictStMaskPlans = PTDDuals.buildStMaskPlans(dictAllStatesNFlds2Init, iOutputRecLength)
+
+        print(f"{'split':>20} {'secs':>10} {'MB/sec':>10}")
+
+        def timeIt(sName, fnSplit):
+            fStart = time.monotonic()
+            fnSplit()
+            fElapsed = time.monotonic() - fStart
+            print(f"{sName:>20} {fElapsed:>10.2f} {fMB / fElapsed:>10.1f}")
+
+        def getDiffFiles(sExpectedDir, sActualDir):
+            return [sFilename for sFilename in sorted(os.listdir(sExpectedDir))
+                    if not filecmp.cmp(os.path.join(sExpectedDir, sFilename), os.path.join(sActualDir, sFilename), shallow=False)]
+
+        #############################################################
+        # Field-by-field bytearray masking
+        #############################################################
+        sLegacyDir = os.path.join(sDir, "legacy")
+        os.mkdir(sLegacyDir)
+        timeIt("bytearray", lambda: splitExtFile(sExtFile, sLegacyDir,
+                                                 lambda bExtRec, sStCD: PTDDuals.maskExtRecLegacy(bExtRec, dictAllStatesNFlds2Init[sStCD], iOutputRecLength)))
+
+        #############################################################
+        # Compiled state mask plans
+        #############################################################
+        def maskExtRec(bExtRec, sStCD):
+            bStTemplate, stGetter = dictStMaskPlans[sStCD]
+            return bStTemplate % stGetter(bExtRec)
+
+        sPlanDir = os.path.join(sDir, "plan")
+        os.mkdir(sPlanDir)
+        timeIt("mask plan", lambda: splitExtFile(sExtFile, sPlanDir, maskExtRec))
+
+        lstDiffFiles = getDiffFiles(sLegacyDir, sPlanDir)
+        if lstDiffFiles:
+            print(f"mask plan state files not identical to bytearray state files: {lstDiffFiles}")
+            sys.exit(12)
+
+        #############################################################
+        # awk script
+        #############################################################
+        if os.path.isfile(args.awk):
+            sAwkDir = os.path.join(sDir, "awk")
+            os.mkdir(sAwkDir)
+            timeIt("awk", lambda: subprocess.run(["awk", "-f", args.awk, "-v", f"outfile_model={sAwkDir}/ST_XX.txt", sParmFile, sExtFile],
+                                                 stdout=subprocess.DEVNULL, check=True))
+
+            lstDiffFiles = getDiffFiles(sLegacyDir, sAwkDir)
+            print(f"awk state files not identical (last fld suppressed): {lstDiffFiles}" if lstDiffFiles else "awk state files identical")
+        else:
+            print(f"{args.awk} not found.")
+
+    finally:
+        shutil.rmtree(sDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+
+    main()
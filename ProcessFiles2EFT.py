@@ -70,6 +70,14 @@
 # Paul Baranoski 2025-11-07 Convert from bash to python.
 # Paul Baranoski 2026-01-13 Add logic to retrieve "TESTING" environment variable. Modify If statment to only load EFT Files to s3://EFT_FILES
 #                           when the HLQ in ("P#EFT,T#EFT,MNUP) AND swTESTING=N.
+# 2026-10-18                Allow main_processing_loop to be called in-process (ExtractRunner) with the Extract folder and
+#                           EFT destination folder as function parameters instead of command-line parameters.
+# 2026-10-18                Replace download/gunzip/sed/wc/upload linux file passes with a single streaming pass (StreamEFTFile.py):
+#                           S3 ranged reads --> gunzip --> cleanse multi-byte chars --> count bytes/chars/lines --> S3 multipart upload.
+#                           No temp files are written to DATADIR. EFT file is only completed in S3 when byte-count = char-count.
+# 2026-10-18                Process Extract files concurrently (EFT_MAX_WORKERS workers, EFT_MEMORY_BUDGET_MB memory budget).
+#                           Log per-file results and send one failure email for all failed files. Failed files are not archived.
+#                           Archive move uses parallel server-side part copies (CommonFunctions.s3MoveLargeFile2NewFolder).
 ######################################################################################
 import os
 import sys
@@ -89,6 +97,11 @@ from boto3.s3.transfer import TransferConfig
 
 import gzip
 import shutil
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import tempfile
 # Set a different temp directory than the default "/tmp"
 tempfile.tempdir = "/app/IDRC/XTR/CMS/data"
@@ -99,26 +112,308 @@ from SET_XTR_ENV import *
 # Our include members
 import LoggerStandard as EnigmaLog
 from CommonFunctions import * 
+import StreamEFTFile as StreamEFT
 
 DATADIR = "/app/IDRC/XTR/CMS/data/"
 LOG_DIR = "/app/IDRC/XTR/CMS/logs/"
 RUNDIR = "/app/IDRC/XTR/CMS/scripts/run/"
 
+# NOF Extract files processed at one time, and memory budget (MB) shared by the files being streamed
+EFT_MAX_WORKERS = int(os.getenv("EFT_MAX_WORKERS", "4"))
+EFT_MEMORY_BUDGET_MB = int(os.getenv("EFT_MEMORY_BUDGET_MB", "1024"))
+
+
+#############################################################
+# Classes
+#############################################################
+class EFTFileError(Exception):
+    """ Processing of one Extract file failed. The message is included in the failure email. """
+
+
+class EFTFileResult:
+    """ Result record of one Extract file processed by an EFT worker. """
+
+    def __init__(self, gz_ExtractFileKey):
+
+        self.gz_ExtractFileKey = gz_ExtractFileKey
+        self.mf_filename = ""
+        self.status = "FAILED"
+        self.msg = ""
+        self.eft_loaded = False
+        self.byte_count = 0
+        self.char_count = 0
+        self.line_count = 0
+        self.elapsed_secs = 0.0
+
+
+class MemoryBudget:
+    """ Global memory budget (bytes) shared by the EFT workers. acquire() waits until the amount is available. """
+
+    def __init__(self, iBudgetBytes):
+
+        self._iBudgetBytes = iBudgetBytes
+        self._iAvailBytes = iBudgetBytes
+        self._cond = threading.Condition()
+
+    def acquire(self, iBytes):
+
+        # a single file larger than the budget must still be able to run (by itself)
+        iBytes = min(iBytes, self._iBudgetBytes)
+
+        with self._cond:
+            while self._iAvailBytes < iBytes:
+                self._cond.wait()
+            self._iAvailBytes -= iBytes
+
+        return iBytes
+
+    def release(self, iBytes):
+
+        with self._cond:
+            self._iAvailBytes += iBytes
+            self._cond.notify_all()
+
+
+class EFTFileLogAdapter(logging.LoggerAdapter):
+    """ Prefix log messages with the Extract filename since files are processed concurrently. """
+
+    def process(self, msg, kwargs):
+
+        return f"[{self.extra['gz_filename']}] {msg}", kwargs
+
 
 #############################################################
 # Functions
 #############################################################
-def cleanseExtFile(sPathNFilename):
+def processExtractFile2EFT(gz_ExtractFileKey, lstEFTConfigRecs, S3ExtKeyFldr2Process, S3HLFolder, S3_EFT_DESTINATION_FLDR, swTESTING, budget, result, fileLogger):
+
+
+    fileLogger.info("*****************************************************************")
+    fileLogger.info(f"{gz_ExtractFileKey=}")
+
+    #############################################################
+    # Build config file key to convert to EFT filename
+    #############################################################
+    # Remove file path to get gz_filename. Get last "node" which contains filename by itself.
+    gz_filename = gz_ExtractFileKey.split("/")[-1] 
+    fileLogger.info(f"{gz_filename=}")
+   
+    ###################################################################
+    # Find Key/Value file mapping record
+    ###################################################################
+    fileLogger.info("")
+    fileLogger.info("Build MF EFT file name for SF file ")
+
+    # Build search keys for EFT config file
+    txt_filename = gz_filename.replace(".gz","")
 
-    rootLogger.info("")
-    rootLogger.info(f"Cleanse extract file {sPathNFilename} on linux ")
+    SEARCH_1NODE  = txt_filename.split("_") [0]  	
+    SEARCH_2NODES = '_'.join(txt_filename.split("_") [0:2])  
+
+    # Extract appropriate key/value record from config file
+    lstMatches = [ EFTConfigRec for EFTConfigRec in lstEFTConfigRecs if re.search(f'^{SEARCH_1NODE}',EFTConfigRec) ]
+    
+    NOF_SF2MF_KEY_VALUE_MATCHES = len(lstMatches)
+    fileLogger.info(f"{NOF_SF2MF_KEY_VALUE_MATCHES=}")
     
-    # Replace double-byte UTF-8 character to single byte space characater
-    # Need to maintaine LRECL count for EFT to send file successfully to MF
-    subprocess.run(["sed", "-i", "s/[\x80-\xff][\x80-\xff]/ /g", sPathNFilename ],env={"LC_ALL": "C"}  )
+    if NOF_SF2MF_KEY_VALUE_MATCHES == 0:
+        fileLogger.info("")
+        fileLogger.info("ProcessFiles2EFT.py failed")
+        
+        MSG=f"ProcessFiles2EFT.py has failed. Could not find matching SF2MF Key/value record for key={SEARCH_1NODE}"
+        raise EFTFileError(MSG)
+        
+    elif NOF_SF2MF_KEY_VALUE_MATCHES == 1:	
+        SF2MF_KEY_VALUE_PAIR = lstMatches[0]
+        fileLogger.info(f"{SF2MF_KEY_VALUE_PAIR=}")
+
+    elif NOF_SF2MF_KEY_VALUE_MATCHES >= 2:
+        # Extract appropriate key/value record from config file
+        lstMatches = [ EFTConfigRec for EFTConfigRec in lstEFTConfigRecs if re.search(f'^{SEARCH_2NODES}',EFTConfigRec) ]
+
+        NOF_SF2MF_KEY_VALUE_MATCHES = len(lstMatches)
+        fileLogger.info(f"{NOF_SF2MF_KEY_VALUE_MATCHES=}")
+        
+        if NOF_SF2MF_KEY_VALUE_MATCHES == 1:	
+            SF2MF_KEY_VALUE_PAIR = lstMatches[0]
+            fileLogger.info(f"{SF2MF_KEY_VALUE_PAIR=}")
+
+        else:
+            fileLogger.info("")
+            fileLogger.info(f"Found {NOF_SF2MF_KEY_VALUE_MATCHES} matching (too many or not any) SF2MF Key/value records for key={SEARCH_2NODES}")
+            
+            MSG=f"ProcessFiles2EFT.py has failed. Found {NOF_SF2MF_KEY_VALUE_MATCHES} matching (too many) SF2MF Key/value records for key={SEARCH_2NODES} "
+            raise EFTFileError(MSG)
+
+    
+    ############################################################
+    # Extract SF and MF file masks from config record; 
+    #   1) remove file extension 
+    #   2) change '_' to ' ' to make it easier to see array elements 
+    #
+    # NOTE: "=" separates key and value parts
+    ############################################################
+    SF_FILE_MASK = str(SF2MF_KEY_VALUE_PAIR.split("=")[0]).replace(".txt","").replace(".csv","").replace("_"," ")
+    SF_FILENAME = txt_filename.replace(".txt","").replace(".txt","").replace(".csv","").replace("_"," ")
+
+    MF_FILE_MASK = (SF2MF_KEY_VALUE_PAIR.split("=")[1]).replace("_"," ")
+    MF_FILENAME = MF_FILE_MASK
+
+    fileLogger.info(f"{MF_FILE_MASK=}")
+    fileLogger.info(f"SF_FILE_MASK Array = {SF_FILE_MASK}" )
+    fileLogger.info(f"SF_FILENAME Array = {SF_FILENAME}") 
+
+    # Create array of tokens from filenames
+    SF_FILEMASK_ARRAY = SF_FILE_MASK.split(" ")
+    SF_FILENAME_ARRAY = SF_FILENAME.split(" ")
+
+    fileLogger.info("")
+    fileLogger.info("Parse SF filename mask nodes")
 
     
-def main_processing_loop():
+    for i, sNode in enumerate(SF_FILEMASK_ARRAY):
+        fileLogger.info("")
+        fileLogger.info(f"{i} = {sNode}")
+
+        # This is a replacement token  
+        if sNode.find("{") >= 0:
+            key = SF_FILEMASK_ARRAY [i] 
+            value = SF_FILENAME_ARRAY [i] if len(SF_FILENAME_ARRAY) > i else "" 
+            
+            if sNode == "{TIMESTAMP}":
+                YYMMDD = value [2:8]
+                HHMMSS = value [9:15]
+                # EFT transer process needs Time node to have 7 digits -- add "1" after time
+                value=f"D{YYMMDD}.T{HHMMSS}1"
+                fileLogger.info(f"valueTM={value}")
+                
+            elif sNode == "{SSA-RDATE}":
+                YYMMDD = value [2:8]
+                HHMMSS = value [9:15]
+                # SSA needs RDATE with no time component
+                value=f"R{YYMMDD}.T{HHMMSS}"
+                fileLogger.info(f"valueRDT={value}")
+
+            else:
+                # calculate offset if there are leading characters before substitution token
+                offset = key.index("{")
+                fileLogger.info(f"{offset=}")
+                
+                key = key [offset : ]
+                value = value [offset : ]
+        
+            fileLogger.info(f"{key} replaced by {value} ")
+            
+            MF_FILENAME = MF_FILENAME.replace(key, value)
+            fileLogger.info(f"{MF_FILENAME=}")
+
+    # end-for
+    fileLogger.info(f"FINAL MF_FILENAME={MF_FILENAME}")   
+    result.mf_filename = MF_FILENAME
+
+            
+    ###################################################################
+    # Verify that EFT filename is a valid length 
+    ###################################################################
+    fileLogger.info("")
+    fileLogger.info("Verify EFT filename length.")
+    
+    if len(MF_FILENAME) > 44:
+        fileLogger.info("")
+        fileLogger.info(f"{MF_FILENAME} filename is {len(MF_FILENAME)} characters which is too long. ")
+        
+        MSG=f"{MF_FILENAME} filename is {len(MF_FILENAME)} characters which is too long.  "
+        raise EFTFileError(MSG)
+
+
+    #############################################################
+    # Stream S3 compressed file --> unzip --> cleanse --> count --> S3/EFT_Files folder (or overrider folder)
+    # NOTE: Only send/trigger files that can actually be EFT'd.
+    #       Other files are still streamed to verify the byte-count and char-count.
+    #############################################################
+    offset =  MF_FILENAME.index('.')
+    HLQ = MF_FILENAME[: offset]
+
+    s3EFTFileKey = f"{S3HLFolder}{S3_EFT_DESTINATION_FLDR}{MF_FILENAME}"
+
+    if HLQ in ("P#EFT", "T#EFT", "MNUP") and swTESTING == "N":
+        fileLogger.info("")
+        fileLogger.info(f"Stream decompressed/cleansed file {txt_filename} to s3://{XTR_BUCKET}{s3EFTFileKey}")
+        sDestKey = s3EFTFileKey
+        
+    else:
+        fileLogger.info("")
+        fileLogger.info(f"{HLQ=}; File NOT loaded to S3 EFT_FILES folder.")
+        sDestKey = None
+
+    #############################################################
+    # Convert bad binary data x'c28d' to spaces.
+    # Other two-byte characters: x'c39b', x'c386', x'c384'
+    # UTF-8/ASCII characters are x'00' thru x'7f'
+    # NOTE: EFT file is not completed in S3 when byte-count and char-count differ.
+    #       Wait for room in the global memory budget before streaming the file.
+    #############################################################
+    iReservedBytes = budget.acquire(StreamEFT.STREAM_MEMORY_BYTES)
+    try:
+        byte_count, char_count, line_count = StreamEFT.streamEFTFile(s3_client, XTR_BUCKET, gz_ExtractFileKey, sDestKey, txt_filename)
+    finally:
+        budget.release(iReservedBytes)
+
+    fileLogger.info(f"{byte_count=} {char_count=} {line_count=}")
+    result.byte_count, result.char_count, result.line_count = byte_count, char_count, line_count
+    result.eft_loaded = sDestKey is not None
+
+    if byte_count !=  char_count:
+        fileLogger.info("")
+        fileLogger.info(f"ProcessFiles2EFT.py failed. Could not convert all multi-byte characters for s3 file {gz_ExtractFileKey}. {byte_count=} {char_count=} ")
+
+        MSG=f"ProcessFiles2EFT.py failed. Could not convert all multi-byte characters for s3 file {gz_ExtractFileKey}. {byte_count=} {char_count=} "
+        raise EFTFileError(MSG)
+
+
+    ###################################################################
+    # Move processed Extract file to Extract archive folder.
+    ###################################################################
+    fileLogger.info("")
+    fileLogger.info(f"Move processed {gz_filename} to S3 Extract archive folder ")
+
+    # server-side parallel part copy, then delete
+    s3MoveLargeFile2NewFolder(s3_client, XTR_BUCKET, f"{S3ExtKeyFldr2Process}{gz_filename}", f"{S3ExtKeyFldr2Process}archive/{gz_filename}")
+
+
+
+def runEFTFileWorker(gz_ExtractFileKey, lstEFTConfigRecs, S3ExtKeyFldr2Process, S3HLFolder, S3_EFT_DESTINATION_FLDR, swTESTING, budget):
+
+    result = EFTFileResult(gz_ExtractFileKey)
+    fileLogger = EFTFileLogAdapter(rootLogger, {"gz_filename": gz_ExtractFileKey.split("/")[-1]})
+
+    fStart = time.monotonic()
+
+    try:
+        processExtractFile2EFT(gz_ExtractFileKey, lstEFTConfigRecs, S3ExtKeyFldr2Process, S3HLFolder, S3_EFT_DESTINATION_FLDR, swTESTING, budget, result, fileLogger)
+        result.status = "SUCCESS"
+
+    except Exception as e:
+        fileLogger.error(f"Exception occured processing {gz_ExtractFileKey}.")
+        fileLogger.error(str(e))
+        result.msg = str(e)
+
+    result.elapsed_secs = time.monotonic() - fStart
+
+    return result
+
+
+def buildResultsReport(lstResults):
+
+    lstLines = ["", "EFT file results:",
+                f"{'Status':<8} {'Extract file':<70} {'EFT filename':<45} {'Loaded':<6} {'Bytes':>15} {'Lines':>12} {'Secs':>9}"]
+    lstLines.extend(f"{result.status:<8} {result.gz_ExtractFileKey.split('/')[-1]:<70} {result.mf_filename:<45} {'Y' if result.eft_loaded else 'N':<6} "
+                    f"{result.byte_count:>15} {result.line_count:>12} {result.elapsed_secs:>9.2f}" for result in lstResults)
+
+    return "\n".join(lstLines) + "\n"
+
+
+def main_processing_loop(S3ParmExtractFolder=None, S3ParmEFTDestFolder=None):
 
     try:    
 
@@ -149,6 +444,7 @@ def main_processing_loop():
 
         # Establish logger with CommonFunctions module.
         setCommonFunctionLogger(rootLogger)
+        StreamEFT.setStreamEFTLogger(rootLogger)
  
         ###########################################################
         # Set current working directory to scripts/run directory.
@@ -160,30 +456,36 @@ def main_processing_loop():
        
         ##########################################
         # Were the correct NOF parameters sent?
+        # NOTE: When called in-process the parameters are function parameters.
         ##########################################
-        iNOFParms = len(sys.argv) - 1
-        if not (iNOFParms == 1 or iNOFParms ==  2):
-            rootLogger.info(f"Incorrect # of parameters sent to script. NOF parameters: {iNOFParms}")    
-            sys.exit(12)
-        else:
-            rootLogger.info(f"There were {iNOFParms} parameters to script.")
-
-        #############################################################
-        # Display parameters passed to script 
-        #############################################################
-        rootLogger.info("")
-        rootLogger.info("Getting parameters... ")
-        
-        lstParms = sys.argv
+        if S3ParmExtractFolder is None:
+            iNOFParms = len(sys.argv) - 1
+            if not (iNOFParms == 1 or iNOFParms ==  2):
+                rootLogger.info(f"Incorrect # of parameters sent to script. NOF parameters: {iNOFParms}")    
+                sys.exit(12)
+            else:
+                rootLogger.info(f"There were {iNOFParms} parameters to script.")
 
-        if iNOFParms == 1:
-            S3ParmExtractFolder = lstParms[1]
-            # There is no EFT override folder
-            S3ParmEFTDestFolder = None
+            #############################################################
+            # Display parameters passed to script 
+            #############################################################
+            rootLogger.info("")
+            rootLogger.info("Getting parameters... ")
             
-        elif iNOFParms == 2:
-            S3ParmExtractFolder = lstParms[1]
-            S3ParmEFTDestFolder = lstParms[2]
+            lstParms = sys.argv
+
+            if iNOFParms == 1:
+                S3ParmExtractFolder = lstParms[1]
+                # There is no EFT override folder
+                S3ParmEFTDestFolder = None
+                
+            elif iNOFParms == 2:
+                S3ParmExtractFolder = lstParms[1]
+                S3ParmEFTDestFolder = lstParms[2]
+
+        rootLogger.info(f"{S3ParmExtractFolder=}")
+
+        if S3ParmEFTDestFolder is not None:
             rootLogger.info(f"EFT Destination folder is being overriden. New destination is {S3ParmEFTDestFolder}. ")
 
        
@@ -304,238 +606,43 @@ def main_processing_loop():
         
         
         #############################################################
-        # Loop thru each file in lstExtractFiles2EFT
+        # Process Extract files with a bounded pool of EFT workers.
+        # Each worker streams one file at a time; the memory budget limits
+        # the NOF files streaming at the same time.
         #
         # NOTE!!! We assume that we will not be processing "parts" files
         #############################################################
-        for gz_ExtractFileKey in lstExtractFileKeys2EFT: 
-
-            rootLogger.info("")
-            rootLogger.info("*****************************************************************")
-            rootLogger.info(f"{gz_ExtractFileKey=}")
-
-            #############################################################
-            # Build config file key to convert to EFT filename
-            #############################################################
-            # Remove file path to get gz_filename. Get last "node" which contains filename by itself.
-            gz_filename = gz_ExtractFileKey.split("/")[-1] 
-            rootLogger.info(f"{gz_filename=}")
-           
-            #############################################################
-            # Download S3 compressed file to linux
-            #############################################################
-            downloadFileFromS3(s3_client, XTR_BUCKET, gz_ExtractFileKey, f"{DATADIR}{gz_filename}")
+        iMaxWorkers = max(1, min(EFT_MAX_WORKERS, len(lstExtractFileKeys2EFT)))
 
-            #############################################################
-            # unzip gz file on linux
-            #############################################################
-            txt_filename = unzipFile(DATADIR, gz_filename)
-
-            #############################################################
-            # Convert bad binary data x'c28d' to spaces.
-            # Other two-byte characters: x'c39b', x'c386', x'c384'
-            # UTF-8/ASCII characters are x'00' thru x'7f'
-            #############################################################
-            cleanseExtFile(f"{DATADIR}{txt_filename}")
-
-            #######################################################################################
-            # Verify that byte-count and char-count are same. Unncessary with new cleanse logic.
-            #######################################################################################
-            byte_count, char_count = wc_cm_largefile(f"{DATADIR}{txt_filename}")
-
-            if byte_count !=  char_count:
-                rootLogger.info("")
-                rootLogger.info(f"ProcessFiles2EFT.py failed. Could not convert all multi-byte characters for s3 file {gz_ExtractFileKey}. {byte_count=} {char_count=} ")
-
-                # remove file from linux
-                os.remove(f"{DATADIR}{txt_filename}")
-            
-                ## Send Failure email	
-                SUBJECT=f"ProcessFiles2EFT.py - Failed ({ENVNAME})"
-                MSG=f"ProcessFiles2EFT.py failed. Could not convert all multi-byte characters for s3 file {gz_ExtractFileKey}. {byte_count=} {char_count=} "
-                sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_FAILURE_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
-                write_sp_info_2_log(sp_info) 
-                
-                sys.exit(12)
-            
-            
-            ###################################################################
-            # Find Key/Value file mapping record
-            ###################################################################
-            rootLogger.info("")
-            rootLogger.info("Build MF EFT file name for SF file ")
-
-            # Build search keys for EFT config file
-            SEARCH_1NODE  = txt_filename.split("_") [0]  	
-            SEARCH_2NODES = '_'.join(txt_filename.split("_") [0:2])  
-
-            # Extract appropriate key/value record from config file
-            lstMatches = [ EFTConfigRec for EFTConfigRec in lstEFTConfigRecs if re.search(f'^{SEARCH_1NODE}',EFTConfigRec) ]
-            
-            NOF_SF2MF_KEY_VALUE_MATCHES = len(lstMatches)
-            rootLogger.info(f"{NOF_SF2MF_KEY_VALUE_MATCHES=}")
-            
-            if NOF_SF2MF_KEY_VALUE_MATCHES == 0:
-                rootLogger.info("")
-                rootLogger.info("ProcessFiles2EFT.py failed")
-                
-                # Send Failure email	
-                SUBJECT=f"ProcessFiles2EFT.py - Failed ({ENVNAME})"
-                MSG=f"ProcessFiles2EFT.py has failed. Could not find matching SF2MF Key/value record for key={SEARCH_1NODE}"
-                sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_FAILURE_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
-                write_sp_info_2_log(sp_info) 
-
-                sys.exit(12)	
-                
-            elif NOF_SF2MF_KEY_VALUE_MATCHES == 1:	
-                SF2MF_KEY_VALUE_PAIR = lstMatches[0]
-                rootLogger.info(f"{SF2MF_KEY_VALUE_PAIR=}")
-
-            elif NOF_SF2MF_KEY_VALUE_MATCHES >= 2:
-                # Extract appropriate key/value record from config file
-                lstMatches = [ EFTConfigRec for EFTConfigRec in lstEFTConfigRecs if re.search(f'^{SEARCH_2NODES}',EFTConfigRec) ]
-
-                NOF_SF2MF_KEY_VALUE_MATCHES = len(lstMatches)
-                rootLogger.info(f"{NOF_SF2MF_KEY_VALUE_MATCHES=}")
-                
-                if NOF_SF2MF_KEY_VALUE_MATCHES == 1:	
-                    SF2MF_KEY_VALUE_PAIR = lstMatches[0]
-                    rootLogger.info(f"{SF2MF_KEY_VALUE_PAIR=}")
-
-                else:
-                    rootLogger.info("")
-                    rootLogger.info(f"Found {NOF_SF2MF_KEY_VALUE_MATCHES} matching (too many or not any) SF2MF Key/value records for key={SEARCH_2NODE}")
-                    
-                    # Send Failure email	
-                    SUBJECT=f"ProcessFiles2EFT.py - Failed ({ENVNAME})"
-                    MSG="ProcessFiles2EFT.py has failed. Found ${NOF_SF2MF_KEY_VALUE_MATCHES} matching (too many) SF2MF Key/value records for key=${SEARCH_2NODE} "
-                    sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_FAILURE_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
-                    write_sp_info_2_log(sp_info) 
-
-                    sys.exit(12)	
-
-            
-            ############################################################
-            # Extract SF and MF file masks from config record; 
-            #   1) remove file extension 
-            #   2) change '_' to ' ' to make it easier to see array elements 
-            #
-            # NOTE: "=" separates key and value parts
-            ############################################################
-            SF_FILE_MASK = str(SF2MF_KEY_VALUE_PAIR.split("=")[0]).replace(".txt","").replace(".csv","").replace("_"," ")
-            SF_FILENAME = txt_filename.replace(".txt","").replace(".txt","").replace(".csv","").replace("_"," ")
-
-            MF_FILE_MASK = (SF2MF_KEY_VALUE_PAIR.split("=")[1]).replace("_"," ")
-            MF_FILENAME = MF_FILE_MASK
-
-            rootLogger.info(f"{MF_FILE_MASK=}")
-            rootLogger.info(f"SF_FILE_MASK Array = {SF_FILE_MASK}" )
-            rootLogger.info(f"SF_FILENAME Array = {SF_FILENAME}") 
-
-            # Create array of tokens from filenames
-            SF_FILEMASK_ARRAY = SF_FILE_MASK.split(" ")
-            SF_FILENAME_ARRAY = SF_FILENAME.split(" ")
-
-            rootLogger.info("")
-            rootLogger.info("Parse SF filename mask nodes")
-
-            
-            for i, sNode in enumerate(SF_FILEMASK_ARRAY):
-                rootLogger.info("")
-                rootLogger.info(f"{i} = {sNode}")
-
-                # This is a replacement token  
-                if sNode.find("{") >= 0:
-                    key = SF_FILEMASK_ARRAY [i] 
-                    value = SF_FILENAME_ARRAY [i] if len(SF_FILENAME_ARRAY) > i else "" 
-                    
-                    if sNode == "{TIMESTAMP}":
-                        YYMMDD = value [2:8]
-                        HHMMSS = value [9:15]
-                        # EFT transer process needs Time node to have 7 digits -- add "1" after time
-                        value=f"D{YYMMDD}.T{HHMMSS}1"
-                        rootLogger.info(f"valueTM={value}")
-                        
-                    elif sNode == "{SSA-RDATE}":
-                        YYMMDD = value [2:8]
-                        HHMMSS = value [9:15]
-                        # SSA needs RDATE with no time component
-                        value=f"R{YYMMDD}.T{HHMMSS}"
-                        rootLogger.info(f"valueRDT={value}")
-
-                    else:
-                        # calculate offset if there are leading characters before substitution token
-                        offset = key.index("{")
-                        rootLogger.info(f"{offset=}")
-                        
-                        key = key [offset : ]
-                        value = value [offset : ]
-                
-                    rootLogger.info(f"{key} replaced by {value} ")
-                    
-                    MF_FILENAME = MF_FILENAME.replace(key, value)
-                    rootLogger.info(f"{MF_FILENAME=}")
-
-            # end-for
-            rootLogger.info(f"FINAL MF_FILENAME={MF_FILENAME}")   
-  
-                    
-            ###################################################################
-            # Verify that EFT filename is a valid length 
-            ###################################################################
-            rootLogger.info("")
-            rootLogger.info("Verify EFT filename length.")
-            
-            if len(MF_FILENAME) > 44:
-                rootLogger.info("")
-                rootLogger.info(f"{MF_FILENAME} filename is {len(MF_FILENAME)} characters which is too long. ")
-                
-                # Send Failure email	
-                SUBJECT=f"ProcessFiles2EFT.py - Failed ({ENVNAME})"
-                MSG=f"{MF_FILENAME} filename is {len(MF_FILENAME)} characters which is too long.  "
-                sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_FAILURE_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
-                write_sp_info_2_log(sp_info) 
+        rootLogger.info("")
+        rootLogger.info(f"Process {len(lstExtractFileKeys2EFT)} Extract files with {iMaxWorkers} workers. Memory budget is {EFT_MEMORY_BUDGET_MB} MB.")
 
-                sys.exit(12)	
+        budget = MemoryBudget(EFT_MEMORY_BUDGET_MB * 1024 * 1024)
 
+        with ThreadPoolExecutor(max_workers=iMaxWorkers) as pool:
+            lstFutures = [pool.submit(runEFTFileWorker, gz_ExtractFileKey, lstEFTConfigRecs, S3ExtKeyFldr2Process, S3HLFolder, S3_EFT_DESTINATION_FLDR, swTESTING, budget)
+                          for gz_ExtractFileKey in lstExtractFileKeys2EFT]
+            lstResults = [future.result() for future in lstFutures]
 
-            #############################################################
-            # Upload uncompressed linux file to S3/EFT_Files folder (or overrider folder)
-            # NOTE: Only send/trigger files that can actually be EFT'd.
-            #############################################################
-            offset =  MF_FILENAME.index('.')
-            HLQ = MF_FILENAME[: offset]
-   
-            if HLQ in ("P#EFT", "T#EFT", "MNUP") and swTESTING == "N":
-                rootLogger.info("")
-                rootLogger.info(f"Upload linux decompressed/cleansed file {txt_filename} to s3://{XTR_BUCKET}{S3HLFolder}{S3_EFT_DESTINATION_FLDR}{MF_FILENAME}")
-               
-                s3EFTFileKey = f"{S3HLFolder}{S3_EFT_DESTINATION_FLDR}{MF_FILENAME}"
-                s3UploadFile(s3_client, unzippedExtFilePath, XTR_BUCKET, s3EFTFileKey)
-                
-            else:
-                rootLogger.info("")
-                rootLogger.info(f"{HLQ=}; File NOT loaded to S3 EFT_FILES folder.")
+        rootLogger.info(buildResultsReport(lstResults))
 
+        ###################################################################
+        # Send one failure email for all files that failed.
+        # NOTE: Failed files are not archived; they remain in the Extract folder.
+        ###################################################################
+        lstFailedResults = [result for result in lstResults if result.status != "SUCCESS"]
 
-            ###################################################################
-            # Move processed Extract file to Extract archive folder.
-            ###################################################################
+        if len(lstFailedResults) > 0:
             rootLogger.info("")
-            rootLogger.info(f"Move processed {gz_filename} to S3 Extract archive folder ")
-
-            sSourceKey = f"{S3ExtKeyFldr2Process}{gz_filename}"
-            sDestinationKey = f"{S3ExtKeyFldr2Process}archive/{gz_filename}"
-
-            s3MoveLargeFile2NewFolder(s3_client, XTR_BUCKET, f"{S3ExtKeyFldr2Process}{gz_filename}", f"{S3ExtKeyFldr2Process}archive/{gz_filename}")
+            rootLogger.info(f"ProcessFiles2EFT.py failed for {len(lstFailedResults)} of {len(lstResults)} files.")
 
+            # Send Failure email	
+            SUBJECT=f"ProcessFiles2EFT.py - Failed ({ENVNAME})"
+            MSG="\n\n".join(f"{result.gz_ExtractFileKey}: {result.msg}" for result in lstFailedResults)
+            sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, ENIGMA_EMAIL_FAILURE_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
+            write_sp_info_2_log(sp_info) 
 
-            #############################################################
-            # clean-up linux data directory
-            #############################################################
-            os.remove(f"{DATADIR}{txt_filename}")
-
-            # end-for
+            sys.exit(12)
 
         
         ####################################################################
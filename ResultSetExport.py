@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  ResultSetExport.py
+#
+# Desc: Export a Snowflake cursor's result set to a file (used by snowconvert_helpers Export and
+#       SQLSnowFlakeFncts.exportAllRows).
+#
+#       The result set is read with cursor.fetch_arrow_batches() and written in chunks of EXPORT_CHUNK_ROWS rows:
+#         CSV     --> each column is converted to text with vectorized (pyarrow.compute) functions, the columns are
+#                     joined with the separator, and the chunk's lines are written to the file with one write.
+#         FIXED   --> as CSV, with each column padded/truncated to its width and no separator.
+#         PARQUET --> the Arrow batches are written with pyarrow.parquet.ParquetWriter (no text conversion).
+#       CSV and FIXED files can be written as a gzip stream. Only one chunk is in memory at a time.
+#
+#       Text is the same as the row-by-row export (separator.join(str(val) for val in row)):
+#         NULL --> None; rows with all NULL values are not exported; values are not quoted.
+#         Columns with types that have no vectorized conversion (FLOAT, TIME, TIMESTAMP with time zone, BINARY, ...)
+#         are converted with str() per value.
+#
+#       When pyarrow is not installed or the result set is not in Arrow format (ex. SHOW, DML results),
+#       the rows are read from the cursor and written row-by-row (CSV/FIXED only).
+#
+#       NUMBER(p,s>0) columns are Arrow decimals only when the connection has arrow_number_to_decimal=True
+#       (snowconvert_helpers.log_on, SQLSnowFlakeFncts.getConnection). Otherwise they are float64 (text "1.5" instead
+#       of str(Decimal) "1.50"), so CSV/FIXED result sets with such columns are written row-by-row.
+#
+# Usage:
+#       import ResultSetExport
+#
+#       iNOFRows = ResultSetExport.exportResultSet(cur, "/app/IDRC/XTR/CMS/data/report.txt", "CSV", "|", bGzip=False)
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+# 2026-10-18 Row-by-row export of NUMBER(p,s>0) columns when the connection does not set arrow_number_to_decimal.
+#            str() per value for decimals with scale > 6 (str(Decimal) exponent notation). Offsets of large_string lines.
+########################################################################################################
+import io
+import gzip
+from functools import reduce
+
+
+########################################################################################################
+# CONSTANTS
+########################################################################################################
+EXPORT_FORMATS = ("CSV", "FIXED", "PARQUET")
+
+# Rows per text conversion/write
+EXPORT_CHUNK_ROWS = 100000
+
+EXPORT_BUFFER_BYTES = 8 * 1024 * 1024
+
+# gzip.open default is 9 --> much slower for a small gain in size
+EXPORT_GZIP_LEVEL = 6
+
+# str(None) of the row-by-row export
+EXPORT_NULL_TEXT = "None"
+
+# FIXED width of a column without a length or precision in the cursor description
+EXPORT_DEFAULT_WIDTH = 30
+
+# cursor description type_code of NUMBER (FIXED)
+SF_TYPE_CODE_FIXED = 0
+
+# str(Decimal) uses exponent notation for values < 1E-6 (ex. 0E-10) --> str() per value for larger scales
+EXPORT_MAX_DECIMAL_SCALE = 6
+
+
+def getFixedWidths(description):
+
+    ######################################################
+    # Column widths from the cursor description:
+    #   text/binary --> internal_size
+    #   NUMBER      --> precision + sign + decimal point
+    ######################################################
+    lstWidths = []
+
+    for col in description:
+        if getattr(col, "internal_size", None):
+            lstWidths.append(col.internal_size)
+        elif getattr(col, "precision", None):
+            lstWidths.append(col.precision + 2)
+        else:
+            lstWidths.append(EXPORT_DEFAULT_WIDTH)
+
+    return lstWidths
+
+
+def openExportFile(sFilename, bGzip):
+
+    # append --> same as the row-by-row export (a gzip file gets another gzip member)
+    if bGzip:
+        return io.BufferedWriter(gzip.open(sFilename, "ab", compresslevel=EXPORT_GZIP_LEVEL), buffer_size=EXPORT_BUFFER_BYTES)
+
+    return open(sFilename, "ab", buffering=EXPORT_BUFFER_BYTES)
+
+
+def formatText(sValue, sFormat, iWidth):
+
+    if sFormat == "FIXED":
+        return sValue[:iWidth].ljust(iWidth)
+
+    return sValue
+
+
+def exportRows(cur, sFilename, sFormat, sSeparator, bGzip, lstWidths):
+
+    ######################################################
+    # Row-by-row export (no pyarrow or no Arrow result).
+    ######################################################
+    iNOFRows = 0
+    sSeparator = "" if sFormat == "FIXED" else sSeparator
+
+    with openExportFile(sFilename, bGzip) as f:
+        for row in cur:
+            if all(v is None for v in row):
+                print("Row is 'None' it will not be exported")
+                continue
+
+            sRow = sSeparator.join(formatText(str(val), sFormat, iWidth) for val, iWidth in zip(row, lstWidths))
+            f.write(f"{sRow}\n".encode("utf-8"))
+            iNOFRows += 1
+
+    return iNOFRows
+
+
+def columnToText(col):
+
+    ######################################################
+    # Arrow column --> string array with the same text
+    # as str(val) of the row-by-row export
+    ######################################################
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    colType = col.type
+
+    if pa.types.is_string(colType) or pa.types.is_large_string(colType):
+        sCol = col
+    elif pa.types.is_boolean(colType):
+        sCol = pc.if_else(col, "True", "False")
+    elif pa.types.is_integer(colType) or pa.types.is_date(colType) or (pa.types.is_decimal(colType) and colType.scale <= EXPORT_MAX_DECIMAL_SCALE):
+        sCol = pc.cast(col, pa.string())
+    elif pa.types.is_timestamp(colType) and colType.tz is None:
+        # str(datetime) --> no fraction when microseconds are 0
+        sCol = pc.cast(col.cast(pa.timestamp("us"), safe=False), pa.string())
+        sCol = pc.if_else(pc.ends_with(sCol, ".000000"), pc.utf8_slice_codeunits(sCol, 0, 19), sCol)
+    else:
+        sCol = pa.array([None if val is None else str(val) for val in col.to_pylist()], pa.string())
+
+    return pc.fill_null(sCol, EXPORT_NULL_TEXT)
+
+
+def writeTextChunk(f, batch, sFormat, sSeparator, lstWidths):
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    # rows with all NULL values are not exported
+    bAllNull = reduce(pc.and_, [pc.is_null(col) for col in batch.columns])
+    if pc.any(bAllNull).as_py():
+        batch = batch.filter(pc.invert(bAllNull))
+
+    if batch.num_rows == 0:
+        return 0
+
+    lstCols = [columnToText(col) for col in batch.columns]
+
+    # binary_join_element_wise needs one string type (columns and separators)
+    textType = pa.large_string() if any(pa.types.is_large_string(sCol.type) for sCol in lstCols) else pa.string()
+    lstCols = [sCol.cast(textType) for sCol in lstCols]
+
+    if sFormat == "FIXED":
+        lstCols = [pc.utf8_slice_codeunits(pc.utf8_rpad(sCol, iWidth), 0, iWidth) for sCol, iWidth in zip(lstCols, lstWidths)]
+        sSeparator = ""
+
+    # line + "\n" for every row --> the lines are contiguous in the string array's data buffer
+    lines = pc.binary_join_element_wise(pc.binary_join_element_wise(*lstCols, pa.scalar(sSeparator, textType)),
+                                        pa.scalar("", textType), pa.scalar("\n", textType))
+
+    # string --> int32 offsets, large_string --> int64 offsets
+    offsets = memoryview(lines.buffers()[1]).cast("q" if pa.types.is_large_string(lines.type) else "i")
+    f.write(memoryview(lines.buffers()[2])[offsets[lines.offset]:offsets[lines.offset + len(lines)]])
+
+    return batch.num_rows
+
+
+def normalizeSchema(table):
+
+    ######################################################
+    # Snowflake Arrow chunks can have different integer
+    # widths for a NUMBER column --> int64 for Parquet
+    ######################################################
+    import pyarrow as pa
+
+    schema = pa.schema([field.with_type(pa.int64()) if pa.types.is_integer(field.type) else field for field in table.schema])
+
+    return table.cast(schema)
+
+
+def exportArrowBatches(arrowBatches, sFilename, sFormat, sSeparator, bGzip, lstWidths):
+
+    iNOFRows = 0
+
+    if sFormat == "PARQUET":
+        import pyarrow.parquet as pq
+
+        writer = None
+
+        try:
+            for table in arrowBatches:
+                table = normalizeSchema(table)
+
+                if writer is None:
+                    writer = pq.ParquetWriter(sFilename, table.schema, compression="gzip" if bGzip else "snappy")
+
+                writer.write_table(table.cast(writer.schema), row_group_size=EXPORT_CHUNK_ROWS)
+                iNOFRows += table.num_rows
+
+        finally:
+            if writer is not None:
+                writer.close()
+
+        return iNOFRows
+
+    with openExportFile(sFilename, bGzip) as f:
+        for table in arrowBatches:
+            for batch in table.to_batches(max_chunksize=EXPORT_CHUNK_ROWS):
+                iNOFRows += writeTextChunk(f, batch, sFormat, sSeparator, lstWidths)
+
+    return iNOFRows
+
+
+def hasFloatScaledNumbers(cur):
+
+    ######################################################
+    # NUMBER(p,s>0) columns are float64 in the Arrow
+    # batches unless the connection has
+    # arrow_number_to_decimal=True
+    ######################################################
+    con = getattr(cur, "connection", None)
+    if con is None or getattr(con, "arrow_number_to_decimal", True):
+        return False
+
+    return any(getattr(col, "type_code", None) == SF_TYPE_CODE_FIXED and (getattr(col, "scale", None) or 0) > 0
+               for col in cur.description)
+
+
+def exportResultSet(cur, sFilename, sFormat="CSV", sSeparator=",", bGzip=False, lstWidths=None):
+
+    ######################################################
+    # Export the cursor's result set to sFilename.
+    # Returns NOF rows exported.
+    ######################################################
+    sFormat = sFormat.upper()
+    if sFormat not in EXPORT_FORMATS:
+        raise Exception(f"Invalid export format {sFormat}. Valid export formats are {', '.join(EXPORT_FORMATS)}")
+
+    if sFormat == "FIXED" and lstWidths is None:
+        lstWidths = getFixedWidths(cur.description)
+    elif lstWidths is None:
+        lstWidths = [0] * len(cur.description)
+
+    if sFormat != "PARQUET" and hasFloatScaledNumbers(cur):
+        print("Exporting rows without Arrow batches: connection does not set arrow_number_to_decimal and result set has NUMBER(p,s>0) columns")
+        return exportRows(cur, sFilename, sFormat, sSeparator, bGzip, lstWidths)
+
+    try:
+        import pyarrow
+
+        # NotSupportedError when the result set is not in Arrow format
+        arrowBatches = cur.fetch_arrow_batches()
+
+    except Exception as e:
+        if sFormat == "PARQUET":
+            raise Exception(f"Export format PARQUET requires pyarrow and an Arrow result set: {e}")
+
+        print(f"Exporting rows without Arrow batches: {e}")
+        return exportRows(cur, sFilename, sFormat, sSeparator, bGzip, lstWidths)
+
+    return exportArrowBatches(arrowBatches, sFilename, sFormat, sSeparator, bGzip, lstWidths)
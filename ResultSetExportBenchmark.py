@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  ResultSetExportBenchmark.py
+#
+# Desc: Benchmark ResultSetExport.py for a synthetic result set (no Snowflake connection):
+#         1) row-by-row export (prior snowconvert_helpers._print_result_set: separator.join(str(val)) per row)
+#         2) ResultSetExport CSV, FIXED, CSV + gzip and PARQUET from Arrow batches
+#
+#       The synthetic cursor returns the result set as Python rows (iteration) and as Arrow batches
+#       (fetch_arrow_batches) of --batch_rows rows, like the Snowflake connector's result chunks.
+#       Checks that the Arrow CSV and FIXED files are identical to the row-by-row files, that the gzip file
+#       decompresses to the CSV file, and that the Parquet file has every row.
+#       Also checks: NUMBER(38,10) text (str(Decimal) exponent notation, ex. 0E-10), large_string lines, and that a
+#       connection without arrow_number_to_decimal (NUMBER(p,s>0) as float64 batches) is exported row-by-row.
+#
+# Ex.   python3 ResultSetExportBenchmark.py --nof_rows 1000000
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+# 2026-10-18 Check NUMBER(38,10), large_string lines, and connections without arrow_number_to_decimal.
+########################################################################################################
+import io
+import os
+import sys
+import gzip
+import time
+import random
+import shutil
+import decimal
+import argparse
+import tempfile
+import datetime
+from collections import namedtuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import ResultSetExport
+
+
+ResultMetadata = namedtuple("ResultMetadata", "name type_code display_size internal_size precision scale is_nullable")
+
+DESCRIPTION = [ResultMetadata("BENE_ID", 2, None, 11, None, None, True),
+               ResultMetadata("CLM_CNT", 0, None, None, 10, 0, True),
+               ResultMetadata("CLM_PMT_AMT", 0, None, None, 18, 2, True),
+               ResultMetadata("CLM_FROM_DT", 3, None, None, None, None, True),
+               ResultMetadata("ETL_LOAD_TS", 8, None, None, 0, 9, True),
+               ResultMetadata("DUAL_IND", 13, None, None, None, None, True),
+               ResultMetadata("RISK_SCORE", 1, None, None, None, None, True),
+               ResultMetadata("RATE_PCT", 0, None, None, 38, 10, True)]
+
+
+class SyntheticConnection:
+
+    def __init__(self, bArrowNumberToDecimal):
+        self.arrow_number_to_decimal = bArrowNumberToDecimal
+
+
+class SyntheticCursor:
+
+    def __init__(self, table, iBatchRows, tableArrow=None, connection=None):
+        self.table = table
+        self.iBatchRows = iBatchRows
+        self.description = DESCRIPTION
+        # Arrow batches of a connection without arrow_number_to_decimal (NUMBER(p,s>0) as float64)
+        self.tableArrow = table if tableArrow is None else tableArrow
+        self.connection = SyntheticConnection(True) if connection is None else connection
+
+    def __iter__(self):
+        for batch in self.table.to_batches(max_chunksize=self.iBatchRows):
+            yield from zip(*[col.to_pylist() for col in batch.columns])
+
+    def fetch_arrow_batches(self):
+        for batch in self.tableArrow.to_batches(max_chunksize=self.iBatchRows):
+            yield pa.Table.from_batches([batch])
+
+
+def createResultSet(iNOFRows):
+
+    def maybeNull(value):
+        return None if random.random() < 0.02 else value
+
+    dtBase = datetime.datetime(2024, 1, 1)
+    lstRows = [(maybeNull(f"{random.randrange(10 ** 10):011}"),
+                maybeNull(random.randint(0, 10 ** 6)),
+                maybeNull(decimal.Decimal(random.randint(-10 ** 8, 10 ** 8)) / 100),
+                maybeNull(dtBase.date() + datetime.timedelta(days=random.randint(0, 700))),
+                maybeNull(dtBase + datetime.timedelta(seconds=random.randint(0, 10 ** 7), microseconds=random.choice([0, random.randint(0, 999999)]))),
+                maybeNull(random.random() < 0.5),
+                maybeNull(random.choice([1.0, 0.25, random.random() * 100])),
+                maybeNull(decimal.Decimal(random.choice([0, 1, random.randint(-10 ** 12, 10 ** 12)])).scaleb(-10)))
+               for iRow in range(iNOFRows)]
+
+    # a row with all NULL values is not exported
+    lstRows[len(lstRows) // 2] = (None,) * len(DESCRIPTION)
+
+    return pa.table(list(zip(*lstRows)), schema=pa.schema([("BENE_ID", pa.string()), ("CLM_CNT", pa.int64()),
+                                                           ("CLM_PMT_AMT", pa.decimal128(18, 2)), ("CLM_FROM_DT", pa.date32()),
+                                                           ("ETL_LOAD_TS", pa.timestamp("ns")), ("DUAL_IND", pa.bool_()),
+                                                           ("RISK_SCORE", pa.float64()), ("RATE_PCT", pa.decimal128(38, 10))]))
+
+
+def getFloatScaledNumbers(table):
+
+    # NUMBER(p,s>0) columns as float64 (connection without arrow_number_to_decimal)
+    return table.cast(pa.schema([field.with_type(pa.float64()) if pa.types.is_decimal(field.type) else field for field in table.schema]))
+
+
+def exportRowByRow(cur, sFilename, sSeparator):
+
+    # prior snowconvert_helpers._print_result_set export
+    with open(sFilename, 'a') as f:
+        for row in cur:
+            allarenone = all(v is None for v in row)
+            if (allarenone):
+                pass
+            else:
+                rowval = sSeparator.join([str(val) for val in row])
+                print(rowval, file=f)
+
+
+def readFile(sFilename):
+
+    with open(sFilename, "rb") as f:
+        return f.read()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="ResultSetExport benchmark")
+    parser.add_argument("--nof_rows", type=int, default=500000, help="NOF rows of the synthetic result set")
+    parser.add_argument("--batch_rows", type=int, default=50000, help="rows per Arrow batch")
+    parser.add_argument("--seed", type=int, default=2026, help="random seed")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    table = createResultSet(args.nof_rows)
+    lstWidths = ResultSetExport.getFixedWidths(DESCRIPTION)
+
+    sDir = tempfile.mkdtemp(prefix="ResultSetExportBenchmark_")
+
+    try:
+        def timeIt(sName, sFile, fnExport):
+            sFilename = os.path.join(sDir, sFile)
+            fStart = time.monotonic()
+            fnExport(SyntheticCursor(table, args.batch_rows), sFilename)
+            fElapsed = time.monotonic() - fStart
+            print(f"{sName:>22} {fElapsed:>10.3f} {os.path.getsize(sFilename) / 1024 / 1024:>10.1f}")
+            return sFilename
+
+        print(f"{args.nof_rows} rows")
+        print(f"{'export':>22} {'secs':>10} {'MB':>10}")
+
+        sRowFile = timeIt("row-by-row CSV", "row.csv", lambda cur, sFile: exportRowByRow(cur, sFile, "|"))
+        sCSVFile = timeIt("arrow CSV", "arrow.csv", lambda cur, sFile: ResultSetExport.exportResultSet(cur, sFile, "CSV", "|"))
+        sRowFixedFile = timeIt("row-by-row FIXED", "row.txt", lambda cur, sFile: ResultSetExport.exportRows(cur, sFile, "FIXED", "", False, lstWidths))
+        sFixedFile = timeIt("arrow FIXED", "arrow.txt", lambda cur, sFile: ResultSetExport.exportResultSet(cur, sFile, "FIXED"))
+        sGzipFile = timeIt("arrow CSV + gzip", "arrow.csv.gz", lambda cur, sFile: ResultSetExport.exportResultSet(cur, sFile, "CSV", "|", bGzip=True))
+        sParquetFile = timeIt("arrow PARQUET", "arrow.parquet", lambda cur, sFile: ResultSetExport.exportResultSet(cur, sFile, "PARQUET"))
+
+        if readFile(sCSVFile) != readFile(sRowFile):
+            print("arrow CSV file is not identical to row-by-row CSV file")
+            sys.exit(12)
+
+        if readFile(sFixedFile) != readFile(sRowFixedFile):
+            print("arrow FIXED file is not identical to row-by-row FIXED file")
+            sys.exit(12)
+
+        with gzip.open(sGzipFile, "rb") as f:
+            if f.read() != readFile(sCSVFile):
+                print("arrow CSV + gzip file does not decompress to the arrow CSV file")
+                sys.exit(12)
+
+        if pq.read_metadata(sParquetFile).num_rows != args.nof_rows:
+            print("arrow PARQUET file does not have every row")
+            sys.exit(12)
+
+        # connection without arrow_number_to_decimal --> row-by-row export, same text as str(Decimal)
+        sFloatFile = os.path.join(sDir, "float.csv")
+        ResultSetExport.exportResultSet(SyntheticCursor(table, args.batch_rows, getFloatScaledNumbers(table), SyntheticConnection(False)), sFloatFile, "CSV", "|")
+        if readFile(sFloatFile) != readFile(sRowFile):
+            print("CSV file of a connection without arrow_number_to_decimal is not identical to row-by-row CSV file")
+            sys.exit(12)
+
+        # large_string columns --> lines with int64 offsets
+        batch = table.slice(0, 1000).to_batches()[0]
+        batchLarge = pa.RecordBatch.from_arrays([col.cast(pa.large_string()) if pa.types.is_string(col.type) else col for col in batch.columns], names=batch.schema.names)
+        bytesString, bytesLarge = io.BytesIO(), io.BytesIO()
+        ResultSetExport.writeTextChunk(bytesString, batch, "CSV", "|", lstWidths)
+        ResultSetExport.writeTextChunk(bytesLarge, batchLarge, "CSV", "|", lstWidths)
+        if bytesLarge.getvalue() != bytesString.getvalue():
+            print("large_string chunk is not identical to string chunk")
+            sys.exit(12)
+
+    finally:
+        shutil.rmtree(sDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  RunMetrics.py
+#
+# Desc: Per-run JSON-lines metrics file ("sidecar") written next to a driver's log file.
+#
+#       Ex. log file:     /app/IDRC/XTR/CMS/logs/HOS_Extract_20260101.120000.log
+#           metrics file: /app/IDRC/XTR/CMS/logs/HOS_Extract_20260101.120000.metrics.jsonl
+#
+#       LoggerStandard.setLogging exports the metrics filename in environment variable RUN_METRICS_FILE,
+#       so extract scripts run by the driver (subprocess or in-process) inherit it.
+#       snowconvert_helpers.execute_sql_statement writes one record per SQL statement:
+#
+#       {"script": "HOS_EXTRACT.py", "query_id": "01b2...", "start_time": "...", "end_time": "...", "elapsed_secs": 12.3,
+#        "status": "SUCCESS", "sql_type": "COPY INTO", "stage": "@BIA_DEV.CMS_STAGE_XTR_DEV.BIA_DEV_XTR_HOS_STG",
+#        "filename": "HOS_...txt.gz", "rows_unloaded": 1234, "input_bytes": 567890, "output_bytes": 12345}
+#
+#       FilenameCounts.getExtractFilenamesAndCounts and DashboardInfo_MS_Driver read the metrics file instead of
+#       scanning the log file for "Executing: COPY INTO" and "rows_unloaded,input_bytes,output_bytes" lines.
+#       When there is no metrics file (older runs, bash wrappers that do not export RUN_METRICS_FILE) they
+#       still scan the log file.
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+########################################################################################################
+import os
+import re
+import sys
+import json
+
+
+########################################################################################################
+# CONSTANTS
+########################################################################################################
+RUN_METRICS_ENV = "RUN_METRICS_FILE"
+RUN_METRICS_SUFFIX = ".metrics.jsonl"
+
+# Ex. "COPY INTO @BIA_DEV.CMS_STAGE_XTR_DEV.BIA_DEV_XTR_HOS_STG/HOS_20260101.120000.txt.gz"
+reCOPY_INTO_STAGE = re.compile(r"^\s*COPY\s+INTO\s+(@[a-zA-Z0-9_.$]+)/([a-zA-Z0-9_.{}-]+)", re.IGNORECASE)
+reSQL_TYPE = re.compile(r"^\s*(COPY\s+INTO|CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMPORARY\s+)?\w+|[A-Za-z]+)", re.IGNORECASE)
+
+
+########################################################################################################
+# Functions
+########################################################################################################
+def getRunMetricsFilename(sLogFilenameNPath):
+
+    # Ex. HOS_Extract_20260101.120000.log --> HOS_Extract_20260101.120000.metrics.jsonl
+    return re.sub(r"\.log$", "", sLogFilenameNPath) + RUN_METRICS_SUFFIX
+
+
+def setRunMetricsFile(sLogFilenameNPath):
+
+    # Child processes (extract scripts) inherit the environment variable
+    os.environ[RUN_METRICS_ENV] = getRunMetricsFilename(sLogFilenameNPath)
+
+
+def getCopyIntoTarget(sql_string):
+    """ Returns (stage, filename) of a COPY INTO @stage/filename statement, or (None, None). """
+
+    objMatch = reCOPY_INTO_STAGE.search(sql_string)
+
+    return (objMatch.group(1), objMatch.group(2)) if objMatch else (None, None)
+
+
+def buildStatementRecord(sql_string, sQueryID, dttmStart, dttmEnd, bSuccess, lstResultRows=None):
+    """ Builds the metrics record of one executed SQL statement. lstResultRows are the COPY INTO result rows (dicts). """
+
+    objMatch = reSQL_TYPE.search(sql_string)
+    sStage, sFilename = getCopyIntoTarget(sql_string)
+
+    dictRecord = {"script": os.path.basename(sys.argv[0]),
+                  "query_id": sQueryID,
+                  "start_time": dttmStart.isoformat(timespec="seconds") if dttmStart else None,
+                  "end_time": dttmEnd.isoformat(timespec="seconds") if dttmEnd else None,
+                  "elapsed_secs": round((dttmEnd - dttmStart).total_seconds(), 3) if dttmStart and dttmEnd else None,
+                  "status": "SUCCESS" if bSuccess else "FAILED",
+                  "sql_type": " ".join(objMatch.group(1).upper().split()) if objMatch else ""}
+
+    if sStage is not None:
+        lstResultRows = lstResultRows or []
+        dictRecord.update({"stage": sStage,
+                           "filename": sFilename,
+                           "rows_unloaded": sum(int(dictRow.get("rows_unloaded") or 0) for dictRow in lstResultRows),
+                           "input_bytes": sum(int(dictRow.get("input_bytes") or 0) for dictRow in lstResultRows),
+                           "output_bytes": sum(int(dictRow.get("output_bytes") or 0) for dictRow in lstResultRows)})
+
+    return dictRecord
+
+
+def writeRunMetricsRecord(dictRecord):
+    """ Appends dictRecord to the run's metrics file. Does nothing when RUN_METRICS_FILE is not set. """
+
+    sMetricsFilename = os.environ.get(RUN_METRICS_ENV)
+    if not sMetricsFilename:
+        return
+
+    # one write per record --> records from concurrent extract processes do not interleave
+    with open(sMetricsFilename, "a", encoding="utf-8") as fMetrics:
+        fMetrics.write(json.dumps(dictRecord, default=str) + "\n")
+
+
+def readRunMetricsRecords(sLogFilenameNPath):
+    """ Returns the metrics records for log file sLogFilenameNPath, or None when there is no metrics file. """
+
+    sMetricsFilename = getRunMetricsFilename(sLogFilenameNPath)
+
+    if not os.path.isfile(sMetricsFilename):
+        return None
+
+    lstRecords = []
+
+    with open(sMetricsFilename, "r", encoding="utf-8") as fMetrics:
+        for sLine in fMetrics:
+            sLine = sLine.strip()
+            if sLine == "":
+                continue
+            try:
+                lstRecords.append(json.loads(sLine))
+            except ValueError:
+                # partial record of a process that was killed mid-write
+                continue
+
+    return lstRecords
+
+
+def getCopyIntoFilesAndCounts(lstRecords):
+    """ Returns [(filename, rows_unloaded, input_bytes, output_bytes)] of the successful COPY INTO @stage statements. """
+
+    return [(dictRecord["filename"], dictRecord["rows_unloaded"], dictRecord["input_bytes"], dictRecord["output_bytes"])
+            for dictRecord in lstRecords
+            if dictRecord.get("filename") and dictRecord.get("status") == "SUCCESS"]
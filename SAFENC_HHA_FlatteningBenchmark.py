@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  SAFENC_HHA_FlatteningBenchmark.py
+#
+# Desc: Benchmark SAFENC HHA flattening (MB/sec) of
+#         1) SAFENC_HHA_Flattening_orig.py (record-by-record program)
+#         2) SAFENC_HHA_Flattening.py for each --workers value
+#
+#       Creates a synthetic IDR extract file in a temp directory (SAFENC_HHA_FlatteningRegression.createTestInputFile),
+#       checks that the outputs are identical to the original program's output, and removes the temp directory.
+#
+# Ex.   python3 SAFENC_HHA_FlatteningBenchmark.py --nof_claims 5000 --workers 1 4 8
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+########################################################################################################
+import os
+import sys
+import time
+import shutil
+import filecmp
+import argparse
+import tempfile
+import subprocess
+
+import SAFENC_HHA_Flattening as flattening
+from SAFENC_HHA_FlatteningRegression import createTestInputFile
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="SAFENC_HHA_Flattening.py benchmark")
+    parser.add_argument("--nof_claims", type=int, default=2000, help="NOF claims of synthetic file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="--Workers values to benchmark")
+    parser.add_argument("--nonASCIIRate", type=float, default=0.0, help="fraction of lines with a non-ASCII name")
+    parser.add_argument("--chunkMB", type=int, default=flattening.CHUNK_SIZE // (1024 * 1024), help="--ChunkMB value")
+    args = parser.parse_args()
+
+    sDir = tempfile.mkdtemp(prefix="SAFENC_HHA_FlatteningBenchmark_")
+    sScriptDir = os.path.dirname(os.path.abspath(__file__))
+
+    try:
+        #############################################################
+        # Create input file
+        #############################################################
+        sInputFile = os.path.join(sDir, "input.txt")
+        createTestInputFile(sInputFile, args.nof_claims, args.nonASCIIRate)
+        fMB = os.path.getsize(sInputFile) / (1024 * 1024)
+        print(f"Input file {args.nof_claims} claims {fMB:.1f} MB")
+
+        print(f"{'flattening':>20} {'secs':>10} {'MB/sec':>10}")
+
+        def timeIt(sName, fnFlatten):
+            fStart = time.monotonic()
+            fnFlatten()
+            fElapsed = time.monotonic() - fStart
+            print(f"{sName:>20} {fElapsed:>10.2f} {fMB / fElapsed:>10.1f}")
+
+        #############################################################
+        # Original program
+        #############################################################
+        sExpectedFile = os.path.join(sDir, "orig.txt")
+        timeIt("record-by-record", lambda: subprocess.run([sys.executable, os.path.join(sScriptDir, "SAFENC_HHA_Flattening_orig.py"),
+                                                           sInputFile, sExpectedFile], stdout=subprocess.DEVNULL, check=True))
+
+        #############################################################
+        # Slice plan engine
+        #############################################################
+        for iWorkers in args.workers:
+            sOutputFile = os.path.join(sDir, f"engine_{iWorkers}.txt")
+            timeIt(f"slice plan x{iWorkers}", lambda: flattening.flattenFile(sInputFile, sOutputFile, iWorkers, args.chunkMB * 1024 * 1024))
+
+            if not filecmp.cmp(sExpectedFile, sOutputFile, shallow=False):
+                print(f"{sOutputFile} is not identical to {sExpectedFile}")
+                sys.exit(12)
+
+    finally:
+        shutil.rmtree(sDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  SAFENC_HHA_FlatteningRegression.py
+#
+# Desc: Regression test of SAFENC_HHA_Flattening.py against SAFENC_HHA_Flattening_orig.py.
+#
+#       Creates a synthetic SAFENC HHA IDR extract file (or uses --inputFile), runs the original program and
+#       SAFENC_HHA_Flattening.py (each --workers value, plain and gzip files), and compares the output files.
+#       The first difference is reported as line number and column.
+#
+# Ex.   python3 SAFENC_HHA_FlatteningRegression.py --nof_claims 2000 --workers 1 4
+#       python3 SAFENC_HHA_FlatteningRegression.py --inputFile SAFENC_HHA_FINAL_QTR2_20230706.134541_sorted.txt
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+########################################################################################################
+import os
+import sys
+import gzip
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+import SAFENC_HHA_Flattening as flattening
+
+
+INPUT_REC_LEN = 3404
+
+# code values (blank and '~' codes are not written)
+CODE_VALUES = ["", "~", " ~", "A1", "Z9", "XY", "\t", "\x1c", "123"]
+
+
+def createTestInputFile(sFilename, iNOFClaims, fNonASCIIRate=0.02, iSeed=2026):
+    """ Creates a sorted IDR extract file: claims of 1-60 lines, blank/'~' codes, short and non-ASCII lines. """
+
+    random.seed(iSeed)
+
+    sChars = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 "
+
+    lstCodeSlices = [(codeSlice, lstPieces) for lstElements in flattening.VAR_GROUPS for codeSlice, lstPieces in lstElements]
+
+    with open(sFilename, "w", encoding="utf-8", newline="") as fInput:
+        for iClaim in range(iNOFClaims):
+
+            lstRec = [random.choice(sChars) for _ in range(INPUT_REC_LEN)]
+
+            # var group codes and MCO plan id
+            for codeSlice, lstPieces in lstCodeSlices:
+                sCode = random.choice(CODE_VALUES)[:codeSlice.stop - codeSlice.start]
+                lstRec[codeSlice] = list(sCode.ljust(codeSlice.stop - codeSlice.start))
+
+            planIdSlice = flattening.MCO_PLAN_ID_SLICES[0]
+            lstRec[planIdSlice] = list(random.choice(["~", "PLAN1", ""]).ljust(planIdSlice.stop - planIdSlice.start))
+
+            # claim key
+            lstRec[:33] = list(f"CLM{iClaim:030}")
+
+            iNOFLines = random.choice([1, 1, 2, 5, 24, 25, 26, 50, 51, 60])
+            for iLine in range(iNOFLines):
+                lstLine = list(lstRec)
+                lstLine[33:43] = list(f"{iLine + 1:010}")
+                lstLine[2067:2077] = random.choices(sChars, k=10)
+
+                # non-ASCII name
+                if random.random() < fNonASCIIRate:
+                    lstLine[215:221] = list("MÜLLER")
+
+                sLine = "".join(lstLine)
+
+                # short line
+                if random.random() < 0.01:
+                    sLine = sLine[:random.randint(20, INPUT_REC_LEN)]
+
+                fInput.write(sLine + "\n")
+
+
+def compareFiles(sExpectedFilename, sActualFilename):
+    """ Returns None when files are identical, else a description of the first difference. """
+
+    with openFile(sExpectedFilename) as fExpected, openFile(sActualFilename) as fActual:
+        iLine = 0
+        while True:
+            iLine += 1
+            bExpected = fExpected.readline()
+            bActual = fActual.readline()
+
+            if bExpected != bActual:
+                iCol = next((i for i, (a, b) in enumerate(zip(bExpected, bActual)) if a != b), min(len(bExpected), len(bActual)))
+                return f"line {iLine} column {iCol + 1}: expected {bExpected[iCol:iCol + 20]!r} actual {bActual[iCol:iCol + 20]!r}"
+
+            if not bExpected:
+                return None
+
+
+def openFile(sFilename):
+
+    return gzip.open(sFilename, "rb") if sFilename.endswith(".gz") else open(sFilename, "rb")
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="SAFENC_HHA_Flattening.py regression test")
+    parser.add_argument("--inputFile", help="IDR extract file (default: synthetic file)")
+    parser.add_argument("--nof_claims", type=int, default=1000, help="NOF claims of synthetic file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="--Workers values to test")
+    parser.add_argument("--chunkMB", type=int, default=1, help="--ChunkMB value to test (small --> many chunks)")
+    args = parser.parse_args()
+
+    sDir = tempfile.mkdtemp(prefix="SAFENC_HHA_FlatteningRegression_")
+    sScriptDir = os.path.dirname(os.path.abspath(__file__))
+
+    try:
+        sInputFile = args.inputFile
+        if sInputFile is None:
+            sInputFile = os.path.join(sDir, "input.txt")
+            createTestInputFile(sInputFile, args.nof_claims)
+
+        sInputGzFile = os.path.join(sDir, "input.txt.gz")
+        with open(sInputFile, "rb") as fIn, gzip.open(sInputGzFile, "wb") as fOut:
+            shutil.copyfileobj(fIn, fOut)
+
+        #############################################################
+        # Original program
+        #############################################################
+        sExpectedFile = os.path.join(sDir, "expected.txt")
+        subprocess.run([sys.executable, os.path.join(sScriptDir, "SAFENC_HHA_Flattening_orig.py"), sInputFile, sExpectedFile],
+                       stdout=subprocess.DEVNULL, check=True)
+
+        #############################################################
+        # SAFENC_HHA_Flattening.py
+        #############################################################
+        iNOFFailures = 0
+
+        for iWorkers in args.workers:
+            for sInFile, sSuffix in ((sInputFile, ".txt"), (sInputGzFile, ".txt.gz")):
+                sActualFile = os.path.join(sDir, f"actual_{iWorkers}{sSuffix}")
+                flattening.flattenFile(sInFile, sActualFile, iWorkers, args.chunkMB * 1024 * 1024)
+
+                sDiff = compareFiles(sExpectedFile, sActualFile)
+                print(f"workers={iWorkers} {os.path.basename(sInFile)}: {'OK' if sDiff is None else 'DIFFERENT ' + sDiff}")
+
+                if sDiff is not None:
+                    iNOFFailures += 1
+
+        if iNOFFailures:
+            sys.exit(12)
+
+    finally:
+        shutil.rmtree(sDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,965 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  SFSessionBroker.py
+#
+# Desc: Long-lived local Snowflake session broker.
+#
+#       The broker is a daemon listening on a Unix socket that keeps warm, authenticated
+#       Snowflake connections in pools keyed by (ENVNAME, role, database, warehouse). Extract programs borrow a connection
+#       from the broker instead of running the full snowconvert_helpers.log_on() sequence
+#       (assume_role STS call, Secrets Manager fetch, PEM->DER key parse, connector.connect)
+#       in every X_Extract.py subprocess.
+#
+#       A client "lease" lasts for the life of the client socket. All SQL sent over that socket
+#       runs on the same pooled Snowflake session so session state (query_tag, USE WAREHOUSE)
+#       behaves as it does with a direct connection. When the client closes the socket the
+#       session is returned to the pool for the warehouse it was last using.
+#
+#       A lease asks for the borrower's ENVNAME and, optionally, a role and database (default is the
+#       role/database of the logon). The broker only logs on to its own ENVNAME; a lease for another
+#       ENVNAME is refused and the borrower uses the direct logon. A pooled session's state is reset
+#       when it is checked out (query_tag unset; USE ROLE/DATABASE/WAREHOUSE of the pool key).
+#
+#       A session is only returned to the pool when every statement of the lease left the session
+#       state as a new session has it (queries, DML, COPY, PUT/GET, DDL other than temporary objects,
+#       USE WAREHOUSE, ALTER SESSION SET/UNSET QUERY_TAG). Any other statement (ALTER SESSION,
+#       USE DATABASE/SCHEMA/ROLE, SET/UNSET variables, BEGIN, CREATE TEMPORARY, CALL, ...) or an error
+#       other than a SQL error --> the session is closed at checkin instead of being lent again.
+#
+#       Every request carries the borrower's query_tag (script name until the borrower sets one);
+#       the broker sets it on the session when it differs, so a pooled session never runs a
+#       borrower's statements under another borrower's tag.
+#
+#       Result rows keep their Python types (Decimal, date, datetime, bytes, ...) and are sent in
+#       batches of SF_BROKER_FETCH_ROWS rows as the borrower fetches them (the broker does not hold
+#       the whole result set in memory). Only the most recently executed cursor of a lease can fetch.
+#       fetch_arrow_batches()/fetch_pandas_batches() run on the broker's cursor and each Arrow table
+#       is sent as an Arrow IPC stream (Export keeps the Arrow path with a borrowed session).
+#
+#       Idle sessions are evicted after SF_BROKER_IDLE_SECS seconds.
+#
+#       snowconvert_helpers.log_on() calls borrowConnection() first and falls back to the
+#       normal logon path when the broker is not running.
+#
+# Usage:
+#       python3 SFSessionBroker.py --start       --> run broker in foreground (use nohup/RunDeck to background)
+#       python3 SFSessionBroker.py --stats       --> display hit/miss/latency counters
+#       python3 SFSessionBroker.py --stop        --> shutdown broker
+#
+# Environment variables:
+#       SF_BROKER_SOCKET     : Unix socket path (default /app/IDRC/XTR/CMS/data/sf_session_broker.sock)
+#       SF_BROKER_IDLE_SECS  : Seconds before an idle pooled session is closed (default 900)
+#       SF_BROKER_POOL_SIZE  : Max idle sessions kept per pool key (default 8)
+#       SF_BROKER_FETCH_ROWS : Result rows sent per fetch (default 10000)
+#       SF_BROKER            : Set to "N" to bypass the broker in snowconvert_helpers.log_on()
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+# 2026-10-18 Close sessions at checkin when the lease changed session state. Set the borrower's query_tag per
+#            request. Typed result values fetched in batches. Any statement error is returned to the borrower
+#            (handler thread no longer dies). Socket created under umask 0177 (no window before chmod).
+# 2026-10-18 Key idle pools by (ENVNAME, role, database, warehouse) and reset session state at checkout.
+#            BrokerCursor proxies fetch_arrow_batches/fetch_pandas_batches to the broker's cursor.
+########################################################################################################
+import os
+import re
+import sys
+import json
+import time
+import base64
+import decimal
+import datetime as dt
+import socket
+import socketserver
+import threading
+import argparse
+import traceback
+from datetime import datetime
+from collections import namedtuple
+
+
+########################################################################################################
+# CONSTANTS
+########################################################################################################
+SF_BROKER_SOCKET = os.getenv("SF_BROKER_SOCKET", "/app/IDRC/XTR/CMS/data/sf_session_broker.sock")
+SF_BROKER_IDLE_SECS = int(os.getenv("SF_BROKER_IDLE_SECS", "900"))
+SF_BROKER_POOL_SIZE = int(os.getenv("SF_BROKER_POOL_SIZE", "8"))
+SF_BROKER_FETCH_ROWS = int(os.getenv("SF_BROKER_FETCH_ROWS", "10000"))
+
+# Seconds a client waits to connect to the broker before falling back to a direct logon
+CLIENT_CONNECT_TIMEOUT = 2.0
+
+# Pool key value when the lease does not name a role/database/warehouse (logon default)
+DEFAULT_KEY = "DEFAULT"
+
+# Statements that leave session state as a new session has it (session can be lent again)
+SESSION_SAFE_VERBS = {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "MERGE", "COPY", "PUT", "GET", "REMOVE", "RM",
+                      "LIST", "LS", "SHOW", "DESC", "DESCRIBE", "EXPLAIN", "TRUNCATE", "DROP", "COMMIT", "ROLLBACK",
+                      "CREATE", "ALTER", "GRANT", "REVOKE", "COMMENT", "UNDROP"}
+SESSION_OBJECT_KEYWORDS = {"TEMP", "TEMPORARY", "LOCAL", "VOLATILE"}
+
+reQueryTag = re.compile(r"^\s*ALTER\s+SESSION\s+(?:SET\s+QUERY_TAG\s*=\s*'((?:[^'\\]|''|\\.)*)'|UNSET\s+QUERY_TAG)\s*;?\s*$",
+                        re.IGNORECASE | re.DOTALL)
+reLeadingComments = re.compile(r"^(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*", re.DOTALL)
+
+
+########################################################################################################
+# Broker (server side)
+########################################################################################################
+# Idle pool key. A session is only lent to leases asking for the same key.
+PoolKey = namedtuple("PoolKey", ["envname", "role", "database", "warehouse"])
+
+
+def _getPoolKey(dictRequest):
+
+    return PoolKey((dictRequest.get("envname") or os.getenv("ENVNAME") or "").upper(),
+                   (dictRequest.get("role") or DEFAULT_KEY).upper(),
+                   (dictRequest.get("database") or DEFAULT_KEY).upper(),
+                   (dictRequest.get("warehouse") or DEFAULT_KEY).upper())
+
+
+class SessionPool:
+    """ Pools of idle Snowflake connections keyed by PoolKey plus hit/miss/latency counters. """
+
+    def __init__(self, iIdleSecs=SF_BROKER_IDLE_SECS, iPoolSize=SF_BROKER_POOL_SIZE):
+
+        self.iIdleSecs = iIdleSecs
+        self.iPoolSize = iPoolSize
+        self.lock = threading.Lock()
+
+        # PoolKey --> list of (connection, last used epoch secs)
+        self.dictIdle = {}
+
+        self.dictCounters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "sessions_dropped": 0,
+            "reset_failures": 0,
+            "leases_active": 0,
+            "statements": 0,
+            "statement_errors": 0,
+            "logon_secs_total": 0.0,
+            "checkout_secs_total": 0.0,
+            "statement_secs_total": 0.0,
+        }
+        self.dtStarted = datetime.now()
+
+    def checkout(self, key):
+
+        fStart = time.monotonic()
+        con = None
+
+        while con is None:
+            with self.lock:
+                lstIdle = self.dictIdle.get(key, [])
+                if not lstIdle:
+                    break
+                con, _ = lstIdle.pop()
+
+            if con.is_closed():
+                con = None
+                continue
+
+            # previous borrower's session state --> state of the pool key
+            try:
+                self._resetSession(con, key)
+            except Exception as e:
+                print(f"SFSessionBroker could not reset pooled session ({e}). Session closed.", file=sys.stderr)
+                with self.lock:
+                    self.dictCounters["reset_failures"] += 1
+                self._close(con)
+                con = None
+
+        bHit = con is not None
+
+        if not bHit:
+            con = self._logon(key)
+
+        with self.lock:
+            self.dictCounters["hits" if bHit else "misses"] += 1
+            self.dictCounters["leases_active"] += 1
+            self.dictCounters["checkout_secs_total"] += time.monotonic() - fStart
+
+        return con, bHit
+
+    def checkin(self, con, key, bReuse=True):
+
+        with self.lock:
+            self.dictCounters["leases_active"] -= 1
+
+        if con is None or con.is_closed():
+            return
+
+        # Lease changed session state (or failed) --> do not lend the session again
+        if not bReuse:
+            with self.lock:
+                self.dictCounters["sessions_dropped"] += 1
+            self._close(con)
+            return
+
+        # session state is reset when the session is checked out again
+        with self.lock:
+            lstIdle = self.dictIdle.setdefault(key, [])
+            if len(lstIdle) < self.iPoolSize:
+                lstIdle.append((con, time.time()))
+                return
+
+        self._close(con)
+
+    def evictIdle(self):
+
+        fNow = time.time()
+        lstEvict = []
+
+        with self.lock:
+            for key, lstIdle in self.dictIdle.items():
+                lstKeep = [(con, fLastUsed) for con, fLastUsed in lstIdle if fNow - fLastUsed < self.iIdleSecs]
+                lstEvict.extend(con for con, fLastUsed in lstIdle if fNow - fLastUsed >= self.iIdleSecs)
+                self.dictIdle[key] = lstKeep
+            self.dictCounters["evictions"] += len(lstEvict)
+
+        for con in lstEvict:
+            self._close(con)
+
+    def closeAll(self):
+
+        with self.lock:
+            lstAll = [con for lstIdle in self.dictIdle.values() for con, _ in lstIdle]
+            self.dictIdle = {}
+
+        for con in lstAll:
+            self._close(con)
+
+    def recordStatement(self, fSecs, bError):
+
+        with self.lock:
+            self.dictCounters["statements"] += 1
+            self.dictCounters["statement_secs_total"] += fSecs
+            if bError:
+                self.dictCounters["statement_errors"] += 1
+
+    def getStats(self):
+
+        with self.lock:
+            dictStats = dict(self.dictCounters)
+            dictStats["idle_sessions"] = {"/".join(key): len(lstIdle) for key, lstIdle in self.dictIdle.items()}
+
+        iCheckouts = dictStats["hits"] + dictStats["misses"]
+        dictStats["hit_ratio"] = round(dictStats["hits"] / iCheckouts, 4) if iCheckouts else 0.0
+        dictStats["avg_logon_secs"] = round(dictStats["logon_secs_total"] / dictStats["misses"], 4) if dictStats["misses"] else 0.0
+        dictStats["avg_checkout_secs"] = round(dictStats["checkout_secs_total"] / iCheckouts, 4) if iCheckouts else 0.0
+        dictStats["avg_statement_secs"] = round(dictStats["statement_secs_total"] / dictStats["statements"], 4) if dictStats["statements"] else 0.0
+        dictStats["started"] = self.dtStarted.strftime("%Y-%m-%d %H:%M:%S")
+
+        return dictStats
+
+    def _logon(self, key):
+
+        import snowconvert_helpers
+
+        # log_on() uses the broker's ENVNAME (secret, account and AWS account of this server)
+        sEnvname = (os.getenv("ENVNAME") or "").upper()
+        if key.envname != sEnvname:
+            raise BrokerError(f"Broker logs on to ENVNAME {sEnvname} only (lease asked for {key.envname})")
+
+        fStart = time.monotonic()
+
+        # Broker must never try to borrow from itself
+        os.environ["SF_BROKER"] = "N"
+        con = snowconvert_helpers.log_on()
+
+        try:
+            self._resetSession(con, key)
+        except Exception:
+            self._close(con)
+            raise
+
+        with self.lock:
+            self.dictCounters["logon_secs_total"] += time.monotonic() - fStart
+
+        return con
+
+    def _resetSession(self, con, key):
+
+        ######################################################
+        # Session state of the pool key. Pooled sessions only
+        # ran statements that leave session state as a new
+        # session has it, plus query_tag and USE WAREHOUSE.
+        ######################################################
+        lstSQL = ["alter session unset query_tag"]
+
+        if key.role != DEFAULT_KEY:
+            lstSQL.append(f"USE ROLE {key.role}")
+        if key.database != DEFAULT_KEY:
+            lstSQL.append(f"USE DATABASE {key.database}")
+        if key.warehouse != DEFAULT_KEY:
+            lstSQL.append(f"USE WAREHOUSE {key.warehouse}")
+
+        cur = con.cursor()
+        try:
+            for sSQL in lstSQL:
+                cur.execute(sSQL)
+        finally:
+            cur.close()
+
+    def _close(self, con):
+
+        try:
+            con.close()
+        except Exception:
+            pass
+
+
+def _jsonValue(val):
+
+    # None, bool, int, float and str are JSON values; other types are tagged so the client rebuilds the same type
+    if val is None or isinstance(val, (bool, int, float, str)):
+        return val
+
+    if isinstance(val, decimal.Decimal):
+        return {"$t": "decimal", "v": str(val)}
+
+    if isinstance(val, dt.datetime):
+        return {"$t": "datetime", "v": val.isoformat()}
+
+    if isinstance(val, dt.date):
+        return {"$t": "date", "v": val.isoformat()}
+
+    if isinstance(val, dt.time):
+        return {"$t": "time", "v": val.isoformat()}
+
+    if isinstance(val, (bytes, bytearray)):
+        return {"$t": "bytes", "v": base64.b64encode(val).decode("ascii")}
+
+    return str(val)
+
+
+def _pyValue(val):
+
+    if not isinstance(val, dict):
+        return val
+
+    sType, sValue = val["$t"], val["v"]
+
+    if sType == "decimal":
+        return decimal.Decimal(sValue)
+    if sType == "datetime":
+        return dt.datetime.fromisoformat(sValue)
+    if sType == "date":
+        return dt.date.fromisoformat(sValue)
+    if sType == "time":
+        return dt.time.fromisoformat(sValue)
+    if sType == "bytes":
+        return base64.b64decode(sValue)
+
+    raise BrokerError(f"Unknown result value type {sType}")
+
+
+def _getQueryTagFromSQL(sSQL):
+
+    # "ALTER SESSION SET QUERY_TAG = 'x'" --> x, "ALTER SESSION UNSET QUERY_TAG" --> "", else None
+    match = reQueryTag.match(reLeadingComments.sub("", sSQL))
+    if match is None:
+        return None
+
+    return re.sub(r"''|\\(.)", lambda m: m.group(1) or "'", match.group(1) or "")
+
+
+def _quoteQueryTag(sQueryTag):
+
+    return "'" + sQueryTag.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def _isSessionStateSQL(sSQL):
+
+    ######################################################
+    # True when the statement may change session state a
+    # new session does not have (session is not lent again)
+    ######################################################
+    sSQL = reLeadingComments.sub("", sSQL).lstrip("(")
+    lstTokens = sSQL.rstrip().rstrip(";").upper().split()
+
+    if not lstTokens:
+        return False
+
+    if lstTokens[0] not in SESSION_SAFE_VERBS:
+        # USE WAREHOUSE is tracked (session returned to that warehouse's pool)
+        return not (lstTokens[0] == "USE" and len(lstTokens) >= 2 and lstTokens[1] == "WAREHOUSE")
+
+    if lstTokens[0] == "ALTER" and len(lstTokens) >= 2 and lstTokens[1] == "SESSION":
+        return _getQueryTagFromSQL(sSQL) is None
+
+    # CREATE [OR REPLACE] TEMPORARY TABLE ... --> object lives as long as the session
+    if lstTokens[0] == "CREATE":
+        return any(sToken in SESSION_OBJECT_KEYWORDS for sToken in lstTokens[1:5])
+
+    return False
+
+
+def _getErrorDict(e):
+
+    # Snowflake error attributes + class name so the client raises the same error class
+    return {"class": type(e).__name__, "errno": getattr(e, "errno", None) or 999,
+            "msg": getattr(e, "msg", None) or str(e), "sqlstate": getattr(e, "sqlstate", None)}
+
+
+def _getWarehouseFromSQL(sSQL):
+
+    # Track "USE WAREHOUSE x" so the session is returned to the correct pool
+    lstTokens = sSQL.strip().rstrip(";").split()
+    if len(lstTokens) == 3 and lstTokens[0].upper() == "USE" and lstTokens[1].upper() == "WAREHOUSE":
+        return lstTokens[2].upper()
+
+    return None
+
+
+class BrokerRequestHandler(socketserver.StreamRequestHandler):
+    """ One client socket == one lease. Requests and responses are JSON lines. """
+
+    def handle(self):
+
+        pool = self.server.pool
+        self.con = None
+        self.cur = None
+        # Arrow tables of the open result set (fetch_arrow_batches/fetch_pandas_batches)
+        self.arrowBatches = None
+        self.key = None
+        # query_tag the session has (checkin unsets it)
+        self.sSessionQueryTag = ""
+        # False --> lease changed session state or failed; session is closed at checkin
+        self.bReuse = True
+
+        try:
+            for bLine in self.rfile:
+                try:
+                    self._handleRequest(json.loads(bLine))
+
+                except (BrokenPipeError, ConnectionResetError):
+                    raise
+
+                except Exception as e:
+                    # Never let a request kill the lease thread: report the error to the client
+                    print(f"SFSessionBroker request failed: {e}", file=sys.stderr)
+                    traceback.print_exc()
+                    self.bReuse = False
+                    self._reply({"ok": False, "error": _getErrorDict(e)})
+
+        except (BrokenPipeError, ConnectionResetError):
+            # client went away in the middle of a reply; its session state is unknown
+            self.bReuse = False
+
+        finally:
+            self._closeCursor()
+            if self.con is not None:
+                pool.checkin(self.con, self.key, self.bReuse)
+
+    def _handleRequest(self, dictRequest):
+
+        pool = self.server.pool
+        sOp = dictRequest.get("op")
+
+        if sOp == "stats":
+            self._reply({"ok": True, "stats": pool.getStats()})
+
+        elif sOp == "shutdown":
+            self._reply({"ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+        elif sOp == "lease":
+            if self.con is not None:
+                raise BrokerError("Socket already holds a lease")
+            self.key = _getPoolKey(dictRequest)
+            self.con, bHit = pool.checkout(self.key)
+            # borrower binds parameters with the session's paramstyle; Export checks arrow_number_to_decimal
+            self._reply({"ok": True, "hit": bHit, "is_pyformat": self.con.is_pyformat,
+                         "arrow_number_to_decimal": getattr(self.con, "arrow_number_to_decimal", False)})
+
+        elif sOp == "execute":
+            if self.con is None:
+                raise BrokerError("execute without a lease")
+            self._execute(dictRequest)
+
+        elif sOp == "fetch":
+            if self.cur is None:
+                raise BrokerError("No open result set to fetch from")
+            self._replyRows({"ok": True})
+
+        elif sOp == "fetch_arrow":
+            if self.cur is None:
+                raise BrokerError("No open result set to fetch from")
+            self._replyArrow(dictRequest)
+
+        else:
+            raise BrokerError(f"Unknown broker op {sOp}")
+
+    def _setQueryTag(self, sQueryTag):
+
+        # Borrower's query_tag for its statements (pooled session may have been tagged by the previous borrower)
+        if sQueryTag is None or sQueryTag == self.sSessionQueryTag:
+            return
+
+        cur = self.con.cursor()
+        try:
+            if sQueryTag:
+                cur.execute(f"alter session set query_tag = {_quoteQueryTag(sQueryTag)}")
+            else:
+                cur.execute("alter session unset query_tag")
+        finally:
+            cur.close()
+
+        self.sSessionQueryTag = sQueryTag
+
+    def _execute(self, dictRequest):
+
+        import snowflake.connector
+
+        sSQL = dictRequest["sql"]
+
+        # previous result set of this lease is replaced
+        self._closeCursor()
+        self._setQueryTag(dictRequest.get("query_tag"))
+
+        fStart = time.monotonic()
+        cur = self.con.cursor()
+
+        try:
+            cur.execute(sSQL, params=dictRequest.get("params"))
+
+        except snowflake.connector.errors.ProgrammingError as e:
+            self.server.pool.recordStatement(time.monotonic() - fStart, True)
+            self._reply({"ok": False, "sfqid": cur.sfqid, "error": _getErrorDict(e)})
+            cur.close()
+            return
+
+        except Exception as e:
+            # connection lost, interface error, ... --> session state unknown
+            self.server.pool.recordStatement(time.monotonic() - fStart, True)
+            self.bReuse = False
+            self._reply({"ok": False, "sfqid": getattr(cur, "sfqid", None), "error": _getErrorDict(e)})
+            cur.close()
+            return
+
+        self.server.pool.recordStatement(time.monotonic() - fStart, False)
+
+        if _isSessionStateSQL(sSQL):
+            self.bReuse = False
+
+        sQueryTag = _getQueryTagFromSQL(sSQL)
+        if sQueryTag is not None:
+            self.sSessionQueryTag = sQueryTag
+
+        sNewWarehouse = _getWarehouseFromSQL(sSQL)
+        if sNewWarehouse is not None:
+            self.key = self.key._replace(warehouse=sNewWarehouse)
+
+        # description as ResultMetadata fields (name, type_code, display_size, internal_size, precision, scale, is_nullable)
+        lstDescription = [list(col)[:7] for col in cur.description] if cur.description else None
+
+        dictResponse = {"ok": True, "rowcount": cur.rowcount, "sfqid": cur.sfqid, "description": lstDescription}
+
+        if lstDescription is None:
+            cur.close()
+            self._reply(dict(dictResponse, rows=[], more=False))
+            return
+
+        self.cur = cur
+        self._replyRows(dictResponse)
+
+    def _replyRows(self, dictResponse):
+
+        # next batch of rows of the open result set (cursor stays open for fetch_arrow until the next execute)
+        lstRows = [[_jsonValue(val) for val in row] for row in self.cur.fetchmany(SF_BROKER_FETCH_ROWS)]
+        bMore = len(lstRows) == SF_BROKER_FETCH_ROWS
+
+        self._reply(dict(dictResponse, rows=lstRows, more=bMore))
+
+    def _replyArrow(self, dictRequest):
+
+        import snowflake.connector
+
+        ######################################################
+        # Next Arrow table of the open result set as an Arrow
+        # IPC stream. "start" --> connector reads the result
+        # batches from the beginning (rows already sent by
+        # execute/fetch do not matter).
+        ######################################################
+        try:
+            import pyarrow as pa
+
+            if dictRequest.get("start"):
+                dictKwargs = dictRequest.get("kwargs") or {}
+                if dictRequest.get("pandas"):
+                    self.arrowBatches = (pa.Table.from_pandas(df, preserve_index=False) for df in self.cur.fetch_pandas_batches(**dictKwargs))
+                else:
+                    self.arrowBatches = iter(self.cur.fetch_arrow_batches(**dictKwargs))
+
+            if self.arrowBatches is None:
+                raise BrokerError("fetch_arrow without start")
+
+            table = next(self.arrowBatches, None)
+
+        except (ImportError, BrokerError, snowflake.connector.errors.Error) as e:
+            # ex. NotSupportedError: result set is not in Arrow format --> borrower reads rows instead
+            self.arrowBatches = None
+            self._reply({"ok": False, "error": _getErrorDict(e)})
+            return
+
+        if table is None:
+            self.arrowBatches = None
+            self._reply({"ok": True, "arrow": None})
+            return
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        self._reply({"ok": True, "arrow": base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")})
+
+    def _closeCursor(self):
+
+        self.arrowBatches = None
+
+        if self.cur is not None:
+            try:
+                self.cur.close()
+            except Exception:
+                pass
+            self.cur = None
+
+    def _reply(self, dictResponse):
+
+        self.wfile.write((json.dumps(dictResponse) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+
+class BrokerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, sSocketPath, pool):
+
+        self.pool = pool
+        super().__init__(sSocketPath, BrokerRequestHandler)
+
+
+def startBroker(sSocketPath=SF_BROKER_SOCKET):
+
+    # Remove stale socket left by a previous broker
+    if os.path.exists(sSocketPath):
+        os.remove(sSocketPath)
+
+    pool = SessionPool()
+
+    # Only the owning user may borrow sessions: socket is created 0600 (no window between bind and chmod)
+    iUmask = os.umask(0o177)
+    try:
+        server = BrokerServer(sSocketPath, pool)
+    finally:
+        os.umask(iUmask)
+
+    def evictLoop():
+        while True:
+            time.sleep(min(60, max(1, pool.iIdleSecs // 4)))
+            pool.evictIdle()
+
+    threading.Thread(target=evictLoop, daemon=True).start()
+
+    print(f"SFSessionBroker listening on {sSocketPath} (idle secs={pool.iIdleSecs}, pool size={pool.iPoolSize})")
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        pool.closeAll()
+        if os.path.exists(sSocketPath):
+            os.remove(sSocketPath)
+
+
+########################################################################################################
+# Client side
+########################################################################################################
+class BrokerError(Exception):
+    "Snowflake session broker protocol error"
+
+
+# cursor.description entry (same fields as the connector's ResultMetadata)
+BrokerColumn = namedtuple("BrokerColumn", ["name", "type_code", "display_size", "internal_size", "precision", "scale", "is_nullable"])
+
+
+def _raiseBrokerError(dictError, sfqid):
+
+    import snowflake.connector
+
+    # same Snowflake error class as the broker got (ProgrammingError, OperationalError, ...); DatabaseError otherwise
+    errorClass = getattr(snowflake.connector.errors, dictError.get("class") or "", None)
+    if not (isinstance(errorClass, type) and issubclass(errorClass, snowflake.connector.errors.Error)):
+        errorClass = snowflake.connector.errors.DatabaseError
+
+    raise errorClass(msg=dictError.get("msg"), errno=dictError.get("errno"), sqlstate=dictError.get("sqlstate"), sfqid=sfqid)
+
+
+class BrokerCursor:
+    """ Minimal cursor with the attributes snowconvert_helpers.execute_sql_statement and Export use. Rows are fetched from the broker in batches. """
+
+    def __init__(self, connection):
+
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self.sfqid = None
+        self._rows = []
+        self._iRow = 0
+        self._bMore = False
+
+    def execute(self, sql, params=None):
+
+        dictResponse = self.connection._request({"op": "execute", "sql": sql, "params": params, "query_tag": self.connection.query_tag})
+        self.sfqid = dictResponse.get("sfqid")
+
+        if not dictResponse["ok"]:
+            _raiseBrokerError(dictResponse["error"], self.sfqid)
+
+        sQueryTag = _getQueryTagFromSQL(sql)
+        if sQueryTag is not None:
+            self.connection.query_tag = sQueryTag
+
+        self.rowcount = dictResponse["rowcount"]
+        self.description = [BrokerColumn(*col) for col in dictResponse["description"]] if dictResponse["description"] else None
+        self._setRows(dictResponse)
+
+        # only this cursor's result set can be fetched from the broker
+        self.connection._activeCursor = self
+
+        return self
+
+    def _setRows(self, dictResponse):
+
+        self._rows = [tuple(_pyValue(val) for val in row) for row in dictResponse["rows"]]
+        self._iRow = 0
+        self._bMore = dictResponse["more"]
+
+    def _fetchBatch(self):
+
+        # next batch of rows from the broker; False when the result set is done
+        if not self._bMore:
+            return False
+
+        if self.connection._activeCursor is not self:
+            raise BrokerError("Result set was replaced by a later execute on the same broker connection")
+
+        dictResponse = self.connection._request({"op": "fetch"})
+        if not dictResponse["ok"]:
+            _raiseBrokerError(dictResponse["error"], self.sfqid)
+
+        self._setRows(dictResponse)
+
+        return True
+
+    def fetchone(self):
+
+        while self._iRow >= len(self._rows):
+            if not self._fetchBatch():
+                return None
+
+        tupRow = self._rows[self._iRow]
+        self._iRow += 1
+
+        return tupRow
+
+    def fetchmany(self, size=1):
+
+        lstRows = []
+        while len(lstRows) < size:
+            tupRow = self.fetchone()
+            if tupRow is None:
+                break
+            lstRows.append(tupRow)
+
+        return lstRows
+
+    def fetchall(self):
+
+        return list(self)
+
+    def fetch_arrow_batches(self, **kwargs):
+
+        # first table is requested here so NotSupportedError (result set not in Arrow format) is raised by this call
+        return self._iterArrow(self._fetchArrow({"op": "fetch_arrow", "start": True, "kwargs": kwargs}), False)
+
+    def fetch_pandas_batches(self, **kwargs):
+
+        return self._iterArrow(self._fetchArrow({"op": "fetch_arrow", "start": True, "pandas": True, "kwargs": kwargs}), True)
+
+    def _iterArrow(self, table, bPandas):
+
+        while table is not None:
+            yield table.to_pandas() if bPandas else table
+            table = self._fetchArrow({"op": "fetch_arrow"})
+
+    def _fetchArrow(self, dictRequest):
+
+        import pyarrow as pa
+
+        if self.connection._activeCursor is not self:
+            raise BrokerError("Result set was replaced by a later execute on the same broker connection")
+
+        dictResponse = self.connection._request(dictRequest)
+        if not dictResponse["ok"]:
+            _raiseBrokerError(dictResponse["error"], self.sfqid)
+
+        if dictResponse["arrow"] is None:
+            return None
+
+        return pa.ipc.open_stream(base64.b64decode(dictResponse["arrow"])).read_all()
+
+    def __iter__(self):
+
+        while True:
+            tupRow = self.fetchone()
+            if tupRow is None:
+                return
+            yield tupRow
+
+    def close(self):
+
+        self._rows = []
+        self._iRow = 0
+        self._bMore = False
+
+
+class BrokerConnection:
+    """ Snowflake connection borrowed from the broker. Closing it returns the session to the pool. """
+
+    def __init__(self, sock, bHit, sQueryTag=""):
+
+        self.sock = sock
+        self.rfile = sock.makefile("rb")
+        self.hit = bHit
+        # sent with every request; the broker sets it on the session when it differs
+        self.query_tag = sQueryTag
+        # attributes of the broker's session (set from the lease response)
+        self.is_pyformat = True
+        self.arrow_number_to_decimal = False
+        self._activeCursor = None
+        self._closed = False
+
+    def cursor(self):
+
+        return BrokerCursor(self)
+
+    def is_closed(self):
+
+        return self._closed
+
+    def close(self):
+
+        if not self._closed:
+            self._closed = True
+            self.rfile.close()
+            self.sock.close()
+
+    def _request(self, dictRequest):
+
+        if self._closed:
+            raise BrokerError("Broker connection is closed")
+
+        self.sock.sendall((json.dumps(dictRequest) + "\n").encode("utf-8"))
+        bLine = self.rfile.readline()
+        if not bLine:
+            raise BrokerError("Broker closed the connection")
+
+        return json.loads(bLine)
+
+
+def _connectSocket(sSocketPath):
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CLIENT_CONNECT_TIMEOUT)
+    sock.connect(sSocketPath)
+    # statements (COPY INTO) can run for a long time
+    sock.settimeout(None)
+
+    return sock
+
+
+def borrowConnection(sWarehouse=None, sSocketPath=SF_BROKER_SOCKET, sQueryTag=None, sRole=None, sDatabase=None):
+    """ Return a BrokerConnection, or None if the broker is unavailable (caller falls back to log_on).
+        sRole/sDatabase None --> role/database of the broker's logon. """
+
+    if os.getenv("SF_BROKER", "Y").upper() == "N":
+        return None
+
+    if not os.path.exists(sSocketPath):
+        return None
+
+    fStart = time.monotonic()
+
+    try:
+        sock = _connectSocket(sSocketPath)
+        # statements are tagged with the script name until the script sets its own query_tag
+        con = BrokerConnection(sock, False, os.path.basename(sys.argv[0]) if sQueryTag is None else sQueryTag)
+        dictResponse = con._request({"op": "lease", "envname": os.getenv("ENVNAME"), "role": sRole, "database": sDatabase,
+                                     "warehouse": sWarehouse or os.getenv("sf_xtr_warehouse")})
+
+    except (OSError, ValueError, BrokerError) as e:
+        print(f"SFSessionBroker unavailable ({e}). Using direct Snowflake logon.")
+        return None
+
+    if not dictResponse["ok"]:
+        print(f"SFSessionBroker could not lend a session ({dictResponse['error'].get('msg')}). Using direct Snowflake logon.")
+        con.close()
+        return None
+
+    con.hit = dictResponse.get("hit", False)
+    con.is_pyformat = dictResponse.get("is_pyformat", True)
+    con.arrow_number_to_decimal = dictResponse.get("arrow_number_to_decimal", False)
+    print(f"Borrowed Snowflake session from SFSessionBroker ({'hit' if con.hit else 'miss'}) in {time.monotonic() - fStart:.3f} secs")
+
+    return con
+
+
+def _sendAdminRequest(dictRequest, sSocketPath=SF_BROKER_SOCKET):
+
+    sock = _connectSocket(sSocketPath)
+    try:
+        sock.sendall((json.dumps(dictRequest) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as rfile:
+            return json.loads(rfile.readline())
+    finally:
+        sock.close()
+
+
+def getBrokerStats(sSocketPath=SF_BROKER_SOCKET):
+
+    return _sendAdminRequest({"op": "stats"}, sSocketPath)["stats"]
+
+
+def stopBroker(sSocketPath=SF_BROKER_SOCKET):
+
+    _sendAdminRequest({"op": "shutdown"}, sSocketPath)
+
+
+########################################################################################################
+# RUN
+########################################################################################################
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Snowflake session broker")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--start", action="store_true", help="Start broker in foreground")
+    group.add_argument("--stats", action="store_true", help="Display broker counters")
+    group.add_argument("--stop", action="store_true", help="Shutdown broker")
+    parser.add_argument("--socket", default=SF_BROKER_SOCKET, help="Unix socket path")
+
+    args = parser.parse_args()
+
+    if args.start:
+        # Sets ENVNAME, sf_xtr_warehouse and IDRC_DATALAKE_AWS_ACCT needed by snowconvert_helpers.log_on()
+        import SET_XTR_ENV
+        startBroker(args.socket)
+    elif args.stats:
+        print(json.dumps(getBrokerStats(args.socket), indent=2))
+    elif args.stop:
+        stopBroker(args.socket)
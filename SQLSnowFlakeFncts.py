@@ -10,6 +10,9 @@
 #
 # Paul Baranoski 2025-03-18 Create Module.
 # Paul Baranoski 2025-05-08 Added Insert into table function.
+# 2026-10-18                Added exportAllRows function --> write result set to a file with ResultSetExport.py
+#                           (Arrow batches; CSV, FIXED or PARQUET) instead of fetchall() into memory.
+# 2026-10-18                getConnection connects with arrow_number_to_decimal=True (NUMBER(p,s>0) --> Arrow decimal).
 ########################################################################################################
 
 import os
@@ -104,7 +107,9 @@ def getConnection():
             #warehouse=sfCredDict['SNOW_WAREHOUSE'], 
             #warehouse=SF_XTR_WAREHOUSE,
             warehouse="idrc_dev_bia_xtr_etl",
-            database=sfCredDict['SNOW_DATABASE'])        
+            database=sfCredDict['SNOW_DATABASE'],
+            # NUMBER(p,s>0) --> Arrow decimal (ResultSetExport text same as str(Decimal))
+            arrow_number_to_decimal=True)        
 
         #logger.info("Connected to Database!")
         #logger.debug(getDriverVersion(con))
@@ -174,6 +179,61 @@ def getAllRows(sqlStmt, tupParms):
             cnx.close()    
 
 
+def exportAllRows(sqlStmt, sExportFile, sFormat="CSV", sSeparator=",", bGzip=False):
+    ########################################################
+    # function parms: 
+    #   1) SQL string w/no parms
+    #   2) export file 
+    #   3) export format: CSV, FIXED or PARQUET
+    #   4) column separator (CSV)
+    #   5) gzip export file (CSV/FIXED) 
+    # Returns NOF rows exported.
+    #########################################################
+    import ResultSetExport
+
+    print("start function exportAllRows()")
+    print(f"{sqlStmt=}")
+    print(f"{sExportFile=}")
+
+    cnx = None
+    curs = None
+
+    try:
+
+        # get connection to DB
+        cnx = getConnection()
+
+        # create cursor
+        curs = cnx.cursor()
+        if curs is None:
+            raise NullCursorException() 
+        
+        # create cursor for SQL statement --> write result set to export file in chunks 
+        curs.execute(sqlStmt)
+
+        # display cursor ID
+        print(f"{curs.sfqid=}")
+        
+        # create list of column names
+        loadCursorColumnList(curs.description)
+
+        iNOFRows = ResultSetExport.exportResultSet(curs, sExportFile, sFormat, sSeparator, bGzip)
+        print(f"{iNOFRows=}")
+
+        return iNOFRows     
+
+    except Exception as e:
+        print(f"Error with Select: {sqlStmt}") 
+        print(e)
+        raise
+    
+    finally: 
+        if cnx is not None:
+            if curs is not None:
+               curs.close()
+            cnx.close()    
+
+
 def getOneRow(sqlStmt, tupParms):
     ########################################################
     # function parms: 
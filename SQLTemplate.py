@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  SQLTemplate.py
+#
+# Desc: Compiled SQL statement templates for snowconvert_helpers.execute_sql_statement variable expansion.
+#
+#       A statement is tokenized once into literal and variable ($var, ${var}, &var) segments and cached
+#       (SQL_TEMPLATE_CACHE_SIZE most recently used statements). Expansion is a join of the literals and
+#       the variable values, with the same values as snowconvert_helpers.expandvars:
+#           environment variable --> passed variable (--param-var=value) --> variable text unchanged
+#
+#       execute_sql_statement logs a statement's text once (with the template hash), and for later executions
+#       of the same statement only the hash and the parameter values.
+#
+#       SQL_TEMPLATE_BIND=Y: variables that are a whole string literal ('${var}') are passed as bind variables
+#       (qmark) instead of being expanded into the statement text, so the statement text is the same for
+#       different values and Snowflake can reuse the compiled plan. log_on opens connections with paramstyle qmark.
+#
+# Usage:
+#       import SQLTemplate
+#
+#       sqlTemplate = SQLTemplate.getSQLTemplate(sql_string)
+#       dictValues = sqlTemplate.getValues(passed_variables)
+#       sql_string = sqlTemplate.expand(dictValues)
+#
+# Modified:
+#
+# 2026-10-18 Created module.
+########################################################################################################
+import os
+import re
+import hashlib
+from functools import lru_cache
+
+
+########################################################################################################
+# CONSTANTS
+########################################################################################################
+SQL_TEMPLATE_CACHE_SIZE = 128
+
+SQL_TEMPLATE_BIND = os.getenv("SQL_TEMPLATE_BIND", "N").upper() == "Y"
+
+BIND_MARKER = "?"
+
+# same as snowconvert_helpers.expandvars
+reVar = re.compile(r'(\$|\&)(\w+|\{([^}]*)\})')
+
+
+class SQLTemplate:
+
+    def __init__(self, sSQL):
+
+        self.sSQL = sSQL
+        self.sHash = hashlib.sha1(sSQL.encode("utf-8")).hexdigest()[:12]
+
+        # statement text logged by execute_sql_statement
+        self.bLogged = False
+
+        ######################################################
+        # sSQL = lstLiterals[0] + var[0] + lstLiterals[1] + ...
+        # lstVars: (variable text, variable name, bBindable)
+        ######################################################
+        self.lstLiterals = []
+        self.lstVars = []
+
+        iPos = 0
+        for mVar in reVar.finditer(sSQL):
+            self.lstLiterals.append(sSQL[iPos:mVar.start()])
+            self.lstVars.append((mVar.group(0), mVar.group(3) or mVar.group(2), self.isStringLiteral(sSQL, mVar.start(), mVar.end())))
+            iPos = mVar.end()
+
+        self.lstLiterals.append(sSQL[iPos:])
+
+    @staticmethod
+    def isStringLiteral(sSQL, iStart, iEnd):
+
+        # '${var}' --> opening quote (even NOF quotes before it) and closing quote
+        return (iStart > 0 and sSQL[iStart - 1] == "'" and sSQL[iEnd:iEnd + 1] == "'"
+                and sSQL.count("'", 0, iStart - 1) % 2 == 0)
+
+    def hasVars(self):
+
+        return len(self.lstVars) > 0
+
+    def hasBindVars(self):
+
+        return any(bBindable for sVarText, sVarName, bBindable in self.lstVars)
+
+    def getValues(self, dictParams):
+
+        ######################################################
+        # variable name --> value (same as expandvars)
+        # None --> no value (variable text unchanged)
+        ######################################################
+        dictValues = {}
+
+        for sVarText, sVarName, bBindable in self.lstVars:
+            if sVarName not in dictValues:
+                sPassValue = dictParams.get(sVarName, None)
+                dictValues[sVarName] = os.getenv(sVarName, sPassValue)
+
+        return dictValues
+
+    def getResolvedValues(self, dictValues):
+
+        # variables with a value (for the log)
+        return {sVarName: sValue for sVarName, sValue in dictValues.items() if sValue is not None}
+
+    @staticmethod
+    def getValueText(sVarText, sValue):
+
+        return sVarText if sValue is None else str(sValue)
+
+    def expand(self, dictValues):
+
+        if not self.lstVars:
+            return self.sSQL
+
+        lstParts = [None] * (len(self.lstLiterals) + len(self.lstVars))
+        lstParts[::2] = self.lstLiterals
+        lstParts[1::2] = [self.getValueText(sVarText, dictValues[sVarName]) for sVarText, sVarName, bBindable in self.lstVars]
+
+        return "".join(lstParts)
+
+    def getBindSQL(self, dictValues):
+
+        ######################################################
+        # '${var}' --> ? and its value in the bind values
+        # Returns (SQL, bind values)
+        ######################################################
+        lstParts = [self.lstLiterals[0]]
+        lstBindValues = []
+
+        for (sVarText, sVarName, bBindable), sLiteral in zip(self.lstVars, self.lstLiterals[1:]):
+            if bBindable:
+                lstParts[-1] = lstParts[-1][:-1]
+                lstParts.append(BIND_MARKER)
+                lstParts.append(sLiteral[1:])
+                lstBindValues.append(self.getValueText(sVarText, dictValues[sVarName]))
+            else:
+                lstParts.append(self.getValueText(sVarText, dictValues[sVarName]))
+                lstParts.append(sLiteral)
+
+        return "".join(lstParts), lstBindValues
+
+
+@lru_cache(maxsize=SQL_TEMPLATE_CACHE_SIZE)
+def getSQLTemplate(sSQL):
+
+    return SQLTemplate(sSQL)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  SQLTemplateBenchmark.py
+#
+# Desc: Benchmark execute_sql_statement variable expansion and statement logging for an INSERT statement with
+#       hundreds of RPAD/LPAD expressions (like SAF_ENC_INP_SNF_Extract.py) executed --nof_execs times
+#       with different parameter values (like a finder-driven driver):
+#         1) prior: snowconvert_helpers.expandvars (regex over the statement) + statement logged
+#            twice per execution ("Executing:" and "Expanded string:")
+#         2) SQLTemplate: cached template expansion (join) + statement logged once, then hash and parameter values
+#
+#       Checks that SQLTemplate expansion is identical to expandvars for random statements/parameters,
+#       and that getBindSQL only replaces '${var}' string literals.
+#
+# Ex.   python3 SQLTemplateBenchmark.py --nof_exprs 300 --nof_execs 500
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+########################################################################################################
+import io
+import os
+import sys
+import time
+import random
+import argparse
+
+import SQLTemplate
+from snowconvert_helpers import expandvars
+
+
+def createStatement(iNOFExprs):
+
+    lstExprs = []
+    for iExpr in range(iNOFExprs):
+        sCol = f"CLM_LINE_FLD_{iExpr:03}"
+        lstExprs.append(random.choice([f"RPAD(COALESCE(TRIM(L.{sCol}),''),{random.randint(1, 20)},' ') AS {sCol}",
+                                       f"LPAD(COALESCE(TO_CHAR(L.{sCol}),'0'),{random.randint(1, 20)},'0') AS {sCol}"]))
+
+    return f"""INSERT INTO BIA_${{ENVNAME}}.CMS_TARGET_XTR_${{ENVNAME}}.SAF_ENC_INP_XTR_${{sfx_num}}
+SELECT {', '.join(lstExprs)}, '${{TMSTMP}}' AS EXTRACT_TS
+      FROM IDRC_${{ENVNAME}}.CMS_FCT_CLM_${{ENVNAME}}.CLM C
+      JOIN IDRC_${{ENVNAME}}.CMS_FCT_CLM_${{ENVNAME}}.CLM_LINE L ON L.GEO_BENE_SK = C.GEO_BENE_SK AND L.CLM_DT_SGNTR_SK = C.CLM_DT_SGNTR_SK
+      WHERE C.CLM_THRU_DT BETWEEN '${{FROM_DT}}' AND '${{THRU_DT}}' AND C.CLM_TYPE_CD IN (&CLM_TYPE_CDS) AND L.$1 <> ''"""
+
+
+def createRandomStatement():
+
+    lstParts = []
+    for iPart in range(random.randint(0, 12)):
+        lstParts.append(random.choice(["SELECT ", "'", "''", " $", "&", "${", "}", "$1", "&&", "x", "${VAR_A}", "$VAR_B",
+                                       "&VAR_C", "'${VAR_D}'", "${}", "${ENVNAME}", "'$VAR_A'", "\\$VAR_B", " WHERE "]))
+
+    return "".join(lstParts)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="SQLTemplate benchmark")
+    parser.add_argument("--nof_exprs", type=int, default=300, help="NOF RPAD/LPAD expressions in the statement")
+    parser.add_argument("--nof_execs", type=int, default=500, help="NOF executions of the statement")
+    parser.add_argument("--seed", type=int, default=2026, help="random seed")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    #############################################################
+    # SQLTemplate expansion is identical to expandvars
+    #############################################################
+    os.environ["VAR_A"] = "env_a"
+    os.environ.pop("VAR_B", None)
+    dictParams = {"VAR_B": "param_b", "VAR_D": "2026-01-01", "VAR_A": "param_a"}
+
+    for iStmt in range(20000):
+        sSQL = createRandomStatement()
+        sqlTemplate = SQLTemplate.getSQLTemplate(sSQL)
+        if sqlTemplate.expand(sqlTemplate.getValues(dictParams)) != expandvars(sSQL, dictParams):
+            print(f"SQLTemplate expansion is not identical to expandvars: {sSQL!r}")
+            sys.exit(12)
+
+    sSQL, lstBindValues = SQLTemplate.SQLTemplate("A = '${VAR_D}' AND B = 'x${VAR_D}' AND C = ${VAR_D} AND D = ''${VAR_D}''").getBindSQL({"VAR_D": "2026-01-01"})
+    if (sSQL, lstBindValues) != ("A = ? AND B = 'x2026-01-01' AND C = 2026-01-01 AND D = ''2026-01-01''", ["2026-01-01"]):
+        print(f"getBindSQL did not replace only '${{var}}' string literals: {sSQL!r} {lstBindValues}")
+        sys.exit(12)
+
+    #############################################################
+    # Expansion + logging for nof_execs executions
+    #############################################################
+    sStatement = createStatement(args.nof_exprs)
+    lstParams = [{"ENVNAME": "PRD", "sfx_num": f"{iExec:04}", "TMSTMP": "20261018.120000", "FROM_DT": f"2025-{iExec % 12 + 1:02}-01",
+                  "THRU_DT": f"2025-{iExec % 12 + 1:02}-28", "CLM_TYPE_CDS": "60,61"} for iExec in range(args.nof_execs)]
+
+    print(f"statement: {len(sStatement)} bytes, {args.nof_execs} executions")
+    print(f"{'expansion + log':>22} {'secs':>10} {'log MB':>10}")
+
+    logPrior = io.StringIO()
+    fStart = time.monotonic()
+    for dictExecParams in lstParams:
+        print("Executing: {0}.".format(sStatement), file=logPrior)
+        print("Expanding variables in SQL statement", file=logPrior)
+        sExpanded = expandvars(sStatement, dictExecParams)
+        print("Expanded string: {0}".format(sExpanded), file=logPrior)
+    print(f"{'prior (expandvars)':>22} {time.monotonic() - fStart:>10.3f} {len(logPrior.getvalue()) / 1024 / 1024:>10.1f}")
+
+    # log as execute_sql_statement does (statement is not COPY INTO @stage --> text logged once)
+    logTemplate = io.StringIO()
+    fStart = time.monotonic()
+    for dictExecParams in lstParams:
+        sqlTemplate = SQLTemplate.getSQLTemplate(sStatement)
+        dictValues = sqlTemplate.getValues(dictExecParams)
+        sExpandedTemplate = sqlTemplate.expand(dictValues)
+        if not sqlTemplate.bLogged:
+            print("Executing: {0}.".format(sExpandedTemplate), file=logTemplate)
+            print(f"SQL template: {sqlTemplate.sHash}", file=logTemplate)
+            sqlTemplate.bLogged = True
+        else:
+            print(f"Executing: SQL template {sqlTemplate.sHash} (statement logged above).", file=logTemplate)
+        print(f"Parameters: {sqlTemplate.getResolvedValues(dictValues)}", file=logTemplate)
+    print(f"{'SQLTemplate':>22} {time.monotonic() - fStart:>10.3f} {len(logTemplate.getvalue()) / 1024 / 1024:>10.1f}")
+
+    if sExpandedTemplate != sExpanded:
+        print("SQLTemplate expansion of the statement is not identical to expandvars")
+        sys.exit(12)
+
+
+if __name__ == "__main__":
+
+    main()
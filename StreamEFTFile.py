@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+######################################################################################
+# Name: StreamEFTFile.py
+#
+# Desc: Single-pass streaming EFT transformer used by ProcessFiles2EFT.py.
+#
+#       S3 .gz extract file --> ranged GETs (prefetched) --> incremental gunzip (multi-member)
+#                           --> cleanse multi-byte characters --> count bytes/chars/lines
+#                           --> multipart upload to S3 EFT folder
+#
+#       Replaces download to DATADIR, unzipFile, "sed -i" cleanse, and wc_cm_largefile, which were
+#       four passes over the file on linux plus the disk space for the .gz and the unzipped file.
+#
+#       Cleanse is byte-identical to:  LC_ALL=C sed 's/[\x80-\xff][\x80-\xff]/ /g'
+#       (each pair of bytes >= x'80' in a run is replaced by one space; an odd trailing byte is left as-is).
+#       A run of high bytes split across chunks is handled by carrying an unpaired trailing byte to the next chunk.
+#
+# NOTE: To use the functions in this module, after establishing the Logger in your python module include:
+#
+#        setStreamEFTLogger(rootLogger)
+#
+#       Benchmark/verify (no S3 needed):
+#
+#        python3 StreamEFTFile.py --benchmark /app/IDRC/XTR/CMS/data/blbtn_clm_ext_20260101.120000.txt.gz
+#
+# Modified:
+#
+# 2026-10-18 Created Module.
+######################################################################################
+import os
+import sys
+import re
+import time
+import zlib
+import codecs
+import logging
+import argparse
+import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+########################################################################################################
+# CONSTANTS
+########################################################################################################
+# size of each ranged GET
+S3_RANGE_SIZE = 8 * 1024 * 1024
+# NOF ranged GETs to prefetch
+S3_PREFETCH = 4
+# max size of each decompressed chunk
+GUNZIP_CHUNK_SIZE = 4 * 1024 * 1024
+# multipart upload part size (S3 minimum is 5 MB except last part)
+UPLOAD_PART_SIZE = 16 * 1024 * 1024
+# NOF part uploads in progress at one time
+UPLOAD_MAX_IN_FLIGHT = 4
+
+# approximate peak memory of one streamEFTFile call: prefetched ranges + gunzip chunks + parts (in-flight, queued, buffered)
+STREAM_MEMORY_BYTES = (S3_PREFETCH + 1) * S3_RANGE_SIZE + 2 * GUNZIP_CHUNK_SIZE + (UPLOAD_MAX_IN_FLIGHT + 2) * UPLOAD_PART_SIZE
+
+reMULTI_BYTE_PAIR = re.compile(rb"[\x80-\xff][\x80-\xff]")
+reTRAILING_HIGH_BYTES = re.compile(rb"[\x80-\xff]+\Z")
+
+rootLogger = logging.getLogger(__name__)
+
+
+#############################################################
+# Functions
+#############################################################
+def setStreamEFTLogger(pRootLogger):
+
+    # Pass the logger once instead of for each function
+    global rootLogger
+    rootLogger = pRootLogger
+
+
+#############################################################
+# Classes
+#############################################################
+class CleanseCounter:
+    """ Applies sed 's/[\\x80-\\xff][\\x80-\\xff]/ /g' to a byte stream and counts bytes, chars and lines of the output. """
+
+    def __init__(self):
+
+        self.byte_count = 0
+        self.char_count = 0
+        self.line_count = 0
+        self._carry = b""
+        # same char count as wc_cm_largefile: decode("utf-8", errors="ignore")
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+    def _count(self, chunk, bFinal=False):
+
+        self.byte_count += len(chunk)
+        self.line_count += chunk.count(b"\n")
+
+        if chunk and chunk.isascii():
+            # ASCII byte ends any pending partial UTF-8 sequence (ignored) --> chars = bytes
+            self._decoder.reset()
+            self.char_count += len(chunk)
+        else:
+            self.char_count += len(self._decoder.decode(chunk, bFinal))
+
+        return chunk
+
+    def process(self, chunk):
+
+        chunk = self._carry + chunk
+        self._carry = b""
+
+        if chunk.isascii():
+            return self._count(chunk)
+
+        ##################################################################
+        # Trailing run of high bytes with odd length --> last byte may pair
+        # with first byte of next chunk. Carry it over.
+        ##################################################################
+        objMatch = reTRAILING_HIGH_BYTES.search(chunk)
+        if objMatch and (objMatch.end() - objMatch.start()) % 2 == 1:
+            self._carry = chunk[-1:]
+            chunk = chunk[:-1]
+
+        return self._count(reMULTI_BYTE_PAIR.sub(b" ", chunk))
+
+    def finish(self):
+
+        chunk = self._carry
+        self._carry = b""
+
+        return self._count(chunk, bFinal=True)
+
+
+class S3MultipartSink:
+    """ Buffers output into UPLOAD_PART_SIZE parts and uploads them concurrently (bounded in-flight). """
+
+    def __init__(self, s3_client, sBucket, sKey, sContentType="application/octet-stream", iPartSize=UPLOAD_PART_SIZE, iMaxInFlight=UPLOAD_MAX_IN_FLIGHT):
+
+        self.s3_client = s3_client
+        self.sBucket = sBucket
+        self.sKey = sKey
+        self.sContentType = sContentType
+        self.iPartSize = iPartSize
+
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._iPartNum = 0
+        self._lstFutures = []
+        self._semInFlight = threading.BoundedSemaphore(iMaxInFlight)
+        self._pool = ThreadPoolExecutor(max_workers=iMaxInFlight)
+
+    def write(self, chunk):
+
+        self._buffer.extend(chunk)
+
+        while len(self._buffer) >= self.iPartSize:
+            bytPart = bytes(self._buffer[:self.iPartSize])
+            del self._buffer[:self.iPartSize]
+            self._submitPart(bytPart)
+
+    def _uploadPart(self, iPartNum, bytPart):
+
+        try:
+            resp = self.s3_client.upload_part(Bucket=self.sBucket, Key=self.sKey, PartNumber=iPartNum, UploadId=self._upload_id, Body=bytPart)
+            return {"ETag": resp["ETag"], "PartNumber": iPartNum}
+        finally:
+            self._semInFlight.release()
+
+    def _submitPart(self, bytPart):
+
+        if self._upload_id is None:
+            resp = self.s3_client.create_multipart_upload(Bucket=self.sBucket, Key=self.sKey, ContentType=self.sContentType)
+            self._upload_id = resp["UploadId"]
+
+        # wait for a free upload slot (bounds memory to max in-flight parts)
+        self._semInFlight.acquire()
+
+        self._iPartNum += 1
+        self._lstFutures.append(self._pool.submit(self._uploadPart, self._iPartNum, bytPart))
+
+    def complete(self):
+
+        try:
+            # small file --> single put
+            if self._upload_id is None:
+                self.s3_client.put_object(Bucket=self.sBucket, Key=self.sKey, Body=bytes(self._buffer), ContentType=self.sContentType)
+                return
+
+            if len(self._buffer) > 0:
+                self._submitPart(bytes(self._buffer))
+                self._buffer = bytearray()
+
+            lstParts = [future.result() for future in self._lstFutures]
+            self.s3_client.complete_multipart_upload(Bucket=self.sBucket, Key=self.sKey, UploadId=self._upload_id, MultipartUpload={"Parts": lstParts})
+
+        finally:
+            self._pool.shutdown(wait=True)
+
+    def abort(self):
+
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+        if self._upload_id is not None:
+            self.s3_client.abort_multipart_upload(Bucket=self.sBucket, Key=self.sKey, UploadId=self._upload_id)
+            rootLogger.info(f"Aborted multipart upload of {self.sKey}")
+
+
+#############################################################
+# Stream stages
+#############################################################
+def iterS3Ranges(s3_client, sBucket, sKey, iRangeSize=S3_RANGE_SIZE, iPrefetch=S3_PREFETCH):
+    """ Yields object bytes in order using ranged GETs; the next iPrefetch ranges are fetched in the background. """
+
+    iSize = s3_client.head_object(Bucket=sBucket, Key=sKey)["ContentLength"]
+
+    def getRange(iStart):
+        iEnd = min(iStart + iRangeSize, iSize) - 1
+        return s3_client.get_object(Bucket=sBucket, Key=sKey, Range=f"bytes={iStart}-{iEnd}")["Body"].read()
+
+    lstStarts = list(range(0, iSize, iRangeSize))
+
+    with ThreadPoolExecutor(max_workers=iPrefetch) as pool:
+        lstPending = [pool.submit(getRange, iStart) for iStart in lstStarts[:iPrefetch]]
+        iNext = len(lstPending)
+
+        while lstPending:
+            bytData = lstPending.pop(0).result()
+
+            if iNext < len(lstStarts):
+                lstPending.append(pool.submit(getRange, lstStarts[iNext]))
+                iNext += 1
+
+            yield bytData
+
+
+def iterFileChunks(sPathNFilename, iChunkSize=S3_RANGE_SIZE):
+    """ Yields bytes of a local file (used by benchmark). """
+
+    with open(sPathNFilename, "rb") as f:
+        while chunk := f.read(iChunkSize):
+            yield chunk
+
+
+def iterGunzip(iterCompressed, iChunkSize=GUNZIP_CHUNK_SIZE):
+    """ Incrementally decompresses gzip data. Handles concatenated gzip members (combined S3 parts files). """
+
+    decompressor = zlib.decompressobj(wbits=31)
+    bMemberStarted = False
+
+    for bytData in iterCompressed:
+
+        while bytData:
+            bMemberStarted = True
+            chunk = decompressor.decompress(bytData, iChunkSize)
+            if chunk:
+                yield chunk
+
+            if decompressor.eof:
+                # next gzip member (if any)
+                bytData = decompressor.unused_data
+                decompressor = zlib.decompressobj(wbits=31)
+                bMemberStarted = False
+            else:
+                bytData = decompressor.unconsumed_tail
+
+    if bMemberStarted:
+        chunk = decompressor.flush()
+        if not decompressor.eof:
+            raise Exception("Compressed file is truncated. End of gzip stream not found.")
+        if chunk:
+            yield chunk
+
+
+def transformStream(iterCompressed, funcWrite=None):
+    """ gunzip + cleanse + count. Output chunks are passed to funcWrite. Returns CleanseCounter with counts. """
+
+    counter = CleanseCounter()
+
+    for chunk in iterGunzip(iterCompressed):
+        chunk = counter.process(chunk)
+        if funcWrite is not None and chunk:
+            funcWrite(chunk)
+
+    chunk = counter.finish()
+    if funcWrite is not None and chunk:
+        funcWrite(chunk)
+
+    return counter
+
+
+def streamEFTFile(s3_client, sBucket, sSourceKey, sDestKey=None, sContentTypeFilename=None):
+    """
+    Streams S3 .gz file sSourceKey through gunzip/cleanse/count and uploads the result to sDestKey.
+    When sDestKey is None the file is only cleansed and counted (nothing is uploaded).
+
+    The upload is only completed when byte_count == char_count (no multi-byte characters remain);
+    otherwise it is aborted.
+
+    Returns: (byte_count, char_count, line_count)
+    """
+    fStart = time.monotonic()
+
+    rootLogger.info(f"Stream {sSourceKey} --> {sDestKey if sDestKey else '(count only)'}")
+
+    sink = None
+    if sDestKey is not None:
+        sContentType = mimetypes.guess_type(sContentTypeFilename or sDestKey)[0] or "application/octet-stream"
+        sink = S3MultipartSink(s3_client, sBucket, sDestKey, sContentType)
+
+    try:
+        counter = transformStream(iterS3Ranges(s3_client, sBucket, sSourceKey), sink.write if sink else None)
+
+        if sink is not None:
+            if counter.byte_count == counter.char_count:
+                sink.complete()
+            else:
+                sink.abort()
+
+    except Exception:
+        if sink is not None:
+            sink.abort()
+        raise
+
+    fElapsed = max(time.monotonic() - fStart, 0.000001)
+    rootLogger.info(f"{sSourceKey}: byte_count={counter.byte_count} char_count={counter.char_count} line_count={counter.line_count} "
+                    f"in {fElapsed:.2f} secs ({counter.byte_count / fElapsed / 1024 / 1024:.1f} MB/sec)")
+
+    return counter.byte_count, counter.char_count, counter.line_count
+
+
+#############################################################
+# Benchmark
+#############################################################
+def benchmark(sGzPathNFilename):
+    """ Compares streaming transform with gunzip + sed + wc_cm passes on a local .gz file; verifies byte-identical output. """
+
+    import gzip
+    import shutil
+    import hashlib
+    import subprocess
+    import tempfile
+
+    ##################################################
+    # Streaming transform
+    ##################################################
+    md5Stream = hashlib.md5()
+
+    fStart = time.monotonic()
+    counter = transformStream(iterFileChunks(sGzPathNFilename), md5Stream.update)
+    fStreamSecs = time.monotonic() - fStart
+
+    print(f"Streaming : {counter.byte_count} bytes {counter.line_count} lines in {fStreamSecs:.2f} secs "
+          f"({counter.byte_count / max(fStreamSecs, 0.000001) / 1024 / 1024:.1f} MB/sec)")
+
+    ##################################################
+    # Previous passes: gunzip file, sed -i, wc_cm
+    ##################################################
+    with tempfile.TemporaryDirectory() as sTmpDir:
+        sTxtFile = os.path.join(sTmpDir, "bench.txt")
+
+        fStart = time.monotonic()
+        with gzip.open(sGzPathNFilename, "rb") as f_in, open(sTxtFile, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+
+        # NOTE: pattern is passed as bytes so sed receives bytes x'80'-x'ff' (a str pattern is UTF-8 encoded by subprocess)
+        subprocess.run(["sed", "-i", b"s/[\x80-\xff][\x80-\xff]/ /g", sTxtFile], env={"LC_ALL": "C"}, check=True)
+
+        byte_count = 0
+        char_count = 0
+        md5Sed = hashlib.md5()
+        with open(sTxtFile, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                byte_count += len(chunk)
+                char_count += len(chunk.decode("utf-8", errors="ignore"))
+                md5Sed.update(chunk)
+        fPassesSecs = time.monotonic() - fStart
+
+    print(f"File passes: {byte_count} bytes in {fPassesSecs:.2f} secs ({byte_count / max(fPassesSecs, 0.000001) / 1024 / 1024:.1f} MB/sec)")
+    print(f"Byte-identical to sed output: {md5Stream.hexdigest() == md5Sed.hexdigest()}")
+    print(f"Counts: stream {counter.byte_count=} {counter.char_count=}   passes {byte_count=} {char_count=}")
+
+    return md5Stream.hexdigest() == md5Sed.hexdigest()
+
+
+if __name__ == "__main__":
+
+    logging.basicConfig(format='%(levelname)s %(asctime)s => %(message)s', level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Streaming EFT transformer")
+    parser.add_argument("--benchmark", help="local .gz file to benchmark and verify against sed")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if benchmark(args.benchmark) else 12)
+
+    parser.print_help()
@@ -16,10 +16,11 @@
 #			                CLM_LINE_GRS_BLW_THRSHLD_AMT,CLM_LINE_GRS_ABOVE_THRSHLD_AMT,CLM_LINE_LIS_AMT,
 #			                CLM_LINE_PLRO_AMT,CLM_LINE_NCVRD_PD_AMT
 # Paul Baranoski 01/21/2025 Add {ENVNAME} back for all Database references. Remove filters added for Dev testing.
+# 2026-10-18 Extract SQL runs in run(con, dictParams) (called in-process by ExtractRunner with an injected
+#            connection). Stand-alone run logs on in the __main__ block.
 ########################################################################################################
 import os
 import sys
-import datetime
 from datetime import datetime
 
 currentDirectory = os.path.dirname(os.path.realpath(__file__))
@@ -30,44 +31,28 @@ sys.path.append(rootDirectory)
 sys.path.append(utilDirectory)
 script_name = os.path.basename(__file__)
 
-import snowconvert_helpers
-from snowconvert_helpers import Export
+import ExtractRunner as ExtRunner
+
 
 ########################################################################################################
-# VARIABLE ASSIGNMENT
+# Method to execute the extract SQL using Timestamp 
 ########################################################################################################
-con = None 
-now = datetime.now()
-date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
-
-TMSTMP=os.getenv('TMSTMP')
-ENVNAME=os.getenv('ENVNAME')
-WKLY_STRT_DT=os.getenv('wkly_strt_dt')
-WKLY_END_DT=os.getenv('wkly_end_dt')
+def run(con, dictParams):
 
-# boolean - Python Exception status
-bPythonExceptionOccurred=False
+   TMSTMP=dictParams.get('TMSTMP')
+   ENVNAME=dictParams.get('ENVNAME')
+   WKLY_STRT_DT=dictParams.get('wkly_strt_dt')
+   WKLY_END_DT=dictParams.get('wkly_end_dt')
 
-########################################################################################################
-# RUN
-########################################################################################################
-print('')
-print("Run date and time: " + date_time  )
-print('')
+   lstRecords = []
 
-########################################################################################################
-# Method to execute the extract SQL using Timestamp 
-########################################################################################################
-try:
-   snowconvert_helpers.configure_log()
-   con = snowconvert_helpers.log_on()   
-   snowconvert_helpers.execute_sql_statement(f"alter session set query_tag='{script_name}'",con,exit_on_error = True)
-   snowconvert_helpers.execute_sql_statement("""USE WAREHOUSE ${sf_xtr_warehouse}  """, con,exit_on_error = True)
+   ExtRunner.execute_sql(con, f"alter session set query_tag='{script_name}'", sScript=script_name)
+   ExtRunner.execute_sql(con, f"USE WAREHOUSE {dictParams.get('sf_xtr_warehouse')}", sScript=script_name)
    
    #**************************************
    #   Extract Part D claim data  
    #**************************************   
-   snowconvert_helpers.execute_sql_statement(f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_BLBTN_STG/blbtn_clm_ext_{TMSTMP}.txt.gz
+   lstRecords.append(ExtRunner.execute_sql(con, f"""COPY INTO @BIA_{ENVNAME}.CMS_STAGE_XTR_{ENVNAME}.BIA_{ENVNAME}_XTR_BLBTN_STG/blbtn_clm_ext_{TMSTMP}.txt.gz
                                                 FROM (
 
             WITH BLBTN_DTL_INFO as (
@@ -359,27 +344,52 @@ try:
 
                         ) 
                         FILE_FORMAT = (TYPE=CSV field_delimiter=none ESCAPE_UNENCLOSED_FIELD=NONE FIELD_OPTIONALLY_ENCLOSED_BY=none )
-                        max_file_size=5368709120  """, con, exit_on_error=True)
+                        max_file_size=5368709120  """, sScript=script_name))
+
+   return lstRecords
+
 
+########################################################################################################
+# RUN (stand-alone)
+########################################################################################################
+if __name__ == "__main__":
+
+   import snowconvert_helpers
+
+   con = None 
+   now = datetime.now()
+   date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
+
+   # boolean - Python Exception status
+   bPythonExceptionOccurred=False
 
+   print('')
+   print("Run date and time: " + date_time  )
+   print('')
+
+   try:
+      snowconvert_helpers.configure_log()
+      con = snowconvert_helpers.log_on()   
+
+      run(con, dict(os.environ))
    
-   #**************************************
-   # End Application
-   #**************************************    
-   snowconvert_helpers.quit_application()
+      #**************************************
+      # End Application
+      #**************************************    
+      snowconvert_helpers.quit_application()
    
-except Exception as e:
-   print(e)
+   except Exception as e:
+      print(e)
    
-   # Let shell script know that python code failed.
-   bPythonExceptionOccurred=True   
+      # Let shell script know that python code failed.
+      bPythonExceptionOccurred=True   
    
-finally:
-   if con is not None:
-      con.close()
-
-   # Let shell script know that python code failed.      
-   if bPythonExceptionOccurred == True:
-      sys.exit(12) 
-   else:   
-      snowconvert_helpers.quit_application()
+   finally:
+      if con is not None:
+         con.close()
+
+      # Let shell script know that python code failed.      
+      if bPythonExceptionOccurred == True:
+         sys.exit(12) 
+      else:   
+         snowconvert_helpers.quit_application()
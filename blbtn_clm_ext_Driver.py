@@ -18,6 +18,9 @@
 #                             Add write_sp_info_2_log function and companion logging import module LoggerStandard.
 # Paul Baranoski   2025-10-20 Subprocess.run was missing "capture_output=True, text=True, check=True" function parameters which prevented email from being captured
 #                             into log file. 
+# 2026-10-18                  Run blbtn_clm_ext.py, combine, success email and EFT steps in-process using ExtractRunner. Log per-stage timings.
+# 2026-10-18                  ExtractRunner calls run(con, dictParams) of blbtn_clm_ext.py in-process with an injected
+#                             Snowflake connection; connection is closed at the end of processing.
 ########################################################################################################
 
 import boto3 
@@ -43,6 +46,9 @@ from FilenameCounts import getExtractFilenamesAndCounts
 # Our include members
 import LoggerStandard as EnigmaLog
 
+# runs extract, combine, email and EFT steps in this process
+import ExtractRunner as ExtRunner
+
 BLBTN_BUCKET = rf"{XTR_BUCKET}/{BLBTN_BUCKET_FLDR}"
 
 
@@ -146,6 +152,9 @@ def main_processing_loop():
         rootLogger = EnigmaLog.setLogging(LOGNAME)
         rootLogger.info(f"\nblbtn_clm_ext_Driver.py started at {TMSTMP}")
 
+        # Establish logger with ExtractRunner module.
+        ExtRunner.setRunnerLogger(rootLogger)
+
         ###########################################################
         # Set current working directory to scripts/run directory.
         # This is so subprocess calls will work from RunDeck  
@@ -214,14 +223,13 @@ def main_processing_loop():
         rootLogger.info("")
         rootLogger.info("Start execution of blbtn_clm_ext.py program")
 
-        try:
-            sp_info = subprocess.run(['python3', 'blbtn_clm_ext.py'], capture_output=True, text=True, check=True)
-            write_sp_info_2_log(sp_info) 
-            
-        except subprocess.CalledProcessError as e:
-            rootLogger.error(f"Calling blbtn_clm_ext.py failed with return code {e.returncode}")
-            rootLogger.error(e.output)
-            
+        extResult = ExtRunner.run_extract("blbtn_clm_ext")
+        rootLogger.info(f"{extResult.returncode=}")
+
+        if extResult.returncode != 0:
+            rootLogger.error(f"Calling blbtn_clm_ext.py failed with return code {extResult.returncode}")
+            rootLogger.error("\n%s", extResult.output)
+
             ## Send Failure email	
             SUBJECT=f"Weekly Blue Button Extract - Failed ({ENVNAME})"
             MSG=f"The weekly Blue Button extract has failed. "
@@ -252,13 +260,11 @@ def main_processing_loop():
         rootLogger.info(f"{sConcatFilename=}")
 
         try:
-            sp_info = subprocess.run(['bash', 'CombineS3Files.sh', BLBTN_BUCKET, sConcatFilename ], capture_output=True, text=True, check=True)
-            write_sp_info_2_log(sp_info) 
-            
-        except subprocess.CalledProcessError as e:
-            rootLogger.error(f"Calling CombineS3Files.sh failed with return code {e.returncode}")
-            rootLogger.error(e.output)
-            
+            ExtRunner.combine_files(BLBTN_BUCKET, sConcatFilename)
+
+        except Exception as e:
+            rootLogger.error(f"Calling CombineS3FilesDriver.py failed with error: {e}")
+
             ## Send Failure email	
             SUBJECT=f"Combining S3 files inblbtn_clm_ext_Driver.py - Failed ({ENVNAME})"
             MSG=f"Combining S3 files inblbtn_clm_ext_Driver.py has failed."
@@ -290,12 +296,10 @@ def main_processing_loop():
         MSG=f"The Weekly Blue Button claim extract has completed for processing date range {wkly_strt_dt} thru {wkly_end_dt} .\n\nThe following file(s) were created:\n\n{S3Files}"
         
         try:
-            sp_info = subprocess.run(['python3', 'sendEmail.py', CMS_EMAIL_SENDER, BLBTN_EMAIL_SUCCESS_RECIPIENT, SUBJECT, MSG], capture_output=True, text=True, check=True)
-            write_sp_info_2_log(sp_info)
-            
-        except subprocess.CalledProcessError as e:
-            rootLogger.error(f"sendEmail.py failed with return code {e.returncode}")
-            rootLogger.error(e.output)
+            ExtRunner.send_notification(CMS_EMAIL_SENDER, BLBTN_EMAIL_SUCCESS_RECIPIENT, SUBJECT, MSG)
+
+        except Exception as e:
+            rootLogger.error(f"sendEmail failed with error: {e}")
 
             sys.exit(12)    
 
@@ -307,13 +311,11 @@ def main_processing_loop():
         rootLogger.info("EFT Blue Button Claim Extract File ")
         
         try:
-            sp_info = subprocess.run(['bash', 'ProcessFiles2EFT.sh', BLBTN_BUCKET ], capture_output=True, text=True, check=True)
-            write_sp_info_2_log(sp_info) 
-            
-        except subprocess.CalledProcessError as e:
-            rootLogger.error(f"Calling ProcessFiles2EFT.sh failed with return code {e.returncode}")
-            rootLogger.error(e.output)
-            
+            ExtRunner.process_files_2_eft(BLBTN_BUCKET)
+
+        except Exception as e:
+            rootLogger.error(f"Calling ProcessFiles2EFT.py failed with error: {e}")
+
             ## Send Failure email	
             SUBJECT = f"Blue Button Claim Extract EFT process  - Failed ({ENVNAME})"
             MSG= f"Blue Button Claim Extract EFT process has failed."
@@ -328,6 +330,9 @@ def main_processing_loop():
         # End of Processing
         # NOTE: the \n before "Ended at" line is to ensure that this information is on a separate line, left-justified without any other logging info preceding it.        
         ####################################################################          
+        rootLogger.info(ExtRunner.timing_report())
+        ExtRunner.close_connection()
+
         # Need these messages for Dashboard
         rootLogger.info("Script blbtn_clm_ext_Driver.py completed successfully.")
         rootLogger.info(f"\nEnded at {TMSTMP}" )
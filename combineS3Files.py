@@ -45,6 +45,19 @@ Modifications to combineS3Files.py:
                           Need to maintain ability to be a called module from CombineS3Files.sh. 
                           Make changes to logging so log messages are written to stdout/stder when module is called as a subprocess,
                           and write log messgaes to CombineLogger parent when used as an imported module.  
+2026-10-18 Rewrite multipart concatenation engine:
+           1) List objects with list_objects_v2 paginator (truncated listings kept the full prefix).
+           2) Part copies/uploads run in a thread pool (max_in_flight) with part numbers assigned in file order.
+           3) Small parts are coalesced in file order into >= MIN_S3_SIZE upload parts (bounded memory per worker)
+              instead of one in-memory last part. A small run followed by a large part borrows the head of the 
+              large part (ranged GET) and copies the rest server-side (CopySourceRange).
+           4) An interrupted multipart upload for the same output file is resumed using ListParts.
+           5) Log parts/sec for each concatenation.
+2026-10-18 Resume only an upload of the same plan: each upload gets a plan fingerprint (output key, MIN_S3_SIZE and
+           the source objects' keys, sizes and ETags) as part RESUME_MARKER_PART_NUM, which is left out of the
+           completed file. An open upload of the same key for another plan (ex. another run) is not adopted.
+           (Create-time Metadata is also set, but S3 does not return it for an upload in progress.)
+           Upload parts are at most 2 * MIN_S3_SIZE bytes; server-side copy parts have no such bound.
 '''
 
 import boto3
@@ -54,6 +67,10 @@ import argparse
 import logging
 import sys
 import re
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 #pip install natsort
 #from natsort import natsorted
@@ -63,6 +80,15 @@ BUCKET = "" # set by command line args
 # S3 multi-part upload parts must be larger than 5mb
 MIN_S3_SIZE = 6000000
 
+# Part number of the plan fingerprint part (S3 max part number). Not part of the completed file.
+RESUME_MARKER_PART_NUM = 10000
+
+# Max NOF part copies/uploads in progress at one time
+MAX_IN_FLIGHT = int(os.getenv("COMBINE_S3_MAX_IN_FLIGHT", "10"))
+
+# one S3 client per worker thread
+_thread_local = threading.local()
+
 
 # Used to sort list of files in S3: 
 # \d = Matches any decimal digit
@@ -76,7 +102,7 @@ def natural_sortkey(lstTuple):
     return tuple(int(num) if num.isnumeric()  else alpha for num, alpha in tokenize(lstTuple[0]))
 
 
-def run_concatenation(folder_to_concatenate, result_filepath, file_prefix, max_filesize):
+def run_concatenation(folder_to_concatenate, result_filepath, file_prefix, max_filesize, max_in_flight=None):
 
     s3 = new_s3_client()
 
@@ -110,25 +136,31 @@ def run_concatenation(folder_to_concatenate, result_filepath, file_prefix, max_f
     #################################################################
     if (len(grouped_parts_list) == 1):
         logger.info("Concatenating single group")
-        run_single_concatenation(s3, grouped_parts_list[0], result_filepath)
+        run_single_concatenation(s3, grouped_parts_list[0], result_filepath, max_in_flight)
     else:
         for i, parts in enumerate(grouped_parts_list):
             logger.info("Concatenating group {}/{}".format(i, len(grouped_parts_list)))
             # The 3rd parameter adds a "-i" to end of result_filepath
-            run_single_concatenation(s3, parts, "{}-{}".format(result_filepath, i))
+            run_single_concatenation(s3, parts, "{}-{}".format(result_filepath, i), max_in_flight)
 
 
-def run_single_concatenation(s3, parts_list, result_filepath):
+def run_single_concatenation(s3, parts_list, result_filepath, max_in_flight=None):
 
     logger.info("In function run_single_concatenation")
     logger.info(f"len(parts_list):{len(parts_list)}")
 
     if len(parts_list) > 1:
         # perform multi-part upload
-        upload_id = initiate_concatenation(s3, result_filepath)
-        parts_mapping = assemble_parts_to_concatenate(s3, result_filepath, upload_id, parts_list)
+        fStart = time.monotonic()
+
+        lstPlannedParts = plan_parts(parts_list)
+        upload_id, dictUploadedParts = initiate_concatenation(s3, result_filepath, get_plan_fingerprint(result_filepath, parts_list), len(lstPlannedParts))
+        parts_mapping = assemble_parts_to_concatenate(s3, result_filepath, upload_id, parts_list, max_in_flight, dictUploadedParts, lstPlannedParts)
         complete_concatenation(s3, result_filepath, upload_id, parts_mapping)
 
+        fElapsed = max(time.monotonic() - fStart, 0.000001)
+        logger.info("Concatenated {} parts into {} in {:.2f} secs ({:.1f} parts/sec)".format(len(parts_list), result_filepath, fElapsed, len(parts_list) / fElapsed))
+
     elif len(parts_list) == 1:
         # can perform a simple S3 copy since there is just a single file
         resp = s3.copy_object(Bucket=BUCKET, CopySource="{}/{}".format(BUCKET, parts_list[0][0]), Key=result_filepath)
@@ -169,6 +201,13 @@ def new_s3_client():
     session = boto3.session.Session()
     return session.client('s3')
 
+
+def _thread_s3_client():
+    # S3 client for the current worker thread
+    if not hasattr(_thread_local, "s3"):
+        _thread_local.s3 = new_s3_client()
+    return _thread_local.s3
+
 def collect_parts(s3, folder, file_prefix):
 
     logger.info("In function collect_parts")
@@ -210,128 +249,230 @@ def _list_all_objects_with_size(s3, folder, file_prefix):
     #     LastModified, ETag, StorageClass
     ##########################################################
     def resp_to_filelist(resp):
-        return [(x['Key'], x['Size']) for x in resp['Contents']]
+        return [(x['Key'], x['Size'], x.get('ETag', '').strip('"')) for x in resp.get('Contents', [])]
 
     objects_list = []
-    #resp = s3.list_objects(Bucket=BUCKET, Prefix=folder)
     folder_n_file_prefix=folder + file_prefix
-    resp = s3.list_objects_v2(Bucket=BUCKET, Prefix=folder_n_file_prefix)
-    ##print (f"resp:{resp}")
 
-    objects_list.extend(resp_to_filelist(resp))
+    # paginator continues truncated listings with the same Prefix
+    paginator = s3.get_paginator('list_objects_v2')
 
-    while resp['IsTruncated']:
-        # if there are more entries than can be returned in one request, the key
-        # of the last entry returned acts as a pagination value for the next request
-        logger.info("Found {} objects so far".format(len(objects_list)))
-        last_key = objects_list[-1][0]
-        resp = s3.list_objects(Bucket=BUCKET, Prefix=folder, Marker=last_key)
+    for resp in paginator.paginate(Bucket=BUCKET, Prefix=folder_n_file_prefix):
         objects_list.extend(resp_to_filelist(resp))
-
-    #print(f"objects_list: {objects_list}")
+        if resp.get('IsTruncated'):
+            logger.info("Found {} objects so far".format(len(objects_list)))
 
     return objects_list
 
 
-def initiate_concatenation(s3, result_filename):
+def get_plan_fingerprint(result_filename, parts_list):
+
+    # Same output key, MIN_S3_SIZE and source objects (key, size, ETag) --> same planned parts with the same bytes
+    sPlan = json.dumps([result_filename, MIN_S3_SIZE, [list(part) for part in parts_list]])
+
+    return hashlib.sha256(sPlan.encode("utf-8")).hexdigest()
+
+
+def _get_plan_marker(sFingerprint):
+
+    # marker part body and its ETag (MD5 of the body) as returned by ListParts
+    bytMarker = "combineS3Files plan {}".format(sFingerprint).encode("utf-8")
+
+    return bytMarker, hashlib.md5(bytMarker).hexdigest()
+
+
+def initiate_concatenation(s3, result_filename, sFingerprint, iNOFPlannedParts):
     # performing the concatenation in S3 requires creating a multi-part upload
     # and then referencing the S3 files we wish to concatenate as "parts" of that upload
     logger.info("In function initiate_concatenation")
 
-    resp = s3.create_multipart_upload(Bucket=BUCKET, Key=result_filename)
+    bytMarker, sMarkerETag = _get_plan_marker(sFingerprint)
+
+    ############################################################
+    # Resume an interrupted multipart upload of the same plan
+    ############################################################
+    for upload_id in _find_interrupted_uploads(s3, result_filename):
+        dictUploadedParts = _list_uploaded_parts(s3, result_filename, upload_id)
+
+        if dictUploadedParts.get(RESUME_MARKER_PART_NUM, (None, None))[0] != sMarkerETag:
+            logger.info("Not resuming upload id {} for {}: upload is for another plan".format(upload_id, result_filename))
+            continue
+
+        del dictUploadedParts[RESUME_MARKER_PART_NUM]
+        logger.info("Resuming concatenation for {} with upload id {}. {} parts already uploaded.".format(result_filename, upload_id, len(dictUploadedParts)))
+        return upload_id, dictUploadedParts
+
+    resp = s3.create_multipart_upload(Bucket=BUCKET, Key=result_filename, Metadata={'combine-plan': sFingerprint})
     logger.info("Initiated concatenation attempt for {}, and got response: {}".format(result_filename, resp))
-    return resp['UploadId']
 
+    # plan fingerprint part (the part number is needed by plans with 10000 parts --> upload cannot be resumed)
+    if iNOFPlannedParts < RESUME_MARKER_PART_NUM:
+        s3.upload_part(Bucket=BUCKET, Key=result_filename, PartNumber=RESUME_MARKER_PART_NUM, UploadId=resp['UploadId'], Body=bytMarker)
+    else:
+        logger.info("Upload id {} for {} cannot be resumed: plan has {} parts".format(resp['UploadId'], result_filename, iNOFPlannedParts))
 
-def assemble_parts_to_concatenate(s3, result_filename, upload_id, parts_list):
+    return resp['UploadId'], {}
 
-    logger.info("assemble_parts_to_concatenate")
 
-    parts_mapping = []
-    part_num = 0
+def _find_interrupted_uploads(s3, result_filename):
+
+    lstUploads = []
+
+    paginator = s3.get_paginator('list_multipart_uploads')
+    for resp in paginator.paginate(Bucket=BUCKET, Prefix=result_filename):
+        lstUploads.extend(upload for upload in resp.get('Uploads', []) if upload['Key'] == result_filename)
+
+    # most recent upload first
+    return [upload['UploadId'] for upload in sorted(lstUploads, key=lambda upload: upload['Initiated'], reverse=True)]
+
 
-    s3_parts = ["{}/{}".format(BUCKET, p[0]) for p in parts_list if p[1] > MIN_S3_SIZE]
-    local_parts = [p[0] for p in parts_list if p[1] <= MIN_S3_SIZE]
+def _list_uploaded_parts(s3, result_filename, upload_id):
 
-    # assemble parts large enough for direct S3 copy
-    for part_num, source_part in enumerate(s3_parts, 1): # part numbers are 1 indexed
-        resp = s3.upload_part_copy(Bucket=BUCKET,
-                                   Key=result_filename,
-                                   PartNumber=part_num,
-                                   UploadId=upload_id,
-                                   CopySource=source_part)
-        logger.info("Setup S3 part #{}, with path: {}, and got response: {}".format(part_num, source_part, resp))
-        parts_mapping.append({'ETag': resp['CopyPartResult']['ETag'][1:-1], 'PartNumber': part_num})
+    # {PartNumber: (ETag, Size)}
+    dictUploadedParts = {}
+
+    paginator = s3.get_paginator('list_parts')
+    for resp in paginator.paginate(Bucket=BUCKET, Key=result_filename, UploadId=upload_id):
+        for part in resp.get('Parts', []):
+            dictUploadedParts[part['PartNumber']] = (part['ETag'].strip('"'), part['Size'])
+
+    return dictUploadedParts
+
+
+def plan_parts(parts_list):
 
     ###############################################################################
-    # assemble parts too small for direct S3 copy by downloading them locally,
-    # combining them, and then reuploading them as the last part of the
-    # multi-part upload (which is not constrained to the 5mb limit)
+    # Build the ordered list of multipart upload parts. 
+    # Each planned part is a list of segments (key, start, end) where end is inclusive.
+    #
+    #   - part > MIN_S3_SIZE with nothing pending --> server-side copy of whole part
+    #   - small parts are coalesced (in file order) until >= MIN_S3_SIZE --> upload
+    #   - pending small parts followed by a large part: borrow the head of the large part
+    #     to reach MIN_S3_SIZE (upload), and copy the rest of the large part server-side.
+    #     If the rest would be too small to be a part, the whole large part is included in the upload.
+    #
+    # Only the last part may be smaller than MIN_S3_SIZE.
+    # Upload parts are at most 2 * MIN_S3_SIZE bytes: pending small parts are < MIN_S3_SIZE
+    # (P) when the next part is added, and the next part is either a small part (<= MIN_S3_SIZE),
+    # the borrowed head of a large part (upload is exactly MIN_S3_SIZE), or a whole large part
+    # only when its size is <= 2 * MIN_S3_SIZE - P. Copy parts (server-side) have no such bound.
     ###############################################################################
+    lstPlannedParts = []
+    lstPending = []
+    iPendingSize = 0
+
+    for key, size, *_ in parts_list:
+
+        if size == 0:
+            continue
+
+        if iPendingSize == 0 and size > MIN_S3_SIZE:
+            lstPlannedParts.append({'type': 'copy', 'segments': [(key, 0, size - 1)], 'size': size})
+            continue
+
+        if size <= MIN_S3_SIZE:
+            lstPending.append((key, 0, size - 1))
+            iPendingSize += size
+
+        else:
+            iNeeded = MIN_S3_SIZE - iPendingSize
+
+            if size - iNeeded > MIN_S3_SIZE:
+                lstPending.append((key, 0, iNeeded - 1))
+                lstPlannedParts.append({'type': 'upload', 'segments': lstPending, 'size': iPendingSize + iNeeded})
+                lstPlannedParts.append({'type': 'copy', 'segments': [(key, iNeeded, size - 1)], 'size': size - iNeeded})
+                lstPending = []
+                iPendingSize = 0
+                continue
+
+            lstPending.append((key, 0, size - 1))
+            iPendingSize += size
+
+        if iPendingSize >= MIN_S3_SIZE:
+            lstPlannedParts.append({'type': 'upload', 'segments': lstPending, 'size': iPendingSize})
+            lstPending = []
+            iPendingSize = 0
+
+    # left-over small parts become the last part
+    if iPendingSize > 0:
+        lstPlannedParts.append({'type': 'upload', 'segments': lstPending, 'size': iPendingSize})
+
+    return lstPlannedParts
 
-    ###########################################################
-    # small_parts = [] is OK for txt file, but not binary file
-    ###########################################################
-    #small_parts = []
+
+def _copy_or_upload_part(result_filename, upload_id, part_num, planned_part):
+
+    s3 = _thread_s3_client()
+
+    if planned_part['type'] == 'copy':
+        key, start, end = planned_part['segments'][0]
+        dictCopyArgs = dict(Bucket=BUCKET, Key=result_filename, PartNumber=part_num, UploadId=upload_id, CopySource="{}/{}".format(BUCKET, key))
+        if start != 0:
+            dictCopyArgs['CopySourceRange'] = "bytes={}-{}".format(start, end)
+
+        resp = s3.upload_part_copy(**dictCopyArgs)
+        logger.info("Setup S3 part #{}, with path: {}, and got response: {}".format(part_num, key, resp))
+        return {'ETag': resp['CopyPartResult']['ETag'].strip('"'), 'PartNumber': part_num}
+
+    ###################################################################
+    # Combine small files (in order) into bytearray for upload to S3.
+    # Use extend (instead of append) for bytes object with more than one byte.
+    ###################################################################
     small_parts = bytearray()
 
-    for source_part in local_parts:
-        logger.info(f"Building small parts --> source_part:{source_part}")
-        
-        gzip_file =  s3.get_object(Bucket=BUCKET, Key=source_part)
-        strmBytes = gzip_file["Body"].read()
-        small_parts.extend(strmBytes)
+    for key, start, end in planned_part['segments']:
+        gzip_file = s3.get_object(Bucket=BUCKET, Key=key, Range="bytes={}-{}".format(start, end))
+        small_parts.extend(gzip_file["Body"].read())
 
-        ###\/#####
-        
-        ######################################################
-        # Remove writing to /tmp directory.  
-        # Ex. Before s3.download_file to temp_filename: /tmp/xtr_DEV_PSPS_NPI_PBAR_PSPS_NPI_2024_JAN_20240122.152712.txt.gz_0_0_0.csv.gz
-        # Ex. source_part = xtr/DEV/PSPS_NPI_PBAR_PSPS_NPI_2024_JAN_20240122.152712.txt.gz_0_0_0.csv.gz
-        ######################################################
-        #logger.info(f"source_part:{source_part}")
-        #temp_filename = "/tmp/{}".format(source_part.replace("/","_"))
+    resp = s3.upload_part(Bucket=BUCKET, Key=result_filename, PartNumber=part_num, UploadId=upload_id, Body=bytes(small_parts))
+    logger.info("Setup local part #{} from {} small files, and got response: {}".format(part_num, len(planned_part['segments']), resp))
+    return {'ETag': resp['ETag'].strip('"'), 'PartNumber': part_num}
 
-        #logger.info(f"Before s3.download_file to temp_filename: {temp_filename}")
-        #s3.download_file(Bucket=BUCKET, Key=source_part, Filename=temp_filename)
 
-        ###################################################################
-        # Combine small files into bytearray variable for upload to S3.
-        ###################################################################
-        #with open(temp_filename, 'rb') as f:
-            #####################################
-            # Use extend (instead of append) bytearray if you have a bytes object with more than one byte
-            # Received exception when using "append"
-            #####################################
-            #small_parts.extend(f.read())
-        #os.remove(temp_filename)
-        #logger.info("Downloaded and copied small part with path: {}".format(source_part))
+def assemble_parts_to_concatenate(s3, result_filename, upload_id, parts_list, max_in_flight=None, dictUploadedParts=None, lstPlannedParts=None):
 
-        ###/\#####
+    logger.info("assemble_parts_to_concatenate")
+
+    iMaxInFlight = max_in_flight or MAX_IN_FLIGHT
+    dictUploadedParts = dictUploadedParts or {}
+
+    # part numbers are 1 indexed and follow file order
+    if lstPlannedParts is None:
+        lstPlannedParts = plan_parts(parts_list)
+    logger.info("Planned {} multipart parts ({} server-side copies) from {} files".format(
+        len(lstPlannedParts), sum(1 for part in lstPlannedParts if part['type'] == 'copy'), len(parts_list)))
 
+    parts_mapping = []
+    lstToDo = []
 
+    for part_num, planned_part in enumerate(lstPlannedParts, 1):
+        # part already uploaded by interrupted run?
+        if part_num in dictUploadedParts and dictUploadedParts[part_num][1] == planned_part['size']:
+            parts_mapping.append({'ETag': dictUploadedParts[part_num][0], 'PartNumber': part_num})
+        else:
+            lstToDo.append((part_num, planned_part))
 
+    if len(parts_mapping) > 0:
+        logger.info("Skipping {} parts uploaded by previous attempt".format(len(parts_mapping)))
 
-    #logger.info("Before len(small_parts):{len(small_parts)}")
+    ###############################################################################
+    # Workers only hold the bytes for the part they are uploading (upload parts are
+    # at most 2 * MIN_S3_SIZE bytes), so memory is bounded to max_in_flight * 2 * MIN_S3_SIZE.
+    ###############################################################################
+    with ThreadPoolExecutor(max_workers=iMaxInFlight) as pool:
+        lstFutures = [pool.submit(_copy_or_upload_part, result_filename, upload_id, part_num, planned_part) for part_num, planned_part in lstToDo]
 
-    if len(small_parts) > 0:
-        logger.info("Uploading last combined small parts")
+        try:
+            parts_mapping.extend(future.result() for future in lstFutures)
 
-        last_part_num = part_num + 1
-        #####################################################################################
-        # When using the ''.join(small_parts) code
-        #   --> received an exception: "sequence item 0: expected str instance, bytes found"
-        #   --> presume this works with text files, but not binary compressed files
-        #####################################################################################
-        ###last_part = ''.join(small_parts)  
-        last_part = small_parts
+        except Exception:
+            # stop remaining parts; upload is left open so next run can resume it
+            logger.error("Concatenation for {} failed. Upload id {} can be resumed.".format(result_filename, upload_id))
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
 
-        logger.info("Before s3.upload_part")
-        resp = s3.upload_part(Bucket=BUCKET, Key=result_filename, PartNumber=last_part_num, UploadId=upload_id, Body=last_part)
-        logger.info("Setup local part #{} from {} small files, and got response: {}".format(last_part_num, len(small_parts), resp))
-        parts_mapping.append({'ETag': resp['ETag'][1:-1], 'PartNumber': last_part_num})
+    return sorted(parts_mapping, key=lambda part: part['PartNumber'])
 
-    return parts_mapping
 
 def complete_concatenation(s3, result_filename, upload_id, parts_mapping):
 
@@ -351,7 +492,7 @@ def setModuleLogger(pParentLogger):
 
 
 # this function is called when this module is imported into another module
-def S3FileConcatenation(bucket=None, folder=None, prefix=None, output=None, filesize=None ):
+def S3FileConcatenation(bucket=None, folder=None, prefix=None, output=None, filesize=None, max_in_flight=None ):
     
     try:    
 
@@ -383,7 +524,7 @@ def S3FileConcatenation(bucket=None, folder=None, prefix=None, output=None, file
         #logger.info("Combining files in {}/{} to {}/{}, with a max size of {} bytes".format(BUCKET, args.folder, BUCKET, args.output, args.filesize))
         logger.info(f"Combining files like {bucket}/{folder}{prefix} to {output} with a max size of {iFilesize}")
 
-        run_concatenation(folder, output, prefix, iFilesize)
+        run_concatenation(folder, output, prefix, iFilesize, max_in_flight)
 
         
     except Exception as e:
@@ -419,6 +560,7 @@ def S3FileConcatenationDriver():
         parser.add_argument("--prefix", help="prefix of files to combine into single file")
         parser.add_argument("--output", help="output location for resulting merged files, relative to the specified base bucket")
         parser.add_argument("--filesize", type=int, help="max filesize of the concatenated files in bytes")
+        parser.add_argument("--max_in_flight", type=int, default=None, help="max NOF part copies/uploads in progress at one time")
 
         args = parser.parse_args()
 
@@ -446,7 +588,7 @@ def S3FileConcatenationDriver():
         #boto3.setup_default_session(profile_name='idrcxtr')
         ##s3 = boto3.client("s3", aws_access_key_id=ACCESS_KEY,aws_secret_access_key=SECRET_KEY)
 
-        run_concatenation(args.folder, args.output, args.prefix, args.filesize)
+        run_concatenation(args.folder, args.output, args.prefix, args.filesize, args.max_in_flight)
 
         sys.exit(0)
 
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  combineS3FilesBenchmark.py
+#
+# Desc: Benchmark combineS3Files.py concatenation (parts/sec) for different max_in_flight settings
+#       against a local S3 stand-in (MinIO or "moto_server").
+#
+#       Creates NOF parts named like Snowflake COPY INTO output (ex. bench_20260101.120000.txt.gz_0_0_N.txt.gz),
+#       combines them for each max_in_flight value, verifies the combined file size, and removes the test objects.
+#
+# Ex.   moto_server -p 5000 &
+#       python3 combineS3FilesBenchmark.py --endpoint http://localhost:5000 --bucket bench --nof_parts 300 --part_size 7000000 --max_in_flight 1 4 16
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+########################################################################################################
+import sys
+import time
+import logging
+import argparse
+
+import boto3
+
+import combineS3Files
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="combineS3Files.py benchmark")
+    parser.add_argument("--endpoint", required=True, help="S3 endpoint url of local S3 stand-in. Ex. http://localhost:5000")
+    parser.add_argument("--bucket", default="combine-benchmark", help="test bucket (created if it does not exist)")
+    parser.add_argument("--folder", default="bench/", help="test folder")
+    parser.add_argument("--nof_parts", type=int, default=200, help="NOF part files to combine")
+    parser.add_argument("--part_size", type=int, default=1000000, help="size of each part file in bytes")
+    parser.add_argument("--max_in_flight", type=int, nargs="+", default=[1, 4, 16], help="max_in_flight values to benchmark")
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s %(asctime)s => %(message)s', level=logging.WARNING)
+    combineS3Files.setModuleLogger(logging.getLogger(__name__))
+
+    # point combineS3Files at the local S3 stand-in
+    combineS3Files.new_s3_client = lambda: boto3.session.Session().client("s3", endpoint_url=args.endpoint)
+    combineS3Files.BUCKET = args.bucket
+
+    s3 = combineS3Files.new_s3_client()
+
+    try:
+        s3.create_bucket(Bucket=args.bucket)
+    except Exception:
+        pass
+
+    #############################################################
+    # Create part files
+    #############################################################
+    sPrefix = "bench_20260101.120000.txt.gz"
+    bytPart = b"x" * args.part_size
+
+    print(f"Creating {args.nof_parts} parts of {args.part_size} bytes in {args.bucket}/{args.folder}")
+    for i in range(args.nof_parts):
+        s3.put_object(Bucket=args.bucket, Key=f"{args.folder}{sPrefix}_0_0_{i}.txt.gz", Body=bytPart)
+
+    #############################################################
+    # Combine parts for each max_in_flight value
+    #############################################################
+    print(f"{'max_in_flight':>15} {'secs':>10} {'parts/sec':>12}")
+
+    lstKeys = []
+    for iMaxInFlight in args.max_in_flight:
+        sOutput = f"{args.folder}out/{sPrefix}.{iMaxInFlight}"
+        lstKeys.append(sOutput)
+
+        fStart = time.monotonic()
+        combineS3Files.run_concatenation(args.folder, sOutput, sPrefix, 10 ** 13, iMaxInFlight)
+        fElapsed = time.monotonic() - fStart
+
+        iSize = s3.head_object(Bucket=args.bucket, Key=sOutput)["ContentLength"]
+        if iSize != args.nof_parts * args.part_size:
+            print(f"Combined file {sOutput} has size {iSize} instead of {args.nof_parts * args.part_size}")
+            sys.exit(12)
+
+        print(f"{iMaxInFlight:>15} {fElapsed:>10.2f} {args.nof_parts / fElapsed:>12.1f}")
+
+    #############################################################
+    # Remove test objects
+    #############################################################
+    lstKeys.extend(f"{args.folder}{sPrefix}_0_0_{i}.txt.gz" for i in range(args.nof_parts))
+    for i in range(0, len(lstKeys), 1000):
+        s3.delete_objects(Bucket=args.bucket, Delete={"Objects": [{"Key": sKey} for sKey in lstKeys[i:i + 1000]]})
+
+
+if __name__ == "__main__":
+
+    main()
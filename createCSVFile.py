@@ -6,15 +6,41 @@
 # NOTE: Program requires a configuration file that describes the Input fixed-width file. Config file should contain a header record, however the column names are 
 #       not enforced by this program. Config file should contain: 1) field-name, field start position, field length, and field type (C)har or (N)umeric
 #       
-#       Execute: python3 createCSVFile.py --ConfigFile {path/filename} --InputFile {path/filename} --CSVFile {path/filename}
+#       Execute: python3 createCSVFile.py --ConfigFile {path/filename} --InputFile {path/filename} --CSVFile {path/filename} [--Workers n]
+#
+# NOTE: The config is compiled once into a slice plan (CompiledLayout). Records are read as bytes; ASCII records are converted
+#       with the slice plan and written in batches. Records with non-ASCII bytes or carriage returns are converted with the
+#       original text-mode rules. The CSV file is byte-identical to the one convert_fixed_width_2_csv_legacy creates.
+#
+#       --Workers n > 1 splits the input file at newline-aligned byte offsets, converts the pieces in n processes, and
+#       concatenates the pieces in order.
+#
+#       Benchmark: python3 createCSVFileBenchmark.py
+#
+#       --OutputFormat parquet|arrow writes a Parquet file or an Arrow IPC file instead of a CSV file (requires pyarrow).
+#       (N)umeric columns are typed by a pre-scan of their values (getNumericFieldTypes): int64, decimal128(38,0) when an
+#       int does not fit int64, or float64 when a value is not an int. (C)har columns are strings; Parquet dictionary-encodes
+#       short (code) char columns.
+#       Record batches are sized by --MemoryBudgetMB and written as they fill.
+#
+#       Execute: python3 createCSVFile.py --ConfigFile {path/filename} --InputFile {path/filename} --CSVFile {path/filename.parquet} --OutputFormat parquet
 #
 # Paul Baranoski 2025-08-28 Create Module.
+# 2026-10-18     Add compiled layout conversion, batched writes, and multi-process mode.
+# 2026-10-18     Add Parquet and Arrow IPC output formats.
+# 2026-10-18     Type (N)umeric Parquet/Arrow columns from a pre-scan of the input file instead of the first record batch.
 ########################################################################################################
 import csv
 import sys
 import os
 import argparse
 import logging
+import locale
+import shutil
+import types
+
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
 
 #import datetime
 from datetime import datetime
@@ -23,6 +49,30 @@ from datetime import date,timedelta
 #LOG_DIR = "/app/IDRC/XTR/CMS/logs/"
 LOG_DIR = ""
 
+# setLogging replaces logger when run as a script
+rootLogger = logging.getLogger(__name__)
+
+# NOF CSV records written per write call
+WRITE_BATCH_SIZE = 10000
+
+# Encoding open() uses for text files --> used for records that are not ASCII
+TEXT_ENCODING = locale.getpreferredencoding(False)
+
+OUTPUT_FORMATS = ["csv", "parquet", "arrow"]
+
+# Memory for one record batch (Python values + Arrow arrays) of Parquet/Arrow output
+COLUMNAR_MEMORY_BUDGET_MB = 256
+# Approx. Python object bytes per field value while a record batch is built
+COLUMNAR_BYTES_PER_VALUE = 64
+
+# (C)har fields this length or shorter are codes --> Parquet dictionary encoding
+DICTIONARY_MAX_FIELD_LENGTH = 12
+
+# (N)umeric ints that fit int64; larger ints are decimal128(38,0) up to DECIMAL_MAX_DIGITS digits (float64 beyond)
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+DECIMAL_MAX_DIGITS = 38
+
 def setLogging(LOGNAME):
 
     # Configure root logger
@@ -70,8 +120,334 @@ def load_config(config_file):
     return config
 
 
-def convert_fixed_width_2_csv(config, inputFile, csvFile):
-    """Parse fixed-width file using config into a DataFrame."""
+def toNumericText(raw_value):
+    """ Returns CSV text of (N)umeric field: same text csv.writer writes for int/float/None of original conversion. """
+
+    raw_value = raw_value.strip()
+
+    # digits without leading zeroes --> int() would not change the text
+    if raw_value.isdigit() and raw_value.isascii() and (raw_value[0] != "0" or len(raw_value) == 1):
+        return raw_value
+    
+    if raw_value == "":
+        return ""
+
+    try:
+        return str(int(raw_value))
+    except ValueError:
+        return str(float(raw_value))
+
+
+def toNumber(raw_value):
+    """ (N)umeric field value of original conversion: None, int or float. """
+
+    raw_value = raw_value.strip()
+
+    if raw_value == "":
+        return None
+
+    try:
+        return int(raw_value)
+    except ValueError:
+        return float(raw_value)
+
+
+class CompiledLayout:
+    """ Config compiled into one slice plan and a converter per field. """
+
+    def __init__(self, config):
+
+        self.header = [entry["name"] for entry in config]
+
+        # Python is zero-based offsets
+        lstSlices = [slice(field["start"] - 1, field["start"] - 1 + field["length"]) for field in config]
+
+        # itemgetter returns a tuple for 2+ slices only
+        if len(lstSlices) > 1:
+            self.getFields = itemgetter(*lstSlices)
+        else:    
+            self.getFields = lambda line: tuple(line[fieldSlice] for fieldSlice in lstSlices)
+
+        self.converters = tuple(toNumericText if field["type"] == "N" else str.strip for field in config)
+
+        # csv.writer quotes an empty field when it is the only field in the record
+        self.bJoinFields = len(config) > 1
+
+
+    def readLines(self, inf, iStartOffset, iEndOffset):
+        """ Yields the non-blank records from iStartOffset up to iEndOffset (None --> end of file) of binary file inf. """
+
+        inf.seek(iStartOffset)
+        iOffset = iStartOffset
+
+        for bLine in inf:
+
+            if iEndOffset is not None and iOffset >= iEndOffset:
+                break
+            iOffset += len(bLine)
+
+            if bLine.isascii() and b"\r" not in bLine:
+                lstLines = [bLine.decode("ascii")]
+            else:
+                lstLines = self.textModeLines(bLine)
+
+            for line in lstLines:
+
+                # Skip blank lines
+                if line.strip() != "":
+                    yield line
+
+
+    def convertLines(self, inf, iStartOffset, iEndOffset, outf):
+        """ Convert the records from iStartOffset up to iEndOffset (None --> end of file) of binary file inf to text file outf. """
+
+        lstOut = []
+        writer = csv.writer(types.SimpleNamespace(write=lstOut.append))
+
+        getFields = self.getFields
+        converters = self.converters
+        bJoinFields = self.bJoinFields
+
+        for line in self.readLines(inf, iStartOffset, iEndOffset):
+
+            record = [convert(raw_value) for convert, raw_value in zip(converters, getFields(line))]
+
+            # No field needs quotes --> join is what csv.writer would write 
+            if bJoinFields and '"' not in line and ',' not in line:
+                lstOut.append(",".join(record) + "\r\n")
+            else:    
+                writer.writerow(record)
+
+            if len(lstOut) >= WRITE_BATCH_SIZE:
+                outf.write("".join(lstOut))
+                lstOut.clear()
+
+        outf.write("".join(lstOut))
+
+
+    @staticmethod
+    def textModeLines(bLine):
+        """ Returns the lines text-mode open() would read from bLine (decoded, universal newlines). """
+
+        text = bLine.decode(TEXT_ENCODING).replace("\r\n", "\n").replace("\r", "\n")
+        lstLines = [line + "\n" for line in text.split("\n")]
+
+        # last piece has no newline
+        lstLines[-1] = lstLines[-1][:-1]
+
+        return lstLines
+
+
+def getNewlineAlignedOffsets(inputFile, iNOFPieces):
+    """ Returns [(start, end)] byte offsets of iNOFPieces of inputFile. Each piece ends after a newline (or at end of file). """
+
+    iFileSize = os.path.getsize(inputFile)
+    lstStartOffsets = [0]
+
+    with open(inputFile, "rb") as inf:
+        for i in range(1, iNOFPieces):
+            inf.seek(max(iFileSize * i // iNOFPieces, lstStartOffsets[-1]))
+            inf.readline()
+            iOffset = inf.tell()
+
+            if iOffset >= iFileSize:
+                break
+            if iOffset > lstStartOffsets[-1]:
+                lstStartOffsets.append(iOffset)
+
+    return list(zip(lstStartOffsets, lstStartOffsets[1:] + [iFileSize]))
+
+
+def convertFilePiece(config, inputFile, pieceFile, iStartOffset, iEndOffset):
+    """ Process pool worker: convert one byte range of inputFile into pieceFile (no header). """
+
+    with open(inputFile, "rb") as inf, open(pieceFile, "w", newline="") as outf:
+        CompiledLayout(config).convertLines(inf, iStartOffset, iEndOffset, outf)
+
+    return pieceFile
+
+
+def convert_fixed_width_2_csv(config, inputFile, csvFile, iWorkers=1):
+    """Parse fixed-width file using config into a CSV file."""
+
+    layout = CompiledLayout(config)
+
+    if iWorkers <= 1:
+        with open(inputFile, "rb") as inf, open(csvFile, "w", newline="") as outf:
+
+            # Create header record
+            csv.writer(outf).writerow(layout.header)
+
+            layout.convertLines(inf, 0, None, outf)
+
+        return
+
+    ##########################################
+    # Convert pieces of input file concurrently
+    ##########################################
+    lstOffsets = getNewlineAlignedOffsets(inputFile, iWorkers)
+    rootLogger.info(f"Convert {len(lstOffsets)} pieces of {inputFile} using {iWorkers} processes: {lstOffsets}")
+
+    lstPieceFiles = [f"{csvFile}.{i}" for i in range(len(lstOffsets))]
+
+    try:
+        with ProcessPoolExecutor(max_workers=iWorkers) as executor:
+            lstFutures = [executor.submit(convertFilePiece, config, inputFile, pieceFile, iStartOffset, iEndOffset)
+                          for pieceFile, (iStartOffset, iEndOffset) in zip(lstPieceFiles, lstOffsets)]
+
+            for future in lstFutures:
+                future.result()
+
+        ##########################################
+        # Header + pieces in input file order
+        ##########################################
+        with open(csvFile, "w", newline="") as outf:
+            csv.writer(outf).writerow(layout.header)
+
+        with open(csvFile, "ab") as outf:
+            for pieceFile in lstPieceFiles:
+                with open(pieceFile, "rb") as inf:
+                    shutil.copyfileobj(inf, outf)
+
+    finally:
+        for pieceFile in lstPieceFiles:
+            if os.path.exists(pieceFile):
+                os.remove(pieceFile)
+
+
+def getNumericFieldTypes(layout, config, inputFile):
+    """ Pre-scan the (N)umeric fields of inputFile. Returns {field index: "int64", "decimal" or "float64"}. """
+
+    dictTypes = {iField: "int64" for iField, field in enumerate(config) if field["type"] == "N"}
+    dictMaxDigits = {iField: 0 for iField in dictTypes}
+
+    if not dictTypes:
+        return dictTypes
+
+    getFields = layout.getFields
+    lstScanFields = list(dictTypes)
+
+    with open(inputFile, "rb") as inf:
+        for line in layout.readLines(inf, 0, None):
+            fields = getFields(line)
+
+            for iField in lstScanFields:
+                value = toNumber(fields[iField])
+
+                if isinstance(value, float):
+                    dictTypes[iField] = "float64"
+                elif value is not None and not INT64_MIN <= value <= INT64_MAX:
+                    dictTypes[iField] = "decimal"
+                    dictMaxDigits[iField] = max(dictMaxDigits[iField], len(str(abs(value))))
+
+            # float64 is final --> stop scanning the field
+            if any(dictTypes[iField] == "float64" for iField in lstScanFields):
+                lstScanFields = [iField for iField in lstScanFields if dictTypes[iField] != "float64"]
+                if not lstScanFields:
+                    break
+
+    for iField, iMaxDigits in dictMaxDigits.items():
+        if dictTypes[iField] == "decimal" and iMaxDigits > DECIMAL_MAX_DIGITS:
+            dictTypes[iField] = "float64"
+
+    return dictTypes
+
+
+def convert_fixed_width_2_columnar(config, inputFile, outputFile, outputFormat, iMemoryBudgetMB=COLUMNAR_MEMORY_BUDGET_MB):
+    """Parse fixed-width file using config into a Parquet or Arrow IPC file, one record batch at a time."""
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(f"Output format {outputFormat} requires the pyarrow package.")
+
+    layout = CompiledLayout(config)
+    getFields = layout.getFields
+    converters = tuple(toNumber if field["type"] == "N" else str.strip for field in config)
+
+    # Size record batches so the Python values of one batch fit in the memory budget
+    iRecBytes = sum(max(field["length"], 0) + COLUMNAR_BYTES_PER_VALUE for field in config)
+    iBatchNOFRecs = max(1000, iMemoryBudgetMB * 1024 * 1024 // max(iRecBytes, 1))
+    rootLogger.info(f"Write {outputFormat} file {outputFile} in batches of {iBatchNOFRecs} records")
+
+    schema = None
+    writer = None
+    iNOFRecs = 0
+
+    def buildSchema():
+
+        dictArrowTypes = {"int64": pa.int64(), "decimal": pa.decimal128(DECIMAL_MAX_DIGITS, 0), "float64": pa.float64()}
+        dictNumericTypes = getNumericFieldTypes(layout, config, inputFile)
+
+        lstFields = []
+        for iField, field in enumerate(config):
+            if field["type"] != "N":
+                lstFields.append(pa.field(field["name"], pa.string()))
+            else:
+                lstFields.append(pa.field(field["name"], dictArrowTypes[dictNumericTypes[iField]]))
+
+        return pa.schema(lstFields)
+
+    def writeBatch(lstRecords):
+
+        nonlocal schema, writer
+
+        lstColumns = list(zip(*lstRecords)) if lstRecords else [[] for _ in config]
+
+        # (N)umeric column types from a pre-scan of the whole input file
+        if schema is None:
+            schema = buildSchema()
+            rootLogger.info(f"{schema=}")
+
+            if outputFormat == "parquet":
+                lstDictColumns = [field["name"] for field in config if field["type"] != "N" and field["length"] <= DICTIONARY_MAX_FIELD_LENGTH]
+                writer = pq.ParquetWriter(outputFile, schema, use_dictionary=lstDictColumns, compression="snappy")
+            else:    
+                writer = pa.ipc.new_file(outputFile, schema)
+
+        lstArrays = []
+        for schemaField, lstValues in zip(schema, lstColumns):
+            # ints beyond DECIMAL_MAX_DIGITS digits in a float64 column
+            if pa.types.is_floating(schemaField.type):
+                lstValues = [value if value is None or isinstance(value, float) else float(value) for value in lstValues]
+
+            lstArrays.append(pa.array(lstValues, type=schemaField.type))
+
+        batch = pa.RecordBatch.from_arrays(lstArrays, schema=schema)
+
+        if outputFormat == "parquet":
+            # one row group per record batch
+            writer.write_table(pa.Table.from_batches([batch]))
+        else:    
+            writer.write_batch(batch)
+
+    try:
+        lstRecords = []
+
+        with open(inputFile, "rb") as inf:
+            for line in layout.readLines(inf, 0, None):
+                lstRecords.append([convert(raw_value) for convert, raw_value in zip(converters, getFields(line))])
+
+                if len(lstRecords) >= iBatchNOFRecs:
+                    writeBatch(lstRecords)
+                    iNOFRecs += len(lstRecords)
+                    lstRecords = []
+
+        # last (or only, possibly empty) batch
+        if lstRecords or schema is None:
+            writeBatch(lstRecords)
+            iNOFRecs += len(lstRecords)
+
+    finally:
+        if writer is not None:
+            writer.close()
+
+    rootLogger.info(f"{iNOFRecs} records written to {outputFile}")
+
+
+def convert_fixed_width_2_csv_legacy(config, inputFile, csvFile):
+    """Parse fixed-width file using config into a DataFrame. Field-by-field conversion (kept for createCSVFileBenchmark.py)."""
     
     with open(inputFile, "r") as inf,open(csvFile, "w", newline="") as outf:
 
@@ -135,7 +511,10 @@ def main():
         parser = argparse.ArgumentParser(description="BuildCalDriver parms")
         parser.add_argument("--ConfigFile", help="Configuration File which contains field-name, start-position, field length, field type")
         parser.add_argument("--InputFile", help="Fixed-width non-delimited file")
-        parser.add_argument("--CSVFile", help="Output CSV file")
+        parser.add_argument("--CSVFile", help="Output CSV file (or Parquet/Arrow file with --OutputFormat)")
+        parser.add_argument("--Workers", type=int, default=1, help="NOF processes converting pieces of the input file (csv only)")
+        parser.add_argument("--OutputFormat", choices=OUTPUT_FORMATS, default="csv", help="csv, parquet, or arrow (Arrow IPC file)")
+        parser.add_argument("--MemoryBudgetMB", type=int, default=COLUMNAR_MEMORY_BUDGET_MB, help="memory per record batch of parquet/arrow output")
 
         args = parser.parse_args()
 
@@ -151,12 +530,15 @@ def main():
         rootLogger.info(config)
 
         # Parse fixed width file
-        rootLogger.info(f"Convert fixed-width to csv file")
-        convert_fixed_width_2_csv(config, data_file, output_file)
+        rootLogger.info(f"Convert fixed-width to {args.OutputFormat} file")
+        if args.OutputFormat == "csv":
+            convert_fixed_width_2_csv(config, data_file, output_file, args.Workers)
+        else:
+            convert_fixed_width_2_columnar(config, data_file, output_file, args.OutputFormat, args.MemoryBudgetMB)
 
         #print(records)
 
-        rootLogger.info(f"CSV file created: {output_file}")
+        rootLogger.info(f"{args.OutputFormat.upper()} file created: {output_file}")
         
         rootLogger.info(f"CreateCSVFile.py ended at {TMSTMP}")
 
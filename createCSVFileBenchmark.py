@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+########################################################################################################
+# Name:  createCSVFileBenchmark.py
+#
+# Desc: Benchmark fixed-width to CSV conversion (MB/sec) of
+#         1) createCSVFile.py field-by-field conversion (convert_fixed_width_2_csv_legacy)
+#         2) createCSVFile.py compiled layout conversion for each --workers value
+#         3) createCSVFile.exe (compiled createCSVFile.c) when it exists
+#
+#       Creates a config file and a fixed-width input file in a temp directory, checks that the compiled layout CSV files
+#       are byte-identical to the field-by-field CSV file, and removes the temp directory.
+#
+# Ex.   python3 createCSVFileBenchmark.py --nof_recs 500000 --nof_fields 60 --workers 1 4 8 --cBinary ./createCSVFile.exe
+#
+# Modified:
+#
+# 2026-10-18 Created script.
+########################################################################################################
+import os
+import sys
+import time
+import random
+import shutil
+import filecmp
+import logging
+import argparse
+import tempfile
+import subprocess
+
+import createCSVFile
+
+
+def createTestFiles(sDir, iNOFRecs, iNOFFields):
+
+    random.seed(iNOFFields)
+
+    lstFields = []
+    iPos = 1
+    for i in range(iNOFFields):
+        iLen = random.randint(1, 20)
+        lstFields.append((f"FLD_{i}", iPos, iLen, "N" if i % 3 == 0 else "C"))
+        iPos += iLen
+
+    sConfigFile = os.path.join(sDir, "layout.csv")
+    with open(sConfigFile, "w") as fConfig:
+        for sName, iStart, iLen, sType in lstFields:
+            fConfig.write(f"{sName},{iStart},{iLen},{sType}\n")
+
+    lstCharValues = ["SMITH", "JONES, JR", "O'BRIEN", "", "MAIN ST", "APT 2"]
+
+    sInputFile = os.path.join(sDir, "input.txt")
+    with open(sInputFile, "w") as fInput:
+        for _ in range(iNOFRecs):
+            sRec = ""
+            for sName, iStart, iLen, sType in lstFields:
+                if sType == "N":
+                    sValue = str(random.randint(0, 10 ** min(iLen, 9) - 1))
+                else:
+                    sValue = random.choice(lstCharValues)
+                sRec += sValue[:iLen].rjust(iLen) if sType == "N" else sValue[:iLen].ljust(iLen)
+            fInput.write(sRec + "\n")
+
+    return sConfigFile, sInputFile
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="createCSVFile.py benchmark")
+    parser.add_argument("--nof_recs", type=int, default=200000, help="NOF fixed-width records")
+    parser.add_argument("--nof_fields", type=int, default=40, help="NOF fields per record")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="--Workers values to benchmark")
+    parser.add_argument("--cBinary", default="./createCSVFile.exe", help="compiled createCSVFile.c (skipped if it does not exist)")
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s %(asctime)s => %(message)s', level=logging.WARNING)
+
+    sDir = tempfile.mkdtemp(prefix="createCSVFileBenchmark_")
+
+    try:
+        #############################################################
+        # Create config and input files
+        #############################################################
+        sConfigFile, sInputFile = createTestFiles(sDir, args.nof_recs, args.nof_fields)
+        fMB = os.path.getsize(sInputFile) / (1024 * 1024)
+        print(f"Input file {args.nof_recs} records {args.nof_fields} fields {fMB:.1f} MB")
+
+        config = createCSVFile.load_config(sConfigFile)
+
+        print(f"{'conversion':>20} {'secs':>10} {'MB/sec':>10}")
+
+        def timeIt(sName, fnConvert):
+            fStart = time.monotonic()
+            fnConvert()
+            fElapsed = time.monotonic() - fStart
+            print(f"{sName:>20} {fElapsed:>10.2f} {fMB / fElapsed:>10.1f}")
+
+        #############################################################
+        # Field-by-field conversion
+        #############################################################
+        sLegacyCSV = os.path.join(sDir, "legacy.csv")
+        timeIt("field-by-field", lambda: createCSVFile.convert_fixed_width_2_csv_legacy(config, sInputFile, sLegacyCSV))
+
+        #############################################################
+        # Compiled layout conversion
+        #############################################################
+        for iWorkers in args.workers:
+            sCSV = os.path.join(sDir, f"compiled_{iWorkers}.csv")
+            timeIt(f"compiled x{iWorkers}", lambda: createCSVFile.convert_fixed_width_2_csv(config, sInputFile, sCSV, iWorkers))
+
+            if not filecmp.cmp(sLegacyCSV, sCSV, shallow=False):
+                print(f"{sCSV} is not identical to {sLegacyCSV}")
+                sys.exit(12)
+
+        #############################################################
+        # C program
+        #############################################################
+        if os.path.isfile(args.cBinary):
+            sCSV = os.path.join(sDir, "c.csv")
+            timeIt("createCSVFile.exe", lambda: subprocess.run([args.cBinary, sConfigFile, sInputFile, sCSV], stdout=subprocess.DEVNULL, check=True))
+        else:
+            print(f"{args.cBinary} not found. Compile with CompCreateCSVFile.bash to include it.")
+
+    finally:
+        shutil.rmtree(sDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+
+    main()
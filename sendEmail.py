@@ -12,12 +12,19 @@
 # Paul Baranoski 2026-07-28 Add function sendEmailNamedParms to be called when module is used as an import module. Added if __name__ == "__main__": for 
 #                           code that was not part of any function. This will prevent this code from being executed when included as an import module, and
 #                           allow code to be processed when module is executed via a subprocess call.
+# 2026-10-18                Queue email in the email spool (EmailSpool.spoolEmail) instead of connecting to the SMTP server.
+#                           The email spool sender sends queued emails over one SMTP connection. EMAIL_DELIVERY=DIRECT sends 
+#                           email over its own SMTP connection (prior logic).
+# 2026-10-18                Queued email message says the spool sender sends it; print a warning when the email spool has failed/ emails.
+# 2026-10-18                Send directly by default (prior logic); the email spool is used when the job sets EMAIL_DELIVERY=SPOOL.
 ########################################################################################################
 
 import smtplib
 import sys
 import os
 
+import EmailSpool
+
 def sendEmailNamedParms(sender=None, receivers=None, subject=None, messageText=None, bccReceivers=None, replyMsg="Note: Do not reply to this email. Send inquiries to bit-extractalerts@index-analytics.com."):
 
     print(f"{sender=}")
@@ -64,6 +71,15 @@ Subject: {subject}
 {replyMsg}
     """
 
+    if EmailSpool.EMAIL_DELIVERY == "SPOOL":
+        EmailSpool.spoolEmail(sender, lstReceivers, message)
+        # queued is not sent: the email spool sender sends it (or moves it to failed/)
+        print("Successfully queued email (sent by the email spool sender)")
+        sFailedWarning = EmailSpool.getFailedSpoolMsgsWarning()
+        if sFailedWarning is not None:
+            print(sFailedWarning)
+        return
+
     try:
 
         print("Before getting smtpServer")	
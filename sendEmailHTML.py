@@ -10,6 +10,11 @@
 #                           instead of hard-coded server name. Depending on the environment, the SMTP server will be named differently.
 # Paul Baranoski 2025-06-12 Add ability to process multiple file attachments with the 5th optional parm. This parameter needs to be a comma-delimited string.
 # Paul Baranoski 2025-12-02 Add formatting for displaying messageText to be able to recognize newlines for better log formatting.
+# 2026-10-18                Queue email in the email spool (EmailSpool.spoolEmail) instead of connecting to the SMTP server.
+#                           Attachments are in the queued message --> attached files can be removed once the email is queued.
+#                           EMAIL_DELIVERY=DIRECT sends email over its own SMTP connection (prior logic).
+# 2026-10-18                Queued email message says the spool sender sends it; print a warning when the email spool has failed/ emails.
+# 2026-10-18                Send directly by default (prior logic); the email spool is used when the job sets EMAIL_DELIVERY=SPOOL.
 ########################################################################################################
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
@@ -19,6 +24,8 @@ import sys
 from os.path import basename 
 import os
 
+import EmailSpool
+
 
 def sendEmail(sender, receivers, subject, messageText, filenamesNPath2Attach=""):
 
@@ -66,6 +73,15 @@ def sendEmail(sender, receivers, subject, messageText, filenamesNPath2Attach="")
                 msg.attach(msgAttach)   
             
             print("files have been attached to email")
+
+        if EmailSpool.EMAIL_DELIVERY == "SPOOL":
+            EmailSpool.spoolEmail(sender, lstReceivers, msg.as_string())
+            # queued is not sent: the email spool sender sends it (or moves it to failed/)
+            print("Successfully queued email (sent by the email spool sender)")
+            sFailedWarning = EmailSpool.getFailedSpoolMsgsWarning()
+            if sFailedWarning is not None:
+                print(sFailedWarning)
+            return
  
         #print("Before getting smtpServer")	
         #secure SMTP protocol (port 465, uses SSL)
@@ -23,6 +23,16 @@
 # IDRC-8950 - Ramesh Nagamani - update execute_sql_statement to display start time, end time, execution time and query id for each and every sql. Irrespective of query status 
 #                               start time, end time, execution time and query id will be displayed.  
 # IDRS-38553 - Vishnu Srungaram - update log_on function to make use of the secrets to login to snowflake. 
+# 2026-10-18 - log_on borrows a warm session from SFSessionBroker when the broker is running; falls back to the normal logon otherwise.
+# 2026-10-18 - execute_sql_statement writes a structured record per statement (query id, elapsed time, COPY INTO stage/filename
+#              and rows_unloaded/input_bytes/output_bytes) to the run's JSON-lines metrics file (RunMetrics.py).
+# 2026-10-18 - Export writes the result set with ResultSetExport.py (Arrow batches; CSV, FIXED or PARQUET; optional gzip)
+#              instead of printing each row to the export file.
+# 2026-10-18 - execute_sql_statement expands variables with a compiled statement template (SQLTemplate.py) and logs a
+#              statement's text once (with its template hash); later executions log the hash and parameter values.
+#              COPY INTO @stage statements are logged every time (log scanners). SQL_TEMPLATE_BIND=Y --> '${var}'
+#              string literals are passed as bind variables (log_on connections use paramstyle qmark).
+# 2026-10-18 - log_on connects with arrow_number_to_decimal=True (Export text of NUMBER(p,s>0) same as str(Decimal)).
 ####################################################################################################################                                 
 
 import sys
@@ -44,6 +54,10 @@ import json
 import boto3
 from botocore.exceptions import ClientError
 
+import RunMetrics
+import ResultSetExport
+import SQLTemplate
+
 
 # global status values
 activity_count = 0
@@ -165,6 +179,19 @@ opened_connections = []
 ################################################################
 def log_on(sf_logon_file = None):
 
+    # Borrow a warm session from the local session broker if it is running
+    # (broker sessions do not use paramstyle qmark for SQL_TEMPLATE_BIND)
+    if sf_logon_file is None and not SQLTemplate.SQL_TEMPLATE_BIND:
+        try:
+            import SFSessionBroker
+            con = SFSessionBroker.borrowConnection()
+        except ImportError:
+            con = None
+
+        if con is not None:
+            opened_connections.append(con)
+            return con
+
     import os
     from snowflake import connector
     from cryptography.hazmat.backends import default_backend
@@ -282,6 +309,9 @@ def log_on(sf_logon_file = None):
         database=sf_db,
         warehouse = sf_wh,
         login_timeout=timeout,
+        paramstyle="qmark" if SQLTemplate.SQL_TEMPLATE_BIND else "pyformat",
+        # NUMBER(p,s>0) --> Arrow decimal (ResultSetExport text same as str(Decimal))
+        arrow_number_to_decimal=True,
         session_parameters={
         'QUERY_TAG': script_name,
                            }
@@ -473,12 +503,33 @@ def execute_sql_statement(sql_string, con, using=None, query_tag: str = None, ex
     """
     global activity_count
     cur = con.cursor()
+    bSuccess = False
+    lstResultRows = None
+    bind_values = None
     try:
-        print("Executing: {0}.".format(sql_string))
-        if ("$" in sql_string or "&" in sql_string):
-            print ("Expanding variables in SQL statement")
-            sql_string = expandvars(sql_string, passed_variables)
-            print ("Expanded string: {0}".format(sql_string))
+        # statement tokenized once --> expansion is a join of literals and variable values (same as expandvars)
+        sql_template = SQLTemplate.getSQLTemplate(sql_string)
+        dictValues = sql_template.getValues(passed_variables)
+
+        if SQLTemplate.SQL_TEMPLATE_BIND and using is None and sql_template.hasBindVars():
+            sql_string, bind_values = sql_template.getBindSQL(dictValues)
+        else:
+            sql_string = sql_template.expand(dictValues)
+
+        # statement text logged once per template; COPY INTO @stage every time (log scanners use "Executing: COPY INTO")
+        if not sql_template.bLogged or RunMetrics.getCopyIntoTarget(sql_string)[0] is not None:
+            print("Executing: {0}.".format(sql_string))
+            print(f"SQL template: {sql_template.sHash}")
+            sql_template.bLogged = True
+        else:
+            print(f"Executing: SQL template {sql_template.sHash} (statement logged above).")
+
+        dictResolvedValues = sql_template.getResolvedValues(dictValues)
+        if dictResolvedValues:
+            print(f"Parameters: {dictResolvedValues}")
+        if bind_values is not None:
+            print(f"Bind values: {bind_values}")
+
         if (using is not None):
                 #we need to change variables from {var} to %(format)
                 sql_string = re.sub(r'\{([^}]*)\}',r'%(\1)',sql_string)
@@ -490,16 +541,21 @@ def execute_sql_statement(sql_string, con, using=None, query_tag: str = None, ex
         if query_tag is not None:
             cur.execute(f"alter session set query_tag='{query_tag}'", params=using)
         #
+        # capture COPY INTO @stage result rows for the run metrics file
+        if RunMetrics.getCopyIntoTarget(sql_string)[0] is not None:
+            lstResultRows = []
+
         start_time = datetime.datetime.now()
         print("Query Start Time:",start_time.strftime("%Y %m %d %H:%M:%S")) 
-        cur.execute(sql_string, params=using)
+        cur.execute(sql_string, params=using if bind_values is None else bind_values)
         
         activity_count = cur.rowcount
         if activity_count >= 1:
-            _print_result_set(cur)
+            _print_result_set(cur, lstResultRows)
         else:
             if (Export.expandedfilename is not None):
-                _print_result_set(cur)
+                _print_result_set(cur, lstResultRows)
+        bSuccess = True
     except snowflake.connector.errors.ProgrammingError as e:
 
         error_code, error_level = _handle_sql_error(e)
@@ -519,6 +575,12 @@ def execute_sql_statement(sql_string, con, using=None, query_tag: str = None, ex
         sf_qry_id=cur.sfqid
         print("Query End Time:",end_time.strftime("%Y %m %d %H:%M:%S")) 
         print("Query Execution Time in Python for Query ID {0} is ".format(sf_qry_id), end_time-start_time)        
+
+        try:
+            RunMetrics.writeRunMetricsRecord(RunMetrics.buildStatementRecord(sql_string, sf_qry_id, start_time, end_time, bSuccess, lstResultRows))
+        except Exception as e:
+            # metrics must never fail the extract
+            print("*** Warning: could not write run metrics record " + str(e), file=sys.stderr)
         
         cur.close()
 
@@ -526,26 +588,24 @@ def execute_sql_statement(sql_string, con, using=None, query_tag: str = None, ex
 ################################################################
 # Needed by execute_sql_statement
 ################################################################
-def _print_result_set(cur):
+def _print_result_set(cur, lstCaptureRows=None):
     if (Export.expandedfilename is None):
         # if there is not export file set then print to console
         print("Printing Result Set:")
-        print(','.join([col[0] for col in cur.description]))
+        lstColumns = [col[0] for col in cur.description]
+        print(','.join(lstColumns))
         for row in cur:
             print(','.join([str(val) for val in row]))
+            # rows returned to caller (ex. COPY INTO rows_unloaded,input_bytes,output_bytes)
+            if lstCaptureRows is not None:
+                lstCaptureRows.append(dict(zip([sCol.lower() for sCol in lstColumns], row)))
         print()
     else:
         print(">>>>>> Exporting to " + Export.expandedfilename)
         reportdir = path.dirname(Export.expandedfilename)
         makedirs(reportdir, exist_ok=True)
-        with open(Export.expandedfilename, 'a') as f:
-            for row in cur:
-                allarenone = all(v is None for v in row)
-                if (allarenone):
-                    print("Row is 'None' it will not be exported")
-                else:
-                    rowval=Export.separator.join([str(val) for val in row])
-                    print(rowval, file=f)
+        iNOFRows = ResultSetExport.exportResultSet(cur, Export.expandedfilename, Export.format, Export.separator, Export.gzip, Export.widths)
+        print(f"{iNOFRows} rows exported")
 
 
 def _handle_sql_error(e):
@@ -720,9 +780,16 @@ Import.using = staticmethod(Import.using)
 class Export:
     expandedfilename=None
     separator=' '
-    def report(file, separator=' '):
+    format="CSV"
+    gzip=False
+    widths=None
+## format: CSV, FIXED (widths or cursor description widths), or PARQUET (see ResultSetExport.py)
+    def report(file, separator=' ', format="CSV", gzip=False, widths=None):
         Export.separator = separator
         Export.expandedfilename = path.expandvars(file)
+        Export.format = format
+        Export.gzip = gzip
+        Export.widths = widths
 ## obsolete
     def title_dashes(state="ON",withValue=None):
         pass
@@ -733,6 +800,9 @@ class Export:
     def reset():
         Export.expandedfilename = None
         Export.separator = ' '
+        Export.format = "CSV"
+        Export.gzip = False
+        Export.widths = None
 
 Export.title_dashes = staticmethod(Export.title_dashes)
 Export.reset = staticmethod(Export.reset)